@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: motion detection cost vs. accuracy at reduced analysis resolution.
+
+Runs one MotionDetector per analysis scale over the same frames (a video
+file or a synthetic source, 4K by default) and reports the detection time
+per frame next to how well each scale reproduces the full-resolution
+detections: recall and precision of the full-resolution boxes (matched at
+IoU >= --iou) and the mean IoU of the matches. All boxes and areas are in
+full-resolution coordinates, and min_area means the same at every scale.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from components.detector.motion_detector import MotionDetector
+from components.streamer.synthetic_source import open_capture
+from core.data_models import FrameData
+
+DEFAULT_SOURCE = "synthetic:4k@25,frames=60,objects=6,noise=4,lighting=0.05"
+DEFAULT_SCALES = "1,0.5,0.33,0.25,0.125"
+
+
+def iou(a, b) -> float:
+    """Intersection over union of two (x, y, w, h) boxes."""
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    inter = max(0, right - left) * max(0, bottom - top)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def match(reference, boxes, threshold: float):
+    """Greedily match boxes to reference boxes; returns the IoU of each match."""
+    pairs = sorted(((iou(r, b), i, j) for i, r in enumerate(reference) for j, b in enumerate(boxes)), reverse=True)
+    used_ref, used_box, matches = set(), set(), []
+    for overlap, i, j in pairs:
+        if overlap < threshold:
+            break
+        if i not in used_ref and j not in used_box:
+            used_ref.add(i)
+            used_box.add(j)
+            matches.append(overlap)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark motion detection at reduced analysis resolution")
+    parser.add_argument("--video", default=DEFAULT_SOURCE,
+                       help=f"Video file or synthetic: spec (default: {DEFAULT_SOURCE})")
+    parser.add_argument("--frames", type=int, default=60, help="Frames to process (default: 60)")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help=f"Analysis scales (default: {DEFAULT_SCALES})")
+    parser.add_argument("--min-area", type=int, default=500, help="Minimum area in full-resolution pixels (default: 500)")
+    parser.add_argument("--iou", type=float, default=0.5, help="IoU for a box to match (default: 0.5)")
+    args = parser.parse_args()
+
+    scales = [float(scale) for scale in args.scales.split(",")]
+    if 1.0 not in scales:
+        scales.insert(0, 1.0)  # The reference
+    detectors = {scale: MotionDetector(min_area=args.min_area, analysis_scale=scale) for scale in scales}
+    times = {scale: [] for scale in scales}
+    counts = {scale: {'boxes': 0, 'matched': 0, 'ious': []} for scale in scales}
+
+    cap = open_capture(args.video)
+    if not cap.isOpened():
+        raise SystemExit(f"Cannot open video: {args.video}")
+    frame_id, frame = 0, None
+    while frame_id < args.frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        boxes = {}
+        for scale, detector in detectors.items():
+            frame_data = FrameData.create(frame_id, frame)
+            start = time.perf_counter()
+            result = detector._process_frame(frame_data)
+            if frame_id > 0:  # The first frame only primes the previous frame
+                times[scale].append(time.perf_counter() - start)
+            boxes[scale] = [d.bbox for d in result.detections]
+        for scale in scales:
+            matches = match(boxes[1.0], boxes[scale], args.iou)
+            counts[scale]['boxes'] += len(boxes[scale])
+            counts[scale]['matched'] += len(matches)
+            counts[scale]['ious'].extend(matches)
+        frame_id += 1
+    cap.release()
+    if frame_id < 2:
+        raise SystemExit("Need at least two frames")
+
+    height, width = frame.shape[:2]
+    reference_ms = statistics.mean(times[1.0]) * 1000
+    reference_boxes = counts[1.0]['boxes']
+    print("=" * 84)
+    print(f"ANALYSIS SCALE - {frame_id} frames of {width}x{height} ({args.video}), min_area {args.min_area}")
+    print("=" * 84)
+    print(f"{'Scale':>6} {'Analysed at':>12} {'ms/frame':>9} {'Speedup':>8} {'Boxes/frame':>12} "
+          f"{'Recall':>7} {'Precision':>10} {'Mean IoU':>9}")
+    for scale in scales:
+        ms = statistics.mean(times[scale]) * 1000
+        analysed = "x".join(map(str, detectors[scale].analysis_size(width, height)))
+        stats = counts[scale]
+        recall = stats['matched'] / reference_boxes if reference_boxes else 1.0
+        precision = stats['matched'] / stats['boxes'] if stats['boxes'] else 1.0
+        mean_iou = statistics.mean(stats['ious']) if stats['ious'] else 0.0
+        print(f"{scale:>6g} {analysed:>12} {ms:>9.2f} {reference_ms / ms:>7.1f}x "
+              f"{stats['boxes'] / frame_id:>12.2f} {recall:>7.1%} {precision:>10.1%} {mean_iou:>9.2f}")
+    print("-" * 84)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: frame codec cost vs. bandwidth.
+
+Encodes and decodes real video frames through MessageProtocol with each codec
+and reports the wire size per frame plus the frame rate a single stage could
+sustain on a link of the given bandwidth (limited by whichever is slower:
+encode + decode CPU time or bytes on the wire).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from communication.codecs import get_codec
+from communication.protocol import MessageProtocol
+from core.data_models import FrameData
+
+DEFAULT_VIDEO = Path(__file__).parent.parent / "data" / "People - 6387.mp4"
+DEFAULT_CODECS = "raw,lz4,zlib,jpeg:90,jpeg:75,jpeg:50,gray"
+
+
+def load_frames(video_path: Path, count: int):
+    """Read up to count frames from the video."""
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise SystemExit(f"Cannot open video: {video_path}")
+
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def measure(codec_spec: str, frames):
+    """Return (encode ms, decode ms, bytes per frame) averaged over frames."""
+    codec = get_codec(codec_spec)
+    encode_time = decode_time = 0.0
+    total_bytes = 0
+
+    for frame_id, frame in enumerate(frames):
+        frame_data = FrameData.create(frame_id, frame)
+
+        start = time.perf_counter()
+        parts = MessageProtocol.serialize_frame_data(frame_data, codec=codec)
+        encode_time += time.perf_counter() - start
+
+        total_bytes += sum(memoryview(part).nbytes for part in parts)
+
+        start = time.perf_counter()
+        MessageProtocol.deserialize(parts)
+        decode_time += time.perf_counter() - start
+
+    n = len(frames)
+    return encode_time / n * 1000, decode_time / n * 1000, total_bytes / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark frame codecs for TCP transport")
+    parser.add_argument("video_file", nargs="?", default=str(DEFAULT_VIDEO),
+                       help="Video to sample frames from (default: bundled sample video)")
+    parser.add_argument("--frames", type=int, default=100, help="Frames to sample (default: 100)")
+    parser.add_argument("--codecs", default=DEFAULT_CODECS,
+                       help=f"Comma-separated codec specs (default: {DEFAULT_CODECS})")
+    parser.add_argument("--link-mbps", type=float, default=1000.0,
+                       help="Link bandwidth for the FPS estimate in Mbit/s (default: 1000)")
+    args = parser.parse_args()
+
+    frames = load_frames(Path(args.video_file), args.frames)
+    if not frames:
+        raise SystemExit("No frames read from video")
+    height, width = frames[0].shape[:2]
+
+    print("=" * 78)
+    print(f"FRAME CODECS - {len(frames)} frames of {width}x{height} from {Path(args.video_file).name}")
+    print(f"Link: {args.link_mbps:.0f} Mbit/s")
+    print("=" * 78)
+    print(f"{'codec':<10}{'encode ms':>11}{'decode ms':>11}{'KB/frame':>11}{'ratio':>8}"
+          f"{'CPU fps':>9}{'link fps':>10}{'max fps':>9}")
+    print("-" * 78)
+
+    raw_bytes = frames[0].nbytes
+    link_bytes_per_s = args.link_mbps * 1e6 / 8
+
+    for spec in args.codecs.split(","):
+        try:
+            encode_ms, decode_ms, frame_bytes = measure(spec, frames)
+        except ValueError as e:
+            print(f"{spec:<10}skipped: {e}")
+            continue
+
+        cpu_fps = 1000.0 / max(encode_ms + decode_ms, 1e-6)
+        link_fps = link_bytes_per_s / frame_bytes
+        print(f"{spec:<10}{encode_ms:>11.2f}{decode_ms:>11.2f}{frame_bytes / 1024:>11.1f}"
+              f"{raw_bytes / frame_bytes:>7.1f}x{cpu_fps:>9.0f}{link_fps:>10.0f}{min(cpu_fps, link_fps):>9.0f}")
+
+    print("-" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: detector pool throughput and reordering.
+
+Streams a synthetic video (unpaced and lossless, as in offline mode) to
+pools of 1, 2, 4... Detector worker processes and receives their results
+in this process, as the Display does: bound to the result channel and put
+back in frame order by a FrameReorderBuffer. Reports the frames per second
+through the pool, the results held back for reordering, the most held at
+once and how long results waited in the reorder buffer. Throughput grows
+with the pool until the cores (or the Streamer) run out; on a single core
+the table shows the pool's overhead instead - every frame also carries its
+predecessor. A pool of 1 is the plain pipeline for reference.
+"""
+import argparse
+import multiprocessing
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from components.detector.motion_detector import MotionDetector
+from components.display.frame_reorder import FrameReorderBuffer
+from components.streamer.video_streamer import VideoStreamer
+from communication.zmq_manager import PipelineComm
+from core.data_models import DEFAULT_STREAM_ID, DetectionResult, SystemMessage
+
+DEFAULT_SOURCE = "synthetic:1080p@30,frames=300,objects=4,noise=4"
+
+
+def run_worker(pool: int, analysis_scale: float):
+    """Worker process: one pooled Detector, until its end-of-stream."""
+    PipelineComm.set_offline(True)
+    PipelineComm.set_detector_pool(pool if pool > 1 else 0)
+    detector = MotionDetector(analysis_scale=analysis_scale, pool_worker=pool > 1)
+    if not detector.start_detection():
+        raise SystemExit("Failed to start detector")
+    detector.process_thread.join()
+    detector.stop_detection()
+
+
+def run(pool: int, args) -> dict:
+    """Stream the source through a pool of workers; returns throughput and reorder statistics."""
+    PipelineComm.set_detector_pool(pool if pool > 1 else 0)
+    receiver = PipelineComm.create_display_receiver()
+    if not receiver.start():
+        raise SystemExit("Failed to start result receiver")
+    spawn = multiprocessing.get_context("spawn")  # Fresh ZMQ contexts in the workers
+    workers = [spawn.Process(target=run_worker, args=(pool, args.analysis_scale)) for _ in range(pool)]
+    for worker in workers:
+        worker.start()
+    time.sleep(args.startup)  # Workers connect before the first frame, or PUSH gives it all to the first
+
+    reorder = FrameReorderBuffer(max_size=args.reorder_buffer, gap_timeout=args.reorder_timeout)
+    held_since, waits = {}, []
+    streamer = VideoStreamer(args.video, offline=True, detector_pool=pool if pool > 1 else 0)
+    if not streamer.start_streaming():
+        raise SystemExit(f"Cannot stream {args.video}")
+    start = time.monotonic()
+    delivered, last_id, deadline = 0, None, None
+    while last_id is None or (reorder.last_frame_id(DEFAULT_STREAM_ID) < last_id and time.monotonic() < deadline):
+        for message in receiver.receive_batch(timeout_ms=100):
+            if isinstance(message, SystemMessage) and message.message_type == "end_of_stream":
+                # Each worker forwards one, the first to get it before draining its queue
+                last_id = message.payload.get('last_frame_ids', {}).get(DEFAULT_STREAM_ID, -1)
+            elif isinstance(message, DetectionResult):
+                held_since[message.frame_id] = time.monotonic()
+                released, _ = reorder.add(message)
+                waits.extend(time.monotonic() - held_since.pop(result.frame_id) for result in released)
+                delivered += len(released)
+        if last_id is not None and deadline is None:
+            deadline = time.monotonic() + args.reorder_timeout + 1.0
+    delivered += len(reorder.flush())  # Only held results after a missing one are left
+    elapsed = time.monotonic() - start
+
+    streamer.stop_streaming()
+    for worker in workers:
+        worker.join(timeout=5)
+        if worker.is_alive():
+            print(f"Worker {worker.pid} did not end after end-of-stream")
+            worker.terminate()
+    receiver.stop()
+    stats = reorder.get_stats()
+    return {
+        'fps': delivered / elapsed,
+        'delivered': delivered,
+        'held': stats['results_held'],
+        'max_pending': stats['max_pending'],
+        'missing': stats['frames_missing'],
+        'wait_ms': statistics.mean(waits) * 1000 if waits else 0.0,
+        'max_wait_ms': max(waits) * 1000 if waits else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detector pools of several worker processes")
+    parser.add_argument("--video", default=DEFAULT_SOURCE, help=f"Video file or synthetic: spec (default: {DEFAULT_SOURCE})")
+    parser.add_argument("--pools", default="1,2,4", help="Pool sizes (default: 1,2,4)")
+    parser.add_argument("--analysis-scale", type=float, default=1.0, help="Detector analysis scale (default: 1.0)")
+    parser.add_argument("--reorder-buffer", type=int, default=32, help="Reorder buffer size (default: 32)")
+    parser.add_argument("--reorder-timeout", type=float, default=0.5, help="Reorder gap timeout in s (default: 0.5)")
+    parser.add_argument("--startup", type=float, default=2.0, help="Seconds for the workers to start (default: 2)")
+    args = parser.parse_args()
+    PipelineComm.set_offline(True)
+
+    print("=" * 84)
+    print(f"DETECTOR POOL - {args.video}, offline (lossless), {multiprocessing.cpu_count()} CPUs")
+    print("=" * 84)
+    print(f"{'Workers':>8} {'Frames':>7} {'Frames/s':>9} {'Held back':>10} {'Max held':>9} {'Missing':>8} "
+          f"{'Reorder wait ms':>16} {'Max wait ms':>12}")
+    for pool in (int(size) for size in args.pools.split(",")):
+        result = run(pool, args)
+        print(f"{pool:>8} {result['delivered']:>7} {result['fps']:>9.1f} {result['held']:>10} "
+              f"{result['max_pending']:>9} {result['missing']:>8} {result['wait_ms']:>16.2f} "
+              f"{result['max_wait_ms']:>12.2f}")
+    print("-" * 84)
+    print("Held back: results that arrived before an earlier frame's result and waited for it")
+
+
+if __name__ == "__main__":
+    main()
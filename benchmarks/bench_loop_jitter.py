@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark: delivery latency jitter of thread-based vs. asyncio stage loops.
+
+A producer thread sends frames at a fixed rate on a data socket while also
+sending control and log traffic on two more sockets. The consumer services
+all three sockets either with one blocking thread per socket (the component
+design: ZMQManager.receive with a 1000 ms poll timeout) or with one asyncio
+event loop (AsyncZMQManager tasks). Each frame is given --work-ms of CPU work
+to create the GIL contention a real stage has. Reports the latency from send
+to receive of data frames: mean, percentiles and standard deviation (jitter).
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import zmq
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from communication.zmq_manager import ZMQManager, SendPolicy
+from communication.async_zmq_manager import AsyncZMQManager
+from core.data_models import FrameData, SystemMessage, LogMessage
+
+ENDPOINT = "ipc:///tmp/axon_bench_jitter"
+
+
+def busy(ms: float):
+    """Burn CPU (holding the GIL) for ms milliseconds."""
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        pass
+
+
+def produce(frames: int, rate: float, frame: np.ndarray, ready: threading.Event):
+    """Send frames at a fixed rate, with a control and a log message every 10 frames."""
+    data = ZMQManager(zmq.PUSH, f"{ENDPOINT}_data", bind=True, send_policy=SendPolicy.BLOCK)
+    control = ZMQManager(zmq.PUSH, f"{ENDPOINT}_control", bind=True)
+    log = ZMQManager(zmq.PUSH, f"{ENDPOINT}_log", bind=True)
+    for manager in (data, control, log):
+        manager.start()
+    ready.wait()
+
+    interval = 1.0 / rate
+    next_time = time.perf_counter()
+    for frame_id in range(frames):
+        data.send_frame_data(FrameData.create(frame_id, frame))
+        if frame_id % 10 == 0:
+            control.send_system_message(SystemMessage.status_request())
+            log.send_log_message(LogMessage.create("INFO", "Bench", f"frame {frame_id}"))
+
+        next_time += interval
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    data.send_system_message(SystemMessage(message_type="end_of_stream", payload={}, timestamp=time.time()))
+    time.sleep(0.5)
+    for manager in (data, control, log):
+        manager.stop()
+
+
+def consume_threads(work_ms: float, latencies: list, ready: threading.Event):
+    """One blocking receive thread per socket."""
+    data = ZMQManager(zmq.PULL, f"{ENDPOINT}_data", bind=False, send_policy=SendPolicy.BLOCK)
+    control = ZMQManager(zmq.PULL, f"{ENDPOINT}_control", bind=False)
+    log = ZMQManager(zmq.PULL, f"{ENDPOINT}_log", bind=False)
+    for manager in (data, control, log):
+        manager.start()
+    stop = threading.Event()
+
+    def side_loop(manager):
+        while not stop.is_set():
+            manager.receive(timeout_ms=1000)
+
+    side_threads = [threading.Thread(target=side_loop, args=(m,), daemon=True) for m in (control, log)]
+    for thread in side_threads:
+        thread.start()
+    time.sleep(0.2)
+    ready.set()
+
+    while True:
+        message = data.receive(timeout_ms=1000)
+        if isinstance(message, FrameData):
+            latencies.append(message.age())
+            busy(work_ms)
+        elif isinstance(message, SystemMessage):
+            break
+
+    stop.set()
+    for thread in side_threads:
+        thread.join()
+    for manager in (data, control, log):
+        manager.stop()
+
+
+def consume_asyncio(work_ms: float, latencies: list, ready: threading.Event):
+    """One event loop servicing all sockets."""
+
+    async def run():
+        data = AsyncZMQManager(ZMQManager(zmq.PULL, f"{ENDPOINT}_data", bind=False, send_policy=SendPolicy.BLOCK))
+        control = AsyncZMQManager(ZMQManager(zmq.PULL, f"{ENDPOINT}_control", bind=False))
+        log = AsyncZMQManager(ZMQManager(zmq.PULL, f"{ENDPOINT}_log", bind=False))
+        for manager in (data, control, log):
+            manager.start()
+
+        async def side_loop(manager):
+            while True:
+                await manager.receive(timeout_ms=1000)
+
+        side_tasks = [asyncio.create_task(side_loop(m)) for m in (control, log)]
+        await asyncio.sleep(0.2)
+        ready.set()
+
+        while True:
+            message = await data.receive(timeout_ms=1000)
+            if isinstance(message, FrameData):
+                latencies.append(message.age())
+                busy(work_ms)
+            elif isinstance(message, SystemMessage):
+                break
+
+        for task in side_tasks:
+            task.cancel()
+        await asyncio.gather(*side_tasks, return_exceptions=True)
+        for manager in (data, control, log):
+            manager.stop()
+
+    asyncio.run(run())
+
+
+def measure(mode: str, frames: int, rate: float, work_ms: float, frame: np.ndarray) -> list:
+    """Run one producer/consumer pair and return per-frame latencies in ms."""
+    latencies = []
+    ready = threading.Event()
+    consumer = consume_threads if mode == "thread" else consume_asyncio
+    consumer_thread = threading.Thread(target=consumer, args=(work_ms, latencies, ready))
+    producer_thread = threading.Thread(target=produce, args=(frames, rate, frame, ready))
+    producer_thread.start()
+    consumer_thread.start()
+    producer_thread.join()
+    consumer_thread.join()
+    return [latency * 1000 for latency in latencies]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark latency jitter of thread vs. asyncio stage loops")
+    parser.add_argument("--frames", type=int, default=500, help="Frames per run (default: 500)")
+    parser.add_argument("--rate", type=float, default=100.0, help="Frames per second (default: 100)")
+    parser.add_argument("--work-ms", type=float, default=2.0,
+                       help="CPU work per frame in the consumer (default: 2.0)")
+    parser.add_argument("--size", default="640x360", help="Frame size WxH (default: 640x360)")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+
+    print("=" * 72)
+    print(f"LOOP JITTER - {args.frames} frames of {width}x{height} at {args.rate:.0f} fps, "
+          f"{args.work_ms:.1f} ms work/frame")
+    print("=" * 72)
+    print(f"{'loop':<10}{'frames':>8}{'mean ms':>10}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}{'stdev ms':>11}")
+    print("-" * 72)
+
+    for mode in ("thread", "asyncio"):
+        latencies = measure(mode, args.frames, args.rate, args.work_ms, frame)
+        if not latencies:
+            print(f"{mode:<10}no frames received")
+            continue
+        p50, p99 = np.percentile(latencies, [50, 99])
+        print(f"{mode:<10}{len(latencies):>8}{statistics.mean(latencies):>10.3f}{p50:>9.3f}{p99:>9.3f}"
+              f"{max(latencies):>9.3f}{statistics.pstdev(latencies):>11.3f}")
+
+    print("-" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: MessageProtocol.deserialize cost per message type.
+
+Compares the legacy untagged format (JSON attempt, then whole-message pickle)
+with the tagged wire format (O(1) dispatch on the type byte).
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from communication.protocol import MessageProtocol
+from core.data_models import FrameData, DetectionResult, Detection, SystemMessage, LogMessage, PerformanceMetrics
+
+
+def build_messages(width: int, height: int):
+    """Build one sample message of each type."""
+    frame = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    frame_data = FrameData.create(42, frame, {'width': width, 'height': height, 'fps': 30.0})
+    detections = [Detection(bbox=(i, i, 40, 40), confidence=0.5, detection_type="motion", area=1600)
+                  for i in range(10)]
+    result = DetectionResult.create(frame_data, detections, processing_time=3.2)
+    
+    return {
+        'frame_data': lambda: MessageProtocol.serialize_frame_data(frame_data),
+        'detection_result': lambda: MessageProtocol.serialize_detection_result(result),
+        'system_message': lambda: MessageProtocol.serialize_system_message(SystemMessage.shutdown()),
+        'log_message': lambda: MessageProtocol.serialize_log_message(LogMessage.info("Detector", "benchmark", 42)),
+        'performance_metrics': lambda: MessageProtocol.serialize_performance_metrics(
+            PerformanceMetrics.create(30.0, 12.5, 150.0, 40.0, 2)),
+    }
+
+
+def time_decode(payload, iterations: int) -> float:
+    """Return mean decode time in microseconds."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        MessageProtocol.deserialize(payload)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark message decode cost per type")
+    parser.add_argument("--width", type=int, default=1920, help="Frame width (default: 1920)")
+    parser.add_argument("--height", type=int, default=1080, help="Frame height (default: 1080)")
+    parser.add_argument("--iterations", type=int, default=200, help="Decodes per measurement (default: 200)")
+    args = parser.parse_args()
+    
+    builders = build_messages(args.width, args.height)
+    
+    print("=" * 60)
+    print(f"DESERIALIZE COST PER MESSAGE ({args.width}x{args.height} frames)")
+    print("=" * 60)
+    print(f"{'message type':<22}{'legacy (us)':>14}{'tagged (us)':>14}{'speedup':>10}")
+    print("-" * 60)
+    
+    for name, build in builders.items():
+        MessageProtocol.wire_version = MessageProtocol.LEGACY_WIRE_VERSION
+        legacy = build()
+        MessageProtocol.wire_version = MessageProtocol.WIRE_VERSION
+        tagged = build()
+        
+        legacy_us = time_decode(legacy, args.iterations)
+        tagged_us = time_decode(tagged, args.iterations)
+        print(f"{name:<22}{legacy_us:>14.1f}{tagged_us:>14.1f}{legacy_us / tagged_us:>9.1f}x")
+    
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
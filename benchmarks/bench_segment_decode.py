@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parallel segment decoding.
+
+Decodes a video file sequentially in one capture, and in segments on a
+process pool two ways: frames pickled back through the pool (the first
+version of ParallelSegmentSource), and decoded into shared-memory blocks
+with only their PTS returned (the current one). For each pool size it
+reports the frames per second a consumer receives in order, and the
+consumer's own CPU time per frame, which includes unpickling or copying the
+frames out. A synthetic source is first encoded to a temporary file, so
+the workers decode and seek a real container.
+"""
+import argparse
+import collections
+import concurrent.futures
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from components.streamer.segment_source import ParallelSegmentSource
+from components.streamer.synthetic_source import SyntheticVideoSource, is_synthetic
+
+DEFAULT_SOURCE = "synthetic:1080p@30,frames=300,objects=4,noise=4"
+
+
+def encode_synthetic(spec: str, directory: str) -> str:
+    """Write a synthetic source to an mp4v file and return its path."""
+    source = SyntheticVideoSource(spec)
+    path = str(Path(directory) / "segments.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), source.spec.fps,
+                             (source.spec.width, source.spec.height))
+    for index in range(source.spec.frames):
+        writer.write(source.render(index))
+    writer.release()
+    return path
+
+
+def decode_pickled(video_path: str, start: int, count: int) -> list:
+    """Worker of the pickling version: decode [start, start + count) and return the frames."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        frames = []
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        return frames
+    finally:
+        cap.release()
+
+
+def run_sequential(video_path: str) -> int:
+    """Decode the whole file in one capture; returns the frame count."""
+    cap = cv2.VideoCapture(video_path)
+    count = 0
+    while cap.read()[0]:
+        count += 1
+    cap.release()
+    return count
+
+
+def run_pickled(video_path: str, total_frames: int, workers: int, segment_frames: int) -> int:
+    """Decode in segments with frames pickled back, consumed in order with 2 segments per worker in flight."""
+    executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    starts = collections.deque(range(0, total_frames, segment_frames))
+    pending = collections.deque()
+    count = 0
+    try:
+        while starts or pending:
+            while starts and len(pending) < 2 * workers:
+                pending.append(executor.submit(decode_pickled, video_path, starts.popleft(), segment_frames))
+            count += len(pending.popleft().result())
+    finally:
+        executor.shutdown()
+    return count
+
+
+def run_shared(video_path: str, total_frames: int, workers: int, segment_frames: int) -> int:
+    """Decode with ParallelSegmentSource (shared-memory blocks), consumed in order."""
+    source = ParallelSegmentSource(video_path, total_frames, workers=workers, segment_frames=segment_frames)
+    source.start()
+    count = 0
+    try:
+        while source.get(timeout=60.0) is not None:
+            count += 1
+    finally:
+        source.stop()
+    return count
+
+
+def measure(run, *args) -> dict:
+    """Frames per second and consumer CPU ms per frame of one run."""
+    start, cpu = time.perf_counter(), time.process_time()
+    frames = run(*args)
+    elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+    return {'frames': frames, 'fps': frames / elapsed, 'cpu_ms': cpu * 1000 / max(frames, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel segment decoding")
+    parser.add_argument("--video", default=DEFAULT_SOURCE, help=f"Video file or synthetic: spec (default: {DEFAULT_SOURCE})")
+    parser.add_argument("--workers", default="1,2,4", help="Pool sizes (default: 1,2,4)")
+    parser.add_argument("--segment-frames", type=int, default=64, help="Frames per segment (default: 64)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        video_path = encode_synthetic(args.video, tmpdir) if is_synthetic(args.video) else args.video
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise SystemExit(f"Cannot open video: {video_path}")
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        size = f"{int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}"
+        cap.release()
+
+        print("=" * 72)
+        print(f"SEGMENT DECODE - {size}, {total_frames} frames, {args.segment_frames} frames per segment, "
+              f"{multiprocessing.cpu_count()} CPUs")
+        print("=" * 72)
+        print(f"{'Mode':>12} {'Workers':>8} {'Frames':>7} {'Frames/s':>9} {'Consumer CPU ms/frame':>22}")
+        result = measure(run_sequential, video_path)
+        print(f"{'sequential':>12} {'-':>8} {result['frames']:>7} {result['fps']:>9.1f} {result['cpu_ms']:>22.2f}")
+        for workers in (int(workers) for workers in args.workers.split(",")):
+            for mode, run in (("pickled", run_pickled), ("shared", run_shared)):
+                result = measure(run, video_path, total_frames, workers, args.segment_frames)
+                print(f"{mode:>12} {workers:>8} {result['frames']:>7} {result['fps']:>9.1f} "
+                      f"{result['cpu_ms']:>22.2f}")
+        print("-" * 72)
+        print("Consumer CPU: the sequential decode counts the decoding itself; the pools only what reaches the consumer")
+
+
+if __name__ == "__main__":
+    main()
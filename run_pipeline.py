@@ -2,6 +2,7 @@
 """
 Runner script for the video processing pipeline with phase selection.
 """
+import os
 import sys
 import subprocess
 from pathlib import Path
@@ -25,6 +26,8 @@ Examples:
   python run_pipeline.py -p c "video.mp4"          # Run phase C with custom video
   python run_pipeline.py "video.mp4" -p b          # Run phase B with custom video
   python run_pipeline.py -p b --no-blur            # Run phase B without blur
+  python run_pipeline.py -p c --offline "video.mp4"  # Process as fast as possible, no drops
+  python run_pipeline.py -p c synthetic:720p@30,objects=5  # Generated video, no sample file needed
         """
     )
     
@@ -38,11 +41,13 @@ Examples:
                        help="Enable motion blur (phase A only)")
     parser.add_argument("--show-logs", action="store_true",
                        help="Show centralized log file after pipeline stops")
+    parser.add_argument("--offline", action="store_true",
+                       help="Batch mode: unpaced, lossless, reports throughput (best with phase C)")
     
     args, extra_args = parser.parse_known_args()
     
-    # Check if video file exists
-    if not Path(args.video_file).exists():
+    # Check if video file exists (synthetic sources are generated by the Streamer)
+    if not args.video_file.startswith("synthetic:") and not Path(args.video_file).exists():
         print(f"Error: Video file not found: {args.video_file}")
         return 1
     
@@ -72,6 +77,11 @@ Examples:
     # Add any extra arguments
     cmd.extend(extra_args)
     
+    # Offline mode reaches every pipeline process through the environment
+    env = dict(os.environ)
+    if args.offline:
+        env["PIPELINE_OFFLINE"] = "1"
+    
     # Display what we're running
     print("=" * 60)
     print(f"RUNNING PHASE {args.phase.upper()} PIPELINE")
@@ -92,11 +102,14 @@ Examples:
         if not args.no_blur:
             print("  + Motion blur enabled")
     
+    if args.offline:
+        print("  + Offline mode: unpaced, lossless, throughput reported at the end")
+    
     print("-" * 60)
     
     # Run the pipeline
     try:
-        return subprocess.call(cmd)
+        return subprocess.call(cmd, env=env)
     except KeyboardInterrupt:
         print("\nPipeline interrupted by user")
         return 0
@@ -0,0 +1,210 @@
+"""
+asyncio variant of ZMQManager.
+
+AsyncZMQManager wraps a ZMQManager (usually from a PipelineComm factory) and
+shadows its socket with a ``zmq.asyncio`` socket. Waits for incoming messages,
+queue space and credits become awaitables, so one event loop can service data,
+control and logging sockets concurrently. Serialization, send policies, shared
+memory and metrics are those of the wrapped manager.
+"""
+import threading
+import time
+from typing import Generator, List, Optional, Tuple, Union
+
+import numpy as np
+import zmq
+import zmq.asyncio
+
+from .zmq_manager import ZMQManager, PipelineComm, SendTracker
+from .shared_memory import SharedFrameRef
+from .protocol import MessageProtocol
+from core.data_models import FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage
+
+
+class AsyncZMQManager:
+    """Awaitable send/receive on top of a ZMQManager."""
+
+    def __init__(self, manager: ZMQManager):
+        """
+        Initialize async manager.
+
+        Args:
+            manager: Manager to wrap; it keeps owning the socket (start/stop)
+        """
+        self.manager = manager
+        self.socket = zmq.asyncio.Socket.from_socket(manager.socket)
+        self.credit_socket: Optional[zmq.asyncio.Socket] = None
+        self.logger = manager.logger
+
+    @property
+    def endpoint(self) -> str:
+        return self.manager.endpoint
+
+    @property
+    def is_connected(self) -> bool:
+        return self.manager.is_connected
+
+    def start(self) -> bool:
+        """Start the wrapped socket (bind or connect)."""
+        return self.manager.start()
+
+    def stop(self):
+        """Stop the wrapped socket."""
+        self.credit_socket = None
+        self.manager.stop()
+
+    async def send_frame_data(self, frame_data: FrameData, timeout_ms: int = 1000,
+                              send: Optional[SendTracker] = None) -> bool:
+        """Send FrameData message according to the channel's send policy (send tracks its completion)."""
+        if not self.is_connected:
+            self.logger.error("Socket not connected")
+            return ZMQManager._unsent(send)
+
+        try:
+            ref = self.manager._shared_frame_ref(frame_data.frame)
+            start = time.perf_counter()
+            parts = MessageProtocol.serialize_frame_data(frame_data, ref, self.manager.codec)
+            self.manager.metrics.serialize_time.record(time.perf_counter() - start)
+            return await self._send_frame_parts(parts, ref, timeout_ms, send)
+
+        except Exception as e:
+            self.logger.error(f"Send failed: {e}")
+            return ZMQManager._unsent(send)
+
+    async def send_detection_result(self, result: DetectionResult, timeout_ms: int = 1000,
+                                    send: Optional[SendTracker] = None) -> bool:
+        """Send DetectionResult message according to the channel's send policy (send tracks its completion)."""
+        if not self.is_connected:
+            self.logger.error("Socket not connected")
+            return ZMQManager._unsent(send)
+
+        try:
+            ref = self.manager._shared_frame_ref(result.frame)
+            start = time.perf_counter()
+            parts = MessageProtocol.serialize_detection_result(result, ref, self.manager.codec)
+            self.manager.metrics.serialize_time.record(time.perf_counter() - start)
+            return await self._send_frame_parts(parts, ref, timeout_ms, send)
+
+        except Exception as e:
+            self.logger.error(f"Send failed: {e}")
+            return ZMQManager._unsent(send)
+
+    async def _send_frame_parts(self, parts: List, ref: Optional[SharedFrameRef], timeout_ms: int,
+                                send: Optional[SendTracker] = None) -> bool:
+        """ZMQManager's send policy, with its waits awaited instead of blocking the loop."""
+        return await self._run_steps(self.manager._frame_send_steps(parts, ref, timeout_ms, send))
+
+    async def _run_steps(self, steps: Generator):
+        """Drive one of the manager's send step sequences, awaiting its waits (see ZMQManager._run_steps)."""
+        try:
+            wait, timeout_ms = next(steps)
+            while True:
+                wait, timeout_ms = steps.send(await self._poll(wait, timeout_ms))
+        except StopIteration as done:
+            return done.value
+
+    async def _poll(self, wait: str, timeout_ms: int) -> bool:
+        """Await up to timeout_ms for a step's wait (queue space or a credit grant)."""
+        if wait == ZMQManager.WAIT_CREDIT:
+            if self.credit_socket is None:
+                self.credit_socket = zmq.asyncio.Socket.from_socket(self.manager.credit_socket)
+            return bool(await self.credit_socket.poll(timeout_ms, zmq.POLLIN))
+        return await self._wait_writable(timeout_ms)
+
+    def interrupt(self):
+        """Make a lossless send waiting on this socket give up after its current wait."""
+        self.manager.interrupt()
+
+    async def _wait_writable(self, timeout_ms: int) -> bool:
+        """Wait until the socket can queue a message."""
+        return bool(await self.socket.poll(timeout_ms, zmq.POLLOUT))
+
+    async def send_system_message(self, message: SystemMessage, timeout_ms: int = 1000) -> bool:
+        """Send SystemMessage, waiting for queue space."""
+        if not self.is_connected:
+            self.logger.error("Socket not connected")
+            return False
+
+        try:
+            await self._run_steps(self.manager._flush_pending_steps(timeout_ms))
+            data = self.manager._serialize_timed(MessageProtocol.serialize_system_message, message)
+            if not await self._wait_writable(timeout_ms):
+                raise zmq.Again()
+            self.manager.socket.send(data, zmq.NOBLOCK)
+            self.manager.metrics.record_send(data)
+            return True
+
+        except zmq.Again:
+            self.manager.metrics.hwm_hits += 1
+            self.logger.warning(f"Send timeout after {timeout_ms}ms")
+            return False
+        except Exception as e:
+            self.logger.error(f"Send failed: {e}")
+            return False
+
+    def send_log_message(self, log_msg: LogMessage, timeout_ms: int = 1000) -> bool:
+        """Send LogMessage (never waits, so no await needed)."""
+        return self.manager.send_log_message(log_msg, timeout_ms)
+
+    def send_performance_metrics(self, metrics: PerformanceMetrics, timeout_ms: int = 1000) -> bool:
+        """Send PerformanceMetrics (never waits, so no await needed)."""
+        return self.manager.send_performance_metrics(metrics, timeout_ms)
+
+    async def receive(self, timeout_ms: int = 1000) -> Optional[Union[FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage]]:
+        """Receive and deserialize one message, awaiting up to timeout_ms."""
+        messages = await self.receive_batch(max_messages=1, timeout_ms=timeout_ms)
+        return messages[0] if messages else None
+
+    async def receive_batch(self, max_messages: int = 64, timeout_ms: int = 1000) -> List[Union[FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage]]:
+        """
+        Receive every message already queued, up to max_messages.
+
+        Awaits up to timeout_ms for the first message, then drains the socket
+        without blocking (see ZMQManager.receive_batch).
+        """
+        if not self.is_connected:
+            self.logger.error("Socket not connected")
+            return []
+
+        try:
+            start = time.perf_counter()
+            if not await self.socket.poll(timeout_ms, zmq.POLLIN):
+                return []
+            self.manager.metrics.receive_wait.record(time.perf_counter() - start)
+        except Exception as e:
+            self.logger.error(f"Receive failed: {e}")
+            return []
+
+        return self.manager._drain(max_messages)
+
+    def release_frame(self, frame: Optional[np.ndarray]):
+        """Release a received frame's shared-memory slot."""
+        self.manager.release_frame(frame)
+
+    def skip_stale(self, messages: List) -> Tuple[List, int]:
+        """Keep only the newest frame-carrying message of a batch (see ZMQManager.skip_stale)."""
+        return self.manager.skip_stale(messages)
+
+    def get_send_stats(self) -> dict:
+        """Get send/drop counters for this channel."""
+        return self.manager.get_send_stats()
+
+    def get_metrics(self) -> dict:
+        """Get transport metrics for this socket."""
+        return self.manager.get_metrics()
+
+
+async def watch_control_channel(stop_event: threading.Event, logger):
+    """Set stop_event when a shutdown message arrives on the control channel (run as a task)."""
+    subscriber = PipelineComm.create_control_subscriber()
+    try:
+        if not subscriber.start():
+            return
+        control = AsyncZMQManager(subscriber)
+        while not stop_event.is_set():
+            message = await control.receive(timeout_ms=1000)
+            if isinstance(message, SystemMessage) and message.message_type == "shutdown":
+                logger.info("Received shutdown on control channel")
+                stop_event.set()
+    finally:
+        subscriber.stop()
@@ -0,0 +1,184 @@
+"""
+Frame codecs for the pixel part of frame-carrying messages.
+
+Raw frames are the right choice on IPC, where the buffer is handed over
+without copying. Over TCP (FORCE_TCP, or a stage on another host) a 1080p
+BGR stream at 30 FPS needs ~1.5 Gbit/s, so senders can trade CPU for
+bandwidth with one of these codecs:
+
+    raw      - pixels as-is (zero-copy)
+    lz4      - lossless, fast (needs the ``lz4`` package)
+    zlib     - lossless, zlib level 1 (always available)
+    jpeg[:Q] - lossy JPEG at quality Q (default 80)
+    gray     - single luma channel, expanded back to BGR on receipt
+
+The codec name and its parameters travel in the frame header, so receivers
+decode whatever the sender chose; only the sending side of a channel is
+configured.
+"""
+import os
+import zlib
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+class FrameCodec:
+    """Base codec: raw pixels, no transformation."""
+
+    name = "raw"
+
+    def supports(self, frame: np.ndarray) -> bool:
+        """Whether this codec can encode the frame (unsupported frames are sent raw)."""
+        return True
+
+    def encode(self, frame: np.ndarray) -> Any:
+        """Encode a contiguous frame into a buffer to send."""
+        return memoryview(frame.reshape(-1, order='A'))
+
+    def decode(self, array_header: Dict[str, Any], buffer: Any) -> np.ndarray:
+        """Rebuild the frame described by array_header from an encoded buffer."""
+        return np.ndarray(
+            shape=array_header['shape'],
+            dtype=np.dtype(array_header['dtype']),
+            buffer=buffer,
+            strides=array_header['strides']
+        )
+
+    def spec(self) -> str:
+        """Codec spec string (as accepted by get_codec)."""
+        return self.name
+
+
+class ZlibCodec(FrameCodec):
+    """Lossless zlib compression (level 1 favours speed over ratio)."""
+
+    name = "zlib"
+
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def encode(self, frame: np.ndarray) -> Any:
+        return zlib.compress(memoryview(frame.reshape(-1, order='A')), self.level)
+
+    def decode(self, array_header: Dict[str, Any], buffer: Any) -> np.ndarray:
+        return super().decode(array_header, zlib.decompress(buffer))
+
+
+class Lz4Codec(FrameCodec):
+    """Lossless LZ4 frame compression (optional dependency)."""
+
+    name = "lz4"
+
+    def __init__(self):
+        if lz4_frame is None:
+            raise ValueError("lz4 codec requires the 'lz4' package (pip install lz4)")
+
+    def encode(self, frame: np.ndarray) -> Any:
+        return lz4_frame.compress(memoryview(frame.reshape(-1, order='A')))
+
+    def decode(self, array_header: Dict[str, Any], buffer: Any) -> np.ndarray:
+        return super().decode(array_header, lz4_frame.decompress(buffer))
+
+
+class JpegCodec(FrameCodec):
+    """Lossy JPEG compression for 8-bit BGR or grayscale frames."""
+
+    name = "jpeg"
+
+    def __init__(self, quality: int = 80):
+        if not 1 <= quality <= 100:
+            raise ValueError(f"JPEG quality must be 1-100, got {quality}")
+        self.quality = quality
+
+    def supports(self, frame: np.ndarray) -> bool:
+        return frame.dtype == np.uint8 and (frame.ndim == 2 or (frame.ndim == 3 and frame.shape[2] == 3))
+
+    def encode(self, frame: np.ndarray) -> Any:
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return encoded
+
+    def decode(self, array_header: Dict[str, Any], buffer: Any) -> np.ndarray:
+        flags = cv2.IMREAD_GRAYSCALE if len(array_header['shape']) == 2 else cv2.IMREAD_COLOR
+        frame = cv2.imdecode(np.frombuffer(buffer, dtype=np.uint8), flags)
+        if frame is None:
+            raise ValueError("JPEG decoding failed")
+        return frame
+
+    def spec(self) -> str:
+        return f"{self.name}:{self.quality}"
+
+
+class GrayCodec(FrameCodec):
+    """Send only the luma channel; receivers get a BGR frame with equal channels."""
+
+    name = "gray"
+
+    def supports(self, frame: np.ndarray) -> bool:
+        return frame.dtype == np.uint8 and frame.ndim == 3 and frame.shape[2] == 3
+
+    def encode(self, frame: np.ndarray) -> Any:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return memoryview(gray.reshape(-1))
+
+    def decode(self, array_header: Dict[str, Any], buffer: Any) -> np.ndarray:
+        height, width = array_header['shape'][:2]
+        gray = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width)
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+_CODEC_CLASSES = {
+    FrameCodec.name: FrameCodec,
+    ZlibCodec.name: ZlibCodec,
+    Lz4Codec.name: Lz4Codec,
+    JpegCodec.name: JpegCodec,
+    GrayCodec.name: GrayCodec,
+}
+
+# spec -> codec instance (codecs are stateless, so one instance per spec is shared)
+_codec_cache: Dict[str, FrameCodec] = {}
+
+
+def get_codec(spec: Optional[str]) -> FrameCodec:
+    """
+    Get a codec from a spec string such as "raw", "zlib", "lz4", "jpeg:75" or "gray".
+    
+    Raises:
+        ValueError: Unknown codec name, bad parameter or missing optional dependency
+    """
+    spec = (spec or FrameCodec.name).strip().lower()
+    codec = _codec_cache.get(spec)
+    if codec is not None:
+        return codec
+    
+    name, _, param = spec.partition(':')
+    codec_class = _CODEC_CLASSES.get(name)
+    if codec_class is None:
+        raise ValueError(f"Unknown frame codec: {name} (available: {', '.join(_CODEC_CLASSES)})")
+    
+    if codec_class is JpegCodec and param:
+        codec = JpegCodec(quality=int(param))
+    elif codec_class is ZlibCodec and param:
+        codec = ZlibCodec(level=int(param))
+    else:
+        codec = codec_class()
+    
+    _codec_cache[spec] = codec
+    return codec
+
+
+def default_codec(endpoint: str) -> FrameCodec:
+    """
+    Default codec for a channel: raw on IPC, ``FRAME_CODEC`` (default raw) on TCP.
+    """
+    if endpoint.startswith("tcp://"):
+        return get_codec(os.getenv("FRAME_CODEC", FrameCodec.name))
+    return get_codec(FrameCodec.name)
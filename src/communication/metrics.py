@@ -0,0 +1,178 @@
+"""
+Per-socket transport metrics for ZMQManager.
+
+Each socket keeps plain integer counters and fixed log2-bucket latency
+histograms, so recording a sample is a couple of integer operations on the
+hot path. Snapshots can be queried in-process (``ZMQManager.get_metrics``) or
+published periodically on ``Endpoints.MONITORING_CHANNEL`` as a
+``transport_metrics`` SystemMessage by a ``TransportMetricsReporter``.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class LatencyHistogram:
+    """Latency histogram with power-of-two microsecond buckets (bucket i: < 2**i us)."""
+
+    NUM_BUCKETS = 32  # Up to ~35 minutes
+
+    def __init__(self):
+        self.counts = [0] * self.NUM_BUCKETS
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float):
+        """Record one duration."""
+        us = int(seconds * 1_000_000)
+        self.counts[min(us.bit_length(), self.NUM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_us += us
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentile(self, p: float) -> int:
+        """Upper bound (us) of the bucket containing the p-th percentile."""
+        if self.count == 0:
+            return 0
+        target = self.count * p / 100.0
+        seen = 0
+        for bucket, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(1 << bucket, self.max_us)
+        return self.max_us
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary plus non-empty buckets (keyed by upper bound in us)."""
+        return {
+            'count': self.count,
+            'mean_us': self.total_us / self.count if self.count else 0.0,
+            'p50_us': self.percentile(50),
+            'p99_us': self.percentile(99),
+            'max_us': self.max_us,
+            'buckets': {1 << bucket: n for bucket, n in enumerate(self.counts) if n}
+        }
+
+
+class SocketMetrics:
+    """Counters and histograms for one socket."""
+
+    def __init__(self, endpoint: str, role: str):
+        self.endpoint = endpoint
+        self.role = role
+        self.created = time.time()
+
+        self.messages_sent = 0
+        self.bytes_sent = 0
+        self.messages_received = 0
+        self.bytes_received = 0
+        self.hwm_hits = 0           # zmq.Again on send (queue at high water mark)
+        self.decode_errors = 0
+
+        self.serialize_time = LatencyHistogram()
+        self.deserialize_time = LatencyHistogram()
+        self.receive_wait = LatencyHistogram()  # Time blocked in poll before a message arrived
+
+    def record_send(self, parts: List[Any]):
+        """Record a message handed to ZMQ (serialization time is recorded separately)."""
+        self.messages_sent += 1
+        self.bytes_sent += message_size(parts)
+
+    def record_receive(self, parts: List[Any], deserialize_seconds: float):
+        """Record a received and decoded message."""
+        self.messages_received += 1
+        self.bytes_received += message_size(parts)
+        self.deserialize_time.record(deserialize_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get all counters and histogram summaries."""
+        return {
+            'endpoint': self.endpoint,
+            'role': self.role,
+            'uptime': time.time() - self.created,
+            'messages_sent': self.messages_sent,
+            'bytes_sent': self.bytes_sent,
+            'messages_received': self.messages_received,
+            'bytes_received': self.bytes_received,
+            'hwm_hits': self.hwm_hits,
+            'decode_errors': self.decode_errors,
+            'serialize_time': self.serialize_time.to_dict(),
+            'deserialize_time': self.deserialize_time.to_dict(),
+            'receive_wait': self.receive_wait.to_dict()
+        }
+
+
+def message_size(parts: Any) -> int:
+    """Total bytes of a message (bytes, memoryview, ndarray or zmq.Frame parts)."""
+    if not isinstance(parts, (list, tuple)):
+        parts = [parts]
+    size = 0
+    for part in parts:
+        nbytes = getattr(part, 'nbytes', None)
+        size += nbytes if nbytes is not None else len(part)
+    return size
+
+
+class TransportMetricsReporter:
+    """Periodically publishes metrics of all sockets in this process on the monitoring channel."""
+
+    def __init__(self, component: str, interval: float = 5.0):
+        """
+        Initialize reporter.
+
+        Args:
+            component: Component name included in each report
+            interval: Seconds between reports
+        """
+        self.component = component
+        self.interval = interval
+        self.publisher = None
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.logger = logging.getLogger("TransportMetrics")
+
+    def start(self) -> bool:
+        """Connect to the monitoring channel and start the reporting thread."""
+        from .zmq_manager import PipelineComm
+
+        self.publisher = PipelineComm.create_metrics_publisher()
+        if not self.publisher.start():
+            self.logger.error("Failed to start metrics publisher")
+            return False
+
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._report_loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Publish a final report and stop."""
+        self.stop_event.set()
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        if self.publisher:
+            self.publisher.stop()
+            self.publisher = None
+
+    def _report_loop(self):
+        """Reporting loop (runs in separate thread)."""
+        while not self.stop_event.wait(self.interval):
+            self.publish()
+        self.publish()
+
+    def publish(self):
+        """Send one transport_metrics report."""
+        from core.data_models import SystemMessage
+        from .zmq_manager import ZMQManager
+
+        sockets = [manager.get_metrics() for manager in ZMQManager.active_managers()
+                   if manager is not self.publisher]
+        self.publisher.send_system_message(SystemMessage(
+            message_type="transport_metrics",
+            payload={'component': self.component, 'pid': os.getpid(), 'sockets': sockets},
+            timestamp=time.time()
+        ), timeout_ms=100)
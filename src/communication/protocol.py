@@ -1,11 +1,30 @@
 """
 Communication protocol definitions for the video processing pipeline.
+
+Wire format (version 1):
+    Every message starts with a 2-byte tag ``[version, type_code]`` so that
+    ``deserialize`` can dispatch to the right decoder without trial parsing.
+    - Control/log/metrics messages: tag + JSON body (single part)
+    - Frame/detection messages: [tag + pickled header, frame buffer]; the
+      buffer is raw pixels unless the header names a codec (see codecs.py).
+      A frame for a pooled Detector adds its predecessor's buffer as a
+      further part, whose index the header records.
+
+Untagged (version 0) messages from older components are still decoded: JSON
+bodies start with ``{`` and pickle bodies with ``0x80``, neither of which is a
+valid version byte. Set ``PIPELINE_WIRE_VERSION=0`` to make new components emit
+the old format while older readers are still running (rolling restarts).
 """
 import json
+import os
 import pickle
-from typing import Any, Dict, Union
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 import numpy as np
-from core.data_models import FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage
+from .shared_memory import SharedFrameRing, SharedFrameRef
+from .codecs import FrameCodec, get_codec
+from core.data_models import (FrameData, Detection, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage,
+                              DEFAULT_STREAM_ID)
 
 
 class MessageProtocol:
@@ -18,21 +37,119 @@ class MessageProtocol:
     PERFORMANCE_METRICS = "performance_metrics"
     LOG_MESSAGE = "log_message"
     
+    # Wire format versioning
+    LEGACY_WIRE_VERSION = 0  # Untagged JSON / whole-message pickle
+    WIRE_VERSION = 1
+    SUPPORTED_WIRE_VERSIONS = (1,)
+    wire_version = int(os.getenv("PIPELINE_WIRE_VERSION", WIRE_VERSION))
+    
+    # One-byte type codes used in the message tag
+    TYPE_CODES = {
+        FRAME_DATA: 1,
+        DETECTION_RESULT: 2,
+        SYSTEM_MESSAGE: 3,
+        PERFORMANCE_METRICS: 4,
+        LOG_MESSAGE: 5,
+    }
+    
+    # type_code -> decoder method name (resolved with getattr, O(1) dispatch)
+    _DECODERS = {
+        1: '_decode_frame_data',
+        2: '_decode_detection_result',
+        3: '_decode_system_message',
+        4: '_decode_performance_metrics',
+        5: '_decode_log_message',
+    }
+    
+    # Type codes of frame-carrying messages (FrameData, DetectionResult)
+    _FRAME_TYPE_CODES = (1, 2)
+    
+    _TAG = struct.Struct('!BB')
+    
+    @staticmethod
+    def _tag(msg_type: str) -> bytes:
+        """Build the [version, type_code] prefix for a message type."""
+        return MessageProtocol._TAG.pack(MessageProtocol.WIRE_VERSION, MessageProtocol.TYPE_CODES[msg_type])
+    
+    @staticmethod
+    def _is_legacy() -> bool:
+        """Whether outgoing messages should use the untagged version 0 format."""
+        return MessageProtocol.wire_version == MessageProtocol.LEGACY_WIRE_VERSION
+    
+    @staticmethod
+    def _encode_json(msg_type: str, data: Dict[str, Any]) -> bytes:
+        """Encode a JSON message body with its tag."""
+        body = json.dumps(data).encode('utf-8')
+        if MessageProtocol._is_legacy():
+            return body
+        return MessageProtocol._tag(msg_type) + body
+    
+    @staticmethod
+    def _encode_frame_message(msg_type: str, header: Dict[str, Any], frame: np.ndarray,
+                              shm_ref: Optional[SharedFrameRef] = None,
+                              codec: Optional[FrameCodec] = None,
+                              prev_frame: Optional[np.ndarray] = None) -> List[Any]:
+        """
+        Encode a frame-carrying message as [tag + pickled header, frame buffer].
+        
+        With a shared-memory reference only the header is sent; the frame
+        stays in its ring slot. Otherwise the buffer is encoded with codec
+        (raw by default). A prev_frame is always sent as a buffer part of its
+        own (the legacy format drops it).
+        """
+        if MessageProtocol._is_legacy():
+            header['frame'] = frame
+            return [pickle.dumps(header)]
+        
+        buffers = []
+        if frame is None:
+            # Metadata-only message
+            header['frame'] = None
+        elif shm_ref is not None:
+            header['frame'] = {
+                'dtype': frame.dtype.str,
+                'shape': frame.shape,
+                'strides': frame.strides,
+                'shm': tuple(shm_ref)
+            }
+        else:
+            header['frame'], buffer = MessageProtocol._encode_array(frame, codec)
+            buffers.append(buffer)
+        
+        if prev_frame is not None:
+            header['prev_frame'], buffer = MessageProtocol._encode_array(prev_frame, codec)
+            buffers.append(buffer)
+            header['prev_frame']['part'] = len(buffers)
+        return [MessageProtocol._tag(msg_type) + pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL)] + buffers
+    
     @staticmethod
-    def serialize_frame_data(frame_data: FrameData) -> bytes:
-        """Serialize FrameData for transmission."""
-        # Use pickle for numpy arrays
-        return pickle.dumps({
+    def serialize_frame_data(frame_data: FrameData, shm_ref: Optional[SharedFrameRef] = None,
+                             codec: Optional[FrameCodec] = None) -> List[Any]:
+        """
+        Serialize FrameData into multipart message parts.
+        
+        Part 0 is the tag plus a small pickled header (ids, timestamp, metadata
+        and the array layout); part 1 is the frame buffer - raw pixels sent
+        without copying, or compressed by codec. If shm_ref is given the frame
+        is referenced by ring slot instead. A prev_frame follows in a further
+        part.
+        """
+        return MessageProtocol._encode_frame_message(MessageProtocol.FRAME_DATA, {
             'type': MessageProtocol.FRAME_DATA,
             'frame_id': frame_data.frame_id,
+            'stream_id': frame_data.stream_id,
             'timestamp': frame_data.timestamp,
-            'frame': frame_data.frame,
+            'pts_ms': frame_data.pts_ms,
+            'capture_time': frame_data.capture_time,
+            'capture_clock': frame_data.capture_clock,
+            'prev_frame_id': frame_data.prev_frame_id,
             'metadata': frame_data.metadata
-        })
+        }, frame_data.frame, shm_ref, codec, frame_data.prev_frame)
     
     @staticmethod
-    def serialize_detection_result(result: DetectionResult) -> bytes:
-        """Serialize DetectionResult for transmission."""
+    def serialize_detection_result(result: DetectionResult, shm_ref: Optional[SharedFrameRef] = None,
+                                   codec: Optional[FrameCodec] = None) -> List[Any]:
+        """Serialize DetectionResult into multipart message parts (header + frame buffer or ring slot)."""
         detections_data = []
         for detection in result.detections:
             detections_data.append({
@@ -42,15 +159,71 @@ class MessageProtocol:
                 'area': detection.area
             })
         
-        return pickle.dumps({
+        return MessageProtocol._encode_frame_message(MessageProtocol.DETECTION_RESULT, {
             'type': MessageProtocol.DETECTION_RESULT,
             'frame_id': result.frame_id,
+            'stream_id': result.stream_id,
             'timestamp': result.timestamp,
-            'frame': result.frame,
+            'pts_ms': result.pts_ms,
+            'capture_time': result.capture_time,
+            'capture_clock': result.capture_clock,
+            'prev_frame_id': result.prev_frame_id,
             'detections': detections_data,
             'processing_time': result.processing_time,
             'metadata': result.metadata
-        })
+        }, result.frame, shm_ref, codec)
+    
+    @staticmethod
+    def _encode_array(array: np.ndarray, codec: Optional[FrameCodec] = None) -> Tuple[Dict[str, Any], Any]:
+        """
+        Describe an ndarray's layout and encode its buffer.
+        
+        Raw frames expose their buffer for zero-copy sends; other codecs add
+        their name to the header. Frames a codec can't handle are sent raw.
+        """
+        if not (array.flags['C_CONTIGUOUS'] or array.flags['F_CONTIGUOUS']):
+            array = np.ascontiguousarray(array)
+        
+        array_header = {
+            'dtype': array.dtype.str,
+            'shape': array.shape,
+            'strides': array.strides
+        }
+        if codec is None or codec.name == FrameCodec.name or not codec.supports(array):
+            return array_header, memoryview(array.reshape(-1, order='A'))
+        
+        array_header['codec'] = codec.name
+        return array_header, codec.encode(array)
+    
+    @staticmethod
+    def _decode_frame(array_header: Optional[Dict[str, Any]], parts: Sequence[Any]) -> Optional[np.ndarray]:
+        """Get the frame of a tagged message from its buffer part (part 1 unless the header says) or shared-memory slot."""
+        if array_header is None:
+            return None
+        
+        shm = array_header.get('shm')
+        if shm is None:
+            buffer = MessageProtocol._part_buffer(parts[array_header.get('part', 1)])
+            codec_name = array_header.get('codec')
+            if codec_name is not None:
+                return get_codec(codec_name).decode(array_header, buffer)
+            return MessageProtocol._decode_array(array_header, buffer)
+        
+        ref = SharedFrameRef(*shm)
+        frame = SharedFrameRing.attach(ref.ring_name).read(ref, array_header)
+        if frame is None:
+            raise ValueError(f"Shared-memory slot {ref.slot} was recycled before it was read")
+        return frame
+    
+    @staticmethod
+    def _decode_array(array_header: Dict[str, Any], buffer: Any) -> np.ndarray:
+        """Rebuild an ndarray on top of a received buffer (no copy)."""
+        return np.ndarray(
+            shape=array_header['shape'],
+            dtype=np.dtype(array_header['dtype']),
+            buffer=buffer,
+            strides=array_header['strides']
+        )
     
     @staticmethod
     def serialize_system_message(message: SystemMessage) -> bytes:
@@ -61,7 +234,7 @@ class MessageProtocol:
             'payload': message.payload,
             'timestamp': message.timestamp
         }
-        return json.dumps(data).encode('utf-8')
+        return MessageProtocol._encode_json(MessageProtocol.SYSTEM_MESSAGE, data)
     
     @staticmethod
     def serialize_performance_metrics(metrics: PerformanceMetrics) -> bytes:
@@ -75,7 +248,7 @@ class MessageProtocol:
             'queue_depth': metrics.queue_depth,
             'timestamp': metrics.timestamp
         }
-        return json.dumps(data).encode('utf-8')
+        return MessageProtocol._encode_json(MessageProtocol.PERFORMANCE_METRICS, data)
     
     @staticmethod
     def serialize_log_message(log_msg: LogMessage) -> bytes:
@@ -89,44 +262,171 @@ class MessageProtocol:
             'frame_id': log_msg.frame_id,
             'metadata': log_msg.metadata
         }
-        return json.dumps(data).encode('utf-8')
+        return MessageProtocol._encode_json(MessageProtocol.LOG_MESSAGE, data)
+    
+    @staticmethod
+    def carries_frame(parts: Sequence[Any]) -> Optional[bool]:
+        """
+        Whether a message is a FrameData or DetectionResult, read from its tag without decoding it.
+        
+        None for untagged (legacy) or empty messages, whose type is only
+        known once decoded.
+        """
+        first = MessageProtocol._part_bytes(parts[0])
+        if not first or first[0] >= 0x20:
+            return None
+        return len(first) > 1 and first[1] in MessageProtocol._FRAME_TYPE_CODES
     
     @staticmethod
-    def deserialize(data: bytes) -> Union[FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage]:
-        """Deserialize received data based on message type."""
+    def deserialize(data: Union[bytes, Sequence[Any]]) -> Union[FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage]:
+        """
+        Deserialize received data (single buffer or multipart parts).
+        
+        Tagged messages are dispatched on their type code; untagged messages
+        fall back to the legacy JSON-then-pickle path.
+        """
+        parts = data if isinstance(data, (list, tuple)) else [data]
+        first = MessageProtocol._part_bytes(parts[0])
+        
+        if not first:
+            raise ValueError("Failed to deserialize message: empty message")
+        
+        version = first[0]
+        if version >= 0x20:
+            # '{' (JSON) or 0x80 (pickle) - untagged message from an older component
+            return MessageProtocol._deserialize_legacy(first if len(parts) == 1 else parts)
+        
+        if version not in MessageProtocol.SUPPORTED_WIRE_VERSIONS:
+            raise ValueError(f"Unsupported wire version: {version}")
+        
+        decoder_name = MessageProtocol._DECODERS.get(first[1]) if len(first) > 1 else None
+        if decoder_name is None:
+            raise ValueError(f"Unknown message type code: {first[1:2].hex()}")
+        
         try:
-            # Try JSON first (for system messages and performance metrics)
-            try:
-                json_data = json.loads(data.decode('utf-8'))
-                if json_data.get('type') == MessageProtocol.SYSTEM_MESSAGE:
-                    return SystemMessage(
-                        message_type=json_data['message_type'],
-                        payload=json_data['payload'],
-                        timestamp=json_data['timestamp']
-                    )
-                elif json_data.get('type') == MessageProtocol.PERFORMANCE_METRICS:
-                    return PerformanceMetrics(
-                        fps=json_data['fps'],
-                        latency_ms=json_data['latency_ms'],
-                        memory_usage_mb=json_data['memory_usage_mb'],
-                        cpu_usage_percent=json_data['cpu_usage_percent'],
-                        queue_depth=json_data['queue_depth'],
-                        timestamp=json_data['timestamp']
-                    )
-                elif json_data.get('type') == MessageProtocol.LOG_MESSAGE:
-                    return LogMessage(
-                        level=json_data['level'],
-                        component=json_data['component'],
-                        message=json_data['message'],
-                        timestamp=json_data['timestamp'],
-                        frame_id=json_data.get('frame_id'),
-                        metadata=json_data.get('metadata', {})
-                    )
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                pass
+            return getattr(MessageProtocol, decoder_name)(first[MessageProtocol._TAG.size:], parts)
+        except Exception as e:
+            raise ValueError(f"Failed to deserialize message: {e}")
+    
+    @staticmethod
+    def _decode_frame_data(body: bytes, parts: Sequence[Any]) -> FrameData:
+        """Decode a tagged FrameData message."""
+        header = pickle.loads(body)
+        return FrameData(
+            frame_id=header['frame_id'],
+            timestamp=header['timestamp'],
+            frame=MessageProtocol._decode_frame(header['frame'], parts),
+            metadata=header['metadata'],
+            stream_id=header.get('stream_id', DEFAULT_STREAM_ID),
+            pts_ms=header.get('pts_ms'),
+            capture_time=header.get('capture_time'),
+            capture_clock=header.get('capture_clock'),
+            prev_frame=MessageProtocol._decode_frame(header.get('prev_frame'), parts),
+            prev_frame_id=header.get('prev_frame_id')
+        )
+    
+    @staticmethod
+    def _decode_detection_result(body: bytes, parts: Sequence[Any]) -> DetectionResult:
+        """Decode a tagged DetectionResult message."""
+        header = pickle.loads(body)
+        return MessageProtocol._build_detection_result(header, MessageProtocol._decode_frame(header['frame'], parts))
+    
+    @staticmethod
+    def _decode_system_message(body: bytes, parts: Sequence[Any]) -> SystemMessage:
+        """Decode a tagged SystemMessage."""
+        return MessageProtocol._build_system_message(json.loads(body))
+    
+    @staticmethod
+    def _decode_performance_metrics(body: bytes, parts: Sequence[Any]) -> PerformanceMetrics:
+        """Decode a tagged PerformanceMetrics message."""
+        return MessageProtocol._build_performance_metrics(json.loads(body))
+    
+    @staticmethod
+    def _decode_log_message(body: bytes, parts: Sequence[Any]) -> LogMessage:
+        """Decode a tagged LogMessage."""
+        return MessageProtocol._build_log_message(json.loads(body))
+    
+    @staticmethod
+    def _build_detection_result(data: Dict[str, Any], frame: np.ndarray) -> DetectionResult:
+        """Build a DetectionResult from a decoded header dict."""
+        detections = [Detection(
+            bbox=det_data['bbox'],
+            confidence=det_data['confidence'],
+            detection_type=det_data['detection_type'],
+            area=det_data['area']
+        ) for det_data in data['detections']]
+        
+        return DetectionResult(
+            frame_id=data['frame_id'],
+            timestamp=data['timestamp'],
+            frame=frame,
+            detections=detections,
+            processing_time=data['processing_time'],
+            metadata=data['metadata'],
+            stream_id=data.get('stream_id', DEFAULT_STREAM_ID),
+            pts_ms=data.get('pts_ms'),
+            capture_time=data.get('capture_time'),
+            capture_clock=data.get('capture_clock'),
+            prev_frame_id=data.get('prev_frame_id')
+        )
+    
+    @staticmethod
+    def _build_system_message(data: Dict[str, Any]) -> SystemMessage:
+        """Build a SystemMessage from a decoded JSON dict."""
+        return SystemMessage(
+            message_type=data['message_type'],
+            payload=data['payload'],
+            timestamp=data['timestamp']
+        )
+    
+    @staticmethod
+    def _build_performance_metrics(data: Dict[str, Any]) -> PerformanceMetrics:
+        """Build PerformanceMetrics from a decoded JSON dict."""
+        return PerformanceMetrics(
+            fps=data['fps'],
+            latency_ms=data['latency_ms'],
+            memory_usage_mb=data['memory_usage_mb'],
+            cpu_usage_percent=data['cpu_usage_percent'],
+            queue_depth=data['queue_depth'],
+            timestamp=data['timestamp']
+        )
+    
+    @staticmethod
+    def _build_log_message(data: Dict[str, Any]) -> LogMessage:
+        """Build a LogMessage from a decoded JSON dict."""
+        return LogMessage(
+            level=data['level'],
+            component=data['component'],
+            message=data['message'],
+            timestamp=data['timestamp'],
+            frame_id=data.get('frame_id'),
+            metadata=data.get('metadata', {})
+        )
+    
+    @staticmethod
+    def _deserialize_legacy(data: Union[bytes, Sequence[Any]]) -> Union[FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage]:
+        """Deserialize untagged (version 0) messages: try JSON first, then pickle."""
+        try:
+            if isinstance(data, (list, tuple)):
+                # Untagged multipart frame message: [pickled header, raw frame buffer]
+                obj_data = pickle.loads(MessageProtocol._part_bytes(data[0]))
+                obj_data['frame'] = MessageProtocol._decode_array(obj_data['frame'], MessageProtocol._part_buffer(data[1]))
+            else:
+                # Try JSON first (for system messages and performance metrics)
+                try:
+                    json_data = json.loads(data.decode('utf-8'))
+                    if json_data.get('type') == MessageProtocol.SYSTEM_MESSAGE:
+                        return MessageProtocol._build_system_message(json_data)
+                    elif json_data.get('type') == MessageProtocol.PERFORMANCE_METRICS:
+                        return MessageProtocol._build_performance_metrics(json_data)
+                    elif json_data.get('type') == MessageProtocol.LOG_MESSAGE:
+                        return MessageProtocol._build_log_message(json_data)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    pass
+                
+                # Use pickle for other message types
+                obj_data = pickle.loads(data)
             
-            # Use pickle for other message types
-            obj_data = pickle.loads(data)
             msg_type = obj_data.get('type')
             
             if msg_type == MessageProtocol.FRAME_DATA:
@@ -134,39 +434,36 @@ class MessageProtocol:
                     frame_id=obj_data['frame_id'],
                     timestamp=obj_data['timestamp'],
                     frame=obj_data['frame'],
-                    metadata=obj_data['metadata']
+                    metadata=obj_data['metadata'],
+                    stream_id=obj_data.get('stream_id', DEFAULT_STREAM_ID),
+                    pts_ms=obj_data.get('pts_ms'),
+                    capture_time=obj_data.get('capture_time'),
+                    capture_clock=obj_data.get('capture_clock'),
+                    prev_frame_id=obj_data.get('prev_frame_id')
                 )
             
             elif msg_type == MessageProtocol.DETECTION_RESULT:
-                from core.data_models import Detection
-                detections = []
-                for det_data in obj_data['detections']:
-                    detections.append(Detection(
-                        bbox=det_data['bbox'],
-                        confidence=det_data['confidence'],
-                        detection_type=det_data['detection_type'],
-                        area=det_data['area']
-                    ))
-                
-                return DetectionResult(
-                    frame_id=obj_data['frame_id'],
-                    timestamp=obj_data['timestamp'],
-                    frame=obj_data['frame'],
-                    detections=detections,
-                    processing_time=obj_data['processing_time'],
-                    metadata=obj_data['metadata']
-                )
+                return MessageProtocol._build_detection_result(obj_data, obj_data['frame'])
             
             else:
                 raise ValueError(f"Unknown message type: {msg_type}")
                 
         except Exception as e:
             raise ValueError(f"Failed to deserialize message: {e}")
+    
+    @staticmethod
+    def _part_bytes(part: Any) -> bytes:
+        """Get the bytes of a message part (bytes or zmq.Frame)."""
+        return part.bytes if hasattr(part, 'bytes') else bytes(part)
+    
+    @staticmethod
+    def _part_buffer(part: Any) -> Any:
+        """Get a zero-copy buffer for a message part (bytes or zmq.Frame)."""
+        return part.buffer if hasattr(part, 'buffer') else part
 
 
 # Platform-aware endpoint configurations
 import platform
-import os
 
 class Endpoints:
     """Platform-aware endpoint assignments for pipeline communication."""
@@ -184,6 +481,7 @@ class Endpoints:
             self.CONTROL_CHANNEL = "tcp://127.0.0.1:5558"
             self.MONITORING_CHANNEL = "tcp://127.0.0.1:5559"
             self.LOGGING_CHANNEL = "tcp://127.0.0.1:5560"
+            self.STREAMER_TO_DISPLAY = "tcp://127.0.0.1:5561"
         else:
             # IPC endpoints for Linux/Unix (production)
             self.STREAMER_TO_DETECTOR = "ipc://streamer_detector"
@@ -192,6 +490,7 @@ class Endpoints:
             self.CONTROL_CHANNEL = "ipc://control_channel"
             self.MONITORING_CHANNEL = "ipc://monitoring_channel"
             self.LOGGING_CHANNEL = "ipc://pipeline_logging"
+            self.STREAMER_TO_DISPLAY = "ipc://streamer_display"
     
     def get_info(self):
         """Get configuration info for logging."""
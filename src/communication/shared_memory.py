@@ -0,0 +1,244 @@
+"""
+Shared-memory frame ring buffer for passing frames between pipeline stages.
+
+The writer (Streamer) copies each decoded frame into a fixed-size slot of a
+``multiprocessing.shared_memory`` block and only the slot reference
+(ring name, slot index, generation) travels over ZeroMQ. Readers (Detector,
+Display, ...) map the same block and read the slot in place.
+
+Memory layout::
+
+    [control block][slot 0][slot 1]...[slot N-1]
+
+    control block (int64):
+        magic, num_slots, num_readers, slot_bytes
+        generation[num_slots]             - generation currently held by each slot
+        released[num_slots, num_readers]  - last generation each reader released
+
+Reference counting: a slot's reference count is the number of readers whose
+``released`` entry is behind the slot generation. Each reader only writes its
+own cells, so no cross-process locks or atomics are needed. The writer recycles
+a slot once its count drops to zero, or forcibly after ``reclaim_timeout``
+(e.g. when a downstream stage dropped the frame and will never release it).
+"""
+import logging
+import threading
+import time
+from multiprocessing import shared_memory, resource_tracker
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+
+class SharedFrameRef(NamedTuple):
+    """Reference to a frame stored in a shared-memory ring slot."""
+    ring_name: str
+    slot: int
+    generation: int
+
+
+class SharedFrameRing:
+    """Fixed-size ring of frame slots in shared memory with per-reader reference counting."""
+
+    MAGIC = 0x41584F4E52494E47  # "AXONRING"
+    _HEADER_FIELDS = 4
+
+    # Rings opened in this process (name -> ring), used to resolve and locate frames
+    _registry: Dict[str, "SharedFrameRing"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, shm: shared_memory.SharedMemory, num_slots: int, num_readers: int,
+                 slot_bytes: int, owner: bool, reclaim_timeout: float = 1.0):
+        """
+        Wrap a shared memory block (use create() or attach() instead of calling directly).
+
+        Args:
+            shm: Shared memory block holding control block and slots
+            num_slots: Number of frame slots in the ring
+            num_readers: Number of readers that must release a slot before reuse
+            slot_bytes: Size of each slot in bytes
+            owner: True for the creating (writing) process, which unlinks on close
+            reclaim_timeout: Seconds to wait for readers before forcing slot reuse
+        """
+        self.shm = shm
+        self.name = shm.name
+        self.num_slots = num_slots
+        self.num_readers = num_readers
+        self.slot_bytes = slot_bytes
+        self.owner = owner
+        self.reclaim_timeout = reclaim_timeout
+
+        control_len = self._control_length(num_slots, num_readers)
+        control = np.ndarray((control_len,), dtype=np.int64, buffer=shm.buf)
+        start = self._HEADER_FIELDS
+        self._generation = control[start:start + num_slots]
+        start += num_slots
+        self._released = control[start:start + num_slots * num_readers].reshape(num_slots, num_readers)
+
+        self._data_offset = control_len * 8
+        self._data = np.ndarray((num_slots * slot_bytes,), dtype=np.uint8,
+                                buffer=shm.buf, offset=self._data_offset)
+        self._data_address = self._data.__array_interface__['data'][0]
+
+        # Writer state
+        self._next_slot = 0
+        self.frames_written = 0
+        self.forced_reclaims = 0
+
+        self.logger = logging.getLogger(f"SharedFrameRing-{self.name}")
+
+    @classmethod
+    def _control_length(cls, num_slots: int, num_readers: int) -> int:
+        """Number of int64 entries in the control block."""
+        return cls._HEADER_FIELDS + num_slots + num_slots * num_readers
+
+    @classmethod
+    def create(cls, name: str, slot_bytes: int, num_slots: int = 16, num_readers: int = 1,
+               reclaim_timeout: float = 1.0) -> "SharedFrameRing":
+        """Create a new ring (writer side)."""
+        control_bytes = cls._control_length(num_slots, num_readers) * 8
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=control_bytes + num_slots * slot_bytes)
+        except FileExistsError:
+            # Stale block from a crashed run - replace it
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=control_bytes + num_slots * slot_bytes)
+
+        header = np.ndarray((cls._control_length(num_slots, num_readers),), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[:cls._HEADER_FIELDS] = (cls.MAGIC, num_slots, num_readers, slot_bytes)
+
+        ring = cls(shm, num_slots, num_readers, slot_bytes, owner=True, reclaim_timeout=reclaim_timeout)
+        with cls._registry_lock:
+            cls._registry[ring.name] = ring
+        return ring
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrameRing":
+        """Attach to an existing ring by name (reader side); cached per process."""
+        with cls._registry_lock:
+            ring = cls._registry.get(name)
+            if ring is not None:
+                return ring
+
+            shm = shared_memory.SharedMemory(name=name)
+            # The creating process owns the block; don't let this process's
+            # resource tracker unlink it when we exit
+            try:
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+
+            magic, num_slots, num_readers, slot_bytes = np.ndarray(
+                (cls._HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+            if magic != cls.MAGIC:
+                shm.close()
+                raise ValueError(f"Shared memory block {name} is not a frame ring")
+
+            ring = cls(shm, int(num_slots), int(num_readers), int(slot_bytes), owner=False)
+            cls._registry[name] = ring
+            return ring
+
+    @classmethod
+    def locate(cls, array: np.ndarray) -> Optional[SharedFrameRef]:
+        """Return the slot reference if array lives inside a ring opened by this process."""
+        if not cls._registry:
+            return None
+
+        address = array.__array_interface__['data'][0]
+        for ring in list(cls._registry.values()):
+            offset = address - ring._data_address
+            if 0 <= offset < ring.num_slots * ring.slot_bytes:
+                slot = offset // ring.slot_bytes
+                return SharedFrameRef(ring.name, slot, int(ring._generation[slot]))
+        return None
+
+    def refcount(self, slot: int) -> int:
+        """Number of readers that still hold the slot's current generation."""
+        return int(np.count_nonzero(self._released[slot] < self._generation[slot]))
+
+    def write(self, frame: np.ndarray) -> SharedFrameRef:
+        """Copy a frame into the next slot and return its reference (writer side)."""
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes does not fit slot of {self.slot_bytes} bytes")
+
+        slot = self._next_slot
+        self._wait_for_slot(slot)
+
+        generation = int(self._generation[slot]) + 1
+        self._generation[slot] = 0  # Mark slot as being rewritten
+
+        start = slot * self.slot_bytes
+        target = self._data[start:start + frame.nbytes].view(frame.dtype).reshape(frame.shape)
+        np.copyto(target, frame)
+
+        self._generation[slot] = generation
+        self._next_slot = (slot + 1) % self.num_slots
+        self.frames_written += 1
+        return SharedFrameRef(self.name, slot, generation)
+
+    def _wait_for_slot(self, slot: int):
+        """Wait until all readers released the slot, forcing reuse after reclaim_timeout."""
+        if self.refcount(slot) == 0:
+            return
+
+        deadline = time.monotonic() + self.reclaim_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.0005)
+            if self.refcount(slot) == 0:
+                return
+
+        self.forced_reclaims += 1
+        self.logger.warning(f"Reclaiming slot {slot} still held by {self.refcount(slot)} reader(s)")
+        self._released[slot, :] = self._generation[slot]
+
+    def read(self, ref: SharedFrameRef, array_header: dict) -> Optional[np.ndarray]:
+        """Return a view of the referenced frame, or None if the slot was recycled."""
+        if int(self._generation[ref.slot]) != ref.generation:
+            return None
+
+        start = ref.slot * self.slot_bytes
+        return np.ndarray(
+            shape=array_header['shape'],
+            dtype=np.dtype(array_header['dtype']),
+            buffer=self.shm.buf,
+            offset=self._data_offset + start,
+            strides=array_header['strides']
+        )
+
+    def release(self, ref: SharedFrameRef, reader_index: int):
+        """Drop this reader's reference to a slot generation."""
+        if 0 <= reader_index < self.num_readers and self._released[ref.slot, reader_index] < ref.generation:
+            self._released[ref.slot, reader_index] = ref.generation
+
+    def get_stats(self) -> dict:
+        """Get ring statistics."""
+        return {
+            'name': self.name,
+            'num_slots': self.num_slots,
+            'num_readers': self.num_readers,
+            'slot_bytes': self.slot_bytes,
+            'frames_written': self.frames_written,
+            'forced_reclaims': self.forced_reclaims,
+            'slots_in_use': sum(1 for slot in range(self.num_slots) if self.refcount(slot) > 0)
+        }
+
+    def close(self):
+        """Detach from the ring; the owner also unlinks the shared memory block."""
+        with self._registry_lock:
+            self._registry.pop(self.name, None)
+
+        # Views handed out to callers keep the mapping alive until they are collected
+        self._generation = self._released = self._data = None
+        try:
+            self.shm.close()
+        except BufferError:
+            self.logger.debug("Frames still referenced - mapping released on garbage collection")
+
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -2,18 +2,185 @@
 ZeroMQ manager for handling socket operations and message passing.
 """
 import zmq
+import os
+import struct
 import logging
-from typing import Optional, Union
+import threading
+import weakref
+from typing import Dict, Generator, List, Optional, Tuple, Union
 import time
+import numpy as np
 
 from .protocol import MessageProtocol, Endpoints
-from core.data_models import FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage
+from .shared_memory import SharedFrameRing, SharedFrameRef
+from .codecs import FrameCodec, get_codec, default_codec
+from .metrics import SocketMetrics
+from core.data_models import (FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage,
+                              StreamDescriptor, DEFAULT_STREAM_ID)
+
+
+class SendPolicy:
+    """
+    What a sender does with a frame when the receiver can't keep up.
+    
+    Applies to frame-carrying messages (FrameData, DetectionResult). System
+    messages always wait up to their timeout; log and metrics messages are
+    never allowed to stall the pipeline and are dropped when the queue is full.
+    """
+    
+    BLOCK = "block"              # Wait up to timeout_ms for queue space, then drop
+    DROP_NEWEST = "drop_newest"  # Drop the new frame if the queue is full (live default)
+    DROP_OLDEST = "drop_oldest"  # Keep only the latest frame: queue of one, newer replaces older
+    CREDIT = "credit"            # Send only with a credit granted by the receiver (bounded in-flight)
+    
+    ALL = (BLOCK, DROP_NEWEST, DROP_OLDEST, CREDIT)
+    
+    DEFAULT_CREDIT_WINDOW = int(os.getenv("PIPELINE_CREDIT_WINDOW", 4))
+    
+    @staticmethod
+    def validate(policy: str) -> str:
+        """Return the normalized policy name or raise ValueError."""
+        policy = policy.strip().lower()
+        if policy not in SendPolicy.ALL:
+            raise ValueError(f"Unknown send policy: {policy} (available: {', '.join(SendPolicy.ALL)})")
+        return policy
+
+
+class SendTracker:
+    """
+    Completion of one frame send, for callers that reuse the frame's buffers.
+    
+    done once the frame was dropped, or sent and ZeroMQ no longer references
+    its zero-copy parts; until then it may be parked (DROP_OLDEST) or queued
+    in ZeroMQ. Pooled buffers are released until it is done (see
+    FrameBufferPool.release).
+    """
+    
+    __slots__ = ('settled', 'trackers')
+    
+    def __init__(self):
+        self.settled = False  # Sent or dropped
+        self.trackers: List[zmq.MessageTracker] = []  # One per zero-copy part of a sent frame
+    
+    def settle(self, trackers: List[zmq.MessageTracker] = ()):
+        """Record the outcome: the trackers of the sent parts, or none if the frame was dropped."""
+        self.trackers = list(trackers)
+        self.settled = True
+    
+    @property
+    def done(self) -> bool:
+        return self.settled and all(tracker.done for tracker in self.trackers)
+
+
+def credit_endpoint(endpoint: str) -> str:
+    """Endpoint of the reverse credit channel for a CREDIT-policy channel."""
+    if endpoint.startswith("tcp://"):
+        host, port = endpoint.rsplit(":", 1)
+        return f"{host}:{int(port) + 100}"
+    return f"{endpoint}_credit"
+
+
+class ZMQContextRegistry:
+    """
+    Process-wide shared ZMQ context, reference-counted by the sockets using it.
+    
+    One context (and one pool of I/O threads) serves every socket in the
+    process. The context is terminated when its last socket is released, so
+    stopping one ZMQManager never tears down a context others still use.
+    
+    Configure before the first socket is created, either with configure() or
+    the environment:
+        ZMQ_IO_THREADS  - number of ZMQ I/O threads (default: 1)
+        ZMQ_IO_CPUS     - comma-separated CPUs to pin the I/O threads to
+    """
+    
+    io_threads = int(os.getenv("ZMQ_IO_THREADS", 1))
+    io_cpus: List[int] = [int(cpu) for cpu in os.getenv("ZMQ_IO_CPUS", "").split(",") if cpu.strip()]
+    
+    _context: Optional[zmq.Context] = None
+    _refcount = 0
+    _pid: Optional[int] = None
+    _lock = threading.Lock()
+    _logger = logging.getLogger("ZMQContextRegistry")
+    
+    @classmethod
+    def configure(cls, io_threads: Optional[int] = None, io_cpus: Optional[List[int]] = None):
+        """Set I/O thread count and CPU pinning (takes effect when the context is next created)."""
+        with cls._lock:
+            if cls._context is not None and cls._pid == os.getpid():
+                cls._logger.warning("ZMQ context already created - configuration applies after all sockets stop")
+            if io_threads is not None:
+                if io_threads < 1:
+                    raise ValueError(f"io_threads must be >= 1, got {io_threads}")
+                cls.io_threads = io_threads
+            if io_cpus is not None:
+                cls.io_cpus = list(io_cpus)
+    
+    @classmethod
+    def acquire(cls) -> zmq.Context:
+        """Get the shared context, creating it on first use, and take a reference."""
+        with cls._lock:
+            if cls._pid != os.getpid():
+                # Contexts don't survive fork - start fresh in a child process
+                cls._context = None
+                cls._refcount = 0
+            
+            if cls._context is None:
+                context = zmq.Context(io_threads=cls.io_threads)
+                for cpu in cls.io_cpus:
+                    if hasattr(zmq, "THREAD_AFFINITY_CPU_ADD"):
+                        context.set(zmq.THREAD_AFFINITY_CPU_ADD, cpu)
+                cls._context = context
+                cls._pid = os.getpid()
+                cls._logger.debug(f"Created ZMQ context with {cls.io_threads} I/O thread(s)")
+            
+            cls._refcount += 1
+            return cls._context
+    
+    @classmethod
+    def release(cls):
+        """Drop a reference; the last one terminates the context (sockets must be closed first)."""
+        with cls._lock:
+            if cls._context is None or cls._pid != os.getpid():
+                return
+            
+            cls._refcount -= 1
+            if cls._refcount <= 0:
+                cls._context.term()
+                cls._context = None
+                cls._refcount = 0
+                cls._logger.debug("Terminated ZMQ context")
+    
+    @classmethod
+    def io_affinity(cls, io_thread: int) -> int:
+        """ZMQ_AFFINITY bitmask pinning a socket to one I/O thread (0 = any, if it doesn't exist)."""
+        return 1 << io_thread if io_thread < cls.io_threads else 0
+    
+    @classmethod
+    def get_stats(cls) -> dict:
+        """Get shared context statistics."""
+        return {
+            'io_threads': cls.io_threads,
+            'io_cpus': cls.io_cpus,
+            'active': cls._context is not None,
+            'sockets': cls._refcount
+        }
 
 
 class ZMQManager:
     """Manages ZeroMQ sockets and message passing for the pipeline."""
     
-    def __init__(self, socket_type: int, endpoint: str, bind: bool = False):
+    _instances: "weakref.WeakSet[ZMQManager]" = weakref.WeakSet()  # For process-wide metrics reports
+    
+    # Waits a send step sequence asks its driver for (see _frame_send_steps)
+    WAIT_WRITABLE = "writable"  # Queue space on the data socket
+    WAIT_CREDIT = "credit"      # A credit grant on the credit socket
+    
+    def __init__(self, socket_type: int, endpoint: str, bind: bool = False,
+                 frame_ring: Optional[SharedFrameRing] = None, shm_reader_index: Optional[int] = None,
+                 codec: Optional[str] = None, affinity: int = 0,
+                 send_policy: str = SendPolicy.DROP_NEWEST, credit_window: int = SendPolicy.DEFAULT_CREDIT_WINDOW,
+                 shm_drop_readers: Optional[Tuple[int, ...]] = None, lossless: bool = False):
         """
         Initialize ZMQ manager.
         
@@ -21,17 +188,77 @@ class ZMQManager:
             socket_type: ZMQ socket type (zmq.PUSH, zmq.PULL, zmq.PUB, zmq.SUB)
             endpoint: IPC endpoint (e.g., "ipc://streamer_detector")  
             bind: True to bind (server), False to connect (client)
+            frame_ring: Shared-memory ring to write outgoing frames into (sender side);
+                        only slot references are then sent over the socket
+            shm_reader_index: This receiver's reader index for releasing ring slots
+            codec: Frame codec spec for outgoing frames (e.g. "jpeg:80"); None = raw on
+                   IPC, FRAME_CODEC env var on TCP. Receivers decode any codec.
+            affinity: ZMQ_AFFINITY bitmask of I/O threads serving this socket (0 = any)
+            send_policy: Backpressure policy for frames (see SendPolicy); both ends of a
+                         CREDIT or DROP_OLDEST channel must use the same policy
+            credit_window: Frames a CREDIT receiver lets the sender have in flight
+            shm_drop_readers: Ring readers to release when a shared-memory frame is
+                              dropped on this channel (None = all readers)
+            lossless: Frame sends never drop: waits for space/credit are repeated
+                      until they succeed or interrupt() is called (BLOCK or CREDIT only)
         """
-        self.context = zmq.Context()
+        send_policy = SendPolicy.validate(send_policy)
+        if lossless and send_policy not in (SendPolicy.BLOCK, SendPolicy.CREDIT):
+            raise ValueError(f"Lossless sends need the {SendPolicy.BLOCK} or {SendPolicy.CREDIT} policy, "
+                             f"not {send_policy}")
+        
+        self.context = ZMQContextRegistry.acquire()  # Shared per process
         self.socket = self.context.socket(socket_type)
+        self._closed = False
         self.endpoint = endpoint
         self.bind = bind
         self.is_connected = False
         
+        # Shared-memory frame transport (optional)
+        self.frame_ring = frame_ring
+        self.shm_reader_index = shm_reader_index
+        
+        # Frame codec for outgoing frame buffers (not used for shared-memory references)
+        self.codec: FrameCodec = get_codec(codec) if codec else default_codec(endpoint)
+        
+        # Backpressure
+        self.send_policy = SendPolicy.validate(send_policy)
+        self.credit_window = credit_window
+        self.shm_drop_readers = shm_drop_readers
+        self.lossless = lossless
+        self._interrupted = threading.Event()
+        self.is_sender = socket_type in (zmq.PUSH, zmq.PUB, zmq.XPUB)
+        self.subscribers = 0        # XPUB: subscriptions seen (see wait_for_subscribers)
+        self.credit_socket: Optional[zmq.Socket] = None
+        self._credits = 0           # Sender: credits available
+        self._credits_owed = 0      # Receiver: credits not yet delivered
+        self._pending: Optional[Tuple[List, Optional[SharedFrameRef], Optional[SendTracker]]] = None  # DROP_OLDEST mailbox
+        self.send_stats: Dict[str, int] = {
+            'sent': 0,
+            'dropped_full': 0,      # Queue full (DROP_NEWEST)
+            'dropped_timeout': 0,   # No space/credit within timeout (BLOCK, CREDIT)
+            'dropped_stale': 0,     # Replaced by a newer frame (DROP_OLDEST)
+            'credit_waits': 0,
+            'lossless_stalls': 0    # Lossless waits that outlasted timeout_ms and were repeated
+        }
+        
+        # Stream descriptors: last one delivered per stream (sender) / cached from the wire (receiver)
+        self.stream_descriptors: Dict[str, StreamDescriptor] = {}
+        
         # Configure socket options
+        hwm = 1 if self.send_policy == SendPolicy.DROP_OLDEST else 10  # Latest-only channels queue one frame
         self.socket.setsockopt(zmq.LINGER, 0)     # Don't wait on close (immediate cleanup)
-        self.socket.setsockopt(zmq.SNDHWM, 10)    # Send high water mark
-        self.socket.setsockopt(zmq.RCVHWM, 10)    # Receive high water mark
+        self.socket.setsockopt(zmq.SNDHWM, hwm)   # Send high water mark
+        self.socket.setsockopt(zmq.RCVHWM, hwm)   # Receive high water mark
+        if affinity:
+            self.socket.setsockopt(zmq.AFFINITY, affinity)  # Must precede bind/connect
+        
+        # Persistent pollers, reused by every receive / blocking send
+        self.poller = zmq.Poller()
+        self.poller.register(self.socket, zmq.POLLIN)
+        self.send_poller = zmq.Poller()
+        self.send_poller.register(self.socket, zmq.POLLOUT)
+        self.credit_poller: Optional[zmq.Poller] = None
         
         # Enable socket reuse for TCP (helps with TIME_WAIT issues)
         if endpoint.startswith("tcp://"):
@@ -41,8 +268,17 @@ class ZMQManager:
             except AttributeError:
                 pass  # Some ZMQ versions don't have these options
         
+        # Transport metrics (see get_metrics)
+        self.metrics = SocketMetrics(endpoint, zmq.SocketType(socket_type).name)
+        ZMQManager._instances.add(self)
+        
         self.logger = logging.getLogger(f"ZMQManager-{endpoint}")
     
+    @classmethod
+    def active_managers(cls) -> List["ZMQManager"]:
+        """Get all open managers in this process."""
+        return [manager for manager in list(cls._instances) if not manager._closed]
+    
     def start(self) -> bool:
         """Start the socket (bind or connect)."""
         try:
@@ -53,6 +289,9 @@ class ZMQManager:
                 self.socket.connect(self.endpoint)
                 self.logger.info(f"Connected to {self.endpoint}")
             
+            if self.send_policy == SendPolicy.CREDIT:
+                self._start_credit_channel()
+            
             self.is_connected = True
             return True
             
@@ -61,66 +300,352 @@ class ZMQManager:
             return False
     
     def stop(self):
-        """Stop and cleanup the socket."""
+        """Close the socket and release the shared context (terminated with its last socket)."""
+        if self._closed:
+            return
+        
+        if self._pending is not None:
+            self._drop(self._pending[1], 'dropped_stale', send=self._pending[2])
+            self._pending = None
+        if self.credit_socket is not None:
+            self.credit_socket.close()
+            self.credit_socket = None
+        self.socket.close()
+        self._closed = True
+        ZMQContextRegistry.release()
+        
         if self.is_connected:
-            self.socket.close()
-            self.context.term()
             self.is_connected = False
             self.logger.info(f"Stopped socket {self.endpoint}")
     
-    def send_frame_data(self, frame_data: FrameData, timeout_ms: int = 1000) -> bool:
-        """Send FrameData message."""
+    def send_frame_data(self, frame_data: FrameData, timeout_ms: int = 1000,
+                        send: Optional[SendTracker] = None) -> bool:
+        """Send FrameData message according to the channel's send policy (send tracks its completion)."""
         if not self.is_connected:
             self.logger.error("Socket not connected")
-            return False
+            return self._unsent(send)
         
         try:
-            data = MessageProtocol.serialize_frame_data(frame_data)
-            self.socket.send(data, zmq.NOBLOCK)
-            return True
+            ref = self._shared_frame_ref(frame_data.frame)
+            start = time.perf_counter()
+            parts = MessageProtocol.serialize_frame_data(frame_data, ref, self.codec)
+            self.metrics.serialize_time.record(time.perf_counter() - start)
+            return self._send_frame_parts(parts, ref, timeout_ms, send)
             
-        except zmq.Again:
-            self.logger.warning(f"Send timeout after {timeout_ms}ms")
-            return False
         except Exception as e:
             self.logger.error(f"Send failed: {e}")
+            return self._unsent(send)
+    
+    def send_detection_result(self, result: DetectionResult, timeout_ms: int = 1000,
+                              send: Optional[SendTracker] = None) -> bool:
+        """Send DetectionResult message according to the channel's send policy (send tracks its completion)."""
+        if not self.is_connected:
+            self.logger.error("Socket not connected")
+            return self._unsent(send)
+        
+        try:
+            ref = self._shared_frame_ref(result.frame)
+            start = time.perf_counter()
+            parts = MessageProtocol.serialize_detection_result(result, ref, self.codec)
+            self.metrics.serialize_time.record(time.perf_counter() - start)
+            return self._send_frame_parts(parts, ref, timeout_ms, send)
+            
+        except Exception as e:
+            self.logger.error(f"Send failed: {e}")
+            return self._unsent(send)
+    
+    @staticmethod
+    def _unsent(send: Optional[SendTracker]) -> bool:
+        """Settle the tracker of a frame that never reached the send policy; returns False."""
+        if send is not None:
+            send.settle()
+        return False
+    
+    def _send_frame_parts(self, parts: List, ref: Optional[SharedFrameRef], timeout_ms: int,
+                          send: Optional[SendTracker] = None) -> bool:
+        """Send an encoded frame message, applying the send policy. Returns False if it was dropped."""
+        return self._run_steps(self._frame_send_steps(parts, ref, timeout_ms, send))
+    
+    def _run_steps(self, steps: Generator):
+        """Drive a step sequence (see _frame_send_steps) with blocking polls; returns its result."""
+        try:
+            wait, timeout_ms = next(steps)
+            while True:
+                wait, timeout_ms = steps.send(self._poll(wait, timeout_ms))
+        except StopIteration as done:
+            return done.value
+    
+    def _poll(self, wait: str, timeout_ms: int) -> bool:
+        """Block up to timeout_ms for a step's wait (WAIT_WRITABLE or WAIT_CREDIT)."""
+        poller = self.credit_poller if wait == self.WAIT_CREDIT else self.send_poller
+        return bool(poller.poll(timeout_ms))
+    
+    def _frame_send_steps(self, parts: List, ref: Optional[SharedFrameRef], timeout_ms: int,
+                          send: Optional[SendTracker] = None) -> Generator:
+        """
+        The send policy for one frame, as a sequence of steps.
+        
+        Yields (wait, timeout_ms) whenever it has to wait - WAIT_WRITABLE for
+        queue space, WAIT_CREDIT for a credit grant - and is sent back whether
+        the wait succeeded. Returns False if the frame was dropped. The blocking
+        sender (_run_steps) and AsyncZMQManager differ only in how they wait,
+        so both apply this one policy. send, if given, is settled once the
+        frame was sent or dropped.
+        """
+        if self.send_policy == SendPolicy.DROP_OLDEST:
+            return self._send_latest(parts, ref, send)
+        
+        if self.send_policy == SendPolicy.CREDIT and not (yield from self._lossless_steps(self._credit_steps, timeout_ms)):
+            return self._drop(ref, 'dropped_timeout', send=send)
+        
+        # From here on a CREDIT frame holds a credit, which every drop gives back
+        credit = self.send_policy == SendPolicy.CREDIT
+        if (self.send_policy in (SendPolicy.BLOCK, SendPolicy.CREDIT)
+                and not (yield from self._lossless_steps(self._writable_steps, timeout_ms))):
+            return self._drop(ref, 'dropped_timeout', refund_credit=credit, send=send)
+        
+        if self._try_send(parts, send):
+            return True
+        return self._drop(ref, 'dropped_full', refund_credit=credit, send=send)
+    
+    def _lossless_steps(self, wait_steps, timeout_ms: int) -> Generator:
+        """Run wait_steps(timeout_ms); on a lossless channel, repeat it until it succeeds or interrupt() is called."""
+        while not (yield from wait_steps(timeout_ms)):
+            if not self.lossless or self._interrupted.is_set():
+                return False
+            self.send_stats['lossless_stalls'] += 1
+            self.logger.debug(f"Receiver slow - still waiting after {timeout_ms}ms (lossless)")
+        return True
+    
+    def _writable_steps(self, timeout_ms: int) -> Generator:
+        """Wait up to timeout_ms for queue space."""
+        return (yield self.WAIT_WRITABLE, timeout_ms)
+    
+    def interrupt(self):
+        """Make a lossless send waiting on this socket give up after its current wait (thread-safe)."""
+        self._interrupted.set()
+    
+    def _try_send(self, parts: List, send: Optional[SendTracker] = None) -> bool:
+        """Send without blocking; False if the queue is full. A sent frame settles send with its part trackers."""
+        frames = parts
+        if send is not None:
+            # Track the zero-copy buffer parts (the header is bytes and copied)
+            frames = [part if isinstance(part, bytes) else zmq.Frame(part, copy=False, track=True) for part in parts]
+        try:
+            self.socket.send_multipart(frames, zmq.NOBLOCK, copy=False)  # Zero-copy for raw frame buffers
+        except zmq.Again:
+            self.metrics.hwm_hits += 1
             return False
+        self.send_stats['sent'] += 1
+        self.metrics.record_send(parts)
+        if send is not None:
+            send.settle([frame.tracker for frame in frames if isinstance(frame, zmq.Frame)])
+        return True
+    
+    def _send_latest(self, parts: List, ref: Optional[SharedFrameRef], send: Optional[SendTracker] = None) -> bool:
+        """DROP_OLDEST: send now if possible, else park the frame, replacing any older parked frame."""
+        if self._pending is not None:
+            if self._try_send(self._pending[0], self._pending[2]):
+                self._pending = None
+            else:
+                self._drop(self._pending[1], 'dropped_stale', send=self._pending[2])
+                self._pending = (parts, ref, send)
+                return True
+        
+        if not self._try_send(parts, send):
+            self._pending = (parts, ref, send)
+        return True
+    
+    def _flush_pending(self, timeout_ms: int):
+        """Send the parked DROP_OLDEST frame (before control messages, to keep ordering)."""
+        self._run_steps(self._flush_pending_steps(timeout_ms))
+    
+    def _flush_pending_steps(self, timeout_ms: int) -> Generator:
+        """_flush_pending as a step sequence (see _frame_send_steps)."""
+        if self._pending is None:
+            return
+        if (yield self.WAIT_WRITABLE, timeout_ms) and self._try_send(self._pending[0], self._pending[2]):
+            self._pending = None
+        else:
+            self._drop(self._pending[1], 'dropped_stale', send=self._pending[2])
+            self._pending = None
+    
+    def _drop(self, ref: Optional[SharedFrameRef], reason: str, refund_credit: bool = False,
+              send: Optional[SendTracker] = None) -> bool:
+        """
+        Count a dropped frame and free its shared-memory slot for the readers that won't see it.
+        
+        refund_credit gives back the credit taken for the frame: it never left,
+        so the receiver will never grant it again. send is settled (nothing
+        references the frame's buffers any more).
+        """
+        if refund_credit:
+            self._credits += 1
+        if send is not None:
+            send.settle()
+        self.send_stats[reason] += 1
+        dropped = self.send_stats['dropped_full'] + self.send_stats['dropped_timeout'] + self.send_stats['dropped_stale']
+        
+        # One warning per 100 drops instead of one per frame
+        if dropped == 1 or dropped % 100 == 0:
+            self.logger.warning(f"Dropping frames ({reason}, policy {self.send_policy}): {dropped} dropped so far")
+        
+        if ref is not None:
+            ring = SharedFrameRing.attach(ref.ring_name)
+            for reader_index in self.shm_drop_readers or range(ring.num_readers):
+                ring.release(ref, reader_index)
+        return False
+    
+    def _start_credit_channel(self):
+        """Open the reverse credit socket (same bind/connect side as the data socket)."""
+        endpoint = credit_endpoint(self.endpoint)
+        self.credit_socket = self.context.socket(zmq.PULL if self.is_sender else zmq.PUSH)
+        self.credit_socket.setsockopt(zmq.LINGER, 0)
+        if self.bind:
+            self.credit_socket.bind(endpoint)
+        else:
+            self.credit_socket.connect(endpoint)
+        
+        if self.is_sender:
+            self.credit_poller = zmq.Poller()
+            self.credit_poller.register(self.credit_socket, zmq.POLLIN)
+        else:
+            self._grant_credits(self.credit_window)  # Initial window
+    
+    def _credit_steps(self, timeout_ms: int) -> Generator:
+        """Sender: consume one credit, waiting up to timeout_ms for the receiver to grant one (step sequence)."""
+        self._collect_credits()
+        if self._credits == 0:
+            self.send_stats['credit_waits'] += 1
+            deadline = time.monotonic() + timeout_ms / 1000.0
+            while self._credits == 0:
+                remaining_ms = int((deadline - time.monotonic()) * 1000)
+                if remaining_ms <= 0 or not (yield self.WAIT_CREDIT, remaining_ms):
+                    return False
+                self._collect_credits()
+        
+        self._credits -= 1
+        return True
+    
+    def _collect_credits(self):
+        """Sender: add up all credit grants received so far."""
+        try:
+            while True:
+                self._credits += struct.unpack('!I', self.credit_socket.recv(zmq.NOBLOCK))[0]
+        except zmq.Again:
+            pass
+    
+    def _grant_credits(self, count: int):
+        """Receiver: return credits to the sender (kept owed if the credit queue is full)."""
+        self._credits_owed += count
+        try:
+            self.credit_socket.send(struct.pack('!I', self._credits_owed), zmq.NOBLOCK)
+            self._credits_owed = 0
+        except zmq.Again:
+            pass
+    
+    def _on_frames_received(self, count: int):
+        """Receiver bookkeeping after frame-carrying messages were dequeued."""
+        if count and self.credit_socket is not None and not self.is_sender:
+            self._grant_credits(count)
+    
+    def get_send_stats(self) -> dict:
+        """Get send/drop counters for this channel."""
+        stats = dict(self.send_stats)
+        stats['dropped'] = stats['dropped_full'] + stats['dropped_timeout'] + stats['dropped_stale']
+        stats['policy'] = self.send_policy
+        if self.send_policy == SendPolicy.CREDIT:
+            stats['credits'] = self._credits
+        return stats
     
-    def send_detection_result(self, result: DetectionResult, timeout_ms: int = 1000) -> bool:
-        """Send DetectionResult message."""
+    def get_metrics(self) -> dict:
+        """
+        Get transport metrics for this socket.
+        
+        Counters (messages/bytes sent and received, HWM hits, decode errors),
+        serialize/deserialize/receive-wait histograms and, for senders, the
+        send/drop counters of get_send_stats().
+        """
+        metrics = self.metrics.snapshot()
+        if self.is_sender:
+            metrics['send'] = self.get_send_stats()
+        return metrics
+    
+    def send_system_message(self, message: SystemMessage, timeout_ms: int = 1000) -> bool:
+        """Send SystemMessage."""
         if not self.is_connected:
             self.logger.error("Socket not connected")
             return False
         
         try:
-            data = MessageProtocol.serialize_detection_result(result)
+            # Control messages are never dropped silently: wait for queue space
+            self._flush_pending(timeout_ms)
+            data = self._serialize_timed(MessageProtocol.serialize_system_message, message)
+            if not self.send_poller.poll(timeout_ms):
+                raise zmq.Again()
             self.socket.send(data, zmq.NOBLOCK)
+            self.metrics.record_send(data)
             return True
             
         except zmq.Again:
+            self.metrics.hwm_hits += 1
             self.logger.warning(f"Send timeout after {timeout_ms}ms")
             return False
         except Exception as e:
             self.logger.error(f"Send failed: {e}")
             return False
     
-    def send_system_message(self, message: SystemMessage, timeout_ms: int = 1000) -> bool:
-        """Send SystemMessage."""
+    def wait_for_subscribers(self, count: int, timeout_ms: int = 1000) -> int:
+        """
+        Wait until an XPUB socket has seen count subscriptions (PUB drops messages to peers still connecting).
+        
+        Returns the number seen, which is less than count on timeout.
+        """
+        deadline = time.monotonic() + timeout_ms / 1000
+        while self.subscribers < count:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0 or not self.poller.poll(remaining_ms):
+                break
+            if self.socket.recv()[:1] == b"\x01":  # Subscribe (0x00 = unsubscribe)
+                self.subscribers += 1
+        return self.subscribers
+    
+    def send_stream_descriptor(self, descriptor: StreamDescriptor, timeout_ms: int = 1000) -> bool:
+        """
+        Send a stream's descriptor unless the receiver already has this one.
+        
+        Meant to be called before every frame: it only sends at stream start,
+        when the descriptor changes, or again after a failed send. It waits for
+        queue space only where frames wait too (BLOCK, CREDIT); on dropping
+        channels the frame after it would be dropped as well, so it is simply
+        retried before the next frame.
+        """
+        if self.stream_descriptors.get(descriptor.stream_id) == descriptor:
+            return True
         if not self.is_connected:
-            self.logger.error("Socket not connected")
             return False
         
+        wait_ms = timeout_ms if self.send_policy in (SendPolicy.BLOCK, SendPolicy.CREDIT) else 0
         try:
-            data = MessageProtocol.serialize_system_message(message)
+            self._flush_pending(wait_ms)  # Keep ordering with a parked DROP_OLDEST frame
+            data = self._serialize_timed(MessageProtocol.serialize_system_message, descriptor.to_message())
+            if not self._run_steps(self._lossless_steps(self._writable_steps, wait_ms)):
+                return False
             self.socket.send(data, zmq.NOBLOCK)
-            return True
-            
+            self.metrics.record_send(data)
         except zmq.Again:
-            self.logger.warning(f"Send timeout after {timeout_ms}ms")
+            self.metrics.hwm_hits += 1
             return False
         except Exception as e:
             self.logger.error(f"Send failed: {e}")
             return False
+        
+        self.stream_descriptors[descriptor.stream_id] = descriptor
+        return True
+    
+    def stream_descriptor(self, stream_id: str = DEFAULT_STREAM_ID) -> Optional[StreamDescriptor]:
+        """Latest descriptor received for a stream (None if none has arrived yet)."""
+        return self.stream_descriptors.get(stream_id)
     
     def send_performance_metrics(self, metrics: PerformanceMetrics, timeout_ms: int = 1000) -> bool:
         """Send PerformanceMetrics."""
@@ -129,11 +654,13 @@ class ZMQManager:
             return False
         
         try:
-            data = MessageProtocol.serialize_performance_metrics(metrics)
+            data = self._serialize_timed(MessageProtocol.serialize_performance_metrics, metrics)
             self.socket.send(data, zmq.NOBLOCK)
+            self.metrics.record_send(data)
             return True
             
         except zmq.Again:
+            self.metrics.hwm_hits += 1
             self.logger.warning(f"Send timeout after {timeout_ms}ms")
             return False
         except Exception as e:
@@ -147,17 +674,59 @@ class ZMQManager:
             return False
         
         try:
-            data = MessageProtocol.serialize_log_message(log_msg)
+            data = self._serialize_timed(MessageProtocol.serialize_log_message, log_msg)
             self.socket.send(data, zmq.NOBLOCK)
+            self.metrics.record_send(data)
             return True
             
         except zmq.Again:
+            self.metrics.hwm_hits += 1
             self.logger.warning(f"Send timeout after {timeout_ms}ms")
             return False
         except Exception as e:
             self.logger.error(f"Send failed: {e}")
             return False
     
+    def _serialize_timed(self, serialize, message) -> bytes:
+        """Serialize a single-part message, recording the serialization time."""
+        start = time.perf_counter()
+        data = serialize(message)
+        self.metrics.serialize_time.record(time.perf_counter() - start)
+        return data
+    
+    def _deserialize_timed(self, parts: List):
+        """Deserialize a received message, recording size and decode time."""
+        start = time.perf_counter()
+        try:
+            message = MessageProtocol.deserialize(parts)
+        except ValueError:
+            self.metrics.decode_errors += 1
+            raise
+        self.metrics.record_receive(parts, time.perf_counter() - start)
+        if isinstance(message, SystemMessage) and message.message_type == StreamDescriptor.MESSAGE_TYPE:
+            descriptor = StreamDescriptor.from_message(message)
+            self.stream_descriptors[descriptor.stream_id] = descriptor
+        return message
+    
+    def _shared_frame_ref(self, frame: Optional[np.ndarray]) -> Optional[SharedFrameRef]:
+        """Reference frames already in a shared ring, or write into our ring if we have one."""
+        if frame is None:
+            return None
+        
+        ref = SharedFrameRing.locate(frame)
+        if ref is None and self.frame_ring is not None:
+            ref = self.frame_ring.write(frame)
+        return ref
+    
+    def release_frame(self, frame: Optional[np.ndarray]):
+        """Release a received frame's shared-memory slot (no-op for socket-delivered frames)."""
+        if frame is None or self.shm_reader_index is None:
+            return
+        
+        ref = SharedFrameRing.locate(frame)
+        if ref is not None:
+            SharedFrameRing.attach(ref.ring_name).release(ref, self.shm_reader_index)
+    
     def receive(self, timeout_ms: int = 1000) -> Optional[Union[FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage]]:
         """Receive and deserialize message."""
         if not self.is_connected:
@@ -166,12 +735,12 @@ class ZMQManager:
         
         try:
             # Use poll to check for messages with timeout
-            poller = zmq.Poller()
-            poller.register(self.socket, zmq.POLLIN)
-            
-            if poller.poll(timeout_ms):
-                data = self.socket.recv(zmq.NOBLOCK)
-                return MessageProtocol.deserialize(data)
+            start = time.perf_counter()
+            if self.poller.poll(timeout_ms):
+                self.metrics.receive_wait.record(time.perf_counter() - start)
+                # copy=False keeps frame buffers in the received zmq.Frame (no copy)
+                messages = self._drain(1)
+                return messages[0] if messages else None
             else:
                 # Timeout - no message available
                 return None
@@ -182,18 +751,221 @@ class ZMQManager:
         except Exception as e:
             self.logger.error(f"Receive failed: {e}")
             return None
+    
+    def receive_batch(self, max_messages: int = 64, timeout_ms: int = 1000) -> List[Union[FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage]]:
+        """
+        Receive every message already queued, up to max_messages, in one call.
+        
+        Waits up to timeout_ms for the first message, then drains the socket
+        without blocking. Messages that fail to decode are logged and skipped.
+        """
+        if not self.is_connected:
+            self.logger.error("Socket not connected")
+            return []
+        
+        try:
+            start = time.perf_counter()
+            if not self.poller.poll(timeout_ms):
+                return []
+            self.metrics.receive_wait.record(time.perf_counter() - start)
+        except Exception as e:
+            self.logger.error(f"Receive failed: {e}")
+            return []
+        
+        return self._drain(max_messages)
+    
+    def _drain(self, max_messages: int) -> List[Union[FrameData, DetectionResult, SystemMessage, PerformanceMetrics, LogMessage]]:
+        """Receive up to max_messages already queued, without blocking."""
+        messages = []
+        frames = 0
+        try:
+            while len(messages) < max_messages:
+                parts = self.socket.recv_multipart(zmq.NOBLOCK, copy=False)
+                # Counted from the tag, so a frame that fails to decode still returns its credit
+                carries_frame = MessageProtocol.carries_frame(parts)
+                frames += bool(carries_frame)
+                try:
+                    message = self._deserialize_timed(parts)
+                except ValueError as e:
+                    self.logger.error(f"Receive failed: {e}")
+                    continue
+                if carries_frame is None:  # Untagged legacy message
+                    frames += isinstance(message, (FrameData, DetectionResult))
+                messages.append(message)
+                    
+        except zmq.Again:
+            pass  # Queue drained
+        except Exception as e:
+            self.logger.error(f"Receive failed: {e}")
+        
+        self._on_frames_received(frames)
+        return messages
+    
+    def skip_stale(self, messages: List) -> Tuple[List, int]:
+        """
+        Keep only the newest frame-carrying message of each stream in a batch.
+        
+        Control/log messages are all kept, in order. Older FrameData and
+        DetectionResult messages are dropped and their shared-memory slots
+        released. Returns (kept messages, number skipped).
+        """
+        newest = {}
+        for message in messages:
+            if isinstance(message, (FrameData, DetectionResult)):
+                newest[message.stream_id] = message
+        
+        kept = []
+        skipped = 0
+        for message in messages:
+            if isinstance(message, (FrameData, DetectionResult)) and message is not newest[message.stream_id]:
+                self.release_frame(message.frame)
+                skipped += 1
+            else:
+                kept.append(message)
+        return kept, skipped
 
 
 class PipelineComm:
     """High-level communication helpers for pipeline components."""
     
+    # Reader indices in the shared-memory frame ring (see SharedFrameRing)
+    SHM_READER_DETECTOR = 0
+    SHM_READER_DISPLAY = 1
+    SHM_READER_WEB = 2
+    
+    # I/O thread assignment when ZMQ_IO_THREADS > 1: frames get thread 0 to
+    # themselves, so log and control bursts don't queue behind frame traffic
+    FRAME_IO_THREAD = 0
+    CONTROL_IO_THREAD = 1
+    
+    # Frame channels. Their send policy comes from set_send_policy() or the
+    # environment, which every pipeline process shares, so both ends agree:
+    #   PIPELINE_SEND_POLICY            - default for all frame channels
+    #   PIPELINE_SEND_POLICY_<CHANNEL>  - per channel, e.g. PIPELINE_SEND_POLICY_STREAMER_TO_DETECTOR=credit
+    STREAMER_TO_DETECTOR = "streamer_to_detector"
+    STREAMER_TO_DISPLAY = "streamer_to_display"
+    DETECTOR_TO_DISPLAY = "detector_to_display"
+    DISPLAY_TO_WEB = "display_to_web"
+    
+    # Offline (batch) mode: the processing channels become lossless CREDIT
+    # channels, so the Streamer runs exactly as fast as the slowest stage and no
+    # frame is dropped. Enabled with set_offline() or PIPELINE_OFFLINE=1. The
+    # browser preview keeps its policy - it shows the latest frame, and waiting
+    # for it would throttle the batch to the browser's rate.
+    LOSSLESS_CHANNELS = (STREAMER_TO_DETECTOR, STREAMER_TO_DISPLAY, DETECTOR_TO_DISPLAY)
+    
+    # Detector pool: N Detector workers share the Streamer's frames (PUSH
+    # round-robin), each frame carrying its predecessor. The Display binds the
+    # result channel so every worker can connect, and reorders the results by
+    # frame_id. Enabled with set_detector_pool() or PIPELINE_DETECTOR_POOL=N.
+    _detector_pool: Optional[int] = None
+    _pool_policy_logged = False  # The CREDIT -> BLOCK switch is logged once per process
+    _logger = logging.getLogger("PipelineComm")
+    
+    _send_policies: Dict[str, str] = {}
+    _offline: Optional[bool] = None
+    
+    @classmethod
+    def set_offline(cls, enabled: Optional[bool] = True):
+        """Switch offline mode on or off (before creating sockets); None defers to PIPELINE_OFFLINE."""
+        cls._offline = enabled
+    
+    @classmethod
+    def is_offline(cls) -> bool:
+        """Whether offline mode is on: explicit setting, then the PIPELINE_OFFLINE environment variable."""
+        if cls._offline is not None:
+            return cls._offline
+        return os.getenv("PIPELINE_OFFLINE", "").strip().lower() in ("1", "true", "yes")
+    
+    @classmethod
+    def set_detector_pool(cls, workers: Optional[int]):
+        """Set the number of pooled Detector workers (before creating sockets); 0 = off, None defers to PIPELINE_DETECTOR_POOL."""
+        cls._detector_pool = workers
+        cls._pool_policy_logged = False
+    
+    @classmethod
+    def detector_pool_size(cls) -> int:
+        """Pooled Detector workers (0 = no pool): explicit setting, then the PIPELINE_DETECTOR_POOL environment variable."""
+        if cls._detector_pool is not None:
+            return cls._detector_pool
+        return int(os.getenv("PIPELINE_DETECTOR_POOL", "0") or 0)
+    
+    @classmethod
+    def is_lossless(cls, channel: str) -> bool:
+        """Whether frame sends on a channel must never drop (offline mode)."""
+        return cls.is_offline() and channel in cls.LOSSLESS_CHANNELS
+    
+    @classmethod
+    def set_send_policy(cls, channel: str, policy: str):
+        """Override the send policy of a frame channel (before creating its sockets)."""
+        cls._send_policies[channel] = SendPolicy.validate(policy)
+    
+    @classmethod
+    def send_policy(cls, channel: str) -> str:
+        """
+        Send policy for a frame channel: CREDIT if lossless, else explicit override, then environment, then DROP_NEWEST.
+        
+        With a detector pool the result channel has one receiver and many
+        senders, and a receiver's credits would go to the workers round-robin
+        rather than to the ones waiting - so it uses BLOCK instead of CREDIT.
+        """
+        if cls.is_lossless(channel):
+            policy = SendPolicy.CREDIT
+        elif channel in cls._send_policies:
+            policy = cls._send_policies[channel]
+        else:
+            policy = os.getenv(f"PIPELINE_SEND_POLICY_{channel.upper()}", os.getenv("PIPELINE_SEND_POLICY"))
+            policy = SendPolicy.validate(policy) if policy else SendPolicy.DROP_NEWEST
+        if policy == SendPolicy.CREDIT and channel == cls.DETECTOR_TO_DISPLAY and cls.detector_pool_size() > 0:
+            if not cls._pool_policy_logged:
+                cls._pool_policy_logged = True
+                lossless = " (still lossless: offline sends wait for queue space)" if cls.is_lossless(channel) else ""
+                cls._logger.warning(f"Detector pool: {channel} uses {SendPolicy.BLOCK} instead of "
+                                    f"{SendPolicy.CREDIT}{lossless}")
+            return SendPolicy.BLOCK
+        return policy
+    
+    @classmethod
+    def get_send_policies(cls) -> Dict[str, str]:
+        """Effective send policy of every frame channel."""
+        channels = (cls.STREAMER_TO_DETECTOR, cls.STREAMER_TO_DISPLAY, cls.DETECTOR_TO_DISPLAY, cls.DISPLAY_TO_WEB)
+        return {channel: cls.send_policy(channel) for channel in channels}
+    
     @staticmethod
-    def create_streamer_sender() -> ZMQManager:
-        """Create sender for Streamer → Detector communication."""
+    def create_streamer_sender(frame_ring: Optional[SharedFrameRing] = None,
+                               codec: Optional[str] = None) -> ZMQManager:
+        """
+        Create sender for Streamer → Detector communication.
+        
+        With a frame_ring, frames are written to shared memory and only the
+        slot index + generation travel over the socket. codec selects the
+        frame codec for this channel (see communication.codecs).
+        """
         return ZMQManager(
             socket_type=zmq.PUSH,
             endpoint=Endpoints.STREAMER_TO_DETECTOR,
-            bind=True  # Streamer binds, Detector connects
+            bind=True,  # Streamer binds, Detector connects
+            frame_ring=frame_ring,
+            codec=codec,
+            send_policy=PipelineComm.send_policy(PipelineComm.STREAMER_TO_DETECTOR),
+            lossless=PipelineComm.is_lossless(PipelineComm.STREAMER_TO_DETECTOR),
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.FRAME_IO_THREAD)
+        )
+    
+    @staticmethod
+    def create_streamer_fanout_sender(frame_ring: Optional[SharedFrameRing] = None,
+                                      codec: Optional[str] = None) -> ZMQManager:
+        """Create sender for Streamer → Display frame fan-out (metadata-only detection mode)."""
+        return ZMQManager(
+            socket_type=zmq.PUSH,
+            endpoint=Endpoints.STREAMER_TO_DISPLAY,
+            bind=True,  # Streamer binds, Display connects
+            frame_ring=frame_ring,
+            codec=codec,
+            send_policy=PipelineComm.send_policy(PipelineComm.STREAMER_TO_DISPLAY),
+            lossless=PipelineComm.is_lossless(PipelineComm.STREAMER_TO_DISPLAY),
+            shm_drop_readers=(PipelineComm.SHM_READER_DISPLAY,),
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.FRAME_IO_THREAD)
         )
     
     @staticmethod
@@ -202,16 +974,24 @@ class PipelineComm:
         return ZMQManager(
             socket_type=zmq.PULL,
             endpoint=Endpoints.STREAMER_TO_DETECTOR,
-            bind=False  # Detector connects to Streamer
+            bind=False,  # Detector connects to Streamer
+            shm_reader_index=PipelineComm.SHM_READER_DETECTOR,
+            send_policy=PipelineComm.send_policy(PipelineComm.STREAMER_TO_DETECTOR),
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.FRAME_IO_THREAD)
         )
     
     @staticmethod
-    def create_detector_sender() -> ZMQManager:
+    def create_detector_sender(codec: Optional[str] = None) -> ZMQManager:
         """Create sender for Detector → Display communication."""
         return ZMQManager(
             socket_type=zmq.PUSH,
             endpoint=Endpoints.DETECTOR_TO_DISPLAY,
-            bind=True  # Detector binds, Display connects
+            bind=PipelineComm.detector_pool_size() == 0,  # Detector binds, Display connects (reversed for a pool)
+            codec=codec,
+            send_policy=PipelineComm.send_policy(PipelineComm.DETECTOR_TO_DISPLAY),
+            lossless=PipelineComm.is_lossless(PipelineComm.DETECTOR_TO_DISPLAY),
+            shm_drop_readers=(PipelineComm.SHM_READER_DISPLAY,),
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.FRAME_IO_THREAD)
         )
     
     @staticmethod
@@ -220,16 +1000,35 @@ class PipelineComm:
         return ZMQManager(
             socket_type=zmq.PULL,
             endpoint=Endpoints.DETECTOR_TO_DISPLAY,
-            bind=False  # Display connects to Detector
+            bind=PipelineComm.detector_pool_size() > 0,  # Display connects to Detector (binds for a pool of them)
+            shm_reader_index=PipelineComm.SHM_READER_DISPLAY,
+            send_policy=PipelineComm.send_policy(PipelineComm.DETECTOR_TO_DISPLAY),
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.FRAME_IO_THREAD)
         )
     
     @staticmethod
-    def create_display_sender() -> ZMQManager:
+    def create_display_frame_receiver() -> ZMQManager:
+        """Create receiver for Streamer → Display frame fan-out."""
+        return ZMQManager(
+            socket_type=zmq.PULL,
+            endpoint=Endpoints.STREAMER_TO_DISPLAY,
+            bind=False,  # Display connects to Streamer
+            shm_reader_index=PipelineComm.SHM_READER_DISPLAY,
+            send_policy=PipelineComm.send_policy(PipelineComm.STREAMER_TO_DISPLAY),
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.FRAME_IO_THREAD)
+        )
+    
+    @staticmethod
+    def create_display_sender(codec: Optional[str] = None) -> ZMQManager:
         """Create sender for Display → Web communication."""
         return ZMQManager(
             socket_type=zmq.PUSH,
             endpoint=Endpoints.DISPLAY_TO_WEB,
-            bind=True  # Display binds, Web connects
+            bind=True,  # Display binds, Web connects
+            codec=codec,
+            send_policy=PipelineComm.send_policy(PipelineComm.DISPLAY_TO_WEB),
+            shm_drop_readers=(PipelineComm.SHM_READER_WEB,),
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.FRAME_IO_THREAD)
         )
     
     @staticmethod
@@ -238,17 +1037,25 @@ class PipelineComm:
         return ZMQManager(
             socket_type=zmq.PULL,
             endpoint=Endpoints.DISPLAY_TO_WEB,
-            bind=False  # Web connects to Display
+            bind=False,  # Web connects to Display
+            shm_reader_index=PipelineComm.SHM_READER_WEB,
+            send_policy=PipelineComm.send_policy(PipelineComm.DISPLAY_TO_WEB),
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.FRAME_IO_THREAD)
         )
     
     @staticmethod
     def create_control_publisher() -> ZMQManager:
-        """Create publisher for system control messages."""
-        return ZMQManager(
-            socket_type=zmq.PUB,
+        """Create publisher for system control messages (XPUB, so it can wait for its subscribers)."""
+        manager = ZMQManager(
+            socket_type=zmq.XPUB,
             endpoint=Endpoints.CONTROL_CHANNEL,
-            bind=True
+            bind=True,
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.CONTROL_IO_THREAD)
         )
+        # Control messages are rare and often the last thing sent - deliver them on close
+        manager.socket.setsockopt(zmq.LINGER, 1000)
+        manager.socket.setsockopt(zmq.XPUB_VERBOSE, 1)  # Report every subscriber, not just the first per topic
+        return manager
     
     @staticmethod
     def create_control_subscriber() -> ZMQManager:
@@ -256,19 +1063,43 @@ class PipelineComm:
         manager = ZMQManager(
             socket_type=zmq.SUB,
             endpoint=Endpoints.CONTROL_CHANNEL,
-            bind=False
+            bind=False,
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.CONTROL_IO_THREAD)
         )
         # Subscribe to all control messages
         manager.socket.setsockopt(zmq.SUBSCRIBE, b"")
         return manager
     
+    @staticmethod
+    def create_metrics_publisher() -> ZMQManager:
+        """Create publisher for transport metrics reports (see TransportMetricsReporter)."""
+        return ZMQManager(
+            socket_type=zmq.PUB,
+            endpoint=Endpoints.MONITORING_CHANNEL,
+            bind=False,  # Every component publishes, the monitor binds
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.CONTROL_IO_THREAD)
+        )
+    
+    @staticmethod
+    def create_metrics_subscriber() -> ZMQManager:
+        """Create subscriber that collects transport metrics from all components."""
+        manager = ZMQManager(
+            socket_type=zmq.SUB,
+            endpoint=Endpoints.MONITORING_CHANNEL,
+            bind=True,
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.CONTROL_IO_THREAD)
+        )
+        manager.socket.setsockopt(zmq.SUBSCRIBE, b"")
+        return manager
+    
     @staticmethod
     def create_log_sender() -> ZMQManager:
         """Create sender for centralized logging."""
         return ZMQManager(
             socket_type=zmq.PUSH,
             endpoint=Endpoints.LOGGING_CHANNEL,
-            bind=False  # Components push to logging service
+            bind=False,  # Components push to logging service
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.CONTROL_IO_THREAD)
         )
     
     @staticmethod
@@ -277,5 +1108,6 @@ class PipelineComm:
         return ZMQManager(
             socket_type=zmq.PULL,
             endpoint=Endpoints.LOGGING_CHANNEL,
-            bind=True  # Logging service binds and receives
+            bind=True,  # Logging service binds and receives
+            affinity=ZMQContextRegistry.io_affinity(PipelineComm.CONTROL_IO_THREAD)
         ) 
\ No newline at end of file
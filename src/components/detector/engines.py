@@ -0,0 +1,245 @@
+"""
+Detection Engines - Interchangeable ways of finding moving pixels.
+
+The MotionDetector grayscales (and optionally downscales) each frame, asks an
+engine for a binary foreground mask, then dilates the mask and turns its
+blobs into detections. Only the engine differs between methods:
+
+    framediff    - difference to the previous frame (basic_vmd.py; default)
+    average[:A]  - difference to a running-average background, learning rate A
+                   (default 0.05); ignores slow lighting drift and sensor noise
+                   better than framediff, and keeps stopped objects for a while
+    mog2[:V]     - OpenCV's Gaussian-mixture background model, variance
+                   threshold V (default 16); robust to noise and flicker
+    knn[:D]      - OpenCV's k-nearest-neighbours background model, squared
+                   distance threshold D (default 400)
+
+Roughly in order of cost. Background models also report objects that stop
+moving until they are learned into the background, where framediff only
+sees the edges that moved. Each stream gets its own engine instance, as
+every engine keeps state about the frames it has seen. Only framediff is
+pairwise - its mask depends on the previous frame alone - so only it can
+run in a detector pool, where each worker primes it with the predecessor
+sent along with the frame.
+"""
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from core.buffer_pool import FrameBufferPool
+
+
+class DetectionEngine:
+    """Base engine: turns consecutive grayscale frames of one stream into foreground masks."""
+
+    name = ""
+    method = ""          # Reported in result metadata as 'detection_method'
+    warmup_frames = 1    # Frames the engine needs before its mask means anything
+    pairwise = False     # Mask depends on the previous frame only (can run in a detector pool)
+
+    def __init__(self, threshold: int = 25):
+        """
+        Initialize engine.
+
+        Args:
+            threshold: Grey-level difference that counts as motion (difference engines)
+        """
+        self.threshold = threshold
+        self.shape = None
+        self.frames_seen = 0
+        self.pool: Optional[FrameBufferPool] = None  # Pool of the frames passed to apply()
+
+    def apply(self, gray: np.ndarray, pool: FrameBufferPool) -> Optional[np.ndarray]:
+        """
+        Foreground mask (0/255) of the next frame, or None while warming up.
+
+        gray is a buffer from pool and belongs to the engine from here on:
+        it releases it, or keeps it and releases it later. The mask is
+        written into another buffer from pool, which the caller releases. A
+        change of frame size restarts the engine.
+        """
+        if gray.shape != self.shape:
+            self.reset()
+            self.shape = gray.shape
+        self.pool = pool
+        self.frames_seen += 1
+        mask = self.foreground_mask(gray, pool)
+        if self.frames_seen > self.warmup_frames:
+            return mask
+        pool.release(mask)
+        return None
+
+    def foreground_mask(self, gray: np.ndarray, pool: FrameBufferPool) -> Optional[np.ndarray]:
+        """Update the engine's state with a frame (releasing or keeping it) and return its foreground mask."""
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget all previous frames."""
+        self.frames_seen = 0
+
+    def spec(self) -> str:
+        """Engine spec string (as accepted by create_engine)."""
+        return self.name
+
+
+class FrameDifferenceEngine(DetectionEngine):
+    """Absolute difference to the previous frame, thresholded (from basic_vmd.py)."""
+
+    name = "framediff"
+    method = "frame_difference"
+    pairwise = True
+
+    def __init__(self, threshold: int = 25):
+        super().__init__(threshold)
+        self.prev_frame: Optional[np.ndarray] = None
+
+    def foreground_mask(self, gray: np.ndarray, pool: FrameBufferPool) -> Optional[np.ndarray]:
+        prev_frame, self.prev_frame = self.prev_frame, gray  # Kept until the next frame replaces it
+        if prev_frame is None:
+            return None
+        diff = cv2.absdiff(gray, prev_frame, dst=pool.acquire())
+        pool.release(prev_frame)
+        return cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY, dst=diff)[1]
+
+    def reset(self):
+        super().reset()
+        if self.pool is not None:
+            self.pool.release(self.prev_frame)
+        self.prev_frame = None
+
+
+class RunningAverageEngine(DetectionEngine):
+    """Absolute difference to an exponentially weighted average of past frames."""
+
+    name = "average"
+    method = "running_average"
+
+    def __init__(self, threshold: int = 25, alpha: float = 0.05):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"Running-average learning rate must be in (0, 1], got {alpha}")
+        super().__init__(threshold)
+        self.alpha = alpha
+        self.background: Optional[np.ndarray] = None  # float32
+        self.background_u8: Optional[np.ndarray] = None
+
+    def foreground_mask(self, gray: np.ndarray, pool: FrameBufferPool) -> Optional[np.ndarray]:
+        if self.background is None:
+            self.background = gray.astype(np.float32)
+            self.background_u8 = gray.copy()
+            pool.release(gray)
+            return None
+        diff = cv2.absdiff(gray, self.background_u8, dst=pool.acquire())
+        cv2.accumulateWeighted(gray, self.background, self.alpha)
+        cv2.convertScaleAbs(self.background, dst=self.background_u8)
+        pool.release(gray)
+        return cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY, dst=diff)[1]
+
+    def reset(self):
+        super().reset()
+        self.background = self.background_u8 = None
+
+    def spec(self) -> str:
+        return f"{self.name}:{self.alpha:g}"
+
+
+class _BackgroundSubtractorEngine(DetectionEngine):
+    """Engine around an OpenCV BackgroundSubtractor (shadow detection off, mask is 0/255)."""
+
+    def __init__(self, threshold: int = 25):
+        super().__init__(threshold)
+        self.subtractor = self.create_subtractor()
+
+    def create_subtractor(self):
+        raise NotImplementedError
+
+    def foreground_mask(self, gray: np.ndarray, pool: FrameBufferPool) -> Optional[np.ndarray]:
+        mask = self.subtractor.apply(gray, fgmask=pool.acquire())
+        pool.release(gray)
+        return mask
+
+    def reset(self):
+        super().reset()
+        self.subtractor = self.create_subtractor()
+
+
+class Mog2Engine(_BackgroundSubtractorEngine):
+    """Gaussian mixture background model (cv2.createBackgroundSubtractorMOG2)."""
+
+    name = "mog2"
+    method = "mog2"
+
+    def __init__(self, threshold: int = 25, var_threshold: float = 16.0, history: int = 500):
+        if var_threshold <= 0:
+            raise ValueError(f"MOG2 variance threshold must be positive, got {var_threshold}")
+        self.var_threshold = var_threshold
+        self.history = history
+        super().__init__(threshold)
+
+    def create_subtractor(self):
+        return cv2.createBackgroundSubtractorMOG2(history=self.history, varThreshold=self.var_threshold,
+                                                 detectShadows=False)
+
+    def spec(self) -> str:
+        return f"{self.name}:{self.var_threshold:g}"
+
+
+class KnnEngine(_BackgroundSubtractorEngine):
+    """K-nearest-neighbours background model (cv2.createBackgroundSubtractorKNN)."""
+
+    name = "knn"
+    method = "knn"
+    warmup_frames = 4  # Reports (almost) everything as foreground until it has a few samples per pixel
+
+    def __init__(self, threshold: int = 25, dist2_threshold: float = 400.0, history: int = 500):
+        if dist2_threshold <= 0:
+            raise ValueError(f"KNN distance threshold must be positive, got {dist2_threshold}")
+        self.dist2_threshold = dist2_threshold
+        self.history = history
+        super().__init__(threshold)
+
+    def create_subtractor(self):
+        return cv2.createBackgroundSubtractorKNN(history=self.history, dist2Threshold=self.dist2_threshold,
+                                                 detectShadows=False)
+
+    def spec(self) -> str:
+        return f"{self.name}:{self.dist2_threshold:g}"
+
+
+_ENGINE_CLASSES = {
+    FrameDifferenceEngine.name: FrameDifferenceEngine,
+    RunningAverageEngine.name: RunningAverageEngine,
+    Mog2Engine.name: Mog2Engine,
+    KnnEngine.name: KnnEngine,
+}
+
+ENGINE_NAMES = tuple(_ENGINE_CLASSES)
+
+# Engine parameter set by the spec's ":value" part
+_ENGINE_PARAMS: Dict[str, str] = {
+    RunningAverageEngine.name: 'alpha',
+    Mog2Engine.name: 'var_threshold',
+    KnnEngine.name: 'dist2_threshold',
+}
+
+
+def create_engine(spec: Optional[str], threshold: int = 25) -> DetectionEngine:
+    """
+    Create a new engine from a spec such as "framediff", "average:0.02", "mog2" or "knn:600".
+
+    Engines are stateful, so every stream needs its own instance.
+
+    Raises:
+        ValueError: Unknown engine name or bad parameter
+    """
+    spec = (spec or FrameDifferenceEngine.name).strip().lower()
+    name, _, param = spec.partition(':')
+    engine_class = _ENGINE_CLASSES.get(name)
+    if engine_class is None:
+        raise ValueError(f"Unknown detection engine: {name} (available: {', '.join(ENGINE_NAMES)})")
+
+    if param:
+        if name not in _ENGINE_PARAMS:
+            raise ValueError(f"Detection engine {name} takes no parameter")
+        return engine_class(threshold, **{_ENGINE_PARAMS[name]: float(param)})
+    return engine_class(threshold)
@@ -2,43 +2,96 @@
 Motion Detector Component - Processes frames and detects motion using OpenCV.
 Extracted and enhanced from basic_vmd.py with proper architecture.
 """
+import asyncio
+import math
 import cv2
 import numpy as np
 import time
 import logging
 import threading
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 import imutils
 
-from core.data_models import FrameData, DetectionResult, Detection, SystemMessage
+from core.data_models import FrameData, DetectionResult, Detection, SystemMessage, StreamDescriptor
+from core.buffer_pool import FrameBufferPool, merge_pool_stats
+from .engines import DetectionEngine, create_engine
 from communication.zmq_manager import ZMQManager, PipelineComm
+from communication.metrics import LatencyHistogram
+from communication.async_zmq_manager import AsyncZMQManager, watch_control_channel
 
 
 class MotionDetector:
-    """Detects motion in video frames using frame differencing approach."""
+    """Detects motion in video frames with a pluggable detection engine (frame differencing by default)."""
     
-    def __init__(self, threshold: int = 25, min_area: int = 500, dilate_iterations: int = 2):
+    WORK_BUFFERS = 4  # Per stream: gray frame, previous gray frame (framediff), foreground mask, dilated mask
+    BLOB_EXTRACTION = ("contours", "components")  # How blobs are found in the motion mask
+    POOL_DRAIN_TIMEOUT = 0.5  # Seconds without frames after a broadcast end-of-stream before a pool worker ends
+    
+    def __init__(self, threshold: int = 25, min_area: int = 500, dilate_iterations: int = 2,
+                 metadata_only: bool = False, codec: Optional[str] = None,
+                 skip_stale_frames: bool = False, use_asyncio: bool = False,
+                 analysis_scale: float = 1.0, analysis_width: Optional[int] = None,
+                 blob_extraction: str = "contours", engine: str = "framediff", pool_worker: bool = False,
+                 static_check: int = 0):
         """
         Initialize motion detector.
         
         Args:
-            threshold: Threshold for binary image (from basic_vmd.py: 25)
+            threshold: Threshold for binary image (from basic_vmd.py: 25; framediff and average engines)
             min_area: Minimum contour area to consider as motion
             dilate_iterations: Dilation iterations (from basic_vmd.py: 2)
+            metadata_only: Send results without the frame (Display gets frames from Streamer)
+            codec: Frame codec for results sent to Display (e.g. "jpeg:80"; None = channel default)
+            skip_stale_frames: When frames queue up, process only the newest one
+            use_asyncio: Run the stage loop on an asyncio event loop that also
+                         services the control channel (shutdown messages)
+            analysis_scale: Analyse frames downscaled by this factor (0 < scale <= 1);
+                            bounding boxes and areas are reported at full resolution
+            analysis_width: Analyse frames downscaled to this width instead (overrides
+                            analysis_scale; frames narrower than this are analysed as they are)
+            blob_extraction: "contours" (findContours, one Python step per contour) or
+                             "components" (connected components, filtered as arrays -
+                             faster on busy masks with hundreds of blobs)
+            engine: Detection engine spec: framediff, average[:alpha], mog2[:var_threshold]
+                    or knn[:dist2_threshold] (see engines.py)
+            pool_worker: One of several Detectors sharing a stream's frames: each frame is
+                         differenced against the predecessor sent along with it, not
+                         against the last frame this worker saw (pairwise engines only)
+            static_check: Skip dilation and blob search when no static_check x static_check
+                          block of the engine's thresholded mask has static_check or more
+                          changed pixels (about a line across it); a power of two (1 = any
+                          changed pixel, exact; 0 = off)
         """
         # Detection parameters (from basic_vmd.py)
         self.threshold = threshold
         self.min_area = min_area
         self.dilate_iterations = dilate_iterations
+        self.metadata_only = metadata_only
+        self.codec = codec
+        self.skip_stale_frames = skip_stale_frames
+        self.use_asyncio = use_asyncio
+        self.analysis_scale = analysis_scale
+        self.analysis_width = analysis_width
+        self.blob_extraction = blob_extraction
+        self.engine = engine
+        self.pool_worker = pool_worker
+        self.static_check = static_check
         
-        # Frame processing state
-        self.prev_frame: Optional[np.ndarray] = None
+        # Frame processing state: detection engine of each stream (holds its previous frame or background)
+        self.engines: Dict[str, DetectionEngine] = {}
+        self.buffer_pools: Dict[str, FrameBufferPool] = {}  # Per stream work buffers (see WORK_BUFFERS)
+        self.scaled_frames: Dict[str, np.ndarray] = {}      # Per stream downscaled colour frame (analysis scale < 1)
         self.frame_counter = 0
+        self.source_frames: Optional[int] = None  # Frames the Streamer sent (from its end-of-stream)
+        self.source_streams: Optional[Dict[str, int]] = None  # Per stream, from a multi-source Streamer
+        self.source_last_ids: Optional[Dict[str, int]] = None  # Last frame_id sent per stream
         self.is_processing = False
         
         # ZMQ communication
         self.frame_receiver: Optional[ZMQManager] = None
         self.result_sender: Optional[ZMQManager] = None
+        self.control_subscriber: Optional[ZMQManager] = None  # Pool workers: end-of-stream broadcast
+        self.stream_ended_at: Optional[float] = None  # Pool workers: last frame seen after the broadcast
         
         # Threading
         self.process_thread: Optional[threading.Thread] = None
@@ -47,8 +100,32 @@ class MotionDetector:
         # Performance tracking
         self.total_detections = 0
         self.processing_times = []
+        self.engine_times = []  # Engine's share of processing_times (foreground mask), ms
+        self.frames_skipped = 0
+        self.static_frames = 0        # Frames the static check found unchanged (no blob search)
+        self.static_check_time = 0.0  # Total time in the static check, ms
+        self.blob_time = 0.0          # Total dilation and blob search time on frames not skipped, ms
+        self.blob_frames = 0
+        self.send_stats: Optional[dict] = None
+        self.first_frame_time = 0.0  # For overall throughput (monotonic clock)
+        self.last_frame_time = 0.0
+        self.latency = LatencyHistogram()  # Capture to detection done (monotonic clock)
+        self.latency_skipped = 0  # Frames captured on another host (clocks not comparable)
         
         self.logger = logging.getLogger("MotionDetector")
+        
+        if not 0 < analysis_scale <= 1:
+            raise ValueError(f"analysis_scale must be in (0, 1], got {analysis_scale}")
+        if analysis_width is not None and analysis_width <= 0:
+            raise ValueError(f"analysis_width must be positive, got {analysis_width}")
+        if blob_extraction not in self.BLOB_EXTRACTION:
+            raise ValueError(f"blob_extraction must be one of {', '.join(self.BLOB_EXTRACTION)}, got {blob_extraction!r}")
+        engine_instance = create_engine(engine, threshold)  # Validates the spec
+        self.engine_spec = engine_instance.spec()
+        if pool_worker and not engine_instance.pairwise:
+            raise ValueError(f"A detector pool worker needs a pairwise engine (framediff), not {self.engine_spec}")
+        if static_check < 0 or static_check & (static_check - 1):
+            raise ValueError(f"static_check must be 0 (off) or a power-of-two block size, got {static_check}")
     
     def setup_communication(self) -> bool:
         """Setup ZMQ communication for receiving frames and sending results."""
@@ -60,11 +137,18 @@ class MotionDetector:
                 return False
             
             # Sender: Send results to Display
-            self.result_sender = PipelineComm.create_detector_sender()
+            self.result_sender = PipelineComm.create_detector_sender(codec=self.codec)
             if not self.result_sender.start():
                 self.logger.error("Failed to start result sender")
                 return False
             
+            # Pool workers: PUSH hands the in-band end-of-stream to one worker only
+            if self.pool_worker:
+                self.control_subscriber = PipelineComm.create_control_subscriber()
+                if not self.control_subscriber.start():
+                    self.logger.error("Failed to start control subscriber")
+                    return False
+            
             self.logger.info("Communication setup complete")
             return True
             
@@ -83,13 +167,28 @@ class MotionDetector:
         
         # Reset state
         self.stop_event.clear()
-        self.prev_frame = None
+        self.engines.clear()
+        self.buffer_pools.clear()
+        self.scaled_frames.clear()
         self.frame_counter = 0
+        self.source_frames = None
+        self.source_streams = None
+        self.source_last_ids = None
+        self.stream_ended_at = None
         self.total_detections = 0
         self.processing_times.clear()
+        self.engine_times.clear()
+        self.frames_skipped = 0
+        self.static_frames = 0
+        self.static_check_time = 0.0
+        self.blob_time = 0.0
+        self.blob_frames = 0
+        self.first_frame_time = 0.0
+        self.last_frame_time = 0.0
         
         # Start processing thread
-        self.process_thread = threading.Thread(target=self._detection_loop, daemon=True)
+        loop_target = self._run_async_loop if self.use_asyncio else self._detection_loop
+        self.process_thread = threading.Thread(target=loop_target, daemon=True)
         self.process_thread.start()
         
         self.is_processing = True
@@ -103,6 +202,8 @@ class MotionDetector:
         
         self.logger.info("Stopping detection...")
         self.stop_event.set()
+        if self.result_sender:
+            self.result_sender.interrupt()  # Don't let a lossless send wait out the join
         
         if self.process_thread and self.process_thread.is_alive():
             self.process_thread.join(timeout=2.0)
@@ -114,43 +215,18 @@ class MotionDetector:
     def _detection_loop(self):
         """Main detection loop (runs in separate thread)."""
         try:
-            while not self.stop_event.is_set():
-                # Receive frame from Streamer
-                message = self.frame_receiver.receive(timeout_ms=1000)
-                
-                if message is None:
-                    continue  # Timeout - try again
+            end_of_stream = False
+            while not end_of_stream and not self.stop_event.is_set():
+                # Receive every frame already queued by the Streamer
+                messages = self.frame_receiver.receive_batch(timeout_ms=self._receive_timeout())
+                frames, end_of_stream = self._split_batch(messages)
+                end_of_stream = end_of_stream or self._pool_stream_done(bool(messages))
                 
-                # Handle different message types
-                if isinstance(message, SystemMessage):
-                    if message.message_type == "end_of_stream":
-                        self.logger.info("Received end-of-stream signal")
-                        break
-                    continue
-                
-                if isinstance(message, FrameData):
-                    # Process the frame
-                    start_time = time.time()
-                    detection_result = self._process_frame(message)
-                    processing_time = (time.time() - start_time) * 1000  # Convert to ms
-                    
-                    if detection_result:
-                        # Send result to Display
-                        success = self.result_sender.send_detection_result(detection_result)
-                        if not success:
-                            self.logger.warning(f"Failed to send detection result for frame {message.frame_id}")
-                        
-                        # Track performance
-                        self.processing_times.append(processing_time)
-                        if len(detection_result.detections) > 0:
-                            self.total_detections += len(detection_result.detections)
-                    
-                    # Log progress periodically
-                    if self.frame_counter % 100 == 0:
-                        avg_time = np.mean(self.processing_times[-100:]) if self.processing_times else 0
-                        self.logger.info(f"Processed {self.frame_counter} frames, "
-                                       f"avg processing: {avg_time:.1f}ms, "
-                                       f"total detections: {self.total_detections}")
+                for message in frames:
+                    detection_result = self._detect(message)
+                    if detection_result and not self.result_sender.send_detection_result(detection_result):
+                        self.logger.debug(f"Dropped detection result for frame {message.frame_id}")  # Counted by the sender
+                    self._finish_frame(message)
         
         except Exception as e:
             self.logger.error(f"Detection loop error: {e}")
@@ -158,19 +234,205 @@ class MotionDetector:
         finally:
             # Forward end-of-stream signal to Display
             try:
-                end_message = SystemMessage(
-                    message_type="end_of_stream",
-                    payload={
-                        'total_frames_processed': self.frame_counter,
-                        'total_detections': self.total_detections
-                    },
-                    timestamp=time.time()
-                )
-                self.result_sender.send_system_message(end_message)
+                self.result_sender.send_system_message(self._end_of_stream_message())
+                self.logger.info("Forwarded end-of-stream signal to Display")
+            except Exception as e:
+                self.logger.error(f"Failed to forward end-of-stream: {e}")
+    
+    def _run_async_loop(self):
+        """Thread target in asyncio mode: run the async stage loop on its own event loop."""
+        asyncio.run(self._detection_loop_async())
+    
+    async def _detection_loop_async(self):
+        """Async detection loop: frames and control messages share one event loop."""
+        frame_receiver = AsyncZMQManager(self.frame_receiver)
+        result_sender = AsyncZMQManager(self.result_sender)
+        control_task = asyncio.create_task(watch_control_channel(self.stop_event, self.logger))
+        
+        try:
+            end_of_stream = False
+            while not end_of_stream and not self.stop_event.is_set():
+                messages = await frame_receiver.receive_batch(timeout_ms=self._receive_timeout())
+                frames, end_of_stream = self._split_batch(messages)
+                end_of_stream = end_of_stream or self._pool_stream_done(bool(messages))
+                
+                for message in frames:
+                    detection_result = self._detect(message)
+                    if detection_result and not await result_sender.send_detection_result(detection_result):
+                        self.logger.debug(f"Dropped detection result for frame {message.frame_id}")  # Counted by the sender
+                    self._finish_frame(message)
+        
+        except Exception as e:
+            self.logger.error(f"Detection loop error: {e}")
+        
+        finally:
+            control_task.cancel()
+            try:
+                await result_sender.send_system_message(self._end_of_stream_message())
                 self.logger.info("Forwarded end-of-stream signal to Display")
             except Exception as e:
                 self.logger.error(f"Failed to forward end-of-stream: {e}")
     
+    def _split_batch(self, messages: List) -> Tuple[List[FrameData], bool]:
+        """Pick the frames to process from a received batch; also reports end-of-stream."""
+        # Fell behind - jump to the newest frame
+        if self.skip_stale_frames and len(messages) > 1:
+            messages, skipped = self.frame_receiver.skip_stale(messages)
+            self.frames_skipped += skipped
+        
+        frames = []
+        for message in messages:
+            # Handle different message types
+            if isinstance(message, SystemMessage):
+                if message.message_type == "end_of_stream":
+                    self.logger.info("Received end-of-stream signal")
+                    self._note_end_of_stream(message)
+                    return frames, True
+                if message.message_type == "stream_ended":
+                    # One source of a multi-source Streamer finished - its frames are already in order before this
+                    self._drop_stream(message.payload.get('stream_id'))
+                elif message.message_type == StreamDescriptor.MESSAGE_TYPE:
+                    # Cached by the receiver (frames only carry the stream_id)
+                    descriptor = self.frame_receiver.stream_descriptor(message.payload['stream_id'])
+                    self.logger.info(f"Stream {descriptor.stream_id}: {descriptor.width}x{descriptor.height} "
+                                     f"@ {descriptor.fps:.2f} FPS ({descriptor.video_path})")
+                    width, height = self.analysis_size(descriptor.width, descriptor.height)
+                    self.buffer_pools[descriptor.stream_id] = FrameBufferPool(
+                        (height, width), preallocate=self.WORK_BUFFERS)
+                continue
+            
+            if isinstance(message, FrameData):
+                frames.append(message)
+        return frames, False
+    
+    def _note_end_of_stream(self, message: SystemMessage):
+        """Keep the Streamer's frame counts from its end-of-stream, for the one forwarded to Display."""
+        self.source_frames = message.payload.get('total_frames')
+        self.source_streams = message.payload.get('streams')
+        self.source_last_ids = message.payload.get('last_frame_ids')
+    
+    def _receive_timeout(self) -> int:
+        """Frame receive timeout (ms): short while a pool worker drains its queue after end-of-stream."""
+        return 100 if self.stream_ended_at is not None else 1000
+    
+    def _pool_stream_done(self, received: bool) -> bool:
+        """
+        Whether a pool worker has seen the end of the stream.
+        
+        The Streamer broadcasts its end-of-stream on the control channel,
+        because over PUSH only one worker would get it. The frames queued for
+        this worker before it are still delivered, so the worker ends once
+        none has arrived for POOL_DRAIN_TIMEOUT.
+        """
+        if self.control_subscriber is None:
+            return False
+        if self.stream_ended_at is None:
+            message = self.control_subscriber.receive(timeout_ms=0)
+            if isinstance(message, SystemMessage) and message.message_type == "end_of_stream":
+                self.logger.info("Received end-of-stream broadcast - draining queued frames")
+                self._note_end_of_stream(message)
+                self.stream_ended_at = time.monotonic()
+            return False
+        if received:
+            self.stream_ended_at = time.monotonic()
+            return False
+        return time.monotonic() - self.stream_ended_at >= self.POOL_DRAIN_TIMEOUT
+    
+    def _drop_stream(self, stream_id: str):
+        """Forget a finished stream: its engine, work buffers and downscaled frame buffer."""
+        self.engines.pop(stream_id, None)
+        self.buffer_pools.pop(stream_id, None)
+        self.scaled_frames.pop(stream_id, None)
+    
+    def _end_of_stream_message(self) -> SystemMessage:
+        """End-of-stream signal forwarded to Display (total_frames, streams, last_frame_ids: from the Streamer, if known)."""
+        return SystemMessage(
+            message_type="end_of_stream",
+            payload={
+                'total_frames': self.source_frames,
+                'streams': self.source_streams,
+                'last_frame_ids': self.source_last_ids,
+                'total_frames_processed': self.frame_counter,
+                'total_detections': self.total_detections
+            },
+            timestamp=time.time()
+        )
+    
+    def _detect(self, message: FrameData) -> Optional[DetectionResult]:
+        """Detect motion in a received frame and track processing time."""
+        # Process the frame
+        start_time = time.monotonic()
+        detection_result = self._process_frame(message)
+        self.last_frame_time = time.monotonic()
+        processing_time = (self.last_frame_time - start_time) * 1000  # Convert to ms
+        if self.first_frame_time == 0:
+            self.first_frame_time = start_time
+        if message.captured_here():
+            self.latency.record(self.last_frame_time - message.capture_time)
+        elif message.capture_time is not None:
+            if not self.latency_skipped:
+                self.logger.warning("Frames come from another host - capture latency not measured")
+            self.latency_skipped += 1
+        
+        if detection_result:
+            # Track performance
+            self.processing_times.append(processing_time)
+            if len(detection_result.detections) > 0:
+                self.total_detections += len(detection_result.detections)
+        return detection_result
+    
+    def analysis_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Size (width, height) at which frames of the given size are analysed."""
+        scale = self.analysis_width / width if self.analysis_width else self.analysis_scale
+        if scale >= 1.0:
+            return width, height
+        return max(1, round(width * scale)), max(1, round(height * scale))
+    
+    def _buffer_pool(self, frame_data: FrameData, shape: Tuple[int, int]) -> FrameBufferPool:
+        """Single-channel work buffers of a frame's stream (recreated if the analysis size changes)."""
+        pool = self.buffer_pools.get(frame_data.stream_id)
+        if pool is None or not pool.matches(shape):
+            pool = FrameBufferPool(shape, preallocate=self.WORK_BUFFERS)
+            self.buffer_pools[frame_data.stream_id] = pool
+        return pool
+    
+    def _stream_engine(self, stream_id: str) -> DetectionEngine:
+        """Detection engine of a stream (created on its first frame)."""
+        engine = self.engines.get(stream_id)
+        if engine is None:
+            engine = create_engine(self.engine, self.threshold)
+            self.engines[stream_id] = engine
+        return engine
+    
+    def _downscale(self, stream_id: str, frame: np.ndarray, width: int, height: int) -> np.ndarray:
+        """Frame resized to the analysis size, into the stream's reused colour buffer."""
+        shape = (height, width) + frame.shape[2:]
+        buffer = self.scaled_frames.get(stream_id)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=frame.dtype)
+            self.scaled_frames[stream_id] = buffer
+        # Linear, then grayscale: cheaper than INTER_AREA or converting the full frame first
+        return cv2.resize(frame, (width, height), dst=buffer, interpolation=cv2.INTER_LINEAR)
+    
+    def _gray_frame(self, stream_id: str, frame: np.ndarray, width: int, height: int,
+                    pool: FrameBufferPool) -> np.ndarray:
+        """Frame at the analysis size in grayscale (from basic_vmd.py), into a buffer from pool."""
+        if frame.shape[:2] != (height, width):
+            frame = self._downscale(stream_id, frame, width, height)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=pool.acquire())
+    
+    def _finish_frame(self, message: FrameData):
+        """Release the frame after its result was sent and log progress."""
+        # Done with the frame - release its shared-memory slot (if any)
+        self.frame_receiver.release_frame(message.frame)
+        
+        # Log progress periodically
+        if self.frame_counter % 100 == 0:
+            avg_time = np.mean(self.processing_times[-100:]) if self.processing_times else 0
+            self.logger.info(f"Processed {self.frame_counter} frames, "
+                           f"avg processing: {avg_time:.1f}ms, "
+                           f"total detections: {self.total_detections}")
+    
     def _process_frame(self, frame_data: FrameData) -> Optional[DetectionResult]:
         """
         Process a single frame for motion detection.
@@ -180,53 +442,55 @@ class MotionDetector:
             frame = frame_data.frame
             self.frame_counter += 1
             
-            # Convert to grayscale (from basic_vmd.py)
-            gray_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            # Analyse at reduced resolution if configured; scale_x/scale_y map back to the frame
+            height, width = frame.shape[:2]
+            analysis_width, analysis_height = self.analysis_size(width, height)
+            scale_x, scale_y = width / analysis_width, height / analysis_height
+            
+            # Convert to grayscale, into a reused buffer
+            pool = self._buffer_pool(frame_data, (analysis_height, analysis_width))
+            gray_frame = self._gray_frame(frame_data.stream_id, frame, analysis_width, analysis_height, pool)
+            
+            # 1-2. Foreground mask from the stream's engine (framediff: difference to the previous
+            # frame, thresholded - from basic_vmd.py); None while the engine warms up
+            engine = self._stream_engine(frame_data.stream_id)
+            engine_start = time.perf_counter()
+            if self.pool_worker:
+                # Other workers saw the frames in between: start over from the frame's predecessor
+                engine.reset()
+                if frame_data.prev_frame is not None:
+                    engine.apply(self._gray_frame(frame_data.stream_id, frame_data.prev_frame,
+                                                  analysis_width, analysis_height, pool), pool)
+            mask = engine.apply(gray_frame, pool)
+            del gray_frame  # Owned by the engine now, which may have released it
+            engine_time = (time.perf_counter() - engine_start) * 1000
+            self.engine_times.append(engine_time)
             
             detections = []
+            static = False
+            if mask is not None and self.static_check:
+                # Most frames of a fixed camera show no motion: look at the mask in blocks first
+                check_start = time.perf_counter()
+                static = _mask_is_static(mask, self.static_check)
+                self.static_check_time += (time.perf_counter() - check_start) * 1000
             
-            # First frame - just store as previous
-            if self.prev_frame is None:
-                self.prev_frame = gray_frame
-                self.logger.debug(f"First frame {frame_data.frame_id} - storing as previous")
+            if mask is None:
+                self.logger.debug(f"Frame {frame_data.frame_id} of stream {frame_data.stream_id} - "
+                                  f"{engine.name} engine warming up")
+            elif static:
+                # Nothing moved: no dilation or blob search
+                self.static_frames += 1
             else:
-                # Motion detection algorithm (from basic_vmd.py)
-                
-                # 1. Frame difference
-                diff = cv2.absdiff(gray_frame, self.prev_frame)
-                
-                # 2. Threshold (from basic_vmd.py: threshold=25)
-                thresh = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)[1]
-                
+                blob_start = time.perf_counter()
                 # 3. Dilate to fill gaps (from basic_vmd.py: iterations=2)
-                thresh = cv2.dilate(thresh, None, iterations=self.dilate_iterations)
-                
-                # 4. Find contours (from basic_vmd.py)
-                cnts = cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                cnts = imutils.grab_contours(cnts)
+                thresh = cv2.dilate(mask, None, dst=pool.acquire(), iterations=self.dilate_iterations)
                 
-                # 5. Convert contours to Detection objects
-                for contour in cnts:
-                    area = cv2.contourArea(contour)
-                    
-                    # Filter by minimum area
-                    if area >= self.min_area:
-                        # Get bounding box
-                        x, y, w, h = cv2.boundingRect(contour)
-                        
-                        # Calculate confidence based on area (larger = more confident)
-                        confidence = min(1.0, area / 10000.0)  # Normalize to 0-1 range
-                        
-                        detection = Detection(
-                            bbox=(x, y, w, h),
-                            confidence=confidence,
-                            detection_type="motion",
-                            area=int(area)
-                        )
-                        detections.append(detection)
-                
-                # Update previous frame (from basic_vmd.py)
-                self.prev_frame = gray_frame
+                # 4-5. Find blobs in the mask and convert them to Detection objects
+                detections = self._extract_blobs(thresh, scale_x, scale_y, width, height)
+                pool.release(thresh)
+                self.blob_time += (time.perf_counter() - blob_start) * 1000
+                self.blob_frames += 1
+            pool.release(mask)  # The engine keeps the frame it needs, not the mask
             
             # Create detection result
             processing_time = 0  # Will be calculated by caller
@@ -235,11 +499,17 @@ class MotionDetector:
                 detections=detections,
                 processing_time=processing_time,
                 metadata={
-                    'detection_method': 'frame_difference',
+                    'detection_method': engine.method,
+                    'engine': engine.spec(),
+                    'engine_time_ms': engine_time,
                     'threshold': self.threshold,
                     'min_area': self.min_area,
+                    'blob_extraction': self.blob_extraction,
+                    'analysis_size': (analysis_width, analysis_height),
+                    'static': static,
                     'contours_found': len(detections)
-                }
+                },
+                include_frame=not self.metadata_only
             )
             
             return result
@@ -248,6 +518,66 @@ class MotionDetector:
             self.logger.error(f"Failed to process frame {frame_data.frame_id}: {e}")
             return None
     
+    def _extract_blobs(self, mask: np.ndarray, scale_x: float, scale_y: float,
+                       width: int, height: int) -> List[Detection]:
+        """Detections (in frame coordinates) from a motion mask, with the configured blob extraction."""
+        if self.blob_extraction == "components":
+            return self._extract_components(mask, scale_x, scale_y, width, height)
+        return self._extract_contours(mask, scale_x, scale_y, width, height)
+    
+    def _extract_contours(self, mask: np.ndarray, scale_x: float, scale_y: float,
+                          width: int, height: int) -> List[Detection]:
+        """Detections from the external contours of a motion mask."""
+        # 4. Find contours (from basic_vmd.py; findContours no longer modifies its input)
+        cnts = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        cnts = imutils.grab_contours(cnts)
+        
+        # 5. Convert contours to Detection objects
+        detections = []
+        for contour in cnts:
+            # Area in full-resolution pixels, so min_area means the same at any analysis scale
+            area = cv2.contourArea(contour) * scale_x * scale_y
+            
+            # Filter by minimum area
+            if area >= self.min_area:
+                # Get bounding box (in frame coordinates)
+                x, y, w, h = _scale_bbox(cv2.boundingRect(contour), scale_x, scale_y, width, height)
+                
+                # Calculate confidence based on area (larger = more confident)
+                confidence = min(1.0, area / 10000.0)  # Normalize to 0-1 range
+                
+                detection = Detection(
+                    bbox=(x, y, w, h),
+                    confidence=confidence,
+                    detection_type="motion",
+                    area=int(area)
+                )
+                detections.append(detection)
+        return detections
+    
+    def _extract_components(self, mask: np.ndarray, scale_x: float, scale_y: float,
+                            width: int, height: int) -> List[Detection]:
+        """
+        Detections from the connected components of a motion mask.
+        
+        Areas, boxes and confidences are computed and filtered as NumPy arrays;
+        Detection objects are created only for blobs that pass min_area. The
+        area is the blob's pixel count, slightly more than contourArea of its
+        outline (which runs through the boundary pixels' centres).
+        """
+        # Grana's block-based labelling: ~3x faster than the default algorithm for 8-connectivity
+        _, _, stats, _ = cv2.connectedComponentsWithStatsWithAlgorithm(mask, 8, cv2.CV_32S, cv2.CCL_GRANA)
+        stats = stats[1:]  # Label 0 is the background
+        
+        areas = stats[:, cv2.CC_STAT_AREA] * (scale_x * scale_y)  # Full-resolution pixels
+        keep = areas >= self.min_area
+        areas = areas[keep]
+        boxes = _scale_boxes(stats[keep, :4], scale_x, scale_y, width, height)
+        confidences = np.minimum(1.0, areas / 10000.0)
+        
+        return [Detection(bbox=tuple(box), confidence=confidence, detection_type="motion", area=int(area))
+                for box, confidence, area in zip(boxes.tolist(), confidences.tolist(), areas.tolist())]
+    
     def _cleanup(self):
         """Cleanup resources."""
         if self.frame_receiver:
@@ -255,21 +585,108 @@ class MotionDetector:
             self.frame_receiver = None
         
         if self.result_sender:
+            self.send_stats = self.result_sender.get_send_stats()  # Keep drop counters for final stats
             self.result_sender.stop()
             self.result_sender = None
+        
+        if self.control_subscriber:
+            self.control_subscriber.stop()
+            self.control_subscriber = None
+    
+    def throughput_fps(self) -> float:
+        """Frames processed per second from the first frame's arrival to the last frame's result."""
+        span = self.last_frame_time - self.first_frame_time
+        return self.frame_counter / span if span > 0 else 0.0
+    
+    def static_check_stats(self) -> dict:
+        """
+        Frames skipped by the static check and the CPU time it saved.
+        
+        The saving is estimated: skipped frames times the average dilation
+        and blob search time of the frames that were not skipped, minus the
+        time spent checking all frames. It is None until a frame has gone
+        the full way.
+        """
+        avg_blob_time = self.blob_time / self.blob_frames if self.blob_frames else None
+        return {
+            'block': self.static_check,
+            'static_frames': self.static_frames,
+            'static_share': self.static_frames / max(1, self.frame_counter),
+            'check_time_ms': self.static_check_time,
+            'avg_blob_time_ms': avg_blob_time,
+            'cpu_saved_ms': (self.static_frames * avg_blob_time - self.static_check_time
+                             if avg_blob_time is not None else None)
+        }
     
     def get_stats(self) -> dict:
         """Get detection statistics."""
         avg_processing_time = np.mean(self.processing_times) if self.processing_times else 0
+        avg_engine_time = np.mean(self.engine_times) if self.engine_times else 0
         
         return {
             'frames_processed': self.frame_counter,
             'total_detections': self.total_detections,
             'avg_processing_time_ms': avg_processing_time,
+            'engine': self.engine_spec,
+            'avg_engine_time_ms': avg_engine_time,
             'detections_per_frame': self.total_detections / max(1, self.frame_counter),
+            'throughput_fps': self.throughput_fps(),
+            'frames_skipped': self.frames_skipped,
+            'latency': self.latency.to_dict(),
+            'latency_skipped': self.latency_skipped,
+            'active_streams': len(self.engines),
+            'analysis_scale': self.analysis_scale,
+            'analysis_width': self.analysis_width,
+            'pool_worker': self.pool_worker,
+            'static_check': self.static_check_stats(),
+            'buffer_pool': merge_pool_stats(list(self.buffer_pools.values())),
+            'send': self.result_sender.get_send_stats() if self.result_sender else self.send_stats,
             'is_processing': self.is_processing
         }
     
     def __del__(self):
         """Destructor - ensure cleanup."""
-        self.stop_detection() 
\ No newline at end of file
+        self.stop_detection() 
+
+
+def _mask_is_static(mask: np.ndarray, block: int) -> bool:
+    """
+    Whether no block x block tile of a 0/255 mask has block or more foreground pixels.
+    
+    Runs on the engine's thresholded mask, so it saves dilation and blob
+    search only. Tile sums come from the mask's integral image, so every
+    changed pixel counts in its tile wherever it is - a small blob can't
+    hide between sample points. Tiles at the right and bottom edges are
+    cut short when a side is not a multiple of block.
+    """
+    if cv2.countNonZero(mask) < block:  # Too few for any tile (the usual case for a still camera)
+        return True
+    if block == 1:
+        return False
+    height, width = mask.shape[:2]
+    # float64 sums are exact at any mask size; int32 would overflow beyond 4K
+    integral = cv2.integral(mask, sdepth=cv2.CV_64F)
+    rows = np.append(np.arange(0, height, block), height)
+    cols = np.append(np.arange(0, width, block), width)
+    corners = integral[np.ix_(rows, cols)]
+    tiles = corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+    return tiles.max() < 255 * block
+
+
+def _scale_bbox(bbox: Tuple[int, int, int, int], scale_x: float, scale_y: float,
+                width: int, height: int) -> Tuple[int, int, int, int]:
+    """Bounding box from analysis to frame coordinates, rounded outwards and clipped to the frame."""
+    x, y, w, h = bbox
+    left, top = int(x * scale_x), int(y * scale_y)
+    right = min(width, math.ceil((x + w) * scale_x))
+    bottom = min(height, math.ceil((y + h) * scale_y))
+    return left, top, right - left, bottom - top
+
+
+def _scale_boxes(boxes: np.ndarray, scale_x: float, scale_y: float, width: int, height: int) -> np.ndarray:
+    """_scale_bbox for an (N, 4) array of boxes."""
+    left = (boxes[:, 0] * scale_x).astype(np.int64)
+    top = (boxes[:, 1] * scale_y).astype(np.int64)
+    right = np.minimum(width, np.ceil((boxes[:, 0] + boxes[:, 2]) * scale_x)).astype(np.int64)
+    bottom = np.minimum(height, np.ceil((boxes[:, 1] + boxes[:, 3]) * scale_y)).astype(np.int64)
+    return np.stack([left, top, right - left, bottom - top], axis=1)
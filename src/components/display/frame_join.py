@@ -0,0 +1,115 @@
+"""
+Frame Join Buffer - Joins metadata-only detection results with frames.
+
+In metadata-only mode the Detector sends results without pixels and the
+Display receives frames directly from the Streamer. This buffer matches the
+two streams by (stream_id, frame_id), bounded in size, and evicts entries whose partner
+never arrives (e.g. a dropped frame or result).
+"""
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from core.data_models import FrameData, DetectionResult
+
+
+class FrameJoinBuffer:
+    """Bounded join buffer keyed by (stream_id, frame_id) with timeout-based eviction."""
+
+    def __init__(self, max_size: int = 64, timeout: float = 1.0):
+        """
+        Initialize join buffer.
+
+        Args:
+            max_size: Maximum pending frames (and pending results) kept at once
+            timeout: Seconds to wait for the matching frame/result before eviction
+        """
+        self.max_size = max_size
+        self.timeout = timeout
+
+        # (stream_id, frame_id) -> (item, arrival time), oldest first
+        self.pending_frames: "OrderedDict[Tuple[str, int], Tuple[FrameData, float]]" = OrderedDict()
+        self.pending_results: "OrderedDict[Tuple[str, int], Tuple[DetectionResult, float]]" = OrderedDict()
+
+        # Statistics
+        self.frames_joined = 0
+        self.frames_evicted = 0
+        self.results_evicted = 0
+
+    def add_frame(self, frame_data: FrameData) -> Tuple[Optional[DetectionResult], List[FrameData]]:
+        """
+        Add a frame from the Streamer.
+
+        Returns:
+            (joined result if its detection result was already waiting,
+             frames evicted to stay within max_size)
+        """
+        key = (frame_data.stream_id, frame_data.frame_id)
+        pending = self.pending_results.pop(key, None)
+        if pending is not None:
+            return self._join(pending[0], frame_data), []
+
+        self.pending_frames[key] = (frame_data, time.monotonic())
+        evicted = []
+        while len(self.pending_frames) > self.max_size:
+            evicted.append(self.pending_frames.popitem(last=False)[1][0])
+            self.frames_evicted += 1
+        return None, evicted
+
+    def add_result(self, result: DetectionResult) -> Optional[DetectionResult]:
+        """Add a metadata-only result; returns the joined result if its frame is buffered."""
+        key = (result.stream_id, result.frame_id)
+        pending = self.pending_frames.pop(key, None)
+        if pending is not None:
+            return self._join(result, pending[0])
+
+        self.pending_results[key] = (result, time.monotonic())
+        while len(self.pending_results) > self.max_size:
+            self.pending_results.popitem(last=False)
+            self.results_evicted += 1
+        return None
+
+    def evict_expired(self) -> List[FrameData]:
+        """Drop entries older than timeout; returns evicted frames so callers can release them."""
+        deadline = time.monotonic() - self.timeout
+        evicted = []
+
+        while self.pending_frames:
+            key, (frame_data, arrived) = next(iter(self.pending_frames.items()))
+            if arrived > deadline:
+                break
+            del self.pending_frames[key]
+            evicted.append(frame_data)
+            self.frames_evicted += 1
+
+        while self.pending_results:
+            key, (_, arrived) = next(iter(self.pending_results.items()))
+            if arrived > deadline:
+                break
+            del self.pending_results[key]
+            self.results_evicted += 1
+
+        return evicted
+
+    def clear(self) -> List[FrameData]:
+        """Drop everything; returns the pending frames."""
+        frames = [frame_data for frame_data, _ in self.pending_frames.values()]
+        self.pending_frames.clear()
+        self.pending_results.clear()
+        return frames
+
+    def _join(self, result: DetectionResult, frame_data: FrameData) -> DetectionResult:
+        """Attach the frame to its detection result."""
+        result.frame = frame_data.frame
+        self.frames_joined += 1
+        return result
+
+    def get_stats(self) -> dict:
+        """Get join buffer statistics."""
+        return {
+            'frames_joined': self.frames_joined,
+            'frames_evicted': self.frames_evicted,
+            'results_evicted': self.results_evicted,
+            'pending_frames': len(self.pending_frames),
+            'pending_results': len(self.pending_results)
+        }
@@ -0,0 +1,141 @@
+"""
+Frame Reorder Buffer - Restores frame order behind a detector pool.
+
+With several Detector workers, results reach the Display in the order the
+workers finish them, not in frame order. This buffer holds results that
+arrive early and releases each stream's results in frame_id order.
+
+frame_ids are not consecutive: the Streamer skips ids to catch up and
+doesn't resend a frame whose send failed. So each result carries the
+frame_id the Streamer sent before it (prev_frame_id), and a result is
+released as soon as that one has been. Results without it (older
+Streamers) must follow their predecessor's frame_id by one.
+
+It is a bounded jitter buffer: a missing result (lost with a stalled or
+dropping worker) is given up once a later result has waited gap_timeout
+seconds or the buffer is full, and the results after the gap are released.
+A result arriving after its place was given up is dropped - showing it
+would break the order.
+"""
+import time
+from typing import Dict, List, Tuple
+
+from core.data_models import DetectionResult
+
+
+class FrameReorderBuffer:
+    """Per-stream reorder buffer releasing results in frame_id order, bounded in size and wait."""
+
+    def __init__(self, max_size: int = 32, gap_timeout: float = 0.5):
+        """
+        Initialize reorder buffer.
+
+        Args:
+            max_size: Maximum results held per stream while an earlier one is missing
+            gap_timeout: Seconds a held result waits for the missing ones before them
+        """
+        self.max_size = max_size
+        self.gap_timeout = gap_timeout
+
+        # stream_id -> frame_id of the last result released (-1 before the first)
+        self.last_ids: Dict[str, int] = {}
+        # stream_id -> frame_id -> (result, arrival time)
+        self.pending: Dict[str, Dict[int, Tuple[DetectionResult, float]]] = {}
+
+        # Statistics
+        self.results_released = 0
+        self.results_held = 0      # Arrived before an earlier frame's result
+        self.frames_missing = 0    # Results given up (gap timeout or full buffer; at least one per gap)
+        self.results_late = 0      # Arrived after their frame_id was given up (dropped)
+        self.max_pending = 0
+
+    def add(self, result: DetectionResult) -> Tuple[List[DetectionResult], List[DetectionResult]]:
+        """
+        Add a result from a Detector worker.
+
+        Returns:
+            (results now released in frame order,
+             late results dropped, so callers can release their frames)
+        """
+        stream_id = result.stream_id
+        last_id = self.last_ids.setdefault(stream_id, -1)
+        if result.frame_id <= last_id:
+            self.results_late += 1
+            return [], [result]
+
+        pending = self.pending.setdefault(stream_id, {})
+        pending[result.frame_id] = (result, time.monotonic())
+        if not self._follows(result, last_id):
+            self.results_held += 1
+
+        released = self._release(stream_id)
+        while len(pending) > self.max_size:
+            released.extend(self._skip_gap(stream_id))
+        self.max_pending = max(self.max_pending, len(pending))
+        return released, []
+
+    def release_expired(self) -> List[DetectionResult]:
+        """Give up gaps that results have waited on for gap_timeout; returns the results released."""
+        deadline = time.monotonic() - self.gap_timeout
+        released = []
+        for stream_id, pending in self.pending.items():
+            while pending and min(arrived for _, arrived in pending.values()) <= deadline:
+                released.extend(self._skip_gap(stream_id))
+        return released
+
+    def flush(self) -> List[DetectionResult]:
+        """Release everything held, in order, giving up all gaps (end of stream)."""
+        released = []
+        for stream_id, pending in self.pending.items():
+            while pending:
+                released.extend(self._skip_gap(stream_id))
+        return released
+
+    def last_frame_id(self, stream_id: str) -> int:
+        """frame_id of the last result released for a stream (-1 before the first)."""
+        return self.last_ids.get(stream_id, -1)
+
+    def pending_count(self) -> int:
+        """Results held across all streams."""
+        return sum(len(pending) for pending in self.pending.values())
+
+    @staticmethod
+    def _follows(result: DetectionResult, last_id: int) -> bool:
+        """Whether result comes right after the stream's last released one."""
+        if result.prev_frame_id is not None:
+            return result.prev_frame_id == last_id
+        return result.frame_id == last_id + 1
+
+    def _release(self, stream_id: str) -> List[DetectionResult]:
+        """Pop the stream's held results that continue its sequence without a gap."""
+        pending = self.pending[stream_id]
+        released = []
+        while pending:
+            first = min(pending)
+            result = pending[first][0]
+            if not self._follows(result, self.last_ids[stream_id]):
+                break
+            released.append(pending.pop(first)[0])
+            self.last_ids[stream_id] = first
+        self.results_released += len(released)
+        return released
+
+    def _skip_gap(self, stream_id: str) -> List[DetectionResult]:
+        """Give up the missing results before the stream's earliest held one and release from there."""
+        first = min(self.pending[stream_id])
+        result = self.pending[stream_id][first][0]
+        last_id = self.last_ids[stream_id]
+        self.frames_missing += 1 if result.prev_frame_id is not None else first - last_id - 1
+        self.last_ids[stream_id] = result.prev_frame_id if result.prev_frame_id is not None else first - 1
+        return self._release(stream_id)
+
+    def get_stats(self) -> dict:
+        """Get reorder buffer statistics."""
+        return {
+            'results_released': self.results_released,
+            'results_held': self.results_held,
+            'frames_missing': self.frames_missing,
+            'results_late': self.results_late,
+            'pending': self.pending_count(),
+            'max_pending': self.max_pending
+        }
@@ -2,23 +2,34 @@
 Video Display Component - Displays video with motion detection overlays.
 Final component in the pipeline: receives DetectionResult from Detector and displays with cv2.imshow.
 """
+import asyncio
 import cv2
 import numpy as np
 import time
 import threading
-from typing import Optional, Tuple
+import zmq
+import zmq.asyncio
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from core.data_models import DetectionResult, SystemMessage, LogMessage
-from communication.zmq_manager import ZMQManager, PipelineComm
+from core.data_models import FrameData, DetectionResult, SystemMessage, LogMessage, DEFAULT_STREAM_ID
+from core.buffer_pool import FrameBufferPool, merge_pool_stats
+from communication.zmq_manager import ZMQManager, PipelineComm, SendTracker
+from communication.async_zmq_manager import AsyncZMQManager, watch_control_channel
+from communication.metrics import LatencyHistogram
 from utils.centralized_logger import PipelineLogger
+from .frame_join import FrameJoinBuffer
+from .frame_reorder import FrameReorderBuffer
 
 
 class VideoDisplay:
     """Displays video frames with motion detection overlays and timestamp."""
     
     def __init__(self, window_name: str = "Motion Detection Pipeline", 
-                 show_fps: bool = True, blur_detections: bool = False, show_window: bool = True):
+                 show_fps: bool = True, blur_detections: bool = False, show_window: bool = True,
+                 join_frames: bool = False, join_buffer_size: int = 64, join_timeout: float = 1.0,
+                 skip_stale_frames: bool = False, use_asyncio: bool = False,
+                 reorder_results: bool = False, reorder_buffer_size: int = 32, reorder_timeout: float = 0.5):
         """
         Initialize video display.
         
@@ -26,11 +37,25 @@ class VideoDisplay:
             window_name: OpenCV window name
             show_fps: Whether to show FPS counter
             blur_detections: Whether to blur detected areas (Phase B feature)
+            join_frames: Receive frames directly from the Streamer and join them with
+                         metadata-only detection results by frame_id
+            join_buffer_size: Maximum frames/results waiting for their partner
+            join_timeout: Seconds before an unmatched frame/result is evicted
+            skip_stale_frames: When results queue up, display only the newest one
+            use_asyncio: Run the display loop on an asyncio event loop that also
+                         services the control channel (shutdown messages)
+            reorder_results: Results come from a detector pool: put them back in
+                             frame_id order before display
+            reorder_buffer_size: Maximum results held while an earlier one is missing
+            reorder_timeout: Seconds a held result waits for a missing earlier one
         """
         self.window_name = window_name
         self.show_fps = show_fps
         self.blur_detections = blur_detections
         self.show_window = show_window
+        self.join_frames = join_frames
+        self.skip_stale_frames = skip_stale_frames
+        self.use_asyncio = use_asyncio
         
         # Debug print
         print(f"[VideoDisplay] Initialized with blur_detections={blur_detections}")
@@ -39,6 +64,16 @@ class VideoDisplay:
         self.result_receiver: Optional[ZMQManager] = None
         self.web_sender: Optional[ZMQManager] = None  # Send to web streamer
         
+        # Frame fan-out from Streamer (metadata-only detection mode)
+        self.frame_receiver: Optional[ZMQManager] = None
+        self.join_buffer = FrameJoinBuffer(max_size=join_buffer_size, timeout=join_timeout)
+        self.join_poller: Optional[zmq.Poller] = None
+        
+        # Result reordering behind a detector pool
+        self.reorder_buffer = FrameReorderBuffer(reorder_buffer_size, reorder_timeout) if reorder_results else None
+        self.pending_end: Optional[SystemMessage] = None  # End-of-stream held until the results before it are out
+        self.end_deadline = 0.0
+        
         # Threading
         self.display_thread: Optional[threading.Thread] = None
         self.stop_event = threading.Event()
@@ -48,11 +83,17 @@ class VideoDisplay:
         self.current_frame_id = 0
         self.total_frames_displayed = 0
         self.total_detections_drawn = 0
+        self.frames_skipped = 0
+        self.send_stats: Optional[dict] = None
         self.start_time = 0.0
+        self.buffer_pools: Dict[str, FrameBufferPool] = {}  # Overlay frames per stream, reused once shown and forwarded
         
-        # FPS calculation
+        # FPS calculation (monotonic clock)
         self.fps_history = []
         self.last_frame_time = 0.0
+        self.first_frame_time = 0.0  # For overall throughput
+        self.latency = LatencyHistogram()  # Capture to rendered overlay (end to end)
+        self.latency_skipped = 0  # Results of frames captured on another host
         
         # Drawing parameters
         self.detection_color = (0, 255, 0)  # Green for motion boxes
@@ -73,6 +114,17 @@ class VideoDisplay:
                 self.logger.error("Failed to start result receiver")
                 return False
             
+            # Frames come straight from the Streamer when results are metadata-only
+            if self.join_frames:
+                self.frame_receiver = PipelineComm.create_display_frame_receiver()
+                if not self.frame_receiver.start():
+                    self.logger.error("Failed to start frame receiver")
+                    return False
+                
+                self.join_poller = zmq.Poller()
+                self.join_poller.register(self.result_receiver.socket, zmq.POLLIN)
+                self.join_poller.register(self.frame_receiver.socket, zmq.POLLIN)
+            
             # Setup web sender for forwarding processed frames
             self.web_sender = PipelineComm.create_display_sender()
             if not self.web_sender.start():
@@ -106,15 +158,21 @@ class VideoDisplay:
         
         # Reset state
         self.stop_event.clear()
+        self.pending_end = None
         self.current_frame_id = 0
         self.total_frames_displayed = 0
         self.total_detections_drawn = 0
-        self.start_time = time.time()
+        self.frames_skipped = 0
+        self.start_time = time.monotonic()
         self.fps_history.clear()
-        self.last_frame_time = time.time()
+        self.last_frame_time = time.monotonic()
+        self.first_frame_time = 0.0
+        self.latency = LatencyHistogram()
+        self.latency_skipped = 0
         
         # Start display thread
-        self.display_thread = threading.Thread(target=self._display_loop, daemon=True)
+        loop_target = self._run_async_loop if self.use_asyncio else self._display_loop
+        self.display_thread = threading.Thread(target=loop_target, daemon=True)
         self.display_thread.start()
         
         self.is_displaying = True
@@ -143,59 +201,269 @@ class VideoDisplay:
     def _display_loop(self):
         """Main display loop (runs in separate thread)."""
         try:
-            while not self.stop_event.is_set():
-                # Receive detection result from Detector
-                message = self.result_receiver.receive(timeout_ms=1000)
-                
-                if message is None:
-                    continue  # Timeout - try again
-                
-                # Handle different message types
-                if isinstance(message, SystemMessage):
-                    if message.message_type == "end_of_stream":
-                        self.logger.info("Received end-of-stream signal - ending display")
-                        # Forward end-of-stream to web streamer
-                        if self.web_sender:
-                            self.web_sender.send_system_message(message)
-                            self.logger.info("Forwarded end-of-stream to web streamer")
-                        break
-                    continue
-                
-                if isinstance(message, DetectionResult):
-                    # Process and optionally display the frame with detections
-                    processed_frame = self._process_frame(message)
-                    
-                    # Update the message with processed frame before forwarding
-                    if processed_frame is not None:
-                        message.frame = processed_frame
-                    
-                    # Forward to web streamer
-                    self._forward_to_web(message)
+            stop = False
+            while not stop and not self.stop_event.is_set():
+                # Receive detection results from Detector
+                for message in self._receive_messages(timeout_ms=1000):
+                    # Handle different message types
+                    if isinstance(message, SystemMessage):
+                        if message.message_type == "end_of_stream":
+                            self.logger.info("Received end-of-stream signal - ending display")
+                            # Forward end-of-stream to web streamer
+                            if self.web_sender:
+                                self.web_sender.send_system_message(message)
+                                self.logger.info("Forwarded end-of-stream to web streamer")
+                            stop = True
+                            break
+                        continue
                     
-                    # Display locally if window is enabled
-                    if self.show_window:
-                        cv2.imshow(self.window_name, processed_frame)
-                        
-                        # Check for user input (ESC to quit)
-                        key = cv2.waitKey(1) & 0xFF
-                        if key == 27:  # ESC key
-                            self.logger.info("User pressed ESC - stopping display")
+                    if isinstance(message, DetectionResult) and not self._show_result(message):
+                        stop = True
+                        break
+        
+        except Exception as e:
+            self.logger.error(f"Display loop error: {e}")
+        
+        finally:
+            self._display_summary()
+    
+    def _run_async_loop(self):
+        """Thread target in asyncio mode: run the async display loop on its own event loop."""
+        asyncio.run(self._display_loop_async())
+    
+    async def _display_loop_async(self):
+        """Async display loop: results, joined frames and control messages share one event loop."""
+        result_receiver = AsyncZMQManager(self.result_receiver)
+        web_sender = AsyncZMQManager(self.web_sender)
+        frame_receiver = AsyncZMQManager(self.frame_receiver) if self.join_frames else None
+        join_poller = None
+        if frame_receiver:
+            join_poller = zmq.asyncio.Poller()
+            join_poller.register(result_receiver.socket, zmq.POLLIN)
+            join_poller.register(frame_receiver.socket, zmq.POLLIN)
+        control_task = asyncio.create_task(watch_control_channel(self.stop_event, self.logger))
+        
+        try:
+            stop = False
+            while not stop and not self.stop_event.is_set():
+                for message in await self._receive_messages_async(result_receiver, frame_receiver, join_poller, 1000):
+                    if isinstance(message, SystemMessage):
+                        if message.message_type == "end_of_stream":
+                            self.logger.info("Received end-of-stream signal - ending display")
+                            await web_sender.send_system_message(message)
+                            self.logger.info("Forwarded end-of-stream to web streamer")
+                            stop = True
                             break
-                        elif key == ord('p'):  # Pause toggle
-                            self.logger.info("Display paused - press any key to continue")
-                            cv2.waitKey(0)
-                        self.logger.info("Display resumed")
+                        continue
+                    
+                    if isinstance(message, DetectionResult) and not await self._show_result_async(message, web_sender):
+                        stop = True
+                        break
         
         except Exception as e:
             self.logger.error(f"Display loop error: {e}")
         
         finally:
+            control_task.cancel()
             self._display_summary()
     
+    async def _receive_messages_async(self, result_receiver: AsyncZMQManager, frame_receiver: Optional[AsyncZMQManager],
+                                      join_poller: Optional[zmq.asyncio.Poller], timeout_ms: int) -> list:
+        """Async _receive_messages: awaits results (and Streamer frames in join mode)."""
+        if not self.join_frames:
+            messages = await result_receiver.receive_batch(timeout_ms=self._poll_timeout(timeout_ms))
+            return self._skip_stale(self._reorder(messages))
+        
+        self._evict_expired_frames()
+        ready = dict(await join_poller.poll(self._poll_timeout(timeout_ms)))
+        message = self._take_joined(frame_receiver.socket in ready, result_receiver.socket in ready)
+        return self._reorder([] if message is None else [message])
+    
+    def _show_result(self, message: DetectionResult) -> bool:
+        """Draw, forward and display one result; returns False if the user asked to stop."""
+        processed_frame = self._render(message)
+        
+        # Forward to web streamer
+        sends = self._forward_to_web(message)
+        
+        shown = self._present(processed_frame)
+        self._release_overlay(message, sends)
+        return shown
+    
+    async def _show_result_async(self, message: DetectionResult, web_sender: AsyncZMQManager) -> bool:
+        """_show_result with the forward to the web streamer awaited."""
+        processed_frame = self._render(message)
+        send = SendTracker()
+        if not await web_sender.send_detection_result(message, timeout_ms=100, send=send):
+            self.logger.debug("Web forward timeout")
+        shown = self._present(processed_frame)
+        self._release_overlay(message, [send])
+        return shown
+    
+    def _release_overlay(self, message: DetectionResult, sends: List[SendTracker]):
+        """Give a shown result's overlay buffer back to its pool once the sends referencing it are done."""
+        pool = self.buffer_pools.get(message.stream_id)
+        if pool is not None:
+            pool.release(message.frame, sends)  # A result without overlay (drawing failed) isn't pooled
+        message.frame = None  # Shown and forwarded
+    
+    def _render(self, message: DetectionResult):
+        """Draw overlays on a result's frame; the message then carries the processed frame."""
+        # Process and optionally display the frame with detections
+        source_frame = message.frame
+        processed_frame = self._process_frame(message)
+        
+        # Overlays are drawn on a copy - release the shared-memory slot (if any)
+        self.result_receiver.release_frame(source_frame)
+        
+        # Update the message with processed frame before forwarding
+        if processed_frame is not None:
+            message.frame = processed_frame
+        
+        age = message.age()
+        if age is not None:
+            self.latency.record(age)
+        elif message.capture_time is not None:
+            if not self.latency_skipped:
+                self.logger.warning("Frames come from another host - capture latency not measured")
+            self.latency_skipped += 1
+        return processed_frame
+    
+    def _present(self, processed_frame) -> bool:
+        """Show a processed frame in the window (if enabled); returns False if the user asked to stop."""
+        # Display locally if window is enabled
+        if self.show_window:
+            cv2.imshow(self.window_name, processed_frame)
+            
+            # Check for user input (ESC to quit)
+            key = cv2.waitKey(1) & 0xFF
+            if key == 27:  # ESC key
+                self.logger.info("User pressed ESC - stopping display")
+                return False
+            elif key == ord('p'):  # Pause toggle
+                self.logger.info("Display paused - press any key to continue")
+                cv2.waitKey(0)
+            self.logger.info("Display resumed")
+        return True
+    
+    def _receive_messages(self, timeout_ms: int) -> list:
+        """Receive all queued messages, keeping only the newest result when skipping stale frames."""
+        if self.join_frames:
+            message = self._receive_next(timeout_ms)
+            return self._reorder([] if message is None else [message])
+        
+        messages = self.result_receiver.receive_batch(timeout_ms=self._poll_timeout(timeout_ms))
+        return self._skip_stale(self._reorder(messages))
+    
+    def _skip_stale(self, messages: list) -> list:
+        """Keep only the newest result of a batch when skipping stale frames."""
+        if self.skip_stale_frames and len(messages) > 1:
+            messages, skipped = self.result_receiver.skip_stale(messages)
+            self.frames_skipped += skipped
+        return messages
+    
+    def _receive_next(self, timeout_ms: int):
+        """Receive the next message; in join mode, pair metadata-only results with Streamer frames."""
+        if not self.join_frames:
+            return self.result_receiver.receive(timeout_ms=timeout_ms)
+        
+        self._evict_expired_frames()
+        ready = dict(self.join_poller.poll(self._poll_timeout(timeout_ms)))
+        return self._take_joined(self.frame_receiver.socket in ready, self.result_receiver.socket in ready)
+    
+    def _evict_expired_frames(self):
+        """Release frames whose detection result never arrived."""
+        for frame_data in self.join_buffer.evict_expired():
+            self.frame_receiver.release_frame(frame_data.frame)
+    
+    def _poll_timeout(self, timeout_ms: int) -> int:
+        """Poll no longer than the join and reorder timeouts, so expired entries are handled in time."""
+        if self.join_frames:
+            timeout_ms = min(timeout_ms, int(self.join_buffer.timeout * 1000))
+        if self.reorder_buffer is not None:
+            timeout_ms = min(timeout_ms, int(self.reorder_buffer.gap_timeout * 1000))
+        return timeout_ms
+    
+    def _reorder(self, messages: list) -> list:
+        """
+        Put results from a detector pool back in frame order (no-op without a pool).
+        
+        Every worker forwards an end-of-stream signal, possibly before other
+        workers' last results. The first one is held until all frames the
+        Streamer sent are out (or nothing arrived for the gap timeout), and
+        then passed on after the remaining results.
+        """
+        if self.reorder_buffer is None:
+            return messages
+        
+        ordered = []
+        for message in messages:
+            if isinstance(message, DetectionResult):
+                released, late = self.reorder_buffer.add(message)
+                ordered.extend(released)
+                receiver = self.frame_receiver if self.join_frames else self.result_receiver
+                for result in late:
+                    receiver.release_frame(result.frame)
+                self.end_deadline = time.monotonic() + self.reorder_buffer.gap_timeout
+            elif isinstance(message, SystemMessage) and message.message_type == "end_of_stream":
+                if self.pending_end is None:
+                    self.pending_end = message
+                    self.end_deadline = time.monotonic() + self.reorder_buffer.gap_timeout
+            else:
+                ordered.append(message)
+        ordered.extend(self.reorder_buffer.release_expired())
+        
+        if self.pending_end is not None:
+            if self._all_results_released(self.pending_end.payload) or time.monotonic() >= self.end_deadline:
+                ordered.extend(self.reorder_buffer.flush())
+                ordered.append(self.pending_end)
+        return ordered
+    
+    def _all_results_released(self, end_payload: dict) -> bool:
+        """
+        Whether the reorder buffer has released every frame the Streamer sent.
+        
+        The Streamer reports the last frame_id it sent per stream
+        ('last_frame_ids'). Older ones report frames per stream ('streams'),
+        or only a total, which is the default stream's.
+        """
+        last_ids = end_payload.get('last_frame_ids')
+        if last_ids is not None:
+            return all(self.reorder_buffer.last_frame_id(stream_id) >= last_id
+                       for stream_id, last_id in last_ids.items())
+        streams = end_payload.get('streams')
+        if streams is None:
+            total_frames = end_payload.get('total_frames')
+            if total_frames is None:
+                return False
+            streams = {DEFAULT_STREAM_ID: total_frames}
+        return all(self.reorder_buffer.last_frame_id(stream_id) >= frames - 1 for stream_id, frames in streams.items())
+    
+    def _take_joined(self, frame_ready: bool, result_ready: bool):
+        """Read the ready sockets and return a joined result (or control message), if any."""
+        if frame_ready:
+            frame_data = self.frame_receiver.receive(timeout_ms=0)
+            if isinstance(frame_data, FrameData):
+                joined, evicted = self.join_buffer.add_frame(frame_data)
+                for evicted_frame in evicted:
+                    self.frame_receiver.release_frame(evicted_frame.frame)
+                if joined is not None:
+                    return joined
+        
+        if result_ready:
+            message = self.result_receiver.receive(timeout_ms=0)
+            if isinstance(message, DetectionResult) and message.frame is None:
+                return self.join_buffer.add_result(message)
+            return message
+        
+        return None
+    
     def _process_frame(self, result: DetectionResult):
         """Process a frame with detection overlays and return the processed frame."""
         try:
-            frame = result.frame.copy()  # Work on copy to avoid modifying original
+            # Work on a copy to avoid modifying the original (a received or shared buffer)
+            frame = self._buffer_pool(result).acquire()
+            np.copyto(frame, result.frame)
             self.current_frame_id = result.frame_id
             
             # Add timestamp (assignment requirement)
@@ -242,11 +510,21 @@ class VideoDisplay:
             self.logger.error(f"Frame processing failed: {e}")
             return None
     
-    def _forward_to_web(self, result: DetectionResult):
-        """Forward processed frame to web streamer."""
+    def _buffer_pool(self, result: DetectionResult) -> FrameBufferPool:
+        """Overlay buffers of a result's stream (recreated if the frame size changes)."""
+        pool = self.buffer_pools.get(result.stream_id)
+        if pool is None or not pool.matches(result.frame.shape):
+            pool = FrameBufferPool(result.frame.shape, dtype=result.frame.dtype)
+            self.buffer_pools[result.stream_id] = pool
+        return pool
+    
+    def _forward_to_web(self, result: DetectionResult) -> List[SendTracker]:
+        """Forward processed frame to web streamer; returns the sends still referencing the frame."""
+        sends = []
         try:
             if self.web_sender:
-                success = self.web_sender.send_detection_result(result, timeout_ms=100)
+                sends.append(SendTracker())
+                success = self.web_sender.send_detection_result(result, timeout_ms=100, send=sends[0])
                 if not success:
                     self.logger.debug("Web forward timeout")
         except Exception as e:
@@ -265,6 +543,7 @@ class VideoDisplay:
         except Exception as e:
             self.logger.error(f"Failed to display frame {result.frame_id}: {e}", 
                             frame_id=result.frame_id)
+        return sends
     
     def _add_timestamp(self, frame: np.ndarray):
         """Add current timestamp to top-left corner (assignment requirement)."""
@@ -316,7 +595,7 @@ class VideoDisplay:
             y_end = min(frame.shape[0], y + h)
             
             # Extract region
-            region = frame[y:y_end, x:x_end].copy()
+            region = frame[y:y_end, x:x_end]  # View; resize reads it before the region is overwritten
             
             if region.size > 0:  # Check if region is valid
                 # Apply pixelation effect for very obvious blur
@@ -392,7 +671,9 @@ class VideoDisplay:
     
     def _update_fps(self):
         """Update FPS calculation."""
-        current_time = time.time()
+        current_time = time.monotonic()
+        if self.first_frame_time == 0:
+            self.first_frame_time = current_time
         if self.last_frame_time > 0:
             frame_time = current_time - self.last_frame_time
             fps = 1.0 / frame_time if frame_time > 0 else 0
@@ -406,7 +687,7 @@ class VideoDisplay:
     
     def _display_summary(self):
         """Display session summary."""
-        elapsed_time = time.time() - self.start_time
+        elapsed_time = time.monotonic() - self.start_time
         avg_fps = np.mean(self.fps_history) if self.fps_history else 0
         
         self.logger.info(f"Display session summary:")
@@ -428,16 +709,28 @@ class VideoDisplay:
             self.result_receiver = None
         
         if self.web_sender:
+            self.send_stats = self.web_sender.get_send_stats()  # Keep drop counters for final stats
             self.web_sender.stop()
             self.web_sender = None
         
+        if self.frame_receiver:
+            for frame_data in self.join_buffer.clear():
+                self.frame_receiver.release_frame(frame_data.frame)
+            self.frame_receiver.stop()
+            self.frame_receiver = None
+        
         if self.logger:
             self.logger.cleanup()
     
+    def throughput_fps(self) -> float:
+        """Frames displayed per second from the first to the last frame."""
+        span = self.last_frame_time - self.first_frame_time
+        return (self.total_frames_displayed - 1) / span if self.first_frame_time > 0 and span > 0 else 0.0
+    
     def get_stats(self) -> dict:
         """Get display statistics."""
         avg_fps = np.mean(self.fps_history) if self.fps_history else 0
-        elapsed_time = time.time() - self.start_time if self.start_time > 0 else 0
+        elapsed_time = time.monotonic() - self.start_time if self.start_time > 0 else 0
         
         return {
             'is_displaying': self.is_displaying,
@@ -445,8 +738,16 @@ class VideoDisplay:
             'detections_drawn': self.total_detections_drawn,
             'current_frame_id': self.current_frame_id,
             'average_fps': avg_fps,
+            'throughput_fps': self.throughput_fps(),
             'elapsed_time': elapsed_time,
-            'window_name': self.window_name
+            'window_name': self.window_name,
+            'frames_skipped': self.frames_skipped,
+            'latency': self.latency.to_dict(),
+            'latency_skipped': self.latency_skipped,
+            'send': self.web_sender.get_send_stats() if self.web_sender else self.send_stats,
+            'join': self.join_buffer.get_stats() if self.join_frames else None,
+            'reorder': self.reorder_buffer.get_stats() if self.reorder_buffer is not None else None,
+            'buffer_pool': merge_pool_stats(list(self.buffer_pools.values()))
         }
     
     def __del__(self):
@@ -44,6 +44,7 @@ class WebStreamer:
         # Statistics
         self.frames_received = 0
         self.frames_streamed = 0
+        self.frames_skipped = 0
         self.start_time = 0.0
         
         # Threading
@@ -152,6 +153,7 @@ class WebStreamer:
             return {
                 'frames_received': self.frames_received,
                 'frames_streamed': self.frames_streamed,
+                'frames_skipped': self.frames_skipped,
                 'fps': fps,
                 'uptime': uptime,
                 'is_streaming': self.is_streaming
@@ -222,6 +224,7 @@ class WebStreamer:
         self.stop_event.clear()
         self.frames_received = 0
         self.frames_streamed = 0
+        self.frames_skipped = 0
         self.start_time = time.time()
         
         # Start frame receiver thread
@@ -260,27 +263,31 @@ class WebStreamer:
     def _receive_loop(self):
         """Main frame receiving loop (runs in separate thread)."""
         try:
-            while not self.stop_event.is_set():
-                # Receive detection result from pipeline
-                message = self.frame_receiver.receive(timeout_ms=1000)
-                if message is None:
-                    continue
+            end_of_stream = False
+            while not end_of_stream and not self.stop_event.is_set():
+                # Receive everything queued; only the newest frame is worth encoding
+                messages = self.frame_receiver.receive_batch(timeout_ms=1000)
+                messages, skipped = self.frame_receiver.skip_stale(messages)
+                self.frames_skipped += skipped
                 
-                if isinstance(message, DetectionResult):
-                    # Convert frame to JPEG for web streaming
-                    frame_with_detections = self._draw_detections(message)
-                    _, buffer = cv2.imencode('.jpg', frame_with_detections, 
-                                           [cv2.IMWRITE_JPEG_QUALITY, 85])
+                for message in messages:
+                    if isinstance(message, DetectionResult):
+                        # Convert frame to JPEG for web streaming
+                        frame_with_detections = self._draw_detections(message)
+                        self.frame_receiver.release_frame(message.frame)
+                        _, buffer = cv2.imencode('.jpg', frame_with_detections, 
+                                               [cv2.IMWRITE_JPEG_QUALITY, 85])
+                        
+                        # Update current frame (thread-safe)
+                        with self.frame_lock:
+                            self.current_frame_data = buffer.tobytes()
+                            self.frames_received += 1
                     
-                    # Update current frame (thread-safe)
-                    with self.frame_lock:
-                        self.current_frame_data = buffer.tobytes()
-                        self.frames_received += 1
-                
-                elif isinstance(message, SystemMessage) and message.message_type == "end_of_stream":
-                    self.logger.info("End of stream received")
-                    self.pipeline_logger.info("Video stream ended")
-                    break
+                    elif isinstance(message, SystemMessage) and message.message_type == "end_of_stream":
+                        self.logger.info("End of stream received")
+                        self.pipeline_logger.info("Video stream ended")
+                        end_of_stream = True
+                        break
         
         except Exception as e:
             self.logger.error(f"Frame receiving error: {e}")
@@ -325,6 +332,7 @@ class WebStreamer:
         return {
             'frames_received': self.frames_received,
             'frames_streamed': self.frames_streamed,
+            'frames_skipped': self.frames_skipped,
             'fps': fps,
             'uptime': uptime,
             'is_streaming': self.is_streaming
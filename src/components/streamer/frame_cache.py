@@ -0,0 +1,213 @@
+"""
+Frame Cache - Decoded frames of a video kept on disk as a memory-mapped archive.
+
+Tuning detector parameters means streaming the same file many times, and
+every run pays for decoding it again. With a frame cache, the first complete
+run writes each decoded frame into an archive. Later runs of the same file
+map the archive and stream frames straight from it, with random access and
+without decoding.
+
+Archive layout (little-endian)::
+
+    [header, 4096 bytes][frame 0][frame 1]...[frame N-1][index]
+
+    header: magic, version, height, width, channels, dtype, frame count,
+            record size, index offset, fps, source size, source mtime (ns)
+    index:  one (offset, pts_ms) record per frame
+
+Frames are fixed-size raw records. The archive is named after a hash of the
+source's absolute path, size and modification time, and the header repeats
+size and mtime. An edited or replaced video therefore never matches a stale
+archive. Archives are written to a temporary file and renamed when complete,
+so an interrupted run leaves no partial archive behind.
+"""
+import hashlib
+import logging
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .frame_prefetch import FrameItem
+
+DEFAULT_CACHE_DIR = os.getenv("PIPELINE_FRAME_CACHE_DIR",
+                              str(Path.home() / ".cache" / "axon-vision" / "frames"))
+
+_MAGIC = b"AXONFRC1"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIII8sQQQdQq")
+_HEADER_BYTES = 4096  # Frame records start page-aligned
+_INDEX_DTYPE = np.dtype([('offset', '<u8'), ('pts_ms', '<f8')])
+
+
+def _source_key(video_path: Path) -> Tuple[int, int]:
+    """Size and modification time (ns) identifying the current version of a video file."""
+    stat = video_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FrameArchive:
+    """Read-only, memory-mapped decoded frames of one video."""
+
+    def __init__(self, path: str):
+        """Map an archive; raises ValueError if it isn't a complete frame archive."""
+        self.path = str(path)
+        self.data = np.memmap(self.path, dtype=np.uint8, mode='r')
+        if len(self.data) < _HEADER.size:
+            raise ValueError(f"Not a frame archive: {self.path}")
+
+        (magic, version, height, width, channels, dtype, frame_count, self.record_bytes,
+         index_offset, self.fps, self.source_size, self.source_mtime_ns) = _HEADER.unpack_from(self.data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a frame archive (or an unsupported version): {self.path}")
+
+        self.shape = (height, width, channels)
+        self.dtype = np.dtype(dtype.rstrip(b"\0").decode())
+        self.index = np.frombuffer(self.data, dtype=_INDEX_DTYPE, count=frame_count, offset=index_offset)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def frame(self, index: int) -> np.ndarray:
+        """Frame index as a read-only view into the mapping (no copy, no decode)."""
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=self.data, offset=int(self.index['offset'][index]))
+
+    def pts_ms(self, index: int) -> float:
+        """Presentation time of frame index in milliseconds."""
+        return float(self.index['pts_ms'][index])
+
+    def matches(self, video_path: Path) -> bool:
+        """Whether the archive was made from the current version of video_path."""
+        return (self.source_size, self.source_mtime_ns) == _source_key(video_path)
+
+
+class FrameArchiveWriter:
+    """Appends decoded frames to a new archive; visible only once finish() renames it into place."""
+
+    def __init__(self, path: Path, shape: Tuple[int, ...], dtype, fps: float, source_key: Tuple[int, int]):
+        self.path = Path(path)
+        self.tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.fps = fps
+        self.source_key = source_key
+        self.record_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.pts: list = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.tmp_path, "wb")
+        self.file.write(bytes(_HEADER_BYTES))  # Header is written last, by finish()
+
+    @property
+    def frames_written(self) -> int:
+        return len(self.pts)
+
+    def append(self, frame: np.ndarray, pts_ms: float) -> bool:
+        """Append the next frame; False (and nothing written) if its shape or dtype doesn't fit."""
+        if frame.shape != self.shape or frame.dtype != self.dtype:
+            return False
+        self.file.write(memoryview(np.ascontiguousarray(frame)).cast('B'))
+        self.pts.append(pts_ms)
+        return True
+
+    def finish(self) -> str:
+        """Write the index and header and move the archive into place."""
+        index = np.empty(len(self.pts), dtype=_INDEX_DTYPE)
+        index['offset'] = _HEADER_BYTES + np.arange(len(self.pts), dtype=np.uint64) * self.record_bytes
+        index['pts_ms'] = self.pts
+        index_offset = self.file.tell()
+        self.file.write(index.tobytes())
+
+        self.file.seek(0)
+        self.file.write(_HEADER.pack(_MAGIC, _VERSION, self.shape[0], self.shape[1], self.shape[2],
+                                     self.dtype.str.encode(), len(self.pts), self.record_bytes,
+                                     index_offset, self.fps, *self.source_key))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        return str(self.path)
+
+    def abort(self):
+        """Discard the partial archive."""
+        self.file.close()
+        try:
+            os.unlink(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class FrameCache:
+    """Directory of frame archives, keyed by video path, size and modification time."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.logger = logging.getLogger("FrameCache")
+
+    def archive_path(self, video_path: str) -> Path:
+        """Archive file for the current version of a video."""
+        source = Path(video_path).resolve()
+        size, mtime_ns = _source_key(source)
+        digest = hashlib.sha1(f"{source}\0{size}\0{mtime_ns}".encode()).hexdigest()[:16]
+        return self.cache_dir / f"{source.stem}-{digest}.frames"
+
+    def open(self, video_path: str) -> Optional[FrameArchive]:
+        """Archive of a video, or None if there is no valid one."""
+        path = self.archive_path(video_path)
+        if not path.exists():
+            return None
+        try:
+            archive = FrameArchive(str(path))
+        except (ValueError, OSError) as e:
+            self.logger.warning(f"Ignoring unreadable frame archive {path}: {e}")
+            return None
+        return archive if archive.matches(Path(video_path).resolve()) else None
+
+    def create(self, video_path: str, shape: Tuple[int, ...], fps: float, dtype=np.uint8) -> FrameArchiveWriter:
+        """Start writing the archive of a video."""
+        return FrameArchiveWriter(self.archive_path(video_path), shape, dtype, fps,
+                                  _source_key(Path(video_path).resolve()))
+
+
+class CachedFrameSource:
+    """Frames of a FrameArchive behind the FramePrefetcher interface (start/get/skip_to/stop/get_stats)."""
+
+    def __init__(self, archive: FrameArchive):
+        self.archive = archive
+        self.position = 0        # Next frame index to deliver
+        self.frames_read = 0
+        self.frames_skipped = 0  # Passed over by skip_to (no read at all)
+
+    def start(self):
+        """Nothing to start: frames are read on demand from the mapping."""
+
+    def stop(self):
+        """Stop delivering frames (views already handed out stay valid)."""
+        self.position = len(self.archive)
+
+    def get(self, timeout: float = 1.0) -> Optional[FrameItem]:
+        """Next frame with its index and PTS, or None at the end of the archive."""
+        if self.position >= len(self.archive):
+            return None
+        index = self.position
+        self.position += 1
+        self.frames_read += 1
+        return index, self.archive.frame(index), self.archive.pts_ms(index)
+
+    def skip_to(self, index: int):
+        """Jump to frame index (random access - skipped frames cost nothing)."""
+        if index > self.position:
+            self.frames_skipped += min(index, len(self.archive)) - self.position
+            self.position = min(index, len(self.archive))
+
+    def get_stats(self) -> dict:
+        """Get archive size and read counters (read-ahead fields for compatibility)."""
+        return {
+            'depth': 0,
+            'queued': 0,
+            'archive': self.archive.path,
+            'frames': len(self.archive),
+            'frames_read': self.frames_read,
+            'frames_skipped': self.frames_skipped,
+            'underruns': 0
+        }
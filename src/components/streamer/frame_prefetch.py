@@ -0,0 +1,184 @@
+"""
+Frame Prefetcher - Decodes video frames ahead of the Streamer's send loop.
+
+Decoding runs on its own thread and fills a bounded queue, so a slow decode
+(keyframes, high-bitrate scenes) is absorbed by the queued frames instead of
+delaying the paced send loop. The queue bound caps memory and read-ahead.
+Frames are queued with their source index and presentation time, and
+skip_to() lets a send loop that fell behind drop frames: queued ones are
+discarded, later ones are grabbed without decoding. Frames decoded into
+pool buffers belong to the consumer once delivered; discarded ones are
+released back to the pool here.
+"""
+import queue
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.buffer_pool import FrameBufferPool
+
+FrameItem = Tuple[int, np.ndarray, float]  # (index in the video, frame, presentation time in ms)
+
+_END_OF_VIDEO = None  # Queued after the last frame
+
+
+def frame_pts(cap, index: int, fps: float) -> float:
+    """
+    Presentation time (ms) of the frame cap just read.
+
+    This is the container timestamp (CAP_PROP_POS_MSEC), or index / fps for
+    backends that don't report one.
+    """
+    pts = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if pts > 0 or (pts == 0 and index == 0):
+        return float(pts)
+    return index * 1000.0 / fps if fps > 0 else 0.0
+
+
+class FramePrefetcher:
+    """Bounded read-ahead of decoded frames from a cv2.VideoCapture-like source."""
+
+    def __init__(self, cap, depth: int = 8, pool: Optional[FrameBufferPool] = None):
+        """
+        Initialize prefetcher.
+
+        Args:
+            cap: Opened capture with read() -> (ret, frame), grab() -> ret and
+                 get(prop) methods; owned by the decode thread until stop()
+            depth: Maximum decoded frames queued ahead of the consumer
+            pool: Buffers to decode into (read(image) -> (ret, frame)) instead
+                  of allocating a frame per read; the consumer releases delivered frames
+        """
+        self.cap = cap
+        self.depth = depth
+        self.pool = pool
+        self.fps = cap.get(cv2.CAP_PROP_FPS)  # For PTS of backends without timestamps
+        self.frames: "queue.Queue[Optional[FrameItem]]" = queue.Queue(maxsize=depth)
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+
+        # Source positions
+        self.next_index = 0  # Decoder: index of the next frame read from cap
+        self.skip_index = 0  # Frames before this index are not delivered
+
+        # Statistics
+        self.frames_decoded = 0
+        self.decode_time = 0.0
+        self.max_decode_time = 0.0
+        self.underruns = 0  # get() found the queue empty and had to wait for the decoder
+        self.frames_grabbed = 0    # Skipped without decoding
+        self.frames_discarded = 0  # Decoded, then skipped
+
+    def start(self):
+        """Start the decode thread."""
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the decode thread and discard queued frames."""
+        self.stop_event.set()
+        self._drain()  # Unblock a decoder waiting on a full queue
+        if self.thread and self.thread.is_alive():
+            self.thread.join(timeout=2.0)
+        self._drain()
+
+    def get(self, timeout: float = 1.0) -> Optional[FrameItem]:
+        """
+        Get the next decoded frame with its source index and PTS.
+
+        Returns None at the end of the video (or if stopped). Raises queue.Empty
+        if no frame was decoded within timeout.
+        """
+        while True:
+            item = self._next_item(timeout)
+            if item is _END_OF_VIDEO or item[0] >= self.skip_index:
+                return item
+            self._release(item)
+            self.frames_discarded += 1
+
+    def skip_to(self, index: int):
+        """Skip all frames before source index (queued frames are discarded, the rest grabbed)."""
+        self.skip_index = max(self.skip_index, index)
+
+    def _next_item(self, timeout: float) -> Optional[FrameItem]:
+        """Next queued item, counting an underrun if the decoder hasn't produced it yet."""
+        try:
+            return self.frames.get_nowait()
+        except queue.Empty:
+            if self.thread is None or not self.thread.is_alive():
+                # The decoder may have queued its last frames after the check above
+                try:
+                    return self.frames.get_nowait()
+                except queue.Empty:
+                    return _END_OF_VIDEO
+            self.underruns += 1
+        return self.frames.get(timeout=timeout)
+
+    def _decode_loop(self):
+        """Decode loop (runs in separate thread)."""
+        try:
+            while not self.stop_event.is_set():
+                # Behind schedule: advance without decoding
+                if self.next_index < self.skip_index:
+                    if not self.cap.grab():
+                        break
+                    self.next_index += 1
+                    self.frames_grabbed += 1
+                    continue
+
+                start = time.perf_counter()
+                buffer = self.pool.acquire() if self.pool else None
+                ret, frame = self.cap.read(buffer) if self.pool else self.cap.read()
+                decode_time = time.perf_counter() - start
+                if frame is not buffer and self.pool:
+                    self.pool.release(buffer)  # Not decoded into (end of video, or another frame size)
+                if not ret:
+                    break
+
+                self.frames_decoded += 1
+                self.decode_time += decode_time
+                self.max_decode_time = max(self.max_decode_time, decode_time)
+                self._put((self.next_index, frame, frame_pts(self.cap, self.next_index, self.fps)))
+                self.next_index += 1
+        finally:
+            self._put(_END_OF_VIDEO)
+
+    def _put(self, item: Optional[FrameItem]):
+        """Queue an item, waiting for space unless stopped (a frame not queued is released)."""
+        while not self.stop_event.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        self._release(item)
+
+    def _drain(self):
+        """Discard all queued frames."""
+        try:
+            while True:
+                self._release(self.frames.get_nowait())
+        except queue.Empty:
+            pass
+
+    def _release(self, item: Optional[FrameItem]):
+        """Give a frame that won't be delivered back to the pool."""
+        if self.pool and item is not _END_OF_VIDEO:
+            self.pool.release(item[1])
+
+    def get_stats(self) -> dict:
+        """Get prefetch depth, current queue occupancy and decode statistics."""
+        return {
+            'depth': self.depth,
+            'queued': self.frames.qsize(),
+            'frames_decoded': self.frames_decoded,
+            'underruns': self.underruns,
+            'frames_grabbed': self.frames_grabbed,
+            'frames_discarded': self.frames_discarded,
+            'avg_decode_ms': self.decode_time / self.frames_decoded * 1000 if self.frames_decoded else 0.0,
+            'max_decode_ms': self.max_decode_time * 1000
+        }
@@ -0,0 +1,366 @@
+"""
+Multi-Source Streamer - Streams many video sources onto the Detector channel.
+
+Each source has its own capture and decode thread (FramePrefetcher), so the
+sources are read concurrently. One send loop interleaves them on the single
+Streamer → Detector socket. Every FrameData carries the source's stream_id,
+and frame_id counts per stream.
+
+Scheduling is earliest-deadline-first. A paced source's next frame is due at
+anchor + index / fps. In offline mode the deadline is the number of frames
+the source has sent, which amounts to round-robin. A source whose decoder
+has no frame ready is passed over for a moment (a turn, offline) instead of
+holding up the others.
+
+When a source ends, a "stream_ended" SystemMessage carries its stream_id.
+The final "end_of_stream" follows after the last source.
+"""
+import cv2
+import heapq
+import logging
+import numpy as np
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.data_models import FrameData, SystemMessage, StreamDescriptor
+from core.buffer_pool import FrameBufferPool
+from communication.zmq_manager import ZMQManager, PipelineComm, SendTracker
+from .frame_prefetch import FramePrefetcher
+from .synthetic_source import is_synthetic, open_capture
+
+
+class StreamSource:
+    """One source of a MultiSourceStreamer: capture, read-ahead and schedule state."""
+
+    def __init__(self, stream_id: str, video_path: str, target_fps: Optional[float] = None,
+                 prefetch_depth: int = 8):
+        self.stream_id = stream_id
+        self.video_path = Path(video_path)
+        self.target_fps = target_fps
+        self.prefetch_depth = max(1, prefetch_depth)  # Decode thread is what makes sources concurrent
+        self.cap: Optional[cv2.VideoCapture] = None
+        self.prefetcher: Optional[FramePrefetcher] = None
+
+        # Video properties (set by open)
+        self.original_fps = 0.0
+        self.total_frames = 0
+        self.frame_width = 0
+        self.frame_height = 0
+        self.descriptor: Optional[StreamDescriptor] = None  # Sent once instead of per-frame metadata
+        self.buffer_pool: Optional[FrameBufferPool] = None  # Decode targets, reused once sent
+        self.sent_frames: List[Tuple[np.ndarray, List[SendTracker]]] = []  # (decode buffer, its send) to release
+
+        # Schedule state
+        self.anchor = 0.0        # Monotonic time frame 0 is due
+        self.next_index = 0      # Index of the next frame to send
+        self.last_sent_id = -1   # frame_id of the last frame sent (its successor's prev_frame_id)
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.underruns = 0       # Decoder had no frame ready when the frame was due
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    def open(self) -> bool:
+        """Open the capture and start its decode thread."""
+        self.cap = open_capture(str(self.video_path))
+        if not self.cap.isOpened():
+            return False
+
+        self.original_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if self.target_fps is None:
+            self.target_fps = self.original_fps or 30.0
+
+        self.descriptor = StreamDescriptor(
+            stream_id=self.stream_id,
+            width=self.frame_width,
+            height=self.frame_height,
+            fps=self.target_fps,
+            original_fps=self.original_fps,
+            video_path=str(self.video_path)
+        )
+        
+        self.buffer_pool = FrameBufferPool.for_stream(self.descriptor)
+        self.prefetcher = FramePrefetcher(self.cap, depth=self.prefetch_depth, pool=self.buffer_pool)
+        self.prefetcher.start()
+        return True
+
+    def close(self):
+        """Stop the decode thread and release the capture."""
+        if self.prefetcher:
+            self.prefetcher.stop()  # Decode thread must release the capture first
+            self.prefetcher = None
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+    def due_time(self) -> float:
+        """Monotonic time the next frame is due."""
+        return self.anchor + self.next_index / self.target_fps
+
+    def get_stats(self) -> dict:
+        """Get per-stream progress."""
+        return {
+            'video_path': str(self.video_path),
+            'frame_id': self.next_index,
+            'total_frames': self.total_frames,
+            'fps': self.target_fps,
+            'frames_sent': self.frames_sent,
+            'frames_skipped': self.frames_skipped,
+            'underruns': self.underruns,
+            'lag_ms': self.lag * 1000,
+            'max_lag_ms': self.max_lag * 1000,
+            'buffer_pool': self.buffer_pool.get_stats() if self.buffer_pool else None
+        }
+
+
+class MultiSourceStreamer:
+    """Streams several video sources, fair-scheduled onto the Detector channel."""
+
+    RETRY_DELAY = 0.005  # Seconds a source without a decoded frame is passed over
+
+    def __init__(self, sources: Dict[str, str], target_fps: Optional[float] = None,
+                 codec: Optional[str] = None, prefetch_depth: int = 8,
+                 catch_up_lag: Optional[float] = 0.5, offline: bool = False):
+        """
+        Initialize multi-source streamer.
+
+        Args:
+            sources: stream_id -> video path
+            target_fps: FPS for every source (None = each source's original FPS)
+            codec: Frame codec for outgoing frames (e.g. "jpeg:80"; None = channel default)
+            prefetch_depth: Frames decoded ahead per source (at least 1)
+            catch_up_lag: Seconds a source may fall behind schedule before its frames
+                          are skipped (None = never skip)
+            offline: Batch mode - no pacing or skipping, sources are sent round-robin
+        """
+        if not sources:
+            raise ValueError("MultiSourceStreamer needs at least one source")
+        self.sources = [StreamSource(stream_id, path, target_fps, prefetch_depth)
+                        for stream_id, path in sources.items()]
+        self.codec = codec
+        self.offline = offline
+        self.catch_up_lag = None if offline else catch_up_lag
+        self.sender: Optional[ZMQManager] = None
+
+        # Streaming state
+        self.is_streaming = False
+        self.start_time = 0.0
+        self.end_time = 0.0
+        self.frames_sent = 0
+
+        # Threading
+        self.stream_thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+
+        self.logger = logging.getLogger("MultiSourceStreamer")
+
+    def start_streaming(self) -> bool:
+        """Open all sources and start the send loop in a separate thread."""
+        if self.is_streaming:
+            self.logger.warning("Already streaming")
+            return True
+
+        for source in self.sources:
+            if not source.open():
+                self.logger.error(f"Failed to open video for stream {source.stream_id}: {source.video_path}")
+                self._cleanup()
+                return False
+            self.logger.info(f"Stream {source.stream_id}: {source.video_path} "
+                             f"({source.frame_width}x{source.frame_height} @ {source.target_fps:.2f} FPS)")
+
+        self.sender = PipelineComm.create_streamer_sender(codec=self.codec)
+        if not self.sender.start():
+            self.logger.error("Failed to start ZMQ sender")
+            self._cleanup()
+            return False
+
+        self.stop_event.clear()
+        self.frames_sent = 0
+        self.end_time = 0.0
+        self.is_streaming = True  # Before the thread starts: short sources may end at once
+        self.stream_thread = threading.Thread(target=self._stream_loop, daemon=True)
+        self.stream_thread.start()
+
+        self.logger.info(f"Started streaming {len(self.sources)} sources")
+        return True
+
+    def stop_streaming(self):
+        """Stop streaming and cleanup (also after all streams ended)."""
+        if self.stream_thread is None:
+            return
+
+        self.logger.info("Stopping streaming...")
+        self.stop_event.set()
+        if self.sender:
+            self.sender.interrupt()  # Don't let a lossless send wait out the join
+
+        if self.stream_thread and self.stream_thread.is_alive():
+            self.stream_thread.join(timeout=2.0)
+
+        self.is_streaming = False
+        self.stream_thread = None
+        self._cleanup()
+        self.logger.info("Streaming stopped")
+
+    def _schedule_key(self, source: StreamSource) -> float:
+        """Deadline of a source's next frame (frames sent, in offline mode)."""
+        return source.frames_sent if self.offline else source.due_time()
+
+    def _stream_loop(self):
+        """Send loop (runs in separate thread): earliest-deadline-first over the sources."""
+        self.start_time = time.monotonic()  # start/end_time measure durations only
+        now = time.monotonic()
+        schedule: List[Tuple[float, int, StreamSource]] = []
+        for order, source in enumerate(self.sources):
+            source.anchor = now
+            heapq.heappush(schedule, (self._schedule_key(source), order, source))
+        order = len(self.sources)
+
+        try:
+            while schedule and not self.stop_event.is_set():
+                key, _, source = heapq.heappop(schedule)
+
+                if not self.offline:
+                    # Wait for the earliest deadline (wakes early on stop)
+                    delay = key - time.monotonic()
+                    if delay > 0 and self.stop_event.wait(delay):
+                        break
+
+                    # This source is behind real time: skip to the frame due now
+                    source.lag = time.monotonic() - source.due_time()
+                    source.max_lag = max(source.max_lag, source.lag)
+                    if self.catch_up_lag is not None and source.lag > self.catch_up_lag:
+                        source.prefetcher.skip_to(source.next_index + int(source.lag * source.target_fps))
+
+                try:
+                    item = source.prefetcher.get(timeout=self.RETRY_DELAY)
+                except queue.Empty:
+                    # Decoder not ready - let the other sources go first
+                    source.underruns += 1
+                    order += 1
+                    heapq.heappush(schedule, (key + (1 if self.offline else self.RETRY_DELAY), order, source))
+                    continue
+
+                if item is None:
+                    self._send_stream_ended(source)
+                    continue
+
+                frame_index, frame, pts_ms = item
+                source.frames_skipped += frame_index - source.next_index
+                frame_data = FrameData.create(frame_id=frame_index, frame=frame, stream_id=source.stream_id,
+                                              pts_ms=pts_ms, prev_frame_id=source.last_sent_id)
+                self._release_sent()  # The last frame's locals are replaced by now
+                self.sender.send_stream_descriptor(source.descriptor, timeout_ms=500)
+                send = SendTracker()
+                if self.sender.send_frame_data(frame_data, timeout_ms=500, send=send):
+                    source.last_sent_id = frame_index
+                else:
+                    self.logger.debug(f"Dropped frame {frame_index} of stream {source.stream_id}")  # Counted by the sender
+                source.sent_frames.append((frame, [send]))  # Decode buffer reused once the send is done
+
+                source.next_index = frame_index + 1
+                source.frames_sent += 1
+                self.frames_sent += 1
+                order += 1
+                heapq.heappush(schedule, (self._schedule_key(source), order, source))
+
+            if not schedule:
+                self.logger.info("All streams ended")
+                self.is_streaming = False  # Mark streaming as done
+
+        except Exception as e:
+            self.logger.error(f"Streaming error: {e}")
+
+        finally:
+            self.end_time = time.monotonic()
+            self._release_sent()
+            try:
+                end_message = SystemMessage(
+                    message_type="end_of_stream",
+                    payload={
+                        'total_frames': self.frames_sent,
+                        'streams': {source.stream_id: source.frames_sent for source in self.sources},
+                        'last_frame_ids': {source.stream_id: source.last_sent_id for source in self.sources},
+                        'throughput_fps': self.throughput_fps()
+                    },
+                    timestamp=time.time()
+                )
+                self.sender.send_system_message(end_message)
+                self.logger.info(f"Sent end-of-stream signal after {self.frames_sent} frames")
+            except Exception as e:
+                self.logger.error(f"Failed to send end-of-stream: {e}")
+
+    def _release_sent(self):
+        """Give sent frames' decode buffers back to their pools (reused once their sends are done)."""
+        for source in self.sources:
+            if source.sent_frames:
+                source.buffer_pool.release_all(source.sent_frames)
+
+    def _send_stream_ended(self, source: StreamSource):
+        """Tell downstream stages that one stream has no more frames."""
+        self.logger.info(f"Stream {source.stream_id} ended after {source.frames_sent} frames")
+        message = SystemMessage(
+            message_type="stream_ended",
+            payload={'stream_id': source.stream_id, 'total_frames': source.frames_sent,
+                     'frames_skipped': source.frames_skipped},
+            timestamp=time.time()
+        )
+        if not self.sender.send_system_message(message):
+            self.logger.warning(f"Failed to send stream_ended for {source.stream_id}")
+
+    def _cleanup(self):
+        """Cleanup resources."""
+        for source in self.sources:
+            source.close()
+        if self.sender:
+            self.sender.stop()
+            self.sender = None
+
+    def throughput_fps(self) -> float:
+        """Frames sent per second over all streams, up to now or the end of the last stream."""
+        elapsed = (self.end_time or time.monotonic()) - self.start_time if self.start_time > 0 else 0
+        return self.frames_sent / elapsed if elapsed > 0 else 0.0
+
+    def get_progress(self) -> dict:
+        """Get streaming progress, overall and per stream."""
+        return {
+            'streams': {source.stream_id: source.get_stats() for source in self.sources},
+            'frames_sent': self.frames_sent,
+            'throughput_fps': self.throughput_fps(),
+            'elapsed_time': time.monotonic() - self.start_time if self.start_time > 0 else 0,
+            'send': self.sender.get_send_stats() if self.sender else None
+        }
+
+    def __del__(self):
+        """Destructor - ensure cleanup."""
+        self.stop_streaming()
+
+
+def parse_sources(specs: List[str]) -> Dict[str, str]:
+    """
+    Map source specs to stream ids.
+
+    A spec is "stream_id=path" or just "path", which uses the file name
+    without extension ("synthetic" for a synthetic source), suffixed with
+    -2, -3, ... if taken.
+    """
+    sources: Dict[str, str] = {}
+    for spec in specs:
+        stream_id, sep, path = spec.partition("=")
+        if not sep or is_synthetic(spec):  # Synthetic options contain "=" too
+            path = spec
+            base = "synthetic" if is_synthetic(path) else Path(path).stem or "stream"
+            stream_id, n = base, 1
+            while stream_id in sources:
+                n += 1
+                stream_id = f"{base}-{n}"
+        if stream_id in sources:
+            raise ValueError(f"Duplicate stream id: {stream_id}")
+        sources[stream_id] = path
+    return sources
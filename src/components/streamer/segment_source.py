@@ -0,0 +1,358 @@
+"""
+Parallel Segment Source - Decodes a video file in a pool of worker processes.
+
+One cv2.VideoCapture decodes on one core, which caps offline throughput. This
+source splits the file into segments of consecutive frames and hands them to
+a process pool. Each worker opens its own capture, seeks to its segment's
+first frame and decodes the segment straight into a shared-memory block, so
+only the frames' PTS travel back through the pool. Segments are delivered
+strictly in order with their global frame index, so a consumer sees exactly
+the frame sequence of a sequential decode. Frame N's previous frame is frame
+N-1 even across a segment boundary.
+
+Only a bounded number of segments is in flight at a time, each in its own
+block, so the blocks take (in_flight + 1) * segment_frames * frame bytes of
+/dev/shm. in_flight is lowered to fit max_buffer_bytes, and start() fails
+with a clear error if /dev/shm can't hold the blocks: the pages are only
+allocated on write, so an oversized block would otherwise crash a worker
+with SIGBUS.
+It has the FramePrefetcher interface (start/get/skip_to/stop/get_stats), so
+the Streamer can use it in place of the single-threaded read-ahead. Delivered
+frames are copied out of the block (into a pool buffer if given one) and
+belong to the consumer; the block is reused once its segment is consumed.
+"""
+import collections
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import time
+from multiprocessing import shared_memory
+from typing import Deque, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from core.buffer_pool import FrameBufferPool
+from .frame_prefetch import FrameItem, frame_pts
+from .synthetic_source import open_capture
+
+DecodedSegment = Tuple[List[float], List[Tuple[np.ndarray, float]]]
+
+DEFAULT_MAX_BUFFER_BYTES = 1 << 30  # Shared-memory budget of the segment blocks (1 GiB)
+SHM_DIR = "/dev/shm"                # Backs POSIX shared memory on Linux
+
+
+def shm_free_bytes() -> Optional[int]:
+    """Free space of the shared-memory filesystem (None where there is none to check)."""
+    if not os.path.isdir(SHM_DIR):
+        return None
+    return shutil.disk_usage(SHM_DIR).free
+
+
+def _grabbed_index(cap, fps: float, first_pts: float) -> int:
+    """Index of the frame cap just grabbed, from its PTS (or the backend's frame position without one)."""
+    pts = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if pts > 0 and fps > 0:
+        return round((pts - first_pts) * fps / 1000.0)
+    return int(cap.get(cv2.CAP_PROP_POS_FRAMES)) - 1
+
+
+def _seek(cap, start: int, fps: float, first_pts: float) -> bool:
+    """
+    Position cap so that its next read returns frame start; False if the video ends first.
+
+    Backends turn CAP_PROP_POS_FRAMES into a timestamp and may land on another
+    frame, while still reporting the requested position. So the frame before
+    start is grabbed and located by its PTS. A seek that landed early grabs
+    forward to it; one that overshot seeks again, twice as far back each time.
+    Only a PTS that contradicts a seek to frame 0 decodes from the start.
+    """
+    target = start - 1  # Grabbed to find where the seek landed
+    back = 0
+    while True:
+        position = max(0, target - back)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+        if not cap.grab():
+            return False
+        landed = _grabbed_index(cap, fps, first_pts) if position > 0 else 0
+        if landed <= target:
+            break
+        back = 2 * max(back, landed - position)
+
+    for _ in range(target - landed):
+        if not cap.grab():
+            return False
+    return True
+
+
+def _decode_segment(video_path: str, start: int, count: int, block_name: str,
+                    shape: Tuple[int, ...], first_pts: float) -> DecodedSegment:
+    """
+    Decode frames [start, start + count) of a video into a shared-memory block (worker process).
+
+    Returns the PTS of the frames decoded into the block, which holds count
+    frames of shape. Frames of another size (the stream changed resolution)
+    can't go there; they and all frames after them are returned with their PTS.
+    """
+    block = shared_memory.SharedMemory(name=block_name)
+    records = np.ndarray((count,) + tuple(shape), dtype=np.uint8, buffer=block.buf)
+    record = frame = None
+    pts, others = [], []
+    cap = open_capture(video_path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if start > 0 and not _seek(cap, start, fps, first_pts):
+            return pts, others
+
+        while len(pts) + len(others) < count:
+            record = None if others else records[len(pts)]
+            ret, frame = cap.read(record) if record is not None else cap.read()
+            if not ret:
+                break
+            frame_pts_ms = frame_pts(cap, start + len(pts) + len(others), fps)
+            if frame is record:
+                pts.append(frame_pts_ms)
+            else:
+                others.append((frame, frame_pts_ms))
+        return pts, others
+    finally:
+        cap.release()
+        records = record = frame = None  # No views may outlive the mapping
+        block.close()
+
+
+class ParallelSegmentSource:
+    """Ordered frames from a video file decoded segment-wise in worker processes."""
+
+    def __init__(self, video_path: str, total_frames: int, workers: int = 4,
+                 segment_frames: int = 64, in_flight: Optional[int] = None,
+                 pool: Optional[FrameBufferPool] = None,
+                 max_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES):
+        """
+        Initialize segment source.
+
+        Args:
+            video_path: Path to video file
+            total_frames: Frame count reported by the container; segments
+                          continue past it until the file ends, in case it is low
+            workers: Decoder processes
+            segment_frames: Frames per segment (larger = fewer seeks, more memory)
+            in_flight: Segments decoding or decoded ahead of the consumer
+                       (default: 2 per worker, lowered to fit max_buffer_bytes)
+            pool: Buffers to copy delivered frames into (default: new arrays)
+            max_buffer_bytes: Shared memory for the segment blocks, in_flight + 1
+                              of segment_frames frames each
+        """
+        if workers < 1 or segment_frames < 1:
+            raise ValueError(f"workers and segment_frames must be >= 1, got {workers} and {segment_frames}")
+        self.video_path = str(video_path)
+        self.total_frames = total_frames
+        self.workers = workers
+        self.segment_frames = segment_frames
+        self.in_flight = in_flight or 2 * workers
+        self.num_segments = max(1, -(-total_frames // segment_frames))  # Ceiling division, grows if low
+        self.pool = pool
+        self.max_buffer_bytes = max_buffer_bytes
+        self.logger = logging.getLogger("ParallelSegmentSource")
+
+        self.executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.shape: Optional[Tuple[int, ...]] = None  # Frame shape of the blocks, from the first frame
+        self.first_pts = 0.0            # PTS of the first frame, for locating seeks
+        self.blocks: List[shared_memory.SharedMemory] = []
+        self.free_blocks: List[int] = []
+        self.pending: Deque[Tuple[int, int, concurrent.futures.Future]] = collections.deque()
+        self.next_segment = 0           # Next segment to submit
+        self.current_block: Optional[int] = None
+        self.current_frames: Optional[np.ndarray] = None  # View of the current segment's block
+        self.current_pts: List[float] = []
+        self.current_others: List[Tuple[np.ndarray, float]] = []  # Frames not in the block
+        self.current_start = 0          # Frame index of the current segment's first frame
+        self.position = 0               # Next frame index to deliver
+        self.skip_index = 0             # Frames before this index are not delivered
+        self.finished = False
+
+        # Statistics
+        self.segments_decoded = 0
+        self.frames_decoded = 0
+        self.frames_discarded = 0
+        self.underruns = 0              # get() had to wait for a segment
+        self.wait_time = 0.0
+
+    def start(self):
+        """Read the first frame's shape, create the shared blocks, start the worker pool and submit the first segments."""
+        cap = open_capture(self.video_path)
+        try:
+            ret, frame = cap.read()
+            self.first_pts = cap.get(cv2.CAP_PROP_POS_MSEC)
+        finally:
+            cap.release()
+        if not ret:
+            self.finished = True  # Empty or unreadable video
+            return
+
+        self.shape = frame.shape
+        block_bytes = self.segment_frames * frame.nbytes
+        self._fit_in_flight(block_bytes)
+        self.blocks = [shared_memory.SharedMemory(create=True, size=block_bytes)
+                       for _ in range(self.in_flight + 1)]  # One more for the segment being consumed
+        self.free_blocks = list(range(len(self.blocks)))
+
+        # spawn: workers must not inherit the parent's ZMQ and decoder threads
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._submit()
+
+    def _fit_in_flight(self, block_bytes: int):
+        """Lower in_flight so the blocks fit max_buffer_bytes; raise if they can't fit it or /dev/shm."""
+        fitting = self.max_buffer_bytes // block_bytes - 1
+        if fitting < 1:
+            raise ValueError(f"Two segment blocks of {block_bytes / 1e6:.0f} MB ({self.segment_frames} frames of "
+                             f"{self.shape}) exceed the {self.max_buffer_bytes / 1e6:.0f} MB decode buffer - "
+                             f"use fewer segment frames or a larger buffer")
+        if fitting < self.in_flight:
+            self.logger.warning(f"Decode buffer of {self.max_buffer_bytes / 1e6:.0f} MB holds {fitting + 1} "
+                                f"segments, not {self.in_flight + 1}: {fitting} in flight"
+                                + (f", {self.workers - fitting} of {self.workers} workers idle"
+                                   if fitting < self.workers else ""))
+            self.in_flight = fitting
+
+        total = (self.in_flight + 1) * block_bytes
+        free = shm_free_bytes()
+        if free is not None and total > free:
+            raise RuntimeError(f"Segment decoding needs {total / 1e6:.0f} MB of {SHM_DIR}, only "
+                               f"{free / 1e6:.0f} MB are free - use fewer segment frames or decode "
+                               f"workers, a smaller decode buffer or a larger {SHM_DIR}")
+
+    def stop(self):
+        """Stop the workers and discard decoded frames."""
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.pending.clear()
+        self.current_frames = None
+        self.current_others = []
+        self.finished = True
+
+        # A worker still decoding keeps its own mapping until it's done
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+        self.free_blocks = []
+        self.current_block = None
+
+    def get(self, timeout: float = 1.0) -> Optional[FrameItem]:
+        """
+        Get the next frame with its index in the video and PTS.
+
+        Returns None at the end of the video (or if stopped). Raises queue.Empty
+        if the next segment wasn't decoded within timeout.
+        """
+        while True:
+            offset = self.position - self.current_start
+            if offset < len(self.current_pts) + len(self.current_others):
+                self.position += 1
+                if self.position - 1 < self.skip_index:
+                    self.frames_discarded += 1
+                    continue
+                frame, pts_ms = self._take(offset)
+                return self.position - 1, frame, pts_ms
+
+            if not self._next_segment(timeout):
+                return None
+
+    def skip_to(self, index: int):
+        """Skip all frames before index (decoded frames are discarded)."""
+        self.skip_index = max(self.skip_index, index)
+
+    def _take(self, offset: int) -> Tuple[np.ndarray, float]:
+        """Frame and PTS at offset in the current segment, copied out of its block."""
+        if offset >= len(self.current_pts):
+            return self.current_others[offset - len(self.current_pts)]
+
+        record = self.current_frames[offset]
+        if self.pool is not None and self.pool.matches(record.shape):
+            frame = self.pool.acquire()
+            np.copyto(frame, record)
+        else:
+            frame = record.copy()
+        return frame, self.current_pts[offset]
+
+    def _next_segment(self, timeout: float) -> bool:
+        """Make the next segment current; False at the end of the video."""
+        if self.finished or not self.pending:
+            return False
+
+        segment, block, future = self.pending[0]
+        if not future.done():
+            self.underruns += 1
+            start = time.perf_counter()
+            try:
+                future.result(timeout=timeout)
+            except concurrent.futures.TimeoutError:
+                raise queue.Empty()
+            finally:
+                self.wait_time += time.perf_counter() - start
+        self.pending.popleft()
+
+        # The previous segment is consumed - its block can take another
+        if self.current_block is not None:
+            self.current_frames = None
+            self.free_blocks.append(self.current_block)
+        pts, others = future.result()
+        self.current_block = block
+        self.current_frames = np.ndarray((self.segment_frames,) + self.shape, dtype=np.uint8,
+                                         buffer=self.blocks[block].buf)
+        self.current_pts, self.current_others = pts, others
+        self.current_start = segment * self.segment_frames
+        self.position = self.current_start
+
+        decoded = len(pts) + len(others)
+        self.segments_decoded += 1
+        self.frames_decoded += decoded
+        if decoded < self.segment_frames:
+            # A short segment is the end of the file
+            self.finished = True
+            self._cancel_pending()
+        else:
+            if segment == self.num_segments - 1:
+                self.num_segments += 1  # The container's frame count was low
+            self._submit()
+        return True
+
+    def _cancel_pending(self):
+        """Drop the segments queued after the end of the file."""
+        for _, _, future in self.pending:
+            future.cancel()
+        self.pending.clear()
+
+    def _submit(self):
+        """Keep in_flight segments queued in the pool."""
+        while (self.executor and len(self.pending) < self.in_flight and self.free_blocks
+               and self.next_segment < self.num_segments):
+            segment = self.next_segment
+            block = self.free_blocks.pop()
+            future = self.executor.submit(_decode_segment, self.video_path, segment * self.segment_frames,
+                                          self.segment_frames, self.blocks[block].name, self.shape,
+                                          self.first_pts)
+            self.pending.append((segment, block, future))
+            self.next_segment += 1
+
+    def get_stats(self) -> dict:
+        """Get pool size, frames ready ahead of the consumer and decode statistics."""
+        ready = max(0, len(self.current_pts) + len(self.current_others) - (self.position - self.current_start))
+        ready += sum(self.segment_frames for _, _, future in self.pending if future.done())
+        return {
+            'workers': self.workers,
+            'depth': self.in_flight * self.segment_frames,
+            'queued': ready,
+            'shared_mb': sum(block.size for block in self.blocks) / 1e6,
+            'segments_decoded': self.segments_decoded,
+            'frames_decoded': self.frames_decoded,
+            'frames_discarded': self.frames_discarded,
+            'underruns': self.underruns,
+            'wait_ms': self.wait_time * 1000
+        }
@@ -0,0 +1,226 @@
+"""
+Synthetic Video Source - Generated frames in place of a video file.
+
+Benchmarks and tests shouldn't depend on a sample video being present, and
+should scale to resolutions and stream counts no sample file has. A
+synthetic source renders frames on the fly: a gradient background, moving
+rectangles that bounce off the frame edges, optional sensor noise and a
+slowly changing illumination. It is a drop-in replacement for
+cv2.VideoCapture (read/grab/retrieve/get/set/release), so the Streamer, the
+read-ahead thread, segment decoding and the multi-source streamer use it
+unchanged. Pass a spec instead of a video path::
+
+    synthetic:WIDTHxHEIGHT[@FPS][,key=value...]
+    synthetic:1280x720@30,objects=5,noise=8,lighting=0.2,seed=7
+    synthetic:4k@25,frames=1000
+
+Resolution presets are 360p, 480p, 720p, 1080p and 4k. Keys: frames (length,
+default 300), objects (moving rectangles, default 3), noise (uniform noise
+amplitude in grey levels, default 0), lighting (illumination swing as a
+fraction of brightness, default 0) and seed (default 0).
+
+Frame i depends only on the spec and i, so the same spec produces the same
+frames in every run, every process, and after any seek.
+"""
+import math
+from dataclasses import dataclass, fields
+from typing import List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+SYNTHETIC_SCHEME = "synthetic:"
+
+RESOLUTION_PRESETS = {
+    "360p": (640, 360),
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+_NOISE_PAD = 61           # Noise is a window into a larger pre-generated field, shifted per frame
+_LIGHTING_PERIOD_S = 5.0  # One full cycle of the illumination change
+
+
+def is_synthetic(video_path: str) -> bool:
+    """Whether video_path is a synthetic source spec rather than a file."""
+    return str(video_path).startswith(SYNTHETIC_SCHEME)
+
+
+def open_capture(video_path: str):
+    """cv2.VideoCapture for a video file, SyntheticVideoSource for a synthetic spec."""
+    if is_synthetic(video_path):
+        return SyntheticVideoSource(video_path)
+    return cv2.VideoCapture(str(video_path))
+
+
+@dataclass
+class SyntheticSpec:
+    """Parameters of a synthetic source."""
+    width: int = 640
+    height: int = 360
+    fps: float = 30.0
+    frames: int = 300
+    objects: int = 3
+    noise: int = 0
+    lighting: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def parse(cls, spec: str) -> "SyntheticSpec":
+        """Parse "synthetic:WIDTHxHEIGHT[@FPS][,key=value...]"; raises ValueError on a bad spec."""
+        if not is_synthetic(spec):
+            raise ValueError(f"Not a synthetic source spec: {spec}")
+        size, *options = spec[len(SYNTHETIC_SCHEME):].split(",")
+        size, _, fps = size.partition("@")
+
+        result = cls()
+        try:
+            if size.lower() in RESOLUTION_PRESETS:
+                result.width, result.height = RESOLUTION_PRESETS[size.lower()]
+            elif size:
+                width, height = size.lower().split("x")
+                result.width, result.height = int(width), int(height)
+            if fps:
+                result.fps = float(fps)
+
+            types = {f.name: f.type for f in fields(cls)}
+            for option in options:
+                key, sep, value = option.partition("=")
+                if not sep or key not in types or key in ("width", "height", "fps"):
+                    raise ValueError(f"unknown option {option!r}")
+                setattr(result, key, types[key](value))
+        except ValueError as e:
+            raise ValueError(f"Invalid synthetic source spec {spec!r}: {e}")
+
+        if result.width <= 0 or result.height <= 0 or result.fps <= 0 or result.frames <= 0:
+            raise ValueError(f"Invalid synthetic source spec {spec!r}: size, fps and frames must be positive")
+        return result
+
+
+class SyntheticVideoSource:
+    """Deterministic generated frames behind the cv2.VideoCapture interface."""
+
+    def __init__(self, spec: Union[str, SyntheticSpec]):
+        """Prepare background, objects and noise for a spec (raises ValueError if invalid)."""
+        self.spec = SyntheticSpec.parse(spec) if isinstance(spec, str) else spec
+        self.shape = (self.spec.height, self.spec.width, 3)
+        self.position = 0                    # Next frame grab() moves to
+        self.grabbed: Optional[int] = None   # Frame retrieve() renders
+        self.opened = True
+
+        rng = np.random.default_rng(self.spec.seed)
+        width, height = self.spec.width, self.spec.height
+
+        # Diagonal mid-grey gradient in a random hue (56-130), so lighting and noise have headroom
+        tint = rng.uniform(0.8, 1.0, 3)
+        ramp = np.add.outer(np.linspace(70, 110, height), np.linspace(0, 20, width))
+        self.background = np.clip(ramp[:, :, None] * tint, 0, 255).astype(np.uint8)
+
+        # Rectangles: size, colour, start position and velocity (px/frame, edge to edge in 2-8 s).
+        # Alternately bright and dark, so every object stands out from the background.
+        self.rects = []
+        for n in range(self.spec.objects):
+            w = int(rng.uniform(0.05, 0.2) * width) + 1
+            h = int(rng.uniform(0.05, 0.2) * height) + 1
+            speed = rng.uniform(1 / 8, 1 / 2) / self.spec.fps
+            angle = rng.uniform(0, 2 * math.pi)
+            color = rng.integers(180, 256, 3) if n % 2 == 0 else rng.integers(0, 26, 3)
+            self.rects.append((w, h, tuple(int(c) for c in color),
+                               rng.uniform(0, width - w), rng.uniform(0, height - h),
+                               math.cos(angle) * speed * width, math.sin(angle) * speed * height))
+        self.lighting_phase = rng.uniform(0, 2 * math.pi)
+
+        # Noise in [0, 2 * noise], minus noise when applied = zero-mean
+        self.noise_field = None
+        if self.spec.noise > 0:
+            self.noise_field = rng.integers(0, 2 * self.spec.noise + 1,
+                                            (height + _NOISE_PAD, width + _NOISE_PAD, 3), dtype=np.uint8)
+
+    def isOpened(self) -> bool:
+        return self.opened
+
+    def release(self):
+        self.opened = False
+
+    def get(self, prop_id: int) -> float:
+        """Stream properties, like cv2.VideoCapture.get (0 for unsupported properties)."""
+        return {
+            cv2.CAP_PROP_FPS: self.spec.fps,
+            cv2.CAP_PROP_FRAME_COUNT: self.spec.frames,
+            cv2.CAP_PROP_FRAME_WIDTH: self.spec.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.spec.height,
+            cv2.CAP_PROP_POS_FRAMES: self.position,
+            cv2.CAP_PROP_POS_MSEC: (self.position if self.grabbed is None else self.grabbed) * 1000.0 / self.spec.fps,
+        }.get(prop_id, 0.0)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """Seek (CAP_PROP_POS_FRAMES only) - exact, since any frame can be rendered directly."""
+        if prop_id != cv2.CAP_PROP_POS_FRAMES:
+            return False
+        self.position = min(max(int(value), 0), self.spec.frames)
+        self.grabbed = None
+        return True
+
+    def grab(self) -> bool:
+        """Advance to the next frame without rendering it."""
+        if not self.opened or self.position >= self.spec.frames:
+            return False
+        self.grabbed = self.position
+        self.position += 1
+        return True
+
+    def retrieve(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Render the grabbed frame, into image if it has the frame's shape."""
+        if self.grabbed is None:
+            return False, None
+        return True, self.render(self.grabbed, image)
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Next frame, like cv2.VideoCapture.read (rendered into image if it fits)."""
+        if not self.grab():
+            return False, None
+        return self.retrieve(image)
+
+    def render(self, index: int, image: Optional[np.ndarray] = None) -> np.ndarray:
+        """Frame index of the source."""
+        if image is None or image.shape != self.shape or image.dtype != np.uint8:
+            image = np.empty(self.shape, dtype=np.uint8)
+
+        gain = 1.0
+        if self.spec.lighting:
+            t = index / self.spec.fps
+            gain += self.spec.lighting * math.sin(2 * math.pi * t / _LIGHTING_PERIOD_S + self.lighting_phase)
+        if gain == 1.0:
+            np.copyto(image, self.background)
+        else:
+            cv2.convertScaleAbs(self.background, dst=image, alpha=gain)
+
+        for (x, y, w, h), rect in zip(self.object_boxes(index), self.rects):
+            lit = tuple(min(255, int(c * gain)) for c in rect[2])
+            cv2.rectangle(image, (x, y), (x + w - 1, y + h - 1), lit, -1)
+
+        if self.noise_field is not None:
+            dx = (index * 37 + self.spec.seed) % _NOISE_PAD
+            dy = (index * 23 + self.spec.seed * 7) % _NOISE_PAD
+            cv2.add(image, self.noise_field[dy:dy + self.spec.height, dx:dx + self.spec.width], dst=image)
+            cv2.subtract(image, (self.spec.noise,) * 3 + (0,), dst=image)
+        return image
+
+    def object_boxes(self, index: int) -> List[Tuple[int, int, int, int]]:
+        """Bounding boxes (x, y, w, h) of the moving rectangles in frame index (ground truth for benchmarks)."""
+        boxes = []
+        for w, h, _, x0, y0, vx, vy in self.rects:
+            x = int(_bounce(x0 + vx * index, self.spec.width - w))
+            y = int(_bounce(y0 + vy * index, self.spec.height - h))
+            boxes.append((x, y, w, h))
+        return boxes
+
+
+def _bounce(position: float, limit: float) -> float:
+    """Position bouncing between 0 and limit (a triangle wave)."""
+    if limit <= 0:
+        return 0.0
+    position %= 2 * limit
+    return 2 * limit - position if position > limit else position
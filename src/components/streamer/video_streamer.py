@@ -2,43 +2,121 @@
 Video Streamer Component - Reads video files and streams frames to pipeline.
 """
 import cv2
+import os
+import queue
 import time
 import logging
 import threading
-from typing import Optional, Callable
+from typing import Optional, Callable, Union
+import numpy as np
 from pathlib import Path
 
-from core.data_models import FrameData, SystemMessage
-from communication.zmq_manager import ZMQManager, PipelineComm
+from core.data_models import FrameData, SystemMessage, StreamDescriptor, DEFAULT_STREAM_ID
+from core.buffer_pool import FrameBufferPool
+from communication.zmq_manager import ZMQManager, PipelineComm, SendTracker
+from communication.shared_memory import SharedFrameRing
+from .frame_prefetch import FramePrefetcher, FrameItem, frame_pts
+from .segment_source import ParallelSegmentSource, DEFAULT_MAX_BUFFER_BYTES
+from .frame_cache import FrameCache, FrameArchive, FrameArchiveWriter, CachedFrameSource
+from .synthetic_source import is_synthetic, open_capture
 
 
 class VideoStreamer:
     """Streams video frames from file to the detection pipeline."""
     
-    def __init__(self, video_path: str, target_fps: Optional[float] = None):
+    def __init__(self, video_path: str, target_fps: Optional[float] = None,
+                 shared_memory: bool = False, shm_slots: int = 16, shm_readers: int = 2,
+                 fanout_to_display: bool = False, codec: Optional[str] = None, prefetch_depth: int = 8,
+                 catch_up_lag: Optional[float] = 0.5, offline: bool = False,
+                 decode_workers: int = 0, segment_frames: int = 64, frame_cache_dir: Optional[str] = None,
+                 detector_pool: int = 0, decode_buffer_bytes: int = DEFAULT_MAX_BUFFER_BYTES):
         """
         Initialize video streamer.
         
         Args:
-            video_path: Path to video file
+            video_path: Path to video file, or a synthetic source spec ("synthetic:1280x720@30,...")
             target_fps: Target FPS (None = use original video FPS)
+            shared_memory: Pass frames through a shared-memory ring instead of the socket
+            shm_slots: Number of frame slots in the shared-memory ring
+            shm_readers: Number of downstream stages reading each slot (Detector + Display = 2)
+            fanout_to_display: Also send every frame directly to the Display, so the
+                               Detector can emit metadata-only results
+            codec: Frame codec for outgoing frames (e.g. "jpeg:80"; None = channel default)
+            prefetch_depth: Frames decoded ahead on a separate thread (0 = decode inline)
+            catch_up_lag: Seconds behind schedule after which frames are skipped to get
+                          back on time (None = never skip, send late frames in a burst)
+            offline: Batch mode - no pacing or skipping: frames are sent as fast as the
+                     pipeline accepts them (lossless channels apply the backpressure)
+            decode_workers: Decode segments of the file in this many worker processes
+                            instead of one capture (0 = off; replaces prefetch_depth)
+            segment_frames: Frames per decode segment with decode_workers
+            frame_cache_dir: Decoded-frame cache directory (None = off): a complete run
+                             records the decoded frames, later runs of the same file
+                             stream them from the memory-mapped archive without decoding
+            detector_pool: Detector workers sharing the frames (0 = a single Detector):
+                           every frame carries its predecessor, and each worker gets
+                           an end-of-stream signal
+            decode_buffer_bytes: Shared memory for the decode segments with decode_workers;
+                                 fewer segments are decoded ahead if they don't fit
         """
         self.video_path = Path(video_path)
         self.target_fps = target_fps
         self.cap: Optional[cv2.VideoCapture] = None
         self.sender: Optional[ZMQManager] = None
         
+        # Shared-memory transport
+        self.shared_memory = shared_memory
+        self.shm_slots = shm_slots
+        self.shm_readers = shm_readers
+        self.frame_ring: Optional[SharedFrameRing] = None
+        
+        # Frame fan-out to Display (metadata-only detection mode)
+        self.fanout_to_display = fanout_to_display
+        self.fanout_sender: Optional[ZMQManager] = None
+        self.control_publisher: Optional[ZMQManager] = None  # End-of-stream to every pooled Detector
+        
+        self.codec = codec
+        self.detector_pool = detector_pool
+        
+        # Decoder read-ahead
+        self.prefetch_depth = prefetch_depth
+        self.prefetcher: Optional[Union[FramePrefetcher, ParallelSegmentSource, CachedFrameSource]] = None
+        
+        # Parallel segment decoding
+        self.decode_workers = decode_workers
+        self.segment_frames = segment_frames
+        self.decode_buffer_bytes = decode_buffer_bytes
+        
+        # Decoded-frame cache
+        # (synthetic sources are generated, there is no decode to save)
+        self.frame_cache = FrameCache(frame_cache_dir) if frame_cache_dir and not is_synthetic(video_path) else None
+        self.cache_writer: Optional[FrameArchiveWriter] = None  # Recording this run (cache miss)
+        self.cache_archive: Optional[FrameArchive] = None       # Streaming from the cache (hit)
+        self.cache_recorded: Optional[str] = None               # Archive written by the last run
+        self.cache_recorded_frames = 0
+        
+        # Deadline scheduling
+        self.catch_up_lag = None if offline else catch_up_lag
+        self.offline = offline
+        self.source_index = 0      # Next frame index in the video (inline decode)
+        self.frames_sent = 0       # Accepted by the Detector channel (its drops not counted)
+        self.frames_skipped = 0    # Skipped to catch up with real time
+        self.lag = 0.0             # Seconds behind schedule at the last frame
+        self.max_lag = 0.0
+        
         # Video properties (set after opening)
         self.original_fps = 0.0
         self.total_frames = 0
         self.frame_width = 0
         self.frame_height = 0
+        self.buffer_pool: Optional[FrameBufferPool] = None  # Decode targets, reused once sent
         
         # Streaming state
         self.is_streaming = False
         self.is_paused = False
         self.current_frame_id = 0
         self.start_time = 0.0
+        self.end_time = 0.0
         
         # Threading
         self.stream_thread: Optional[threading.Thread] = None
@@ -49,11 +127,11 @@ class VideoStreamer:
     def open_video(self) -> bool:
         """Open video file and setup capture."""
         try:
-            if not self.video_path.exists():
+            if not is_synthetic(str(self.video_path)) and not self.video_path.exists():
                 self.logger.error(f"Video file not found: {self.video_path}")
                 return False
             
-            self.cap = cv2.VideoCapture(str(self.video_path))
+            self.cap = open_capture(str(self.video_path))
             
             if not self.cap.isOpened():
                 self.logger.error(f"Failed to open video: {self.video_path}")
@@ -83,11 +161,37 @@ class VideoStreamer:
     def setup_communication(self) -> bool:
         """Setup ZMQ communication to detector."""
         try:
-            self.sender = PipelineComm.create_streamer_sender()
+            if self.shared_memory:
+                self.frame_ring = SharedFrameRing.create(
+                    name=f"axon_frames_{os.getpid()}",
+                    slot_bytes=self.frame_width * self.frame_height * 3,  # BGR uint8
+                    num_slots=self.shm_slots,
+                    num_readers=self.shm_readers
+                )
+                self.logger.info(f"Shared-memory frame ring: {self.shm_slots} slots, "
+                                 f"{self.shm_readers} readers ({self.frame_ring.name})")
+            
+            self.sender = PipelineComm.create_streamer_sender(frame_ring=self.frame_ring, codec=self.codec)
             if not self.sender.start():
                 self.logger.error("Failed to start ZMQ sender")
                 return False
             
+            if self.fanout_to_display:
+                # Display gets frames from the fan-out, so a drop here only concerns the Detector
+                self.sender.shm_drop_readers = (PipelineComm.SHM_READER_DETECTOR,)
+                self.fanout_sender = PipelineComm.create_streamer_fanout_sender(frame_ring=self.frame_ring,
+                                                                           codec=self.codec)
+                if not self.fanout_sender.start():
+                    self.logger.error("Failed to start fan-out sender")
+                    return False
+            
+            if self.detector_pool:
+                # PUSH deals messages round-robin, so only a broadcast reaches every worker
+                self.control_publisher = PipelineComm.create_control_publisher()
+                if not self.control_publisher.start():
+                    self.logger.error("Failed to start control publisher")
+                    return False
+            
             self.logger.info("Communication setup complete")
             return True
             
@@ -100,6 +204,7 @@ class VideoStreamer:
         if self.is_streaming:
             self.logger.warning("Already streaming")
             return True
+        self.stop_streaming()  # Release the sockets of a run that ended (loop mode)
         
         if not self.open_video():
             return False
@@ -111,8 +216,45 @@ class VideoStreamer:
         # Reset state
         self.stop_event.clear()
         self.current_frame_id = 0
+        self.source_index = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.end_time = 0.0
         self.is_paused = False
         
+        # Decode into reused buffers (segment frames are copied into them from shared memory)
+        self.buffer_pool = FrameBufferPool.for_stream(self.stream_descriptor())
+        
+        # Cached frames need no decoding; otherwise record this run for the next one
+        self.cache_archive = self.frame_cache.open(str(self.video_path)) if self.frame_cache else None
+        self.cache_recorded = None
+        if self.frame_cache and self.cache_archive is None:
+            self.cache_writer = self.frame_cache.create(str(self.video_path),
+                                                        (self.frame_height, self.frame_width, 3),
+                                                        fps=self.original_fps)
+        
+        # Decode ahead of the paced send loop
+        if self.cache_archive is not None:
+            self.prefetcher = CachedFrameSource(self.cache_archive)
+            self.logger.info(f"Streaming {len(self.cache_archive)} cached frames from {self.cache_archive.path}")
+        elif self.decode_workers > 0:
+            self.prefetcher = ParallelSegmentSource(str(self.video_path), self.total_frames,
+                                                    workers=self.decode_workers,
+                                                    segment_frames=self.segment_frames,
+                                                    pool=self.buffer_pool,
+                                                    max_buffer_bytes=self.decode_buffer_bytes)
+            try:
+                self.prefetcher.start()
+            except (ValueError, RuntimeError) as e:
+                self.logger.error(f"Failed to start segment decoding: {e}")
+                self._cleanup()
+                return False
+        elif self.prefetch_depth > 0:
+            self.prefetcher = FramePrefetcher(self.cap, depth=self.prefetch_depth, pool=self.buffer_pool)
+            self.prefetcher.start()
+        
         # Start streaming thread
         self.stream_thread = threading.Thread(target=self._stream_loop, daemon=True)
         self.stream_thread.start()
@@ -122,17 +264,21 @@ class VideoStreamer:
         return True
     
     def stop_streaming(self):
-        """Stop streaming and cleanup."""
-        if not self.is_streaming:
+        """Stop streaming and cleanup (also after the video ended)."""
+        if self.stream_thread is None:
             return
         
         self.logger.info("Stopping streaming...")
         self.stop_event.set()
+        for sender in (self.sender, self.fanout_sender):
+            if sender:
+                sender.interrupt()  # Don't let a lossless send wait out the join
         
         if self.stream_thread and self.stream_thread.is_alive():
             self.stream_thread.join(timeout=2.0)
         
         self.is_streaming = False
+        self.stream_thread = None
         self._cleanup()
         self.logger.info("Streaming stopped")
     
@@ -149,74 +295,196 @@ class VideoStreamer:
     def _stream_loop(self):
         """Main streaming loop (runs in separate thread)."""
         frame_duration = 1.0 / self.target_fps  # Time between frames
-        self.start_time = time.time()
+        self.start_time = time.monotonic()  # start/end_time measure durations only
+        descriptor = self.stream_descriptor()
+        
+        # Frame i is due at anchor + i * frame_duration (monotonic clock), so
+        # sleep errors and slow frames never accumulate into drift
+        anchor = time.monotonic()
+        paused = False
+        reached_end = False
+        prev_frame = None  # Last frame sent, travels with the next one to a pooled Detector
+        prev_sends = []    # Sends that referenced prev_frame's buffer
+        prev_frame_id = -1  # Last frame_id sent, so results can be ordered across skipped ids
+        done_frames = []   # (decode buffer, its sends) to give back to the pool
         
         try:
             while not self.stop_event.is_set():
                 if self.is_paused:
+                    paused = True
                     time.sleep(0.1)
                     continue
+                if paused:
+                    # Resume the schedule from the current frame
+                    anchor = time.monotonic() - self.current_frame_id * frame_duration
+                    paused = False
                 
-                loop_start = time.time()
+                # Behind real time: skip frames (grabbed without decoding) to get back on schedule
+                self.lag = time.monotonic() - (anchor + self.current_frame_id * frame_duration)
+                self.max_lag = max(self.max_lag, self.lag)
+                if self.catch_up_lag is not None and self.lag > self.catch_up_lag:
+                    skip = int(self.lag / frame_duration)
+                    self._skip_to(self.current_frame_id + skip)
+                    self.logger.debug(f"{self.lag:.3f}s behind - skipping {skip} frames")
                 
-                # Read next frame
-                ret, frame = self.cap.read()
-                if not ret:
-                    self.logger.info("End of video reached")
-                    self.is_streaming = False  # Mark streaming as done
+                # Read next frame (already decoded by the prefetch thread, if enabled)
+                item = self._read_frame()
+                if item is None:
+                    if not self.stop_event.is_set():
+                        self.logger.info("End of video reached")
+                        self.is_streaming = False  # Mark streaming as done
+                        reached_end = True
                     break
+                frame_index, frame, pts_ms = item
+                decoded_frame = frame  # Not the ring slot: it may be reused before the next send
+                if self.cache_writer:
+                    self._record_frame(frame_index, frame, pts_ms)
+                self.frames_skipped += frame_index - self.current_frame_id
+                self.current_frame_id = frame_index  # frame_id is the frame's index in the video
                 
-                # Create FrameData
-                frame_data = FrameData.create(
-                    frame_id=self.current_frame_id,
-                    frame=frame,
-                    metadata={
-                        'width': self.frame_width,
-                        'height': self.frame_height,
-                        'fps': self.target_fps,
-                        'original_fps': self.original_fps,
-                        'video_path': str(self.video_path)
-                    }
-                )
+                # With fan-out, place the frame in the ring once so both sends reference the same slot
+                if self.frame_ring is not None and self.fanout_sender:
+                    ref = self.frame_ring.write(frame)
+                    frame = self.frame_ring.read(ref, {'dtype': frame.dtype.str, 'shape': frame.shape, 'strides': None})
                 
-                # Send frame to detector
-                success = self.sender.send_frame_data(frame_data, timeout_ms=500)
-                if not success:
-                    self.logger.warning(f"Failed to send frame {self.current_frame_id}")
+                # Create FrameData (stream properties travel once, in the descriptor)
+                frame_data = FrameData.create(frame_id=self.current_frame_id, frame=frame, pts_ms=pts_ms,
+                                              prev_frame=prev_frame, prev_frame_id=prev_frame_id)
+                self.buffer_pool.release_all(done_frames)  # The last frame's locals are replaced by now
                 
-                self.current_frame_id += 1
+                # Send frame to detector, preceded by the descriptor when the receiver lacks it
+                self.sender.send_stream_descriptor(descriptor, timeout_ms=500)
+                sends = [SendTracker()]
+                success = self.sender.send_frame_data(frame_data, timeout_ms=500, send=sends[0])
+                if success:
+                    prev_frame_id = self.current_frame_id
+                    self.frames_sent += 1
+                else:
+                    self.logger.debug(f"Dropped frame {self.current_frame_id}")  # Counted by the sender
+                
+                # Same frame straight to Display (references the same ring slot in shm mode)
+                if self.fanout_sender:
+                    frame_data.prev_frame = None  # Only the Detector needs it
+                    self.fanout_sender.send_stream_descriptor(descriptor, timeout_ms=500)
+                    sends.append(SendTracker())
+                    if not self.fanout_sender.send_frame_data(frame_data, timeout_ms=500, send=sends[-1]):
+                        self.logger.debug(f"Dropped fan-out frame {self.current_frame_id}")
                 
-                # Frame rate control
-                loop_time = time.time() - loop_start
-                sleep_time = frame_duration - loop_time
+                # Done with the decode buffer once its sends are - for a pooled Detector,
+                # after it went out once more as the next frame's predecessor
+                if self.detector_pool and success:
+                    done_frames.append((prev_frame, prev_sends + sends))
+                    prev_frame, prev_sends = decoded_frame, sends
+                else:
+                    done_frames.append((decoded_frame, sends))
                 
+                self.current_frame_id += 1
+                
+                # Frame rate control: sleep until the next frame's deadline
+                if self.offline:
+                    continue  # Unpaced - the lossless sends hold us to the pipeline's pace
+                sleep_time = anchor + self.current_frame_id * frame_duration - time.monotonic()
                 if sleep_time > 0:
                     time.sleep(sleep_time)
-                elif sleep_time < -0.01:  # If we're more than 10ms behind
-                    self.logger.debug(f"Frame processing taking too long: {loop_time:.3f}s")
         
         except Exception as e:
             self.logger.error(f"Streaming error: {e}")
         
         finally:
+            self.end_time = time.monotonic()
+            done_frames.append((prev_frame, prev_sends))
+            self.buffer_pool.release_all(done_frames)
+            self._finish_recording(complete=reached_end)
+            
             # Send end-of-stream signal
             try:
                 end_message = SystemMessage(
                     message_type="end_of_stream",
-                    payload={'total_frames': self.current_frame_id},
+                    payload={'total_frames': self.current_frame_id, 'frames_skipped': self.frames_skipped,
+                             'last_frame_ids': {DEFAULT_STREAM_ID: prev_frame_id},
+                             'throughput_fps': self.throughput_fps()},
                     timestamp=time.time()
                 )
-                self.sender.send_system_message(end_message)
+                self.sender.send_system_message(end_message)  # After the frames, to one pooled worker
+                if self.control_publisher:
+                    subscribers = self.control_publisher.wait_for_subscribers(self.detector_pool, timeout_ms=2000)
+                    if subscribers < self.detector_pool:
+                        self.logger.warning(f"Only {subscribers} of {self.detector_pool} Detector workers "
+                                            f"subscribed to end-of-stream")
+                    self.control_publisher.send_system_message(end_message)  # Every worker drains its queue and ends
                 self.logger.info(f"Sent end-of-stream signal after {self.current_frame_id} frames")
             except Exception as e:
                 self.logger.error(f"Failed to send end-of-stream: {e}")
     
+    def _record_frame(self, frame_index: int, frame: np.ndarray, pts_ms: float):
+        """Add a frame to the cache being recorded; a gap (skipped frames) abandons the recording."""
+        if frame_index != self.cache_writer.frames_written or not self.cache_writer.append(frame, pts_ms):
+            self.logger.info(f"Frame {frame_index} can't be cached in order - not caching this run")
+            self.cache_writer.abort()
+            self.cache_writer = None
+    
+    def _finish_recording(self, complete: bool):
+        """Move a recorded cache into place after a complete run, else discard it."""
+        if self.cache_writer is None:
+            return
+        try:
+            if complete and self.cache_writer.frames_written > 0:
+                self.cache_recorded = self.cache_writer.finish()
+                self.cache_recorded_frames = self.cache_writer.frames_written
+                self.logger.info(f"Cached {self.cache_writer.frames_written} decoded frames in {self.cache_recorded}")
+            else:
+                self.cache_writer.abort()
+        except OSError as e:
+            self.logger.error(f"Failed to write frame cache: {e}")
+            self.cache_writer.abort()
+        self.cache_writer = None
+    
+    def _read_frame(self) -> Optional[FrameItem]:
+        """Next decoded frame with its index in the video and PTS, or None at the end (or when stopping)."""
+        if self.prefetcher is None:
+            buffer = self.buffer_pool.acquire()
+            ret, frame = self.cap.read(buffer)
+            if frame is not buffer:
+                self.buffer_pool.release(buffer)  # Not decoded into (end of video, or another frame size)
+            if not ret:
+                return None
+            self.source_index += 1
+            return self.source_index - 1, frame, frame_pts(self.cap, self.source_index - 1, self.original_fps)
+        
+        while not self.stop_event.is_set():
+            try:
+                return self.prefetcher.get(timeout=0.5)
+            except queue.Empty:
+                self.logger.debug("Decoder stalled - waiting for next frame")
+        return None
+    
+    def _skip_to(self, frame_index: int):
+        """Skip frames before frame_index without decoding them."""
+        if self.prefetcher is not None:
+            self.prefetcher.skip_to(frame_index)
+            return
+        
+        while self.source_index < frame_index and self.cap.grab():
+            self.source_index += 1
+    
     def _cleanup(self):
         """Cleanup resources."""
+        if self.prefetcher:
+            self.prefetcher.stop()  # Decode thread must release the capture first
+            self.prefetcher = None
         self.close_video()
         if self.sender:
             self.sender.stop()
             self.sender = None
+        if self.fanout_sender:
+            self.fanout_sender.stop()
+            self.fanout_sender = None
+        if self.control_publisher:
+            self.control_publisher.stop()
+            self.control_publisher = None
+        if self.frame_ring:
+            self.frame_ring.close()
+            self.frame_ring = None
     
     def close_video(self):
         """Close video capture."""
@@ -224,13 +492,41 @@ class VideoStreamer:
             self.cap.release()
             self.cap = None
     
+    def frame_cache_status(self) -> Optional[dict]:
+        """Decoded-frame cache state: streaming from it, recording it, or neither (None if off)."""
+        if self.frame_cache is None:
+            return None
+        if self.cache_archive is not None:
+            return {'mode': 'hit', 'path': self.cache_archive.path, 'frames': len(self.cache_archive)}
+        if self.cache_writer is not None:
+            return {'mode': 'recording', 'path': str(self.cache_writer.path), 'frames': self.cache_writer.frames_written}
+        if self.cache_recorded is not None:
+            return {'mode': 'recorded', 'path': self.cache_recorded, 'frames': self.cache_recorded_frames}
+        return {'mode': 'off', 'path': None, 'frames': 0}
+    
+    def stream_descriptor(self) -> StreamDescriptor:
+        """Static properties of the stream, sent once instead of with every frame."""
+        return StreamDescriptor(
+            stream_id=DEFAULT_STREAM_ID,
+            width=self.frame_width,
+            height=self.frame_height,
+            fps=self.target_fps,
+            original_fps=self.original_fps,
+            video_path=str(self.video_path)
+        )
+    
+    def throughput_fps(self) -> float:
+        """Frames sent per second of streaming, up to now or the end of the video."""
+        elapsed = (self.end_time or time.monotonic()) - self.start_time if self.start_time > 0 else 0
+        return self.frames_sent / elapsed if elapsed > 0 else 0.0
+    
     def get_progress(self) -> dict:
         """Get streaming progress information."""
         if not self.is_streaming:
             return {'progress': 0.0, 'frame_id': 0, 'total_frames': 0}
         
         progress = (self.current_frame_id / self.total_frames) * 100 if self.total_frames > 0 else 0
-        elapsed_time = time.time() - self.start_time if self.start_time > 0 else 0
+        elapsed_time = time.monotonic() - self.start_time if self.start_time > 0 else 0
         
         return {
             'progress': progress,
@@ -238,7 +534,16 @@ class VideoStreamer:
             'total_frames': self.total_frames,
             'elapsed_time': elapsed_time,
             'fps': self.target_fps,
-            'is_paused': self.is_paused
+            'is_paused': self.is_paused,
+            'frames_sent': self.frames_sent,
+            'frames_skipped': self.frames_skipped,
+            'throughput_fps': self.throughput_fps(),
+            'lag_ms': self.lag * 1000,
+            'max_lag_ms': self.max_lag * 1000,
+            'send': self.sender.get_send_stats() if self.sender else None,
+            'prefetch': self.prefetcher.get_stats() if self.prefetcher else None,
+            'buffer_pool': self.buffer_pool.get_stats() if self.buffer_pool else None,
+            'frame_cache': self.frame_cache_status()
         }
     
     def __del__(self):
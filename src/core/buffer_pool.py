@@ -0,0 +1,177 @@
+"""
+Frame Buffer Pool - Reuses frame-sized arrays instead of allocating per frame.
+
+Decoding (cap.read), colour conversion, differencing and overlay drawing each
+allocate a fresh frame-sized ndarray per frame by default. A pool hands out
+preallocated arrays of one shape, to be used as the output argument (cv2
+``dst=``, ``cap.read(image)``, ``np.copyto``).
+
+Whoever acquires a buffer owns it until it calls ``release()``: the stage
+that last needs it (after a send, when a previous frame is replaced, when a
+queued frame is discarded) gives it back. A buffer still referenced by a
+zero-copy ZeroMQ send is released ``until`` the send's trackers are done,
+and is reused only after that. A buffer that is never released is simply
+not reused. After warm-up the pool holds as many buffers as are in use at
+once, and ``get_stats()['allocations']`` stops growing.
+
+With ``debug`` (or PIPELINE_BUFFER_POOL_DEBUG=1), acquire() checks that a
+released buffer is referenced by nothing but the pool, which catches a
+release while the buffer is still in use.
+"""
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .data_models import StreamDescriptor
+
+_POOL_REFS = 2  # References to a free buffer seen by the debug check: the pool's list and getrefcount's argument
+
+
+def debug_checks_enabled() -> bool:
+    """Whether pools check released buffers by default (PIPELINE_BUFFER_POOL_DEBUG environment variable)."""
+    return os.getenv("PIPELINE_BUFFER_POOL_DEBUG", "").strip().lower() in ("1", "true", "yes")
+
+
+class FrameBufferPool:
+    """Reusable arrays of one shape and dtype, handed out by acquire() and given back by release()."""
+
+    def __init__(self, shape: Tuple[int, ...], dtype=np.uint8, preallocate: int = 0, debug: Optional[bool] = None):
+        """
+        Initialize buffer pool.
+
+        Args:
+            shape: Shape of every buffer (e.g. (height, width, 3))
+            dtype: Buffer dtype
+            preallocate: Buffers to allocate up front (more are added on demand)
+            debug: Check on reuse that a released buffer is no longer referenced
+                   (None = PIPELINE_BUFFER_POOL_DEBUG environment variable)
+        """
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.debug = debug_checks_enabled() if debug is None else debug
+        self.buffers: List[np.ndarray] = []
+        self.indexes: Dict[int, int] = {}  # id(buffer) -> index in buffers
+        self.free: List[int] = []          # Released buffers, reused last-in first-out (warm in cache)
+        self.returned: List[Tuple[int, Sequence]] = []  # Released until their sends are done
+        self.lent: Set[int] = set()        # Acquired and not released
+        self.lock = threading.Lock()       # Decode threads acquire, send loops release
+
+        # Statistics
+        self.allocations = 0
+        self.reuses = 0
+
+        for _ in range(preallocate):
+            self.free.append(self._allocate())
+
+    @classmethod
+    def for_stream(cls, descriptor: StreamDescriptor, channels: int = 3, preallocate: int = 0) -> "FrameBufferPool":
+        """Pool of frames sized from a stream descriptor (channels 1 = single-channel frames)."""
+        shape = (descriptor.height, descriptor.width) if channels == 1 else (descriptor.height, descriptor.width, channels)
+        return cls(shape, preallocate=preallocate)
+
+    def acquire(self) -> np.ndarray:
+        """Get a free buffer (contents undefined), allocating one if all are in use."""
+        with self.lock:
+            if not self.free:
+                self._collect_returned()
+            if not self.free:
+                index = self._allocate()
+            else:
+                index = self.free.pop()
+                if self.debug and sys.getrefcount(self.buffers[index]) > _POOL_REFS:
+                    raise RuntimeError(f"Pool buffer {index} {self.shape} was released while still referenced")
+                self.reuses += 1
+            self.lent.add(index)
+            return self.buffers[index]
+
+    def release(self, buffer: Optional[np.ndarray], until: Sequence = ()) -> bool:
+        """
+        Give back an acquired buffer; the caller must not use it afterwards.
+
+        until holds objects with a done attribute (zmq.MessageTracker,
+        SendTracker) for sends that still reference the buffer; it is reused
+        only once all are done. Returns False, and does nothing, for None,
+        buffers of another pool and buffers not currently acquired.
+        """
+        if buffer is None:
+            return False
+        with self.lock:
+            return self._release(buffer, until)
+
+    def release_all(self, frames: List[Tuple[np.ndarray, Sequence]]):
+        """
+        release() each (buffer, until) pair in frames, emptying the list.
+
+        The list is emptied under the pool's lock, so a caller releasing from
+        another thread than the one acquiring keeps no reference to a buffer
+        that may already be handed out again (the debug check would see it).
+        """
+        with self.lock:
+            while frames:
+                self._release(*frames.pop())
+
+    def _release(self, buffer: Optional[np.ndarray], until: Sequence) -> bool:
+        """release() with the lock held."""
+        index = self.indexes.get(id(buffer))
+        if index is None or index not in self.lent or self.buffers[index] is not buffer:
+            return False
+        self.lent.discard(index)
+        if any(not tracker.done for tracker in until):
+            self.returned.append((index, until))
+        else:
+            self.free.append(index)
+        return True
+
+    def matches(self, shape: Tuple[int, ...]) -> bool:
+        """Whether the pool's buffers have this shape."""
+        return self.shape == tuple(shape)
+
+    def _collect_returned(self):
+        """Move returned buffers whose sends are done to the free list."""
+        waiting = []
+        for index, until in self.returned:
+            if all(tracker.done for tracker in until):
+                self.free.append(index)
+            else:
+                waiting.append((index, until))
+        self.returned = waiting
+
+    def _allocate(self) -> int:
+        """Add a new buffer to the pool; returns its index."""
+        buffer = np.empty(self.shape, dtype=self.dtype)
+        self.indexes[id(buffer)] = len(self.buffers)
+        self.buffers.append(buffer)
+        self.allocations += 1
+        return len(self.buffers) - 1
+
+    def in_use(self) -> int:
+        """Buffers acquired and not released, or released with their sends still in flight."""
+        with self.lock:
+            self._collect_returned()
+            return len(self.lent) + len(self.returned)
+
+    def get_stats(self) -> dict:
+        """Get pool size and allocation counters."""
+        return {
+            'shape': self.shape,
+            'buffers': len(self.buffers),
+            'in_use': self.in_use(),
+            'allocations': self.allocations,
+            'reuses': self.reuses
+        }
+
+
+def merge_pool_stats(pools: List[Optional[FrameBufferPool]]) -> dict:
+    """Sum the counters of several pools (e.g. one per stream)."""
+    stats = {'pools': 0, 'buffers': 0, 'in_use': 0, 'allocations': 0, 'reuses': 0}
+    for pool in pools:
+        if pool is None:
+            continue
+        pool_stats = pool.get_stats()
+        stats['pools'] += 1
+        for key in ('buffers', 'in_use', 'allocations', 'reuses'):
+            stats[key] += pool_stats[key]
+    return stats
@@ -1,29 +1,79 @@
 """
 Core data models for the video processing pipeline.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import List, Dict, Any, Tuple, Optional
 import numpy as np
+import socket
 import time
 
+DEFAULT_STREAM_ID = "default"  # Stream of single-source pipelines
+
+
+def _capture_clock_id() -> str:
+    """Identify this host's monotonic clock: the Linux boot id, else the host name."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return socket.gethostname()
+
+
+CAPTURE_CLOCK = _capture_clock_id()  # Clock domain of capture_time on this host
+
 
 @dataclass
 class FrameData:
-    """Represents a video frame with metadata."""
+    """
+    Represents a video frame with metadata (frame_id counts per stream).
+    
+    timestamp is wall-clock time at capture, for display and logs. Latencies
+    use capture_time (time.monotonic() at capture, comparable between
+    processes on one host and immune to clock adjustments); capture_clock
+    names the host clock it was read on, and age() is None for frames
+    captured on another host. pts_ms is the
+    frame's presentation time in the source recording. prev_frame is the
+    stream's previous frame, sent along to pooled Detector workers (which
+    don't see every frame of the stream themselves). prev_frame_id is the
+    frame_id the Streamer sent before this one on the stream (-1 for its
+    first frame), so results can be put back in order across skipped ids.
+    """
     frame_id: int
     timestamp: float
     frame: np.ndarray
     metadata: Dict[str, Any]
+    stream_id: str = DEFAULT_STREAM_ID
+    pts_ms: Optional[float] = None        # Container presentation timestamp (None = unknown)
+    capture_time: Optional[float] = None  # time.monotonic() at capture (None = unknown)
+    prev_frame: Optional[np.ndarray] = None  # Previous frame of the stream (detector pool only)
+    capture_clock: Optional[str] = None   # CAPTURE_CLOCK of the capturing host (None = unknown)
+    prev_frame_id: Optional[int] = None   # frame_id sent before on the stream (-1 = first, None = unknown)
     
     @classmethod
-    def create(cls, frame_id: int, frame: np.ndarray, metadata: Optional[Dict[str, Any]] = None):
-        """Create a FrameData instance with current timestamp."""
+    def create(cls, frame_id: int, frame: np.ndarray, metadata: Optional[Dict[str, Any]] = None,
+               stream_id: str = DEFAULT_STREAM_ID, pts_ms: Optional[float] = None,
+               prev_frame: Optional[np.ndarray] = None, prev_frame_id: Optional[int] = None):
+        """Create a FrameData instance with current wall-clock and monotonic timestamps."""
         return cls(
             frame_id=frame_id,
             timestamp=time.time(),
             frame=frame,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            stream_id=stream_id,
+            pts_ms=pts_ms,
+            capture_time=time.monotonic(),
+            prev_frame=prev_frame,
+            capture_clock=CAPTURE_CLOCK,
+            prev_frame_id=prev_frame_id
         )
+    
+    def captured_here(self) -> bool:
+        """Whether capture_time is on this host's monotonic clock (frames without a clock id count as local)."""
+        return self.capture_time is not None and self.capture_clock in (None, CAPTURE_CLOCK)
+    
+    def age(self) -> Optional[float]:
+        """Seconds since capture on the monotonic clock (None if unknown or captured on another host)."""
+        return time.monotonic() - self.capture_time if self.captured_here() else None
 
 
 @dataclass
@@ -43,26 +93,45 @@ class Detection:
 
 @dataclass
 class DetectionResult:
-    """Complete detection result for a frame."""
+    """Complete detection result for a frame (frame is None for metadata-only results)."""
     frame_id: int
     timestamp: float
-    frame: np.ndarray
+    frame: Optional[np.ndarray]
     detections: List[Detection]
     processing_time: float
     metadata: Dict[str, Any]
+    stream_id: str = DEFAULT_STREAM_ID
+    pts_ms: Optional[float] = None        # Of the frame (see FrameData)
+    capture_time: Optional[float] = None
+    capture_clock: Optional[str] = None
+    prev_frame_id: Optional[int] = None   # Of the frame (see FrameData)
     
     @classmethod
     def create(cls, frame_data: FrameData, detections: List[Detection], 
-               processing_time: float, metadata: Optional[Dict[str, Any]] = None):
+               processing_time: float, metadata: Optional[Dict[str, Any]] = None,
+               include_frame: bool = True):
         """Create a DetectionResult from FrameData and detections."""
         return cls(
             frame_id=frame_data.frame_id,
             timestamp=frame_data.timestamp,
-            frame=frame_data.frame,
+            frame=frame_data.frame if include_frame else None,
             detections=detections,
             processing_time=processing_time,
-            metadata=metadata or {}
+            metadata=metadata or {},
+            stream_id=frame_data.stream_id,
+            pts_ms=frame_data.pts_ms,
+            capture_time=frame_data.capture_time,
+            capture_clock=frame_data.capture_clock,
+            prev_frame_id=frame_data.prev_frame_id
         )
+    
+    def captured_here(self) -> bool:
+        """Whether the frame's capture_time is on this host's monotonic clock (see FrameData)."""
+        return self.capture_time is not None and self.capture_clock in (None, CAPTURE_CLOCK)
+    
+    def age(self) -> Optional[float]:
+        """Seconds since the frame was captured, on the monotonic clock (None if unknown or captured on another host)."""
+        return time.monotonic() - self.capture_time if self.captured_here() else None
 
 
 @dataclass
@@ -91,6 +160,32 @@ class SystemMessage:
         )
 
 
+@dataclass
+class StreamDescriptor:
+    """Static properties of a stream, sent once ahead of its frames instead of with every frame."""
+    stream_id: str
+    width: int
+    height: int
+    fps: float
+    original_fps: float
+    video_path: str
+    
+    MESSAGE_TYPE = "stream_descriptor"
+    
+    def to_message(self) -> SystemMessage:
+        """Wrap the descriptor in a SystemMessage (control messages are never dropped)."""
+        return SystemMessage(
+            message_type=self.MESSAGE_TYPE,
+            payload=asdict(self),
+            timestamp=time.time()
+        )
+    
+    @classmethod
+    def from_message(cls, message: SystemMessage) -> "StreamDescriptor":
+        """Rebuild a descriptor from its SystemMessage."""
+        return cls(**message.payload)
+
+
 @dataclass
 class PerformanceMetrics:
     """Performance metrics for monitoring."""
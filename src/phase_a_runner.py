@@ -43,8 +43,8 @@ class PipelineOrchestrator:
             print(f"Python executable: {sys.executable}")
             print("-" * 80)
             
-            # Validate video file
-            if not self.video_path.exists():
+            # Validate video file (synthetic sources are generated by the Streamer)
+            if not str(self.video_path).startswith("synthetic:") and not self.video_path.exists():
                 print(f"ERROR: Video file not found: {self.video_path}")
                 return False
             
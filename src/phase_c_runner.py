@@ -44,8 +44,8 @@ class PipelineCOrchestrator:
             print(f"Python executable: {sys.executable}")
             print("-" * 80)
             
-            # Validate video file
-            if not self.video_path.exists():
+            # Validate video file (synthetic sources are generated by the Streamer)
+            if not str(self.video_path).startswith("synthetic:") and not self.video_path.exists():
                 print(f"ERROR: Video file not found: {self.video_path}")
                 return False
             
@@ -189,6 +189,7 @@ class PipelineCOrchestrator:
                         if i == 4:  # Streamer
                             print(f"✓ {process_name} completed video playback (exit code: {exit_code})")
                             print("  → End-of-stream signal sent to pipeline")
+                            self._report_throughput(process)
                         else:
                             print(f"✓ {process_name} shut down gracefully (exit code: {exit_code})")
                     
@@ -212,6 +213,16 @@ class PipelineCOrchestrator:
         finally:
             self.stop_pipeline()
     
+    def _report_throughput(self, streamer_process: subprocess.Popen):
+        """Echo the throughput line from the finished Streamer's output."""
+        try:
+            output = streamer_process.stdout.read()
+        except Exception:
+            return
+        for line in output.splitlines():
+            if line.strip().startswith("Throughput:"):
+                print(f"  → Streamer {line.strip()}")
+    
     def stop_pipeline(self):
         """Stop all pipeline processes gracefully."""
         if not self.processes:
@@ -13,6 +13,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from components.detector.motion_detector import MotionDetector
+from communication.metrics import TransportMetricsReporter
+from communication.zmq_manager import PipelineComm
 
 
 def signal_handler(signum, frame):
@@ -23,16 +25,48 @@ def signal_handler(signum, frame):
 
 def main():
     parser = argparse.ArgumentParser(description="Video Pipeline Motion Detector Process")
+    parser.add_argument("--engine", default="framediff",
+                       help="Detection engine: framediff, average[:alpha], mog2[:var_threshold], knn[:dist2_threshold] "
+                            "(default: framediff)")
     parser.add_argument("--threshold", type=int, default=25,
                        help="Motion detection threshold (default: 25)")
     parser.add_argument("--min-area", type=int, default=500,
                        help="Minimum area for motion detection (default: 500)")
     parser.add_argument("--dilate-iterations", type=int, default=2,
                        help="Dilation iterations (default: 2)")
+    parser.add_argument("--analysis-scale", type=float, default=1.0,
+                       help="Detect on frames downscaled by this factor, e.g. 0.25 for 4K (default: 1.0)")
+    parser.add_argument("--analysis-width", type=int, default=None,
+                       help="Detect on frames downscaled to this width (overrides --analysis-scale)")
+    parser.add_argument("--blob-extraction", choices=MotionDetector.BLOB_EXTRACTION, default="contours",
+                       help="Find blobs with contours or connected components (faster with hundreds of blobs) (default: contours)")
+    parser.add_argument("--static-check", type=int, default=0, metavar="N",
+                       help="Skip dilation and blob search when no NxN block of the motion mask has N changed pixels "
+                            "(power of two; 1 = any changed pixel, exact) (default: 0 = off)")
+    parser.add_argument("--metadata-only", action="store_true",
+                       help="Send results without frames (Display joins with Streamer fan-out)")
+    parser.add_argument("--codec", default=None,
+                       help="Frame codec: raw, zlib, lz4, jpeg[:quality], gray (default: raw on IPC, $FRAME_CODEC on TCP)")
+    parser.add_argument("--skip-stale", action="store_true",
+                       help="When frames queue up, process only the newest one")
+    parser.add_argument("--asyncio", action="store_true",
+                       help="Run the stage loop on an asyncio event loop (also services the control channel)")
     parser.add_argument("--stats-interval", type=int, default=5,
                        help="Statistics display interval in seconds (default: 5)")
+    parser.add_argument("--offline", action="store_true",
+                       help="Batch mode: lossless frame channels, must match the Streamer (same as PIPELINE_OFFLINE=1)")
+    parser.add_argument("--detector-pool", type=int, default=None, metavar="N",
+                       help="Run as one of N pooled Detector workers, must match the Streamer "
+                            "(same as PIPELINE_DETECTOR_POOL=N; framediff engine only)")
+    parser.add_argument("--metrics-interval", type=float, default=0,
+                       help="Publish transport metrics on the monitoring channel every N seconds (default: 0 = off)")
     
     args = parser.parse_args()
+    if args.offline:
+        PipelineComm.set_offline(True)
+    if args.detector_pool is not None:
+        PipelineComm.set_detector_pool(args.detector_pool)
+    pool_worker = PipelineComm.detector_pool_size() > 0
     
     # Setup signal handlers
     signal.signal(signal.SIGINT, signal_handler)
@@ -41,18 +75,49 @@ def main():
     print("=" * 60)
     print("VIDEO PIPELINE - MOTION DETECTOR PROCESS")
     print("=" * 60)
+    print(f"Engine: {args.engine}")
     print(f"Threshold: {args.threshold}")
     print(f"Min area: {args.min_area}")
     print(f"Dilate iterations: {args.dilate_iterations}")
+    if args.analysis_width:
+        print(f"Analysis width: {args.analysis_width}px")
+    else:
+        print(f"Analysis scale: {args.analysis_scale:g}")
+    print(f"Blob extraction: {args.blob_extraction}")
+    print(f"Static check: {f'{args.static_check}x{args.static_check} blocks' if args.static_check else 'off'}")
+    print(f"Metadata-only results: {args.metadata_only}")
+    print(f"Loop: {'asyncio' if args.asyncio else 'thread'}")
+    print(f"Offline (lossless): {PipelineComm.is_offline()}")
+    print(f"Detector pool: {f'worker of {PipelineComm.detector_pool_size()}' if pool_worker else 'off'}")
+    print(f"Transport metrics: {f'every {args.metrics_interval}s' if args.metrics_interval > 0 else 'off'}")
     print("Press Ctrl+C to stop")
     print("-" * 60)
     
     # Create motion detector
-    detector = MotionDetector(
-        threshold=args.threshold,
-        min_area=args.min_area,
-        dilate_iterations=args.dilate_iterations
-    )
+    try:
+        detector = MotionDetector(
+            threshold=args.threshold,
+            min_area=args.min_area,
+            dilate_iterations=args.dilate_iterations,
+            metadata_only=args.metadata_only,
+            codec=args.codec,
+            skip_stale_frames=args.skip_stale,
+            use_asyncio=args.asyncio,
+            analysis_scale=args.analysis_scale,
+            analysis_width=args.analysis_width,
+            blob_extraction=args.blob_extraction,
+            engine=args.engine,
+            pool_worker=pool_worker,
+            static_check=args.static_check
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    
+    # Transport metrics reporter (optional)
+    reporter = TransportMetricsReporter("detector", args.metrics_interval) if args.metrics_interval > 0 else None
+    if reporter:
+        reporter.start()
     
     try:
         print("Starting motion detection...")
@@ -65,13 +130,13 @@ def main():
         print("Motion detection started - waiting for frames from streamer...")
         
         # Monitor statistics
-        last_stats_time = time.time()
+        last_stats_time = time.monotonic()
         try:
             while detector.is_processing:
                 time.sleep(1)
                 
                 # Show statistics periodically
-                current_time = time.time()
+                current_time = time.monotonic()
                 if current_time - last_stats_time >= args.stats_interval:
                     stats = detector.get_stats()
                     if stats['frames_processed'] > 0:
@@ -89,6 +154,8 @@ def main():
     
     finally:
         print("Stopping motion detector...")
+        if reporter:
+            reporter.stop()  # Final report while sockets are still open
         detector.stop_detection()
         
         # Final statistics
@@ -98,7 +165,23 @@ def main():
         print(f"Frames processed: {stats['frames_processed']}")
         print(f"Total detections: {stats['total_detections']}")
         print(f"Detections per frame: {stats['detections_per_frame']:.2f}")
-        print(f"Average processing time: {stats['avg_processing_time_ms']:.1f}ms")
+        print(f"Average processing time: {stats['avg_processing_time_ms']:.1f}ms "
+              f"(engine {stats['engine']}: {stats['avg_engine_time_ms']:.1f}ms)")
+        print(f"Throughput: {stats['throughput_fps']:.1f} frames/s")
+        static = stats['static_check']
+        if static['block']:
+            saved = f"~{static['cpu_saved_ms']:.0f}ms" if static['cpu_saved_ms'] is not None else "n/a"
+            print(f"Static frames: {static['static_frames']} ({static['static_share']:.0%}), "
+                  f"CPU saved: {saved} (check {static['check_time_ms']:.0f}ms)")
+        if stats['latency']['count']:
+            print(f"Latency (capture to result): p50 {stats['latency']['p50_us'] / 1000:.1f}ms, "
+                  f"p99 {stats['latency']['p99_us'] / 1000:.1f}ms, max {stats['latency']['max_us'] / 1000:.1f}ms")
+        if stats['latency_skipped']:
+            print(f"Latency not measured for {stats['latency_skipped']} frames captured on another host")
+        print(f"Work buffers: {stats['buffer_pool']['allocations']} allocated, "
+              f"{stats['buffer_pool']['reuses']} reused")
+        if stats['send']:
+            print(f"Results dropped: {stats['send']['dropped']} (policy: {stats['send']['policy']})")
         print("Motion detector stopped")
     
     return 0
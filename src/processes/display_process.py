@@ -13,6 +13,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from components.display.video_display import VideoDisplay
+from communication.metrics import TransportMetricsReporter
+from communication.zmq_manager import PipelineComm
 
 
 def signal_handler(signum, frame):
@@ -31,10 +33,34 @@ def main():
                        help="Enable motion blur on detected areas (Phase B)")
     parser.add_argument("--no-window", action="store_true",
                        help="Disable cv2.imshow window (forward to web only)")
+    parser.add_argument("--join-frames", action="store_true",
+                       help="Join metadata-only detection results with frames from the Streamer")
+    parser.add_argument("--join-timeout", type=float, default=1.0,
+                       help="Seconds to wait for a frame/result partner before eviction (default: 1.0)")
+    parser.add_argument("--skip-stale", action="store_true",
+                       help="When results queue up, process only the newest one")
+    parser.add_argument("--asyncio", action="store_true",
+                       help="Run the stage loop on an asyncio event loop (also services the control channel)")
     parser.add_argument("--stats-interval", type=int, default=10,
                        help="Statistics display interval in seconds (default: 10)")
+    parser.add_argument("--offline", action="store_true",
+                       help="Batch mode: lossless frame channels, must match the Streamer (same as PIPELINE_OFFLINE=1)")
+    parser.add_argument("--detector-pool", type=int, default=None, metavar="N",
+                       help="Results come from N pooled Detector workers: reorder them by frame_id, must match "
+                            "the Streamer (same as PIPELINE_DETECTOR_POOL=N)")
+    parser.add_argument("--reorder-buffer", type=int, default=32,
+                       help="Results held while an earlier one is missing, with --detector-pool (default: 32)")
+    parser.add_argument("--reorder-timeout", type=float, default=0.5,
+                       help="Seconds a held result waits for a missing earlier one, with --detector-pool (default: 0.5)")
+    parser.add_argument("--metrics-interval", type=float, default=0,
+                       help="Publish transport metrics on the monitoring channel every N seconds (default: 0 = off)")
     
     args = parser.parse_args()
+    if args.offline:
+        PipelineComm.set_offline(True)
+    if args.detector_pool is not None:
+        PipelineComm.set_detector_pool(args.detector_pool)
+    reorder = PipelineComm.detector_pool_size() > 0
     
     # Setup signal handlers
     signal.signal(signal.SIGINT, signal_handler)
@@ -46,6 +72,11 @@ def main():
     print(f"Window name: {args.window_name}")
     print(f"Show FPS: {not args.no_fps}")
     print(f"Motion blur: {args.blur_detections}")
+    print(f"Join frames: {args.join_frames}")
+    print(f"Loop: {'asyncio' if args.asyncio else 'thread'}")
+    print(f"Offline (lossless): {PipelineComm.is_offline()}")
+    print(f"Detector pool: {f'{PipelineComm.detector_pool_size()} workers, reorder within {args.reorder_buffer} results / {args.reorder_timeout}s' if reorder else 'off'}")
+    print(f"Transport metrics: {f'every {args.metrics_interval}s' if args.metrics_interval > 0 else 'off'}")
     print("Controls: ESC=quit, P=pause/resume")
     print("Press Ctrl+C to stop")
     print("-" * 60)
@@ -55,9 +86,21 @@ def main():
         window_name=args.window_name,
         show_fps=not args.no_fps,
         blur_detections=args.blur_detections,
-        show_window=not args.no_window
+        show_window=not args.no_window,
+        join_frames=args.join_frames,
+        join_timeout=args.join_timeout,
+        skip_stale_frames=args.skip_stale,
+        use_asyncio=args.asyncio,
+        reorder_results=reorder,
+        reorder_buffer_size=args.reorder_buffer,
+        reorder_timeout=args.reorder_timeout
     )
     
+    # Transport metrics reporter (optional)
+    reporter = TransportMetricsReporter("display", args.metrics_interval) if args.metrics_interval > 0 else None
+    if reporter:
+        reporter.start()
+    
     try:
         if args.no_window:
             print("Starting video display (forwarding mode - no window)...")
@@ -74,13 +117,13 @@ def main():
         print("Video display started - waiting for frames from detector...")
         
         # Monitor statistics
-        last_stats_time = time.time()
+        last_stats_time = time.monotonic()
         try:
             while display.is_displaying:
                 time.sleep(1)
                 
                 # Show statistics periodically
-                current_time = time.time()
+                current_time = time.monotonic()
                 if current_time - last_stats_time >= args.stats_interval:
                     stats = display.get_stats()
                     if stats['frames_displayed'] > 0:
@@ -98,6 +141,8 @@ def main():
     
     finally:
         print("Stopping video display...")
+        if reporter:
+            reporter.stop()  # Final report while sockets are still open
         display.stop_display()
         
         # Final statistics
@@ -107,6 +152,18 @@ def main():
         print(f"Frames displayed: {stats['frames_displayed']}")
         print(f"Detections drawn: {stats['detections_drawn']}")
         print(f"Average FPS: {stats['average_fps']:.1f}")
+        print(f"Throughput: {stats['throughput_fps']:.1f} frames/s")
+        if stats['latency']['count']:
+            print(f"Latency (capture to display): p50 {stats['latency']['p50_us'] / 1000:.1f}ms, "
+                  f"p99 {stats['latency']['p99_us'] / 1000:.1f}ms, max {stats['latency']['max_us'] / 1000:.1f}ms")
+        if stats['latency_skipped']:
+            print(f"Latency not measured for {stats['latency_skipped']} frames captured on another host")
+        if stats['reorder']:
+            print(f"Reordered: {stats['reorder']['results_held']} results held back, "
+                  f"{stats['reorder']['frames_missing']} missing frames skipped, "
+                  f"{stats['reorder']['results_late']} late results dropped")
+        print(f"Overlay buffers: {stats['buffer_pool']['allocations']} allocated, "
+              f"{stats['buffer_pool']['reuses']} reused")
         print(f"Session duration: {stats['elapsed_time']:.1f}s")
         print("Video display stopped")
     
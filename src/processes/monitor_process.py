@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Transport Monitor Process
+Collects per-socket transport metrics published by pipeline components
+(started with --metrics-interval) and prints them as a table.
+"""
+import argparse
+import json
+import signal
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from communication.zmq_manager import PipelineComm
+from core.data_models import SystemMessage
+
+
+def signal_handler(signum, frame):
+    """Handle shutdown signals gracefully."""
+    print(f"\nReceived signal {signum}, shutting down monitor...")
+    sys.exit(0)
+
+
+def print_report(payload: dict):
+    """Print one component's transport metrics report."""
+    print(f"[{payload['component']} pid={payload['pid']}]")
+    print(f"  {'endpoint':<34} {'type':<5} {'msgs out':>9} {'MB out':>8} {'msgs in':>9} {'MB in':>8} "
+          f"{'HWM':>6} {'drop':>6} {'ser p99':>8} {'deser p99':>9} {'wait p50':>9}")
+    for socket in payload['sockets']:
+        dropped = socket['send']['dropped'] if socket.get('send') else 0
+        print(f"  {socket['endpoint']:<34} {socket['role']:<5} "
+              f"{socket['messages_sent']:>9} {socket['bytes_sent'] / 1e6:>8.1f} "
+              f"{socket['messages_received']:>9} {socket['bytes_received'] / 1e6:>8.1f} "
+              f"{socket['hwm_hits']:>6} {dropped:>6} "
+              f"{socket['serialize_time']['p99_us']:>6}us {socket['deserialize_time']['p99_us']:>7}us "
+              f"{socket['receive_wait']['p50_us']:>7}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video Pipeline Transport Monitor")
+    parser.add_argument("--json", action="store_true",
+                       help="Print raw reports as JSON lines instead of tables")
+
+    args = parser.parse_args()
+
+    # Setup signal handlers
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    if not args.json:
+        print("=" * 60)
+        print("VIDEO PIPELINE - TRANSPORT MONITOR")
+        print("=" * 60)
+        print("Start components with --metrics-interval N to publish metrics")
+        print("Press Ctrl+C to stop")
+        print("-" * 60)
+
+    subscriber = PipelineComm.create_metrics_subscriber()
+
+    try:
+        if not subscriber.start():
+            print("Failed to start metrics subscriber!")
+            return 1
+
+        try:
+            while True:
+                message = subscriber.receive(timeout_ms=1000)
+                if not isinstance(message, SystemMessage) or message.message_type != "transport_metrics":
+                    continue
+
+                if args.json:
+                    print(json.dumps(message.payload), flush=True)
+                else:
+                    print_report(message.payload)
+
+        except KeyboardInterrupt:
+            print("\nShutdown requested by user")
+
+    finally:
+        subscriber.stop()
+        if not args.json:
+            print("Transport monitor stopped")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
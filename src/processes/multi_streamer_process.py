@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Multi-Source Streamer Process
+Reads several video files concurrently and streams their frames, tagged with
+a stream id, to the detection pipeline.
+"""
+import argparse
+import signal
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from components.streamer.multi_source_streamer import MultiSourceStreamer, parse_sources
+from components.streamer.synthetic_source import SyntheticSpec, is_synthetic
+from communication.metrics import TransportMetricsReporter
+from communication.zmq_manager import PipelineComm
+
+
+def signal_handler(signum, frame):
+    """Handle shutdown signals gracefully."""
+    print(f"\nReceived signal {signum}, shutting down streamer...")
+    sys.exit(0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Video Pipeline Multi-Source Streamer Process")
+    parser.add_argument("sources", nargs="+",
+                       help="Video files or synthetic source specs, optionally named: [stream_id=]path (default id: file name)")
+    parser.add_argument("--fps", type=float, default=None,
+                       help="Target FPS for every source (default: each source's original FPS)")
+    parser.add_argument("--codec", default=None,
+                       help="Frame codec: raw, zlib, lz4, jpeg[:quality], gray (default: raw on IPC, $FRAME_CODEC on TCP)")
+    parser.add_argument("--prefetch", type=int, default=8,
+                       help="Frames decoded ahead per source (default: 8)")
+    parser.add_argument("--catch-up-lag", type=float, default=0.5,
+                       help="Skip a source's frames when it is this many seconds behind schedule (default: 0.5)")
+    parser.add_argument("--no-catch-up", action="store_true",
+                       help="Never skip frames; late frames are sent back-to-back instead")
+    parser.add_argument("--offline", action="store_true",
+                       help="Batch mode: send as fast as the pipeline processes, lossless (same as PIPELINE_OFFLINE=1)")
+    parser.add_argument("--metrics-interval", type=float, default=0,
+                       help="Publish transport metrics on the monitoring channel every N seconds (default: 0 = off)")
+
+    args = parser.parse_args()
+
+    try:
+        sources = parse_sources(args.sources)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    for stream_id, path in sources.items():
+        if is_synthetic(path):
+            try:
+                SyntheticSpec.parse(path)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return 1
+        elif not Path(path).exists():
+            print(f"Error: Video file not found for stream {stream_id}: {path}")
+            return 1
+
+    if args.offline:
+        PipelineComm.set_offline(True)
+    offline = PipelineComm.is_offline()
+    if PipelineComm.detector_pool_size() > 0:
+        print("Error: a detector pool is only supported with a single-source Streamer")
+        return 1
+
+    # Setup signal handlers
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    print("=" * 60)
+    print("VIDEO PIPELINE - MULTI-SOURCE STREAMER PROCESS")
+    print("=" * 60)
+    for stream_id, path in sources.items():
+        print(f"Stream {stream_id}: {path}")
+    print(f"Target FPS: {'unpaced (offline)' if offline else args.fps or 'Original'}")
+    print(f"Prefetch depth: {args.prefetch} per source")
+    print(f"Catch-up: {'off' if args.no_catch_up or offline else f'skip when {args.catch_up_lag}s behind'}")
+    print(f"Transport metrics: {f'every {args.metrics_interval}s' if args.metrics_interval > 0 else 'off'}")
+    print("Press Ctrl+C to stop")
+    print("-" * 60)
+
+    streamer = MultiSourceStreamer(sources, target_fps=args.fps,
+                                   codec=args.codec,
+                                   prefetch_depth=args.prefetch,
+                                   catch_up_lag=None if args.no_catch_up else args.catch_up_lag,
+                                   offline=offline)
+
+    # Transport metrics reporter (optional)
+    reporter = TransportMetricsReporter("streamer", args.metrics_interval) if args.metrics_interval > 0 else None
+    if reporter:
+        reporter.start()
+
+    try:
+        if not streamer.start_streaming():
+            print("Failed to start streaming!")
+            return 1
+
+        print(f"Streaming {len(sources)} sources - sending frames to detector...")
+
+        # Monitor progress
+        try:
+            while streamer.is_streaming:
+                time.sleep(1)
+                progress = streamer.get_progress()
+                active = sum(1 for stats in progress['streams'].values()
+                             if stats['frames_sent'] + stats['frames_skipped'] < stats['total_frames'])
+                print(f"\rFrames sent: {progress['frames_sent']} "
+                      f"Streams active: {active}/{len(sources)} "
+                      f"Throughput: {progress['throughput_fps']:.1f} fps "
+                      f"Dropped: {progress['send']['dropped'] if progress.get('send') else 0}",
+                      end="", flush=True)
+
+        except KeyboardInterrupt:
+            print("\nShutdown requested by user")
+
+        progress = streamer.get_progress()
+        print("\nPer-stream summary:")
+        for stream_id, stats in progress['streams'].items():
+            print(f"  {stream_id}: {stats['frames_sent']} sent, {stats['frames_skipped']} skipped, "
+                  f"{stats['underruns']} decoder underruns, max lag {stats['max_lag_ms']:.0f}ms, "
+                  f"{stats['buffer_pool']['allocations'] if stats['buffer_pool'] else 0} frame buffers")
+        print(f"Throughput: {streamer.throughput_fps():.1f} frames/s "
+              f"({streamer.frames_sent} frames in {(streamer.end_time or time.monotonic()) - streamer.start_time:.1f}s)")
+
+    except Exception as e:
+        print(f"Streamer error: {e}")
+        return 1
+
+    finally:
+        print("Stopping streamer...")
+        if reporter:
+            reporter.stop()  # Final report while sockets are still open
+        streamer.stop_streaming()
+        print("Streamer stopped")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -13,6 +13,11 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from components.streamer.video_streamer import VideoStreamer
+from components.streamer.frame_cache import DEFAULT_CACHE_DIR
+from components.streamer.segment_source import DEFAULT_MAX_BUFFER_BYTES
+from components.streamer.synthetic_source import SyntheticSpec, is_synthetic
+from communication.metrics import TransportMetricsReporter
+from communication.zmq_manager import PipelineComm
 
 
 def signal_handler(signum, frame):
@@ -23,20 +28,66 @@ def signal_handler(signum, frame):
 
 def main():
     parser = argparse.ArgumentParser(description="Video Pipeline Streamer Process")
-    parser.add_argument("video_file", help="Path to video file")
+    parser.add_argument("video_file", help="Path to video file, or a synthetic source spec (synthetic:1280x720@30,...)")
     parser.add_argument("--fps", type=float, default=None,
                        help="Target FPS (default: use original video FPS)")
     parser.add_argument("--loop", action="store_true",
                        help="Loop video continuously")
+    parser.add_argument("--shared-memory", action="store_true",
+                       help="Pass frames through a shared-memory ring (slot references over ZMQ)")
+    parser.add_argument("--shm-slots", type=int, default=16,
+                       help="Frame slots in the shared-memory ring (default: 16)")
+    parser.add_argument("--shm-readers", type=int, default=2,
+                       help="Stages reading each shared-memory slot (default: 2 = Detector + Display)")
+    parser.add_argument("--fanout-display", action="store_true",
+                       help="Also send frames directly to the Display (use with detector --metadata-only)")
+    parser.add_argument("--codec", default=None,
+                       help="Frame codec: raw, zlib, lz4, jpeg[:quality], gray (default: raw on IPC, $FRAME_CODEC on TCP)")
+    parser.add_argument("--prefetch", type=int, default=8,
+                       help="Frames decoded ahead on a separate thread (default: 8, 0 = decode inline)")
+    parser.add_argument("--decode-workers", type=int, default=0,
+                       help="Decode segments of the file in N worker processes (default: 0 = one decoder)")
+    parser.add_argument("--segment-frames", type=int, default=64,
+                       help="Frames per decode segment with --decode-workers (default: 64)")
+    parser.add_argument("--decode-buffer-mb", type=int, default=DEFAULT_MAX_BUFFER_BYTES >> 20,
+                       help=f"Shared memory (/dev/shm) for decode segments with --decode-workers; fewer "
+                            f"segments are decoded ahead if they don't fit (default: {DEFAULT_MAX_BUFFER_BYTES >> 20})")
+    parser.add_argument("--frame-cache", nargs="?", const=DEFAULT_CACHE_DIR, default=None, metavar="DIR",
+                       help=f"Cache decoded frames on disk: the first complete run records them, later runs "
+                            f"stream them without decoding (default DIR: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--catch-up-lag", type=float, default=0.5,
+                       help="Skip frames when this many seconds behind schedule (default: 0.5)")
+    parser.add_argument("--no-catch-up", action="store_true",
+                       help="Never skip frames; late frames are sent back-to-back instead")
+    parser.add_argument("--offline", action="store_true",
+                       help="Batch mode: send as fast as the pipeline processes, lossless (same as PIPELINE_OFFLINE=1)")
+    parser.add_argument("--detector-pool", type=int, default=None, metavar="N",
+                       help="Share frames among N Detector workers, each frame sent with its predecessor "
+                            "(same as PIPELINE_DETECTOR_POOL=N)")
+    parser.add_argument("--metrics-interval", type=float, default=0,
+                       help="Publish transport metrics on the monitoring channel every N seconds (default: 0 = off)")
     
     args = parser.parse_args()
     
-    # Validate video file
+    # Validate video file (or synthetic source spec)
     video_path = Path(args.video_file)
-    if not video_path.exists():
+    if is_synthetic(args.video_file):
+        try:
+            SyntheticSpec.parse(args.video_file)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    elif not video_path.exists():
         print(f"Error: Video file not found: {video_path}")
         return 1
     
+    if args.offline:
+        PipelineComm.set_offline(True)
+    offline = PipelineComm.is_offline()
+    if args.detector_pool is not None:
+        PipelineComm.set_detector_pool(args.detector_pool)
+    detector_pool = PipelineComm.detector_pool_size()
+    
     # Setup signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -45,13 +96,41 @@ def main():
     print("VIDEO PIPELINE - STREAMER PROCESS")
     print("=" * 60)
     print(f"Video file: {video_path}")
-    print(f"Target FPS: {args.fps or 'Original'}")
+    print(f"Target FPS: {'unpaced (offline)' if offline else args.fps or 'Original'}")
     print(f"Loop mode: {args.loop}")
+    print(f"Shared memory: {args.shared_memory}")
+    if args.decode_workers > 0:
+        print(f"Decode workers: {args.decode_workers} ({args.segment_frames} frames/segment, "
+              f"up to {args.decode_buffer_mb} MB shared memory)")
+    else:
+        print(f"Prefetch depth: {args.prefetch}")
+    print(f"Frame cache: {'off (synthetic source)' if args.frame_cache and is_synthetic(args.video_file) else args.frame_cache or 'off'}")
+    print(f"Catch-up: {'off' if args.no_catch_up else f'skip when {args.catch_up_lag}s behind'}")
+    print(f"Detector pool: {f'{detector_pool} workers' if detector_pool else 'off'}")
+    print(f"Transport metrics: {f'every {args.metrics_interval}s' if args.metrics_interval > 0 else 'off'}")
     print("Press Ctrl+C to stop")
     print("-" * 60)
     
     # Create streamer
-    streamer = VideoStreamer(str(video_path), target_fps=args.fps)
+    streamer = VideoStreamer(str(video_path), target_fps=args.fps,
+                             shared_memory=args.shared_memory,
+                             shm_slots=args.shm_slots,
+                             shm_readers=args.shm_readers,
+                             fanout_to_display=args.fanout_display,
+                             codec=args.codec,
+                             prefetch_depth=args.prefetch,
+                             catch_up_lag=None if args.no_catch_up else args.catch_up_lag,
+                             offline=offline,
+                             decode_workers=args.decode_workers,
+                             segment_frames=args.segment_frames,
+                             decode_buffer_bytes=args.decode_buffer_mb << 20,
+                             frame_cache_dir=args.frame_cache,
+                             detector_pool=detector_pool)
+    
+    # Transport metrics reporter (optional)
+    reporter = TransportMetricsReporter("streamer", args.metrics_interval) if args.metrics_interval > 0 else None
+    if reporter:
+        reporter.start()
     
     try:
         loop_count = 0
@@ -76,7 +155,11 @@ def main():
                     progress = streamer.get_progress()
                     print(f"\rProgress: {progress['progress']:.1f}% "
                           f"({progress['frame_id']}/{progress['total_frames']}) "
-                          f"FPS: {progress['fps']:.1f}", 
+                          f"FPS: {progress.get('fps', 0):.1f} "
+                          f"Skipped: {progress.get('frames_skipped', 0)} "
+                          f"Dropped: {progress['send']['dropped'] if progress.get('send') else 0} "
+                          f"Prefetch: {progress['prefetch']['queued'] if progress.get('prefetch') else 0}"
+                          f"/{progress['prefetch']['depth'] if progress.get('prefetch') else args.prefetch}", 
                           end="", flush=True)
             
             except KeyboardInterrupt:
@@ -84,6 +167,15 @@ def main():
                 break
             
             print(f"\nVideo streaming completed (loop {loop_count})")
+            print(f"Throughput: {streamer.throughput_fps():.1f} frames/s "
+                  f"({streamer.frames_sent} frames in {streamer.end_time - streamer.start_time:.1f}s)")
+            cache = streamer.frame_cache_status()
+            if cache and cache['mode'] != 'off':
+                print(f"Frame cache: {'streamed' if cache['mode'] == 'hit' else cache['mode']} "
+                      f"{cache['frames']} frames ({cache['path']})")
+            if streamer.buffer_pool and not (cache and cache['mode'] == 'hit'):
+                pool_stats = streamer.buffer_pool.get_stats()
+                print(f"Frame buffers: {pool_stats['allocations']} allocated, {pool_stats['reuses']} reused")
             
             if not args.loop:
                 break
@@ -97,6 +189,8 @@ def main():
     
     finally:
         print("Stopping streamer...")
+        if reporter:
+            reporter.stop()  # Final report while sockets are still open
         streamer.stop_streaming()
         print("Streamer stopped")
     
@@ -0,0 +1,25 @@
+"""
+Test helper: run pipeline sockets on private ipc:// endpoints.
+
+The production ipc:// endpoints are socket files relative to the working
+directory, so tests that go through PipelineComm would leave them in the
+tree and collide with a pipeline running from the same directory.
+"""
+import tempfile
+import unittest
+from unittest import mock
+
+from communication.protocol import Endpoints
+
+
+def use_temporary_endpoints(test_case: unittest.TestCase):
+    """Point every ipc:// endpoint into a temporary directory, removed when the test ends."""
+    directory = tempfile.TemporaryDirectory(prefix="axon_test_")
+    test_case.addCleanup(directory.cleanup)
+    endpoints = {name: f"ipc://{directory.name}/{value[len('ipc://'):]}"
+                 for name, value in vars(Endpoints).items()
+                 if isinstance(value, str) and value.startswith("ipc://")}
+    if endpoints:  # TCP endpoints (Windows, FORCE_TCP) are left alone
+        patcher = mock.patch.multiple(Endpoints, **endpoints)
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tests for reusing frame buffers in the Streamer, Detector and Display.
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import imutils
+import numpy as np
+import zmq
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.buffer_pool import FrameBufferPool
+from core.data_models import FrameData, DetectionResult, Detection, SystemMessage, StreamDescriptor
+from components.streamer.video_streamer import VideoStreamer
+from components.detector.motion_detector import MotionDetector
+from components.display.video_display import VideoDisplay
+from communication.zmq_manager import ZMQManager, PipelineComm
+from ipc_endpoints import use_temporary_endpoints
+
+
+def moving_box_frames(count: int):
+    """Frames with a box moving right, so every frame differs from the last."""
+    frames = []
+    for index in range(count):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        cv2.rectangle(frame, (index, 10), (index + 12, 30), (255, 255, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+class FakeSend:
+    """Stands in for a SendTracker."""
+
+    def __init__(self, done=False):
+        self.done = done
+
+
+class TestFrameBufferPool(unittest.TestCase):
+    """Test that buffers are reused only once released and their sends are done."""
+
+    def test_reuse_after_release(self):
+        pool = FrameBufferPool((4, 4, 3), debug=False)
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertIsNot(first, second)
+
+        self.assertTrue(pool.release(first))
+        self.assertIs(pool.acquire(), first)
+        stats = pool.get_stats()
+        self.assertEqual((stats['allocations'], stats['reuses'], stats['in_use']), (2, 1, 2))
+
+    def test_reused_once_sends_are_done(self):
+        pool = FrameBufferPool((4, 4, 3), preallocate=1, debug=False)
+        buffer = pool.acquire()
+        send = FakeSend()
+        pool.release(buffer, [send, FakeSend(done=True)])
+        self.assertIsNot(pool.acquire(), buffer)
+        self.assertEqual(pool.in_use(), 2)
+
+        send.done = True
+        self.assertEqual(pool.in_use(), 1)
+        self.assertIs(pool.acquire(), buffer)
+
+    def test_release_only_own_acquired_buffers(self):
+        pool = FrameBufferPool((4, 4, 3), debug=False)
+        buffer = pool.acquire()
+        self.assertFalse(pool.release(None))
+        self.assertFalse(pool.release(np.empty((4, 4, 3), dtype=np.uint8)))
+        self.assertFalse(pool.release(buffer[::2]))
+        self.assertTrue(pool.release(buffer))
+        self.assertFalse(pool.release(buffer))  # Twice
+        pool.acquire()
+        self.assertEqual(pool.get_stats()['allocations'], 1)
+
+    def test_debug_check_finds_early_release(self):
+        pool = FrameBufferPool((4, 4, 3), debug=True)
+        buffer = pool.acquire()
+        pool.release(buffer)
+        with self.assertRaises(RuntimeError):
+            pool.acquire()  # buffer is still referenced here
+
+        del buffer
+        pool = FrameBufferPool((4, 4, 3), debug=True)
+        pool.release(pool.acquire())
+        pool.acquire()
+
+    def test_sized_from_stream_descriptor(self):
+        descriptor = StreamDescriptor("cam", 64, 48, 25.0, 25.0, "cam.mp4")
+        self.assertEqual(FrameBufferPool.for_stream(descriptor).acquire().shape, (48, 64, 3))
+        self.assertEqual(FrameBufferPool.for_stream(descriptor, channels=1).acquire().shape, (48, 64))
+
+
+class TestPooledStreaming(unittest.TestCase):
+    """Frames decoded into reused buffers must arrive intact through zero-copy sends."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmpdir.name, "moving.avi")
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+        for frame in moving_box_frames(40):
+            writer.write(frame)
+        writer.release()
+
+        cap = cv2.VideoCapture(self.video_path)
+        self.expected = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            self.expected.append(frame)
+        cap.release()
+        use_temporary_endpoints(self)
+        PipelineComm.set_offline(True)
+
+    def tearDown(self):
+        PipelineComm.set_offline(None)
+        self.tmpdir.cleanup()
+
+    def test_received_frames_match_decode(self):
+        receiver = PipelineComm.create_detector_receiver()
+        self.assertTrue(receiver.start())
+        streamer = VideoStreamer(self.video_path, offline=True, prefetch_depth=4)
+        frames = []
+        try:
+            self.assertTrue(streamer.start_streaming())
+            while True:
+                message = receiver.receive(timeout_ms=5000)
+                self.assertIsNotNone(message, "timed out waiting for frames")
+                if isinstance(message, SystemMessage):
+                    if message.message_type == "end_of_stream":
+                        break
+                    continue
+                frames.append(message)
+            pool_stats = streamer.buffer_pool.get_stats()
+        finally:
+            streamer.stop_streaming()
+            receiver.stop()
+
+        self.assertEqual(len(frames), len(self.expected))
+        for frame_data, expected in zip(frames, self.expected):
+            np.testing.assert_array_equal(frame_data.frame, expected)
+        self.assertLess(pool_stats['allocations'], len(self.expected))
+        self.assertGreater(pool_stats['reuses'], 0)
+
+
+class TestDetectorWorkBuffers(unittest.TestCase):
+    """Detection into reused buffers matches the allocating version."""
+
+    def reference_boxes(self, prev_gray, gray, detector):
+        diff = cv2.absdiff(gray, prev_gray)
+        thresh = cv2.threshold(diff, detector.threshold, 255, cv2.THRESH_BINARY)[1]
+        thresh = cv2.dilate(thresh, None, iterations=detector.dilate_iterations)
+        cnts = imutils.grab_contours(cv2.findContours(thresh.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE))
+        return sorted(cv2.boundingRect(c) for c in cnts if cv2.contourArea(c) >= detector.min_area)
+
+    @mock.patch.dict(os.environ, {'PIPELINE_BUFFER_POOL_DEBUG': "1"})  # Released buffers must be unreferenced
+    def test_same_detections_without_allocations(self):
+        detector = MotionDetector(min_area=10)
+        frames = moving_box_frames(20)
+        for index, frame in enumerate(frames):
+            result = detector._process_frame(FrameData.create(index, frame))
+            if index > 0:
+                expected = self.reference_boxes(cv2.cvtColor(frames[index - 1], cv2.COLOR_BGR2GRAY),
+                                                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), detector)
+                self.assertEqual(sorted(d.bbox for d in result.detections), expected)
+                self.assertTrue(expected)
+
+        stats = detector.get_stats()['buffer_pool']
+        self.assertEqual(stats['allocations'], MotionDetector.WORK_BUFFERS)
+        self.assertEqual(stats['in_use'], 1)  # The engine's previous frame
+
+
+class TestDisplayOverlayBuffers(unittest.TestCase):
+    """Overlays are drawn into one reused buffer once each shown result is released."""
+
+    @mock.patch.dict(os.environ, {'PIPELINE_BUFFER_POOL_DEBUG': "1"})
+    def test_overlay_buffer_reused(self):
+        display = VideoDisplay(show_window=False)
+        display.result_receiver = ZMQManager(zmq.PULL, "inproc://overlay-test")  # Never started
+        try:
+            for index, frame in enumerate(moving_box_frames(5)):
+                result = DetectionResult.create(FrameData.create(index, frame), [
+                    Detection(bbox=(index, 10, 12, 20), confidence=1.0, detection_type="motion", area=240)
+                ], processing_time=0.0)
+                self.assertTrue(display._show_result(result))
+                self.assertIsNone(result.frame)
+        finally:
+            display.result_receiver.stop()
+
+        stats = display.get_stats()['buffer_pool']
+        self.assertEqual((stats['allocations'], stats['in_use']), (1, 0))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
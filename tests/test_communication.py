@@ -0,0 +1,751 @@
+#!/usr/bin/env python3
+"""
+Tests for the communication layer (message protocol and ZMQ transport).
+These tests do not need the sample video file.
+"""
+import asyncio
+import unittest
+import os
+import pickle
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import zmq
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from communication.protocol import MessageProtocol
+from communication.zmq_manager import ZMQManager, ZMQContextRegistry, SendPolicy, SendTracker, PipelineComm
+from communication.metrics import LatencyHistogram, TransportMetricsReporter
+from communication.async_zmq_manager import AsyncZMQManager
+from communication.shared_memory import SharedFrameRing
+from communication.codecs import get_codec, default_codec
+from core.data_models import FrameData, DetectionResult, Detection, SystemMessage, StreamDescriptor, DEFAULT_STREAM_ID, CAPTURE_CLOCK
+from ipc_endpoints import use_temporary_endpoints
+
+
+class TestFrameWireFormat(unittest.TestCase):
+    """Test the multipart (header + raw buffer) frame wire format."""
+
+    def test_frame_data_roundtrip(self):
+        """FrameData survives serialization with shape, dtype and pixels intact."""
+        frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+        frame_data = FrameData.create(7, frame, {'width': 64, 'height': 48})
+
+        parts = MessageProtocol.serialize_frame_data(frame_data)
+        self.assertEqual(len(parts), 2)
+
+        decoded = MessageProtocol.deserialize(parts)
+        self.assertIsInstance(decoded, FrameData)
+        self.assertEqual(decoded.frame_id, 7)
+        self.assertEqual(decoded.metadata['width'], 64)
+        np.testing.assert_array_equal(decoded.frame, frame)
+
+    def test_non_contiguous_frame(self):
+        """Strided views are sent correctly."""
+        frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)[::2, ::2]
+        decoded = MessageProtocol.deserialize(
+            MessageProtocol.serialize_frame_data(FrameData.create(1, frame)))
+        np.testing.assert_array_equal(decoded.frame, frame)
+
+    def test_detection_result_roundtrip(self):
+        """DetectionResult keeps its detections and frame."""
+        frame = np.zeros((32, 32, 3), dtype=np.uint8)
+        result = DetectionResult.create(
+            FrameData.create(3, frame),
+            [Detection(bbox=(1, 2, 3, 4), confidence=0.5, detection_type="motion", area=12)],
+            processing_time=1.5
+        )
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_detection_result(result))
+        self.assertIsInstance(decoded, DetectionResult)
+        self.assertEqual(decoded.detections[0].bbox, (1, 2, 3, 4))
+        np.testing.assert_array_equal(decoded.frame, frame)
+
+    def test_metadata_only_detection_result(self):
+        """Results created without the frame travel as a single part and decode with frame None."""
+        result = DetectionResult.create(
+            FrameData.create(4, np.zeros((32, 32, 3), dtype=np.uint8)),
+            [Detection(bbox=(5, 6, 7, 8), confidence=0.9, detection_type="motion", area=56)],
+            processing_time=0.5,
+            include_frame=False
+        )
+        parts = MessageProtocol.serialize_detection_result(result)
+        self.assertEqual(len(parts), 1)
+
+        decoded = MessageProtocol.deserialize(parts)
+        self.assertIsNone(decoded.frame)
+        self.assertEqual(decoded.frame_id, 4)
+        self.assertEqual(decoded.detections[0].bbox, (5, 6, 7, 8))
+
+    def test_stream_id_roundtrip(self):
+        """Frames and results keep their stream_id; untagged ones decode as the default stream."""
+        frame_data = FrameData.create(2, np.zeros((8, 8, 3), dtype=np.uint8), stream_id="cam-a")
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_frame_data(frame_data))
+        self.assertEqual(decoded.stream_id, "cam-a")
+
+        result = DetectionResult.create(frame_data, [], processing_time=0.0, include_frame=False)
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_detection_result(result))
+        self.assertEqual(decoded.stream_id, "cam-a")
+
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_frame_data(
+            FrameData.create(3, np.zeros((8, 8, 3), dtype=np.uint8))))
+        self.assertEqual(decoded.stream_id, DEFAULT_STREAM_ID)
+
+    def test_source_timestamps_roundtrip(self):
+        """PTS and the monotonic capture time travel with frames and results."""
+        frame_data = FrameData.create(4, np.zeros((8, 8, 3), dtype=np.uint8), pts_ms=160.0)
+        self.assertAlmostEqual(frame_data.capture_time, time.monotonic(), delta=1.0)
+
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_frame_data(frame_data))
+        self.assertEqual((decoded.pts_ms, decoded.capture_time), (160.0, frame_data.capture_time))
+        result = DetectionResult.create(decoded, [], processing_time=0.0, include_frame=False)
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_detection_result(result))
+        self.assertEqual((decoded.pts_ms, decoded.capture_time), (160.0, frame_data.capture_time))
+        self.assertGreaterEqual(decoded.age(), 0.0)
+
+        # Headers from older senders have neither
+        header = {'type': MessageProtocol.FRAME_DATA, 'frame_id': 1, 'timestamp': 0.0, 'metadata': {},
+                  'frame': np.zeros((2, 2, 3), dtype=np.uint8)}
+        legacy = MessageProtocol.deserialize([pickle.dumps(header)])
+        self.assertIsNone(legacy.pts_ms)
+        self.assertIsNone(legacy.age())
+
+    def test_capture_clock_of_another_host(self):
+        """Frames captured on another host keep their capture time but report no age."""
+        frame_data = FrameData.create(4, np.zeros((8, 8, 3), dtype=np.uint8))
+        self.assertEqual(frame_data.capture_clock, CAPTURE_CLOCK)
+        frame_data.capture_clock = "other-host"
+
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_frame_data(frame_data))
+        self.assertEqual((decoded.capture_time, decoded.capture_clock), (frame_data.capture_time, "other-host"))
+        self.assertIsNone(decoded.age())
+        result = DetectionResult.create(decoded, [], processing_time=0.0, include_frame=False)
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_detection_result(result))
+        self.assertEqual(decoded.capture_clock, "other-host")
+        self.assertIsNone(decoded.age())
+
+    def test_prev_frame_roundtrip(self):
+        """A pooled Detector's frame carries its predecessor in a further part, also with a codec."""
+        frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+        prev_frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+        for codec in (None, get_codec("zlib")):
+            parts = MessageProtocol.serialize_frame_data(
+                FrameData.create(5, frame, prev_frame=prev_frame, prev_frame_id=2), codec=codec)
+            self.assertEqual(len(parts), 3)
+            decoded = MessageProtocol.deserialize(parts)
+            np.testing.assert_array_equal(decoded.frame, frame)
+            np.testing.assert_array_equal(decoded.prev_frame, prev_frame)
+            self.assertEqual(decoded.prev_frame_id, 2)
+
+        # The Detector echoes prev_frame_id, so the Display can order results across skipped frame_ids
+        result = DetectionResult.create(decoded, [], processing_time=0.0, include_frame=False)
+        self.assertEqual(MessageProtocol.deserialize(MessageProtocol.serialize_detection_result(result)).prev_frame_id, 2)
+
+        decoded = MessageProtocol.deserialize(MessageProtocol.serialize_frame_data(FrameData.create(6, frame)))
+        self.assertIsNone(decoded.prev_frame)
+        self.assertIsNone(decoded.prev_frame_id)
+
+
+class TestFrameCodecs(unittest.TestCase):
+    """Test compressed frame codecs carried in the frame header."""
+
+    def setUp(self):
+        # Smooth gradient so lossy codecs stay close to the source
+        ramp = np.tile(np.arange(64, dtype=np.uint8) * 4, (48, 1))
+        self.frame = np.ascontiguousarray(np.dstack([ramp, ramp[::-1], 255 - ramp]))
+        self.frame_data = FrameData.create(9, self.frame)
+
+    def roundtrip(self, spec):
+        parts = MessageProtocol.serialize_frame_data(self.frame_data, codec=get_codec(spec))
+        return MessageProtocol.deserialize(parts).frame
+
+    def test_zlib_is_lossless(self):
+        np.testing.assert_array_equal(self.roundtrip("zlib"), self.frame)
+
+    def test_jpeg_is_close(self):
+        decoded = self.roundtrip("jpeg:90")
+        self.assertEqual(decoded.shape, self.frame.shape)
+        self.assertLess(np.abs(decoded.astype(int) - self.frame.astype(int)).mean(), 8)
+
+    def test_gray_expands_to_bgr(self):
+        decoded = self.roundtrip("gray")
+        self.assertEqual(decoded.shape, self.frame.shape)
+        np.testing.assert_array_equal(decoded[..., 0], decoded[..., 2])
+
+    def test_unknown_codec_rejected(self):
+        with self.assertRaises(ValueError):
+            get_codec("h264")
+
+    def test_default_codec_per_transport(self):
+        os.environ["FRAME_CODEC"] = "jpeg:70"
+        try:
+            self.assertEqual(default_codec("tcp://127.0.0.1:5555").spec(), "jpeg:70")
+            self.assertEqual(default_codec("ipc://streamer_detector").spec(), "raw")
+        finally:
+            del os.environ["FRAME_CODEC"]
+
+
+class TestTaggedDispatch(unittest.TestCase):
+    """Test the [version, type] message tag and legacy compatibility."""
+
+    def tearDown(self):
+        MessageProtocol.wire_version = MessageProtocol.WIRE_VERSION
+
+    def test_messages_are_tagged(self):
+        """Every message starts with the wire version and its type code."""
+        data = MessageProtocol.serialize_system_message(SystemMessage.shutdown())
+        self.assertEqual(data[0], MessageProtocol.WIRE_VERSION)
+        self.assertEqual(data[1], MessageProtocol.TYPE_CODES[MessageProtocol.SYSTEM_MESSAGE])
+
+    def test_legacy_messages_still_decode(self):
+        """Untagged messages from older components are still understood."""
+        MessageProtocol.wire_version = MessageProtocol.LEGACY_WIRE_VERSION
+        frame = np.random.randint(0, 255, (16, 16, 3), dtype=np.uint8)
+        legacy_frame = MessageProtocol.serialize_frame_data(FrameData.create(5, frame))
+        legacy_control = MessageProtocol.serialize_system_message(SystemMessage.shutdown())
+        MessageProtocol.wire_version = MessageProtocol.WIRE_VERSION
+
+        self.assertEqual(len(legacy_frame), 1)
+        decoded = MessageProtocol.deserialize(legacy_frame)
+        self.assertEqual(decoded.frame_id, 5)
+        np.testing.assert_array_equal(decoded.frame, frame)
+        self.assertEqual(MessageProtocol.deserialize(legacy_control).message_type, "shutdown")
+
+    def test_unknown_version_rejected(self):
+        """Messages from a newer, unsupported wire version raise ValueError."""
+        with self.assertRaises(ValueError):
+            MessageProtocol.deserialize(bytes([9, 3]) + b'{}')
+
+
+class TestSharedFrameRing(unittest.TestCase):
+    """Test the shared-memory frame ring and its reference counting."""
+
+    def setUp(self):
+        self.ring = SharedFrameRing.create(f"axon_test_{id(self)}", slot_bytes=32 * 32 * 3,
+                                           num_slots=2, num_readers=2, reclaim_timeout=0.05)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_slot_roundtrip_and_refcount(self):
+        """A written slot is readable and held until every reader releases it."""
+        frame = np.random.randint(0, 255, (32, 32, 3), dtype=np.uint8)
+        ref = self.ring.write(frame)
+        array_header = {'dtype': frame.dtype.str, 'shape': frame.shape, 'strides': frame.strides}
+
+        np.testing.assert_array_equal(self.ring.read(ref, array_header), frame)
+        self.assertEqual(self.ring.refcount(ref.slot), 2)
+        self.ring.release(ref, 0)
+        self.ring.release(ref, 1)
+        self.assertEqual(self.ring.refcount(ref.slot), 0)
+
+    def test_stale_reference_and_forced_reclaim(self):
+        """Unreleased slots are reclaimed after the timeout and old references go stale."""
+        frame = np.zeros((32, 32, 3), dtype=np.uint8)
+        first = self.ring.write(frame)
+        self.ring.write(frame)
+        self.ring.write(frame)  # Wraps around onto the unreleased first slot
+
+        self.assertEqual(self.ring.forced_reclaims, 1)
+        self.assertIsNone(self.ring.read(first, {'dtype': '|u1', 'shape': (32, 32, 3), 'strides': (96, 3, 1)}))
+
+    def test_zmq_sends_slot_reference(self):
+        """With a frame ring attached, only a header travels over the socket."""
+        frame = np.random.randint(0, 255, (32, 32, 3), dtype=np.uint8)
+        sender = ZMQManager(zmq.PUSH, "ipc:///tmp/axon_test_shm", bind=True, frame_ring=self.ring)
+        parts = MessageProtocol.serialize_frame_data(FrameData.create(1, frame), sender._shared_frame_ref(frame))
+        self.assertEqual(len(parts), 1)
+
+        decoded = MessageProtocol.deserialize(parts)
+        np.testing.assert_array_equal(decoded.frame, frame)
+        self.assertIsNotNone(SharedFrameRing.locate(decoded.frame))
+        sender.stop()
+
+
+class TestZMQTransport(unittest.TestCase):
+    """Test sending messages through real ZMQ sockets."""
+
+    def setUp(self):
+        endpoint = f"ipc:///tmp/axon_test_{id(self)}"
+        self.sender = ZMQManager(zmq.PUSH, endpoint, bind=True)
+        self.receiver = ZMQManager(zmq.PULL, endpoint, bind=False)
+        self.assertTrue(self.sender.start())
+        self.assertTrue(self.receiver.start())
+        time.sleep(0.1)
+
+    def tearDown(self):
+        self.receiver.stop()
+        self.sender.stop()
+
+    def test_frame_and_system_message(self):
+        """Frames and control messages arrive in order."""
+        frame = np.random.randint(0, 255, (120, 160, 3), dtype=np.uint8)
+        self.assertTrue(self.sender.send_frame_data(FrameData.create(0, frame)))
+        self.assertTrue(self.sender.send_system_message(SystemMessage.shutdown()))
+
+        received = self.receiver.receive(timeout_ms=1000)
+        self.assertIsInstance(received, FrameData)
+        np.testing.assert_array_equal(received.frame, frame)
+
+        control = self.receiver.receive(timeout_ms=1000)
+        self.assertIsInstance(control, SystemMessage)
+        self.assertEqual(control.message_type, "shutdown")
+
+    def test_receive_batch_drains_queue(self):
+        """One call returns everything already queued, bounded by max_messages."""
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        for frame_id in range(5):
+            self.assertTrue(self.sender.send_frame_data(FrameData.create(frame_id, frame)))
+        time.sleep(0.1)
+
+        first = self.receiver.receive_batch(max_messages=3, timeout_ms=1000)
+        rest = self.receiver.receive_batch(timeout_ms=1000)
+        self.assertEqual([m.frame_id for m in first + rest], [0, 1, 2, 3, 4])
+        self.assertEqual(self.receiver.receive_batch(timeout_ms=10), [])
+
+    def test_skip_stale_keeps_newest_frame_and_control(self):
+        """Only the newest frame survives; control messages are never dropped."""
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        messages = [FrameData.create(0, frame), SystemMessage.shutdown(),
+                    FrameData.create(1, frame), FrameData.create(2, frame)]
+
+        kept, skipped = self.receiver.skip_stale(messages)
+        self.assertEqual(skipped, 2)
+        self.assertIsInstance(kept[0], SystemMessage)
+        self.assertEqual(kept[1].frame_id, 2)
+
+    def test_stream_descriptor_sent_once_and_cached(self):
+        """The descriptor goes out once per stream and again only when it changes."""
+        descriptor = StreamDescriptor("cam-a", 64, 48, 25.0, 25.0, "a.mp4")
+        self.assertTrue(self.sender.send_stream_descriptor(descriptor))
+        self.assertTrue(self.sender.send_stream_descriptor(descriptor))
+        changed = StreamDescriptor("cam-a", 64, 48, 12.5, 25.0, "a.mp4")
+        self.assertTrue(self.sender.send_stream_descriptor(changed))
+
+        messages = self.receiver.receive_batch(timeout_ms=1000)
+        messages += self.receiver.receive_batch(timeout_ms=100)
+        self.assertEqual([m.message_type for m in messages], [StreamDescriptor.MESSAGE_TYPE] * 2)
+        self.assertEqual(self.receiver.stream_descriptor("cam-a"), changed)
+        self.assertIsNone(self.receiver.stream_descriptor("cam-b"))
+
+    def test_skip_stale_keeps_newest_frame_per_stream(self):
+        """Each stream keeps its own newest frame; stream_id survives the wire."""
+        frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        for frame_id in range(3):
+            for stream_id in ("cam-a", "cam-b"):
+                self.sender.send_frame_data(FrameData.create(frame_id, frame, stream_id=stream_id))
+
+        messages = []
+        while len(messages) < 6:
+            batch = self.receiver.receive_batch(timeout_ms=1000)
+            self.assertTrue(batch)
+            messages.extend(batch)
+
+        kept, skipped = self.receiver.skip_stale(messages)
+        self.assertEqual(skipped, 4)
+        self.assertEqual(sorted((m.stream_id, m.frame_id) for m in kept),
+                         [("cam-a", 2), ("cam-b", 2)])
+
+    def test_wait_for_subscribers(self):
+        """An XPUB publisher counts each subscriber, and gives up after the timeout."""
+        endpoint = f"ipc:///tmp/axon_test_{id(self)}_control"
+        publisher = ZMQManager(zmq.XPUB, endpoint, bind=True)
+        publisher.socket.setsockopt(zmq.XPUB_VERBOSE, 1)
+        subscribers = [ZMQManager(zmq.SUB, endpoint, bind=False) for _ in range(2)]
+        try:
+            self.assertTrue(publisher.start())
+            for subscriber in subscribers:
+                subscriber.socket.setsockopt(zmq.SUBSCRIBE, b"")
+                self.assertTrue(subscriber.start())
+            self.assertEqual(publisher.wait_for_subscribers(2, timeout_ms=2000), 2)
+            self.assertEqual(publisher.wait_for_subscribers(3, timeout_ms=50), 2)
+
+            self.assertTrue(publisher.send_system_message(SystemMessage.shutdown()))
+            for subscriber in subscribers:
+                self.assertEqual(subscriber.receive(timeout_ms=1000).message_type, "shutdown")
+        finally:
+            for subscriber in subscribers:
+                subscriber.stop()
+            publisher.stop()
+
+
+class TestSendPolicies(unittest.TestCase):
+    """Test backpressure policies on frame sends."""
+
+    def setUp(self):
+        self.endpoint = f"ipc:///tmp/axon_test_policy_{id(self)}"
+        self.frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        self.managers = []
+        use_temporary_endpoints(self)  # PipelineComm channels
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.stop()
+
+    def manager(self, socket_type, bind, policy, **kwargs):
+        manager = ZMQManager(socket_type, self.endpoint, bind=bind, send_policy=policy, **kwargs)
+        self.assertTrue(manager.start())
+        self.managers.append(manager)
+        return manager
+
+    def test_drop_newest_counts_drops(self):
+        """Without a peer the queue is full immediately and frames are counted as dropped."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.DROP_NEWEST)
+        self.assertFalse(sender.send_frame_data(FrameData.create(0, self.frame)))
+        self.assertEqual(sender.get_send_stats()['dropped_full'], 1)
+
+    def test_block_honours_timeout(self):
+        """BLOCK waits for the given timeout before dropping."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.BLOCK)
+        start = time.monotonic()
+        self.assertFalse(sender.send_frame_data(FrameData.create(0, self.frame), timeout_ms=100))
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+        self.assertEqual(sender.get_send_stats()['dropped_timeout'], 1)
+
+    def test_drop_oldest_keeps_latest(self):
+        """Parked frames are replaced by newer ones; the newest is delivered before control messages."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.DROP_OLDEST)
+        for frame_id in range(3):
+            self.assertTrue(sender.send_frame_data(FrameData.create(frame_id, self.frame)))
+        self.assertEqual(sender.get_send_stats()['dropped_stale'], 2)
+
+        receiver = self.manager(zmq.PULL, False, SendPolicy.DROP_OLDEST)
+        self.assertTrue(sender.send_system_message(SystemMessage.shutdown()))
+        self.assertEqual(receiver.receive(timeout_ms=1000).frame_id, 2)
+        self.assertIsInstance(receiver.receive(timeout_ms=1000), SystemMessage)
+
+    def test_send_tracker(self):
+        """A tracked frame is done once dropped, or once sent and no longer referenced by ZeroMQ."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.DROP_OLDEST)
+        sends = [SendTracker(), SendTracker()]
+        for frame_id, send in enumerate(sends):
+            self.assertTrue(sender.send_frame_data(FrameData.create(frame_id, self.frame), send=send))
+        self.assertTrue(sends[0].done)  # Replaced by the newer frame
+        self.assertFalse(sends[1].done)  # Parked
+
+        receiver = self.manager(zmq.PULL, False, SendPolicy.DROP_OLDEST)
+        self.assertTrue(sender.send_system_message(SystemMessage.shutdown()))
+        self.assertEqual(receiver.receive(timeout_ms=1000).frame_id, 1)
+        self.assertTrue(sends[1].settled)
+        self.assertEqual(len(sends[1].trackers), 1)  # The raw frame buffer
+        deadline = time.monotonic() + 1.0
+        while not sends[1].done and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(sends[1].done)
+
+    def test_credit_bounds_frames_in_flight(self):
+        """The sender stops after credit_window frames until the receiver consumes them."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.CREDIT)
+        receiver = self.manager(zmq.PULL, False, SendPolicy.CREDIT, credit_window=2)
+
+        self.assertTrue(sender.send_frame_data(FrameData.create(0, self.frame)))
+        self.assertTrue(sender.send_frame_data(FrameData.create(1, self.frame)))
+        self.assertFalse(sender.send_frame_data(FrameData.create(2, self.frame), timeout_ms=100))
+        self.assertEqual(sender.get_send_stats()['dropped_timeout'], 1)
+
+        self.assertEqual(len(receiver.receive_batch(timeout_ms=1000)), 2)
+        self.assertTrue(sender.send_frame_data(FrameData.create(3, self.frame)))
+        self.assertEqual(receiver.receive(timeout_ms=1000).frame_id, 3)
+
+    def test_failed_send_returns_credit(self):
+        """A frame that holds a credit but can't be queued gives the credit back."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.CREDIT)
+        receiver = self.manager(zmq.PULL, False, SendPolicy.CREDIT, credit_window=2)
+        time.sleep(0.1)  # Initial grant arrives
+        sender._try_send = lambda parts, send=None: False  # Queue full after the poll said it had space
+        for frame_id in range(3):
+            self.assertFalse(sender.send_frame_data(FrameData.create(frame_id, self.frame)))
+        stats = sender.get_send_stats()
+        self.assertEqual((stats['dropped_full'], stats['credits']), (3, 2))
+
+        del sender._try_send
+        self.assertTrue(sender.send_frame_data(FrameData.create(3, self.frame)))
+        self.assertEqual(receiver.receive(timeout_ms=1000).frame_id, 3)
+
+    def test_undecodable_frame_returns_credit(self):
+        """A frame message that fails to decode still gives its credit back."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.CREDIT)
+        receiver = self.manager(zmq.PULL, False, SendPolicy.CREDIT, credit_window=1)
+        self.assertTrue(sender.send_frame_data(FrameData.create(0, self.frame)))
+        error = ValueError("Shared-memory slot was recycled before it was read")
+        with mock.patch.object(MessageProtocol, '_decode_frame_data', side_effect=error):
+            self.assertIsNone(receiver.receive(timeout_ms=1000))
+        self.assertEqual(receiver.get_metrics()['decode_errors'], 1)
+
+        self.assertTrue(sender.send_frame_data(FrameData.create(1, self.frame)))
+        self.assertEqual(receiver.receive(timeout_ms=1000).frame_id, 1)
+
+    def test_lossless_waits_past_timeout(self):
+        """A lossless sender keeps waiting for credit instead of dropping after timeout_ms."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.CREDIT, lossless=True)
+        receiver = self.manager(zmq.PULL, False, SendPolicy.CREDIT, credit_window=1)
+        self.assertTrue(sender.send_frame_data(FrameData.create(0, self.frame)))
+
+        timer = threading.Timer(0.3, receiver.receive_batch, kwargs={'timeout_ms': 1000})  # Grants a credit late
+        timer.start()
+        self.assertTrue(sender.send_frame_data(FrameData.create(1, self.frame), timeout_ms=50))
+        timer.join()
+
+        stats = sender.get_send_stats()
+        self.assertEqual(stats['dropped'], 0)
+        self.assertGreater(stats['lossless_stalls'], 0)
+        self.assertEqual(receiver.receive(timeout_ms=1000).frame_id, 1)
+
+    def test_lossless_interrupt(self):
+        """interrupt() makes a waiting lossless send give up; lossy policies are rejected."""
+        sender = self.manager(zmq.PUSH, True, SendPolicy.BLOCK, lossless=True)
+        threading.Timer(0.2, sender.interrupt).start()
+        self.assertFalse(sender.send_frame_data(FrameData.create(0, self.frame), timeout_ms=50))
+        self.assertEqual(sender.get_send_stats()['dropped_timeout'], 1)
+
+        with self.assertRaises(ValueError):
+            ZMQManager(zmq.PUSH, self.endpoint, send_policy=SendPolicy.DROP_NEWEST, lossless=True)
+
+    def test_offline_mode_policies(self):
+        """Offline mode makes the processing channels lossless CREDIT channels, but not the web preview."""
+        PipelineComm.set_offline(True)
+        try:
+            for channel in PipelineComm.LOSSLESS_CHANNELS:
+                self.assertEqual(PipelineComm.send_policy(channel), SendPolicy.CREDIT)
+                self.assertTrue(PipelineComm.is_lossless(channel))
+            self.assertFalse(PipelineComm.is_lossless(PipelineComm.DISPLAY_TO_WEB))
+
+            sender = PipelineComm.create_streamer_sender()
+            self.managers.append(sender)
+            self.assertTrue(sender.lossless)
+        finally:
+            PipelineComm.set_offline(None)
+        self.assertFalse(PipelineComm.is_lossless(PipelineComm.STREAMER_TO_DETECTOR))
+
+    def test_detector_pool_channels(self):
+        """With a detector pool the Display binds the result channel, which blocks instead of using credits."""
+        PipelineComm.set_offline(True)
+        PipelineComm.set_detector_pool(3)
+        try:
+            with self.assertLogs("PipelineComm", "WARNING") as logs:
+                self.assertEqual(PipelineComm.send_policy(PipelineComm.DETECTOR_TO_DISPLAY), SendPolicy.BLOCK)
+            self.assertIn("instead of credit", logs.output[0])
+            self.assertEqual(PipelineComm.send_policy(PipelineComm.STREAMER_TO_DETECTOR), SendPolicy.CREDIT)
+
+            receiver = PipelineComm.create_display_receiver()
+            self.managers.append(receiver)
+            self.assertTrue(receiver.bind)
+            self.assertTrue(receiver.start())
+            workers = [PipelineComm.create_detector_sender() for _ in range(2)]
+            self.managers.extend(workers)
+            for frame_id, worker in enumerate(workers):
+                self.assertFalse(worker.bind)
+                self.assertTrue(worker.lossless)
+                self.assertTrue(worker.start())
+                result = DetectionResult.create(FrameData.create(frame_id, self.frame), [], processing_time=0.0)
+                self.assertTrue(worker.send_detection_result(result))
+            received = [receiver.receive(timeout_ms=1000) for _ in workers]
+            self.assertEqual(sorted(result.frame_id for result in received), [0, 1])
+        finally:
+            PipelineComm.set_offline(None)
+            PipelineComm.set_detector_pool(None)
+        self.assertEqual(PipelineComm.send_policy(PipelineComm.DETECTOR_TO_DISPLAY), SendPolicy.DROP_NEWEST)
+
+
+class TestZMQContextRegistry(unittest.TestCase):
+    """Test the shared per-process ZMQ context."""
+
+    def test_sockets_share_context_until_last_stop(self):
+        """Stopping one socket leaves the shared context usable for the others."""
+        endpoint = f"ipc:///tmp/axon_test_ctx_{id(self)}"
+        sender = ZMQManager(zmq.PUSH, endpoint, bind=True)
+        receiver = ZMQManager(zmq.PULL, endpoint, bind=False)
+        self.assertIs(sender.context, receiver.context)
+        self.assertTrue(sender.start())
+        self.assertTrue(receiver.start())
+
+        extra = ZMQManager(zmq.PUSH, f"{endpoint}_extra", bind=True)
+        extra.stop()
+        self.assertFalse(sender.context.closed)
+
+        time.sleep(0.1)
+        self.assertTrue(sender.send_system_message(SystemMessage.shutdown()))
+        self.assertIsInstance(receiver.receive(timeout_ms=1000), SystemMessage)
+
+        receiver.stop()
+        sender.stop()
+        sender.stop()  # Idempotent
+        self.assertTrue(sender.context.closed)
+        self.assertFalse(ZMQContextRegistry.get_stats()['active'])
+
+    def test_io_affinity_only_for_existing_threads(self):
+        """Affinity masks never reference I/O threads the context doesn't have."""
+        self.assertEqual(ZMQContextRegistry.io_affinity(0), 1)
+        self.assertEqual(ZMQContextRegistry.io_affinity(ZMQContextRegistry.io_threads), 0)
+
+
+class TestTransportMetrics(unittest.TestCase):
+    """Test per-socket transport metrics."""
+
+    def test_histogram_percentiles(self):
+        """Percentiles report the upper bound of the log2 bucket, capped at the max."""
+        histogram = LatencyHistogram()
+        for _ in range(99):
+            histogram.record(0.000010)  # 10us -> bucket < 16us
+        histogram.record(0.005)         # 5ms outlier
+        summary = histogram.to_dict()
+        self.assertEqual(summary['count'], 100)
+        self.assertEqual(summary['p50_us'], 16)
+        self.assertEqual(summary['p99_us'], 16)
+        self.assertEqual(summary['max_us'], 5000)
+        self.assertEqual(LatencyHistogram().percentile(99), 0)
+
+    def test_socket_counters(self):
+        """Messages, bytes, HWM hits and codec timings are counted on both ends."""
+        endpoint = f"ipc:///tmp/axon_test_metrics_{id(self)}"
+        sender = ZMQManager(zmq.PUSH, endpoint, bind=True)
+        receiver = ZMQManager(zmq.PULL, endpoint, bind=False)
+        self.assertTrue(sender.start())
+        self.assertTrue(receiver.start())
+        try:
+            time.sleep(0.1)
+            frame = np.zeros((48, 64, 3), dtype=np.uint8)
+            for frame_id in range(3):
+                self.assertTrue(sender.send_frame_data(FrameData.create(frame_id, frame, {})))
+
+            messages = []
+            deadline = time.time() + 2.0
+            while len(messages) < 3 and time.time() < deadline:
+                messages.extend(receiver.receive_batch(timeout_ms=200))
+            self.assertEqual(len(messages), 3)
+
+            sent = sender.get_metrics()
+            received = receiver.get_metrics()
+            self.assertEqual(sent['role'], 'PUSH')
+            self.assertEqual(sent['messages_sent'], 3)
+            self.assertGreater(sent['bytes_sent'], 3 * frame.nbytes)
+            self.assertEqual(sent['serialize_time']['count'], 3)
+            self.assertEqual(sent['send']['sent'], 3)
+            self.assertEqual(received['messages_received'], 3)
+            self.assertEqual(received['bytes_received'], sent['bytes_sent'])
+            self.assertEqual(received['deserialize_time']['count'], 3)
+            self.assertGreaterEqual(received['receive_wait']['count'], 1)
+            self.assertNotIn('send', received)
+        finally:
+            receiver.stop()
+            sender.stop()
+
+        # Closed sockets are no longer reported
+        self.assertNotIn(sender, ZMQManager.active_managers())
+
+    def test_hwm_hits_counted(self):
+        """A send that finds the queue full is counted as an HWM hit."""
+        sender = ZMQManager(zmq.PUSH, f"ipc:///tmp/axon_test_metrics_hwm_{id(self)}", bind=True)
+        self.assertTrue(sender.start())
+        try:
+            # No peer connected: PUSH cannot queue anything
+            self.assertFalse(sender.send_frame_data(FrameData.create(0, np.zeros((4, 4, 3), np.uint8), {})))
+            self.assertEqual(sender.get_metrics()['hwm_hits'], 1)
+            self.assertEqual(sender.get_metrics()['messages_sent'], 0)
+        finally:
+            sender.stop()
+
+    def test_reporter_publishes_on_monitoring_channel(self):
+        """A report lists this process's sockets but not the reporter's own publisher."""
+        use_temporary_endpoints(self)
+        subscriber = PipelineComm.create_metrics_subscriber()
+        self.assertTrue(subscriber.start())
+        data_socket = ZMQManager(zmq.PUSH, f"ipc:///tmp/axon_test_metrics_pub_{id(self)}", bind=True)
+        reporter = TransportMetricsReporter("test", interval=60.0)
+        try:
+            self.assertTrue(reporter.start())
+            message = None
+            deadline = time.time() + 5.0
+            while message is None and time.time() < deadline:
+                reporter.publish()  # Reports before the PUB/SUB join completes are dropped
+                message = subscriber.receive(timeout_ms=200)
+            self.assertIsInstance(message, SystemMessage)
+            self.assertEqual(message.message_type, "transport_metrics")
+            self.assertEqual(message.payload['component'], "test")
+            self.assertEqual(message.payload['pid'], os.getpid())
+            sockets = [(socket['endpoint'], socket['role']) for socket in message.payload['sockets']]
+            self.assertIn((data_socket.endpoint, 'PUSH'), sockets)
+            self.assertNotIn((reporter.publisher.endpoint, 'PUB'), sockets)
+        finally:
+            reporter.stop()
+            data_socket.stop()
+            subscriber.stop()
+
+
+class TestAsyncZMQManager(unittest.IsolatedAsyncioTestCase):
+    """Test the asyncio variant of ZMQManager."""
+
+    def setUp(self):
+        self.endpoint = f"ipc:///tmp/axon_test_async_{id(self)}"
+        self.frame = np.zeros((8, 8, 3), dtype=np.uint8)
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.stop()
+
+    def manager(self, socket_type, endpoint, bind, **kwargs):
+        manager = AsyncZMQManager(ZMQManager(socket_type, endpoint, bind=bind, **kwargs))
+        self.assertTrue(manager.start())
+        self.managers.append(manager)
+        return manager
+
+    async def test_one_loop_services_several_sockets(self):
+        """Receives on two sockets wait concurrently in one event loop."""
+        data_sender = self.manager(zmq.PUSH, self.endpoint, True)
+        data_receiver = self.manager(zmq.PULL, self.endpoint, False)
+        control_sender = self.manager(zmq.PUSH, f"{self.endpoint}_control", True)
+        control_receiver = self.manager(zmq.PULL, f"{self.endpoint}_control", False)
+        await asyncio.sleep(0.1)
+
+        async def send_later():
+            await asyncio.sleep(0.05)
+            self.assertTrue(await control_sender.send_system_message(SystemMessage.shutdown()))
+            self.assertTrue(await data_sender.send_frame_data(FrameData.create(5, self.frame)))
+
+        frames, control, _ = await asyncio.gather(
+            data_receiver.receive_batch(timeout_ms=2000),
+            control_receiver.receive(timeout_ms=2000),
+            send_later()
+        )
+        self.assertEqual(frames[0].frame_id, 5)
+        np.testing.assert_array_equal(frames[0].frame, self.frame)
+        self.assertEqual(control.message_type, "shutdown")
+        self.assertEqual(data_receiver.get_metrics()['messages_received'], 1)
+
+    async def test_credit_wait_is_awaitable(self):
+        """A CREDIT sender awaits credits; the grant after a receive resumes it."""
+        sender = self.manager(zmq.PUSH, self.endpoint, True, send_policy=SendPolicy.CREDIT)
+        receiver = self.manager(zmq.PULL, self.endpoint, False, send_policy=SendPolicy.CREDIT, credit_window=1)
+
+        self.assertTrue(await sender.send_frame_data(FrameData.create(0, self.frame)))
+        self.assertFalse(await sender.send_frame_data(FrameData.create(1, self.frame), timeout_ms=100))
+        self.assertEqual(sender.get_send_stats()['dropped_timeout'], 1)
+
+        blocked_send = asyncio.ensure_future(sender.send_frame_data(FrameData.create(2, self.frame)))
+        self.assertEqual((await receiver.receive(timeout_ms=1000)).frame_id, 0)
+        self.assertTrue(await blocked_send)
+        self.assertEqual((await receiver.receive(timeout_ms=1000)).frame_id, 2)
+
+    async def test_same_policy_steps_as_sync_sender(self):
+        """The async sender runs the manager's policy steps: a failed credited send gives its credit back."""
+        sender = self.manager(zmq.PUSH, self.endpoint, True, send_policy=SendPolicy.CREDIT)
+        receiver = self.manager(zmq.PULL, self.endpoint, False, send_policy=SendPolicy.CREDIT, credit_window=1)
+        await asyncio.sleep(0.1)
+        sender.manager._try_send = lambda parts, send=None: False
+        self.assertFalse(await sender.send_frame_data(FrameData.create(0, self.frame)))
+        self.assertEqual(sender.get_send_stats()['credits'], 1)
+
+        del sender.manager._try_send
+        self.assertTrue(await sender.send_frame_data(FrameData.create(1, self.frame)))
+        self.assertEqual((await receiver.receive(timeout_ms=1000)).frame_id, 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the decoded-frame cache (memory-mapped frame archives).
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from components.streamer.frame_cache import FrameCache, CachedFrameSource
+from components.streamer.video_streamer import VideoStreamer
+from communication.zmq_manager import PipelineComm
+from core.data_models import SystemMessage
+from ipc_endpoints import use_temporary_endpoints
+
+
+class TestFrameCache(unittest.TestCase):
+    """Test archive round trips, keying and the frame source."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.video_path = os.path.join(self.tmpdir.name, "moving.avi")
+        writer = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+        for index in range(30):
+            frame = np.zeros((48, 64, 3), dtype=np.uint8)
+            cv2.rectangle(frame, (index, 10), (index + 12, 30), (255, 255, 255), -1)
+            writer.write(frame)
+        writer.release()
+
+        cap = cv2.VideoCapture(self.video_path)
+        self.decoded = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            self.decoded.append(frame)
+        cap.release()
+        self.cache = FrameCache(os.path.join(self.tmpdir.name, "cache"))
+        use_temporary_endpoints(self)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def record(self):
+        writer = self.cache.create(self.video_path, self.decoded[0].shape, fps=25.0)
+        for index, frame in enumerate(self.decoded):
+            self.assertTrue(writer.append(frame, index * 40.0))
+        return writer.finish()
+
+    def test_roundtrip_with_random_access(self):
+        self.assertIsNone(self.cache.open(self.video_path))
+        self.record()
+
+        archive = self.cache.open(self.video_path)
+        self.assertEqual(len(archive), len(self.decoded))
+        for index in (17, 0, len(self.decoded) - 1):
+            np.testing.assert_array_equal(archive.frame(index), self.decoded[index])
+        self.assertEqual(archive.pts_ms(10), 400.0)
+        self.assertFalse(archive.frame(0).flags.writeable)
+
+    def test_modified_video_misses(self):
+        """A newer mtime (or size) of the source never matches the old archive."""
+        self.record()
+        stat = os.stat(self.video_path)
+        os.utime(self.video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertIsNone(self.cache.open(self.video_path))
+
+    def test_aborted_recording_leaves_nothing(self):
+        writer = self.cache.create(self.video_path, self.decoded[0].shape, fps=25.0)
+        writer.append(self.decoded[0], 0.0)
+        writer.abort()
+        self.assertIsNone(self.cache.open(self.video_path))
+        self.assertEqual(os.listdir(self.cache.cache_dir), [])
+
+    def test_source_skip_to(self):
+        self.record()
+        source = CachedFrameSource(self.cache.open(self.video_path))
+        source.skip_to(25)
+        index, frame, pts_ms = source.get()
+        self.assertEqual((index, pts_ms), (25, 1000.0))
+        np.testing.assert_array_equal(frame, self.decoded[25])
+        self.assertEqual(source.get_stats()['frames_skipped'], 25)
+
+    def test_streamer_records_then_streams_from_cache(self):
+        """The first offline run records the archive; the second sends identical frames from it."""
+        PipelineComm.set_offline(True)
+        try:
+            for expected_mode in ('recorded', 'hit'):
+                frames, status = self.stream_once()
+                self.assertEqual(status['mode'], expected_mode)
+                self.assertEqual(len(frames), len(self.decoded))
+                for received, expected in zip(frames, self.decoded):
+                    np.testing.assert_array_equal(received.frame, expected)
+                # Container PTS, decoded or from the archive (25 FPS)
+                self.assertEqual([f.pts_ms for f in frames], [i * 40.0 for i in range(len(self.decoded))])
+        finally:
+            PipelineComm.set_offline(None)
+
+    def stream_once(self):
+        receiver = PipelineComm.create_detector_receiver()
+        self.assertTrue(receiver.start())
+        streamer = VideoStreamer(self.video_path, offline=True, frame_cache_dir=str(self.cache.cache_dir))
+        frames = []
+        try:
+            self.assertTrue(streamer.start_streaming())
+            while True:
+                message = receiver.receive(timeout_ms=5000)
+                self.assertIsNotNone(message, "timed out waiting for frames")
+                if isinstance(message, SystemMessage):
+                    if message.message_type == "end_of_stream":
+                        break
+                    continue
+                frames.append(message)
+            streamer.stream_thread.join(timeout=2.0)
+            status = streamer.frame_cache_status()
+        finally:
+            streamer.stop_streaming()
+            receiver.stop()
+        return frames, status
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
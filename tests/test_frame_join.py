@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for joining metadata-only detection results with Streamer frames at the Display.
+"""
+import unittest
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from components.display.frame_join import FrameJoinBuffer
+from core.data_models import FrameData, DetectionResult
+
+
+def make_frame(frame_id: int, stream_id: str = "default") -> FrameData:
+    return FrameData.create(frame_id, np.full((8, 8, 3), frame_id, dtype=np.uint8), stream_id=stream_id)
+
+
+def make_result(frame_id: int, stream_id: str = "default") -> DetectionResult:
+    return DetectionResult.create(make_frame(frame_id, stream_id), [], processing_time=0.0, include_frame=False)
+
+
+class TestFrameJoinBuffer(unittest.TestCase):
+    """Test frame_id matching, bounds and eviction."""
+
+    def test_join_in_either_order(self):
+        """A result joins its frame whether the frame or the result arrives first."""
+        buffer = FrameJoinBuffer()
+
+        joined, evicted = buffer.add_frame(make_frame(1))
+        self.assertIsNone(joined)
+        self.assertEqual(evicted, [])
+        joined = buffer.add_result(make_result(1))
+        self.assertEqual(joined.frame_id, 1)
+        self.assertEqual(int(joined.frame[0, 0, 0]), 1)
+
+        self.assertIsNone(buffer.add_result(make_result(2)))
+        joined, _ = buffer.add_frame(make_frame(2))
+        self.assertEqual(int(joined.frame[0, 0, 0]), 2)
+
+        self.assertEqual(buffer.get_stats()['frames_joined'], 2)
+        self.assertEqual(buffer.get_stats()['pending_frames'], 0)
+
+    def test_size_bound_evicts_oldest_frames(self):
+        """Frames beyond max_size are evicted oldest first and handed back for release."""
+        buffer = FrameJoinBuffer(max_size=2)
+        buffer.add_frame(make_frame(1))
+        buffer.add_frame(make_frame(2))
+        _, evicted = buffer.add_frame(make_frame(3))
+
+        self.assertEqual([frame_data.frame_id for frame_data in evicted], [1])
+        self.assertIsNone(buffer.add_result(make_result(1)))
+        self.assertIsNotNone(buffer.add_result(make_result(3)))
+
+    def test_streams_join_separately(self):
+        """The same frame_id from two streams never joins across streams."""
+        buffer = FrameJoinBuffer()
+        buffer.add_frame(make_frame(1, "cam-a"))
+        buffer.add_frame(make_frame(1, "cam-b"))
+
+        joined = buffer.add_result(make_result(1, "cam-b"))
+        self.assertEqual(joined.stream_id, "cam-b")
+        self.assertEqual(buffer.get_stats()['pending_frames'], 1)
+        self.assertEqual(buffer.add_result(make_result(1, "cam-a")).stream_id, "cam-a")
+
+    def test_timeout_eviction(self):
+        """Unmatched entries are dropped once their partner is overdue."""
+        buffer = FrameJoinBuffer(timeout=0.01)
+        buffer.add_frame(make_frame(1))
+        buffer.add_result(make_result(2))
+        time.sleep(0.02)
+
+        evicted = buffer.evict_expired()
+        self.assertEqual([frame_data.frame_id for frame_data in evicted], [1])
+        stats = buffer.get_stats()
+        self.assertEqual(stats['results_evicted'], 1)
+        self.assertEqual(stats['pending_results'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
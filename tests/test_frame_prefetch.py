@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the Streamer's decoder read-ahead.
+"""
+import queue
+import unittest
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from components.streamer.frame_prefetch import FramePrefetcher
+
+
+class FrameSource:
+    """Capture stand-in returning numbered frames, with an optional per-read delay."""
+
+    def __init__(self, count: int, delay: float = 0.0):
+        self.count = count
+        self.delay = delay
+        self.reads = 0
+
+    def read(self):
+        if self.reads >= self.count:
+            return False, None
+        time.sleep(self.delay)
+        frame = np.full((4, 4, 3), self.reads, dtype=np.uint8)
+        self.reads += 1
+        return True, frame
+
+    def grab(self):
+        if self.reads >= self.count:
+            return False
+        self.reads += 1
+        return True
+
+    def get(self, prop_id):
+        # 25 FPS, and the PTS of the last frame read
+        return {cv2.CAP_PROP_FPS: 25.0, cv2.CAP_PROP_POS_MSEC: (self.reads - 1) * 40.0}.get(prop_id, 0.0)
+
+
+class TestFramePrefetcher(unittest.TestCase):
+    """Test ordering, bounds, skipping and end-of-video handling."""
+
+    def test_frames_in_order_then_end(self):
+        """All frames arrive in decode order, followed by None."""
+        prefetcher = FramePrefetcher(FrameSource(20), depth=4)
+        prefetcher.start()
+        indices = []
+        while True:
+            item = prefetcher.get(timeout=1.0)
+            if item is None:
+                break
+            index, frame, pts_ms = item
+            self.assertEqual(int(frame[0, 0, 0]), index)
+            self.assertEqual(pts_ms, index * 40.0)
+            indices.append(index)
+        prefetcher.stop()
+
+        self.assertEqual(indices, list(range(20)))
+        self.assertIsNone(prefetcher.get(timeout=0.1))  # Stays at end of video
+        self.assertEqual(prefetcher.get_stats()['frames_decoded'], 20)
+
+    def test_read_ahead_is_bounded(self):
+        """The decoder stops depth frames ahead of a consumer that isn't reading."""
+        source = FrameSource(100)
+        prefetcher = FramePrefetcher(source, depth=5)
+        prefetcher.start()
+        time.sleep(0.2)
+
+        stats = prefetcher.get_stats()
+        self.assertEqual(stats['queued'], 5)
+        self.assertLessEqual(source.reads, 6)  # Queue plus the frame waiting to be queued
+
+        prefetcher.stop()
+        self.assertFalse(prefetcher.thread.is_alive())
+        self.assertEqual(prefetcher.get_stats()['queued'], 0)
+
+    def test_skip_to_discards_and_grabs(self):
+        """Queued frames before the skip index are discarded, later ones grabbed undecoded."""
+        prefetcher = FramePrefetcher(FrameSource(50), depth=4)
+        prefetcher.start()
+        time.sleep(0.1)  # Queue full with frames 0-3
+
+        prefetcher.skip_to(30)
+        index, frame, pts_ms = prefetcher.get(timeout=1.0)
+        self.assertEqual((index, pts_ms), (30, 1200.0))
+        self.assertEqual(int(frame[0, 0, 0]), 30)
+
+        stats = prefetcher.get_stats()
+        self.assertGreaterEqual(stats['frames_discarded'], 4)
+        self.assertGreater(stats['frames_grabbed'], 0)
+        self.assertEqual(stats['frames_discarded'] + stats['frames_grabbed'], 30)  # Each earlier frame exactly once
+        prefetcher.stop()
+
+    def test_underruns_counted(self):
+        """Waiting on a slow decoder is counted as an underrun."""
+        prefetcher = FramePrefetcher(FrameSource(2, delay=0.05), depth=4)
+        prefetcher.start()
+        self.assertIsNotNone(prefetcher.get(timeout=1.0))
+        self.assertGreaterEqual(prefetcher.get_stats()['underruns'], 1)
+        prefetcher.stop()
+
+
+    def test_frames_queued_while_decoder_exits(self):
+        """Frames queued between an empty queue and the decoder's exit are still delivered."""
+        prefetcher = FramePrefetcher(FrameSource(3), depth=4)
+        prefetcher.start()
+        prefetcher.thread.join(timeout=1.0)  # All frames and the end of video queued
+
+        get_nowait = prefetcher.frames.get_nowait
+        calls = []
+
+        def late_get_nowait():
+            calls.append(None)
+            if len(calls) == 1:
+                raise queue.Empty  # Checked just before the decoder's last puts
+            return get_nowait()
+
+        prefetcher.frames.get_nowait = late_get_nowait
+        indices = []
+        item = prefetcher.get(timeout=0.1)
+        while item is not None:
+            indices.append(item[0])
+            item = prefetcher.get(timeout=0.1)
+        self.assertEqual(indices, [0, 1, 2])
+        prefetcher.stop()
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for putting detection results from a detector pool back in frame order at the Display.
+"""
+import unittest
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from components.display.frame_reorder import FrameReorderBuffer
+from components.display.video_display import VideoDisplay
+from components.streamer.video_streamer import VideoStreamer
+from communication.zmq_manager import PipelineComm
+from core.data_models import FrameData, DetectionResult, SystemMessage
+from ipc_endpoints import use_temporary_endpoints
+
+
+def make_result(frame_id: int, stream_id: str = "default", prev_frame_id=None) -> DetectionResult:
+    frame_data = FrameData.create(frame_id, np.zeros((8, 8, 3), dtype=np.uint8), stream_id=stream_id,
+                                  prev_frame_id=prev_frame_id)
+    return DetectionResult.create(frame_data, [], processing_time=0.0)
+
+
+def add_all(buffer: FrameReorderBuffer, frame_ids, stream_id: str = "default"):
+    """Add results in the given order; returns the frame_ids released."""
+    released = []
+    for frame_id in frame_ids:
+        results, _ = buffer.add(make_result(frame_id, stream_id))
+        released.extend(result.frame_id for result in results)
+    return released
+
+
+class TestFrameReorderBuffer(unittest.TestCase):
+    """Test ordering, the size bound and the gap timeout."""
+
+    def test_releases_in_frame_order(self):
+        """Results from interleaved workers come out in frame_id order as soon as they can."""
+        buffer = FrameReorderBuffer()
+        self.assertEqual(add_all(buffer, [1, 2]), [])
+        self.assertEqual(add_all(buffer, [0]), [0, 1, 2])
+        self.assertEqual(add_all(buffer, [4, 3, 6, 5]), [3, 4, 5, 6])
+
+        stats = buffer.get_stats()
+        self.assertEqual(stats['results_released'], 7)
+        self.assertEqual(stats['results_held'], 4)
+        self.assertEqual(stats['pending'], 0)
+        self.assertEqual(stats['max_pending'], 2)
+
+    def test_size_bound_skips_gap(self):
+        """When the buffer is full the missing frame is given up; it is dropped if it turns up later."""
+        buffer = FrameReorderBuffer(max_size=3)
+        self.assertEqual(add_all(buffer, [1, 2, 3]), [])
+        self.assertEqual(add_all(buffer, [4]), [1, 2, 3, 4])
+
+        released, late = buffer.add(make_result(0))
+        self.assertEqual(released, [])
+        self.assertEqual([result.frame_id for result in late], [0])
+        stats = buffer.get_stats()
+        self.assertEqual((stats['frames_missing'], stats['results_late']), (1, 1))
+
+    def test_gap_timeout(self):
+        """A held result waits at most gap_timeout for the ones before it."""
+        buffer = FrameReorderBuffer(gap_timeout=0.02)
+        self.assertEqual(add_all(buffer, [0, 3, 2]), [0])
+        self.assertEqual(buffer.release_expired(), [])
+        time.sleep(0.03)
+
+        self.assertEqual([result.frame_id for result in buffer.release_expired()], [2, 3])
+        self.assertEqual(buffer.last_frame_id("default"), 3)
+        self.assertEqual(buffer.get_stats()['frames_missing'], 1)
+
+    def test_streams_ordered_separately(self):
+        """A gap in one stream doesn't hold back another."""
+        buffer = FrameReorderBuffer()
+        self.assertEqual(add_all(buffer, [1], "cam-a"), [])
+        self.assertEqual(add_all(buffer, [0, 1], "cam-b"), [0, 1])
+        self.assertEqual(buffer.pending_count(), 1)
+
+        flushed = buffer.flush()
+        self.assertEqual([(result.stream_id, result.frame_id) for result in flushed], [("cam-a", 1)])
+        self.assertEqual(buffer.pending_count(), 0)
+
+
+    def test_follows_predecessor_across_skipped_ids(self):
+        """Ids the Streamer skipped or failed to send are no gap: a result follows its prev_frame_id."""
+        buffer = FrameReorderBuffer(gap_timeout=10.0)
+        chain = {0: -1, 1: 0, 5: 1, 9: 5, 10: 9}
+        released = []
+        for frame_id in (0, 5, 1, 10, 9):
+            results, _ = buffer.add(make_result(frame_id, prev_frame_id=chain[frame_id]))
+            released.extend(result.frame_id for result in results)
+        self.assertEqual(released, [0, 1, 5, 9, 10])
+        self.assertEqual(buffer.get_stats()['frames_missing'], 0)
+
+        # A lost result still holds its successors until the gap timeout
+        self.assertEqual(buffer.add(make_result(14, prev_frame_id=12))[0], [])
+        self.assertEqual(buffer.pending_count(), 1)
+
+
+class TestStreamerSkippedFrames(unittest.TestCase):
+    """Results of a Streamer that skips frame_ids are released without waiting."""
+
+    def setUp(self):
+        use_temporary_endpoints(self)
+        PipelineComm.set_offline(True)
+
+    def tearDown(self):
+        PipelineComm.set_offline(None)
+
+    def test_nothing_held(self):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        items = iter([(0, frame, 0.0), (1, frame, 40.0), (4, frame, 160.0), (9, frame, 360.0), (10, frame, 400.0)])
+        receiver = PipelineComm.create_detector_receiver()
+        self.assertTrue(receiver.start())
+        streamer = VideoStreamer("synthetic:64x48@25,frames=20", offline=True, prefetch_depth=0)
+        buffer = FrameReorderBuffer(gap_timeout=10.0)
+        released, end = [], None
+        try:
+            with mock.patch.object(VideoStreamer, '_read_frame', lambda _: next(items, None)):
+                self.assertTrue(streamer.start_streaming())
+                while end is None:
+                    message = receiver.receive(timeout_ms=5000)
+                    self.assertIsNotNone(message, "timed out waiting for frames")
+                    if isinstance(message, FrameData):
+                        results, _ = buffer.add(DetectionResult.create(message, [], processing_time=0.0))
+                        released.extend(result.frame_id for result in results)
+                    elif message.message_type == "end_of_stream":
+                        end = message
+        finally:
+            streamer.stop_streaming()
+            receiver.stop()
+
+        self.assertEqual(released, [0, 1, 4, 9, 10])
+        self.assertEqual((buffer.pending_count(), buffer.get_stats()['results_held']), (0, 0))
+        self.assertEqual(end.payload['last_frame_ids'], {"default": 10})
+
+
+class TestDisplayEndOfStream(unittest.TestCase):
+    """The Display holds a pool's end-of-stream until every stream's results are out."""
+
+    def end_of_stream(self, **payload) -> SystemMessage:
+        return SystemMessage(message_type="end_of_stream", payload=payload, timestamp=time.time())
+
+    def released(self, messages):
+        return [(m.stream_id, m.frame_id) if isinstance(m, DetectionResult) else m.message_type for m in messages]
+
+    def test_waits_for_every_stream(self):
+        display = VideoDisplay(show_window=False, reorder_results=True, reorder_timeout=10.0)
+        batch = [make_result(1, "cam-a"), self.end_of_stream(total_frames=3, streams={"cam-a": 2, "cam-b": 1})]
+        self.assertEqual(display._reorder(batch), [])
+        self.assertEqual(self.released(display._reorder([make_result(0, "cam-a")])), [("cam-a", 0), ("cam-a", 1)])
+        self.assertEqual(self.released(display._reorder([make_result(0, "cam-b")])), [("cam-b", 0), "end_of_stream"])
+
+    def test_single_source_total(self):
+        display = VideoDisplay(show_window=False, reorder_results=True, reorder_timeout=10.0)
+        self.assertEqual(display._reorder([make_result(1), self.end_of_stream(total_frames=2)]), [])
+        self.assertEqual(self.released(display._reorder([make_result(0)])), [("default", 0), ("default", 1),
+                                                                              "end_of_stream"])
+
+    def test_last_frame_ids(self):
+        """End-of-stream waits for the last frame_id sent, not for a frame count."""
+        display = VideoDisplay(show_window=False, reorder_results=True, reorder_timeout=10.0)
+        batch = [make_result(7, prev_frame_id=3), self.end_of_stream(total_frames=8, last_frame_ids={"default": 7})]
+        self.assertEqual(display._reorder(batch), [])
+        self.assertEqual(self.released(display._reorder([make_result(3, prev_frame_id=-1)])),
+                         [("default", 3), ("default", 7), "end_of_stream"])
+
+
+if __name__ == '__main__':
+    unittest.main()
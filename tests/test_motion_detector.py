@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Tests for the MotionDetector's detection options.
+"""
+import unittest
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from components.detector.motion_detector import MotionDetector, _mask_is_static, _scale_bbox, _scale_boxes
+from components.detector.engines import ENGINE_NAMES, create_engine
+from components.streamer.synthetic_source import SyntheticVideoSource
+from components.streamer.video_streamer import VideoStreamer
+from communication.zmq_manager import PipelineComm
+from core.data_models import FrameData, DetectionResult, SystemMessage
+from ipc_endpoints import use_temporary_endpoints
+
+
+def two_box_frames(shape=(480, 640), big=(60, 40), small=(12, 10)):
+    """Two frames in which a big and a small box move 30 px (each leaves two strips in the difference)."""
+    height, width = shape
+    frames = []
+    for step in (0, 30):
+        frame = np.full((height, width, 3), 90, dtype=np.uint8)
+        cv2.rectangle(frame, (100 + step, 120), (100 + step + big[0] - 1, 120 + big[1] - 1), (250, 250, 250), -1)
+        cv2.rectangle(frame, (400 + step, 300), (400 + step + small[0] - 1, 300 + small[1] - 1), (10, 10, 10), -1)
+        frames.append(frame)
+    return frames
+
+
+def detect(detector, frames):
+    result = None
+    for frame_id, frame in enumerate(frames):
+        result = detector._process_frame(FrameData.create(frame_id, frame))
+    return result
+
+
+class TestAnalysisScale(unittest.TestCase):
+    """Detection on downscaled frames, reported in full-resolution coordinates."""
+
+    def test_boxes_map_back_to_frame_coordinates(self):
+        frames = two_box_frames()
+        full = sorted(d.bbox for d in detect(MotionDetector(min_area=10, dilate_iterations=0), frames).detections)
+        for scale in (0.5, 0.25):
+            result = detect(MotionDetector(min_area=10, dilate_iterations=0, analysis_scale=scale), frames)
+            self.assertEqual(result.metadata['analysis_size'], (int(640 * scale), int(480 * scale)))
+            boxes = sorted(d.bbox for d in result.detections)
+            self.assertEqual(len(boxes), len(full))
+            for box, expected in zip(boxes, full):
+                # Rounded outwards: contains the full-resolution box, within one analysis pixel
+                for got, want, tolerance in zip(box, expected, (1 / scale,) * 2 + (2 / scale,) * 2):
+                    self.assertLessEqual(abs(got - want), tolerance)
+
+    def test_min_area_in_full_resolution_pixels(self):
+        """The same min_area keeps the big box's strips (30x40) and drops the small box's (12x10) at every scale."""
+        frames = two_box_frames()
+        for scale in (1.0, 0.5, 0.25):
+            detector = MotionDetector(min_area=300, dilate_iterations=0, analysis_scale=scale)
+            detections = detect(detector, frames).detections
+            self.assertEqual(len(detections), 2, f"scale {scale}")
+            for detection in detections:
+                self.assertAlmostEqual(detection.area, 29 * 39, delta=0.3 * 29 * 39)
+
+    def test_analysis_width(self):
+        detector = MotionDetector(analysis_width=160)
+        self.assertEqual(detector.analysis_size(640, 480), (160, 120))
+        self.assertEqual(detector.analysis_size(3840, 2160), (160, 90))
+        self.assertEqual(detector.analysis_size(120, 90), (120, 90))  # Never upscaled
+
+        result = detect(detector, two_box_frames())
+        self.assertEqual(result.metadata['analysis_size'], (160, 120))
+        for x, y, w, h in (d.bbox for d in result.detections):
+            self.assertTrue(0 <= x and 0 <= y and x + w <= 640 and y + h <= 480)
+
+    def test_bbox_clipped_to_frame(self):
+        self.assertEqual(_scale_bbox((0, 0, 10, 10), 1.0, 1.0, 64, 48), (0, 0, 10, 10))
+        self.assertEqual(_scale_bbox((10, 5, 6, 7), 3.0, 3.0, 48, 36), (30, 15, 18, 21))
+        self.assertEqual(_scale_bbox((1, 1, 3, 3), 1.5, 1.5, 5, 5), (1, 1, 4, 4))
+
+    def test_invalid_scale(self):
+        for kwargs in ({'analysis_scale': 0}, {'analysis_scale': 1.5}, {'analysis_width': 0}):
+            with self.assertRaises(ValueError):
+                MotionDetector(**kwargs)
+
+
+
+def blob_grid_frames(rows=12, cols=16, shape=(480, 640)):
+    """An empty frame, then one with rows x cols separate boxes of varying size (a busy scene)."""
+    height, width = shape
+    empty = np.zeros((height, width, 3), dtype=np.uint8)
+    busy = empty.copy()
+    rng = np.random.default_rng(5)
+    cell_w, cell_h = width // cols, height // rows
+    for row in range(rows):
+        for col in range(cols):
+            w, h = rng.integers(6, cell_w - 4), rng.integers(6, cell_h - 4)
+            x, y = col * cell_w + 2, row * cell_h + 2
+            cv2.rectangle(busy, (int(x), int(y)), (int(x + w - 1), int(y + h - 1)), (255, 255, 255), -1)
+    return [empty, busy]
+
+
+class TestBlobExtraction(unittest.TestCase):
+    """Connected components find the same blobs as contours."""
+
+    def test_same_boxes_as_contours(self):
+        frames = blob_grid_frames()
+        for scale in (1.0, 0.5):
+            results = {}
+            for method in MotionDetector.BLOB_EXTRACTION:
+                detector = MotionDetector(min_area=10, dilate_iterations=0, analysis_scale=scale, blob_extraction=method)
+                results[method] = detect(detector, frames)
+            self.assertEqual(results['components'].metadata['blob_extraction'], 'components')
+            contours = sorted(results['contours'].detections, key=lambda d: d.bbox)
+            components = sorted(results['components'].detections, key=lambda d: d.bbox)
+            self.assertGreater(len(contours), 100)
+            self.assertEqual([d.bbox for d in components], [d.bbox for d in contours])
+            for component, contour in zip(components, contours):
+                # Pixel count vs. the outline's area: (w * h) vs. (w - 1) * (h - 1) for a box
+                self.assertGreaterEqual(component.area, contour.area)
+                self.assertAlmostEqual(component.confidence, min(1.0, component.area / 10000.0), delta=1e-3)
+
+    def test_min_area_filter(self):
+        frames = two_box_frames()
+        detections = detect(MotionDetector(min_area=300, dilate_iterations=0, blob_extraction="components"),
+                            frames).detections
+        self.assertEqual([d.area for d in detections], [30 * 40, 30 * 40])
+        self.assertEqual(detect(MotionDetector(min_area=5000, blob_extraction="components"), frames).detections, [])
+
+    def test_vectorized_bbox_scaling(self):
+        boxes = np.random.default_rng(1).integers(0, 50, (40, 4))
+        expected = [_scale_bbox(tuple(box), 2.5, 3.0, 120, 140) for box in boxes.tolist()]
+        self.assertEqual([tuple(box) for box in _scale_boxes(boxes, 2.5, 3.0, 120, 140).tolist()], expected)
+
+    def test_invalid_method(self):
+        with self.assertRaises(ValueError):
+            MotionDetector(blob_extraction="watershed")
+
+
+
+class TestDetectionEngines(unittest.TestCase):
+    """Every engine finds moving objects; background models also keep stopped ones."""
+
+    def test_every_engine_detects_moving_objects(self):
+        source = SyntheticVideoSource("synthetic:320x240,frames=40,objects=2,noise=3,seed=1")
+        for name in ENGINE_NAMES:
+            detector = MotionDetector(min_area=50, engine=name)
+            hits = 0
+            for index in range(40):
+                result = detector._process_frame(FrameData.create(index, source.render(index)))
+                self.assertEqual(result.metadata['engine'], create_engine(name).spec())
+                if index >= 10:
+                    truth = source.object_boxes(index)
+                    hits += all(any(overlaps(d.bbox, box) for d in result.detections) for box in truth)
+            self.assertGreaterEqual(hits, 27, name)
+            self.assertGreater(detector.get_stats()['avg_engine_time_ms'], 0)
+
+    def test_stopped_object(self):
+        """A box appears and stays: framediff reports it once, background models until they learn it."""
+        empty = np.full((120, 160, 3), 100, dtype=np.uint8)
+        with_box = empty.copy()
+        cv2.rectangle(with_box, (40, 40), (79, 79), (250, 250, 250), -1)
+        frames = [empty] * 10 + [with_box] * 5
+        for name, expected in (("framediff", 1), ("average:0.01", 5), ("mog2", 2)):
+            detector = MotionDetector(min_area=100, engine=name)
+            found = [bool(detector._process_frame(FrameData.create(i, frame)).detections)
+                     for i, frame in enumerate(frames)]
+            self.assertTrue(found[10], name)
+            if name == "framediff":
+                self.assertEqual(sum(found), 1)
+            else:
+                self.assertGreaterEqual(sum(found), expected, name)
+
+    def test_knn_warmup(self):
+        """No detections while the model has too few samples (it reports everything as foreground)."""
+        detector = MotionDetector(engine="knn")
+        frames = two_box_frames()
+        results = [detector._process_frame(FrameData.create(i, frames[i % 2])) for i in range(4)]
+        self.assertEqual([r.detections for r in results], [[]] * 4)
+
+    def test_engine_per_stream(self):
+        detector = MotionDetector(min_area=10, engine="average")
+        frames = two_box_frames()
+        for stream_id in ("a", "b"):
+            result = detector._process_frame(FrameData.create(0, frames[0], stream_id=stream_id))
+            self.assertEqual(result.detections, [])
+        self.assertEqual(set(detector.engines), {"a", "b"})
+        self.assertIsNot(detector.engines["a"], detector.engines["b"])
+
+    def test_stream_ended_frees_state(self):
+        """A finished source's engine and work buffers are dropped; other streams keep theirs."""
+        detector = MotionDetector(analysis_scale=0.5)
+        frames = two_box_frames()
+        for stream_id in ("a", "b"):
+            detector._process_frame(FrameData.create(0, frames[0], stream_id=stream_id))
+        ended = SystemMessage(message_type="stream_ended", payload={'stream_id': "a"}, timestamp=0.0)
+        self.assertEqual(detector._split_batch([ended]), ([], False))
+        for per_stream in (detector.engines, detector.buffer_pools, detector.scaled_frames):
+            self.assertEqual(set(per_stream), {"b"})
+
+    def test_latency_only_for_local_frames(self):
+        """Frames captured on another host are detected but left out of the latency histogram."""
+        detector = MotionDetector()
+        frames = two_box_frames()
+        detector._detect(FrameData.create(0, frames[0]))
+        remote = FrameData.create(1, frames[1])
+        remote.capture_clock = "other-host"
+        self.assertEqual(len(detector._detect(remote).detections), 2)
+        self.assertEqual((detector.latency.count, detector.latency_skipped), (1, 1))
+
+    def test_specs(self):
+        self.assertEqual(create_engine("average:0.02").alpha, 0.02)
+        self.assertEqual(create_engine("MOG2").spec(), "mog2:16")
+        self.assertEqual(create_engine(None).spec(), "framediff")
+        for bad in ("watershed", "framediff:3", "average:2", "knn:abc"):
+            with self.assertRaises(ValueError):
+                MotionDetector(engine=bad)
+
+
+class TestPoolWorker(unittest.TestCase):
+    """Workers of a detector pool find what one Detector finds, from frames sent with their predecessor."""
+
+    def test_workers_match_single_detector(self):
+        source = SyntheticVideoSource("synthetic:320x240,frames=12,objects=2,noise=3,seed=2")
+        frames = [source.render(index) for index in range(12)]
+        single = MotionDetector(min_area=50, analysis_scale=0.5)
+        expected = [[d.bbox for d in single._process_frame(FrameData.create(i, frame)).detections]
+                    for i, frame in enumerate(frames)]
+
+        workers = [MotionDetector(min_area=50, analysis_scale=0.5, pool_worker=True) for _ in range(3)]
+        for index, frame in enumerate(frames):
+            frame_data = FrameData.create(index, frame, prev_frame=frames[index - 1] if index else None)
+            result = workers[index % 3]._process_frame(frame_data)  # Round-robin, like PUSH
+            self.assertEqual([d.bbox for d in result.detections], expected[index], f"frame {index}")
+        self.assertTrue(any(expected))
+
+    def test_needs_pairwise_engine(self):
+        self.assertTrue(create_engine("framediff").pairwise)
+        for name in ("average", "mog2", "knn"):
+            with self.assertRaises(ValueError):
+                MotionDetector(engine=name, pool_worker=True)
+
+    def test_every_worker_ends(self):
+        """The Streamer's end-of-stream reaches every worker, not just the one PUSH hands it to."""
+        use_temporary_endpoints(self)
+        PipelineComm.set_offline(True)
+        PipelineComm.set_detector_pool(3)
+        receiver = PipelineComm.create_display_receiver()
+        workers = [MotionDetector(pool_worker=True) for _ in range(3)]
+        streamer = VideoStreamer("synthetic:160x120@25,frames=30", offline=True, detector_pool=3)
+        results, ends = 0, 0
+        try:
+            self.assertTrue(receiver.start())
+            for worker in workers:
+                self.assertTrue(worker.start_detection())
+            self.assertTrue(streamer.start_streaming())
+            deadline = time.monotonic() + 15.0
+            while ends < len(workers) and time.monotonic() < deadline:
+                for message in receiver.receive_batch(timeout_ms=100):
+                    if isinstance(message, DetectionResult):
+                        results += 1
+                    elif isinstance(message, SystemMessage) and message.message_type == "end_of_stream":
+                        ends += 1
+            for worker in workers:
+                worker.process_thread.join(timeout=2.0)
+            self.assertEqual([worker.process_thread.is_alive() for worker in workers], [False] * 3)
+        finally:
+            streamer.stop_streaming()
+            for worker in workers:
+                worker.stop_detection()
+            receiver.stop()
+            PipelineComm.set_detector_pool(None)
+            PipelineComm.set_offline(None)
+        self.assertEqual((results, ends), (30, 3))
+
+
+class TestStaticCheck(unittest.TestCase):
+    """Frames without change skip the blob search; frames with motion are detected as before."""
+
+    def test_static_frames_skipped(self):
+        frames = two_box_frames()
+        sequence = [frames[0]] * 4 + [frames[1]] * 3 + [frames[0]]
+        detector = MotionDetector(min_area=300, dilate_iterations=0, static_check=8)
+        results = [detector._process_frame(FrameData.create(i, frame)) for i, frame in enumerate(sequence)]
+
+        # First frame: no mask yet; 1-3 and 5-6 repeat their predecessor
+        self.assertEqual([r.metadata['static'] for r in results],
+                         [False, True, True, True, False, True, True, False])
+        self.assertEqual([len(r.detections) for r in results], [0, 0, 0, 0, 2, 0, 0, 2])
+        stats = detector.get_stats()['static_check']
+        self.assertEqual((stats['block'], stats['static_frames']), (8, 5))
+        self.assertGreater(stats['check_time_ms'], 0)
+        self.assertGreater(stats['avg_blob_time_ms'], 0)
+
+    def test_small_object_between_sample_points(self):
+        """A 5x5 box in rows 1-5 lies between every 8th row, but its pixels still count in their block."""
+        frames = []
+        for x in (300, 305):
+            frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+            frame[1:6, x:x + 5] = 250
+            frames.append(frame)
+        for block in (0, 8):
+            result = detect(MotionDetector(min_area=20, static_check=block), frames)
+            self.assertFalse(result.metadata['static'])
+            self.assertEqual(len(result.detections), 1, f"block {block}")
+
+    def test_block_needs_a_line_of_changed_pixels(self):
+        mask = np.zeros((64, 64), dtype=np.uint8)
+        self.assertTrue(_mask_is_static(mask, 1))
+        mask[17, 9:16] = 255  # 7 pixels in one 8x8 tile
+        self.assertTrue(_mask_is_static(mask, 8))
+        self.assertFalse(_mask_is_static(mask, 1))
+        mask[17, 8] = 255     # 8
+        self.assertFalse(_mask_is_static(mask, 8))
+
+    def test_odd_mask_size(self):
+        """Odd sides leave ragged edge tiles, but every pixel still counts in its tile."""
+        mask = np.zeros((67, 93), dtype=np.uint8)
+        for y in range(0, 63, 3):
+            for x in range(0, 89, 5):
+                mask[:] = 0
+                mask[y:y + 4, x:x + 4] = 255  # 16 pixels, at least 4 in one 4x4 tile
+                self.assertFalse(_mask_is_static(mask, 4), f"blob at {(y, x)}")
+        mask[:] = 0
+        mask[64, 88:93] = 255  # 5 pixels in the 3x5 corner tile of block 8
+        self.assertTrue(_mask_is_static(mask, 8))
+        mask[65, 88:91] = 255  # 8
+        self.assertFalse(_mask_is_static(mask, 8))
+
+    def test_odd_frame_size_small_object(self):
+        frames = []
+        for x in (300, 305):
+            frame = np.full((479, 641, 3), 90, dtype=np.uint8)
+            frame[341:346, x:x + 5] = 250
+            frames.append(frame)
+        for block in (0, 8):
+            result = detect(MotionDetector(min_area=20, static_check=block), frames)
+            self.assertEqual(len(result.detections), 1, f"block {block}")
+
+    def test_exact_check_matches_full_detection(self):
+        """Block 1 checks every pixel, so it skips only frames whose mask is empty."""
+        source = SyntheticVideoSource("synthetic:320x240,frames=30,objects=2,noise=3,seed=4")
+        frames = [source.render(index) for index in range(30)]
+        frames[10:20] = [frames[10]] * 10  # Still scene
+        plain = MotionDetector(min_area=50)
+        checked = MotionDetector(min_area=50, static_check=1)
+        for index, frame in enumerate(frames):
+            expected = plain._process_frame(FrameData.create(index, frame))
+            result = checked._process_frame(FrameData.create(index, frame))
+            self.assertEqual([d.bbox for d in result.detections], [d.bbox for d in expected.detections])
+        self.assertEqual(checked.get_stats()['static_check']['static_frames'], 9)
+
+    def test_any_engine(self):
+        frames = two_box_frames()
+        detector = MotionDetector(min_area=300, engine="average", static_check=4)
+        detect(detector, [frames[0]] * 3)
+        self.assertEqual(detector.get_stats()['static_check']['static_frames'], 2)
+        for block in (-1, 3, 12):
+            with self.assertRaises(ValueError):
+                MotionDetector(static_check=block)
+
+
+def overlaps(a, b) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming several sources with per-stream ids.
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from components.streamer.multi_source_streamer import MultiSourceStreamer, parse_sources
+from components.detector.motion_detector import MotionDetector
+from communication.zmq_manager import PipelineComm
+from core.data_models import FrameData, SystemMessage
+from ipc_endpoints import use_temporary_endpoints
+
+
+def write_video(path: str, frames: int, shade: int):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+    for _ in range(frames):
+        writer.write(np.full((48, 64, 3), shade, dtype=np.uint8))
+    writer.release()
+
+
+class TestParseSources(unittest.TestCase):
+    """Test stream id assignment from command-line specs."""
+
+    def test_named_and_default_ids(self):
+        sources = parse_sources(["front=a/cam.mp4", "b/cam.mp4", "c/cam.mp4"])
+        self.assertEqual(sources, {"front": "a/cam.mp4", "cam": "b/cam.mp4", "cam-2": "c/cam.mp4"})
+
+    def test_synthetic_specs(self):
+        sources = parse_sources(["synthetic:360p,seed=1", "synthetic:360p,seed=2", "cam=synthetic:720p,noise=4"])
+        self.assertEqual(sources, {"synthetic": "synthetic:360p,seed=1", "synthetic-2": "synthetic:360p,seed=2",
+                                   "cam": "synthetic:720p,noise=4"})
+
+    def test_duplicate_id_rejected(self):
+        with self.assertRaises(ValueError):
+            parse_sources(["cam=a.mp4", "cam=b.mp4"])
+
+
+class TestPerStreamDetection(unittest.TestCase):
+    """Test that interleaved streams are differenced against their own previous frame."""
+
+    def test_streams_do_not_diff_against_each_other(self):
+        detector = MotionDetector(min_area=10)
+        dark = np.zeros((48, 64, 3), dtype=np.uint8)
+        bright = np.full((48, 64, 3), 200, dtype=np.uint8)
+
+        for frame_id in range(3):
+            for stream_id, frame in (("dark", dark), ("bright", bright)):
+                result = detector._process_frame(FrameData.create(frame_id, frame, stream_id=stream_id))
+                self.assertEqual(result.detections, [])
+        self.assertEqual(len(detector.engines), 2)
+
+
+class TestMultiSourceStreamer(unittest.TestCase):
+    """Test fair interleaving and per-stream end messages (offline, lossless)."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.sources = {}
+        for stream_id, frames in (("long", 12), ("short", 5)):
+            path = os.path.join(self.tmpdir.name, f"{stream_id}.avi")
+            write_video(path, frames, shade=len(self.sources) * 100)
+            self.sources[stream_id] = path
+        use_temporary_endpoints(self)
+        PipelineComm.set_offline(True)
+
+    def tearDown(self):
+        PipelineComm.set_offline(None)
+        self.tmpdir.cleanup()
+
+    def test_round_robin_with_stream_ended(self):
+        receiver = PipelineComm.create_detector_receiver()
+        self.assertTrue(receiver.start())
+        streamer = MultiSourceStreamer(self.sources, offline=True)
+        messages = []
+        try:
+            self.assertTrue(streamer.start_streaming())
+            while not (messages and isinstance(messages[-1], SystemMessage)
+                       and messages[-1].message_type == "end_of_stream"):
+                message = receiver.receive(timeout_ms=5000)
+                self.assertIsNotNone(message, "timed out waiting for frames")
+                messages.append(message)
+        finally:
+            streamer.stop_streaming()
+            receiver.stop()
+
+        frames = [m for m in messages if isinstance(m, FrameData)]
+        for stream_id, count in (("long", 12), ("short", 5)):
+            self.assertEqual([f.frame_id for f in frames if f.stream_id == stream_id], list(range(count)))
+
+        # Offline scheduling is round-robin while both streams have frames
+        self.assertEqual(sorted(f.stream_id for f in frames[:10]), ["long"] * 5 + ["short"] * 5)
+
+        ended = [m.payload['stream_id'] for m in messages
+                 if isinstance(m, SystemMessage) and m.message_type == "stream_ended"]
+        self.assertEqual(sorted(ended), ["long", "short"])
+        self.assertEqual(messages[-1].payload['streams'], {"long": 12, "short": 5})
+
+        # Stream properties arrive once per stream, ahead of its first frame
+        for stream_id in ("long", "short"):
+            descriptor = receiver.stream_descriptor(stream_id)
+            self.assertEqual((descriptor.width, descriptor.height), (64, 48))
+            first_frame = next(i for i, m in enumerate(messages)
+                               if isinstance(m, FrameData) and m.stream_id == stream_id)
+            self.assertTrue(any(isinstance(m, SystemMessage) and m.payload.get('stream_id') == stream_id
+                                and m.message_type == "stream_descriptor" for m in messages[:first_frame]))
+        self.assertEqual(frames[0].metadata, {})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
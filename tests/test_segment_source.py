@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for parallel segment decoding of offline runs.
+"""
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from components.streamer.segment_source import ParallelSegmentSource, _seek
+from core.buffer_pool import FrameBufferPool
+
+
+class InexactSeekCapture:
+    """Capture whose seeks land on a keyframe and still report the requested frame position."""
+
+    def __init__(self, frames: int, gop: int, overshoot: bool, fps: float = 25.0):
+        self.frames, self.gop, self.overshoot, self.fps = frames, gop, overshoot, fps
+        self.position = self.requested = self.grabs = 0
+        self.grabbed = None
+
+    def set(self, prop_id: int, value: float) -> bool:
+        self.requested = int(value)
+        keyframe = (-(-self.requested // self.gop) if self.overshoot else self.requested // self.gop) * self.gop
+        self.position = min(keyframe, self.frames)
+        return True
+
+    def grab(self) -> bool:
+        if self.position >= self.frames:
+            return False
+        self.grabbed, self.position = self.position, self.position + 1
+        self.grabs += 1
+        return True
+
+    def get(self, prop_id: int) -> float:
+        if prop_id == cv2.CAP_PROP_POS_MSEC:
+            return self.grabbed * 1000.0 / self.fps
+        return self.requested if prop_id == cv2.CAP_PROP_POS_FRAMES else 0.0
+
+
+class TestParallelSegmentSource(unittest.TestCase):
+    """Test that segment-wise decoding reproduces a sequential decode."""
+
+    @classmethod
+    def setUpClass(cls):
+        # Each frame differs, so a frame delivered under the wrong index is caught
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.video_path = os.path.join(cls.tmpdir.name, "segments.avi")
+        writer = cv2.VideoWriter(cls.video_path, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+        for index in range(50):
+            frame = np.zeros((48, 64, 3), dtype=np.uint8)
+            cv2.rectangle(frame, (index, 10), (index + 10, 30), (255, 255, 255), -1)
+            writer.write(frame)
+        writer.release()
+
+        cap = cv2.VideoCapture(cls.video_path)
+        cls.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cls.sequential = []
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            cls.sequential.append(frame)
+        cap.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def read_all(self, source):
+        frames = []
+        source.start()
+        try:
+            while True:
+                item = source.get(timeout=30.0)
+                if item is None:
+                    break
+                frames.append(item)
+        finally:
+            source.stop()
+        return frames
+
+    def test_matches_sequential_decode(self):
+        """Frames arrive in order with global indices, identical across segment boundaries."""
+        source = ParallelSegmentSource(self.video_path, self.total_frames, workers=2, segment_frames=7)
+        frames = self.read_all(source)
+
+        self.assertEqual([index for index, _, _ in frames], list(range(len(self.sequential))))
+        for (index, frame, _), expected in zip(frames, self.sequential):
+            np.testing.assert_array_equal(frame, expected)
+        self.assertEqual(source.get_stats()['segments_decoded'], 8)  # ceil(50 / 7)
+
+    def test_low_frame_count_reads_to_end(self):
+        """The last segment reads on to the end when the container under-reports frames."""
+        source = ParallelSegmentSource(self.video_path, 20, workers=2, segment_frames=8)
+        self.assertEqual(len(self.read_all(source)), len(self.sequential))
+
+    def test_skip_to_discards(self):
+        """Frames before the skip index are not delivered."""
+        source = ParallelSegmentSource(self.video_path, self.total_frames, workers=1, segment_frames=16)
+        source.skip_to(20)
+        frames = self.read_all(source)
+        self.assertEqual(frames[0][0], 20)
+        self.assertEqual(source.get_stats()['frames_discarded'], 20)
+
+    def test_copies_into_pool(self):
+        """Frames are copied out of shared memory into pool buffers, which are reused once released."""
+        pool = FrameBufferPool(self.sequential[0].shape, debug=False)
+        source = ParallelSegmentSource(self.video_path, self.total_frames, workers=2, segment_frames=8, pool=pool)
+        source.start()
+        try:
+            for expected in self.sequential:
+                index, frame, _ = source.get(timeout=30.0)
+                np.testing.assert_array_equal(frame, expected)
+                pool.release(frame)
+            self.assertIsNone(source.get(timeout=30.0))
+        finally:
+            source.stop()
+        self.assertEqual(pool.get_stats()['allocations'], 1)
+
+    def test_buffer_budget_caps_in_flight(self):
+        """Fewer segments are decoded ahead when their blocks don't fit max_buffer_bytes."""
+        block_bytes = 8 * self.sequential[0].nbytes
+        source = ParallelSegmentSource(self.video_path, self.total_frames, workers=2, segment_frames=8,
+                                       max_buffer_bytes=3 * block_bytes)
+        source.start()
+        try:
+            self.assertEqual(source.in_flight, 2)
+            self.assertEqual(source.get_stats()['shared_mb'], 3 * block_bytes / 1e6)
+            frames = 0
+            while source.get(timeout=30.0) is not None:
+                frames += 1
+        finally:
+            source.stop()
+        self.assertEqual(frames, len(self.sequential))
+
+        too_small = ParallelSegmentSource(self.video_path, self.total_frames, segment_frames=8,
+                                          max_buffer_bytes=block_bytes)
+        with self.assertRaises(ValueError):
+            too_small.start()
+        self.assertEqual(too_small.blocks, [])
+
+    def test_fails_early_without_shm_space(self):
+        """start() raises before creating blocks that /dev/shm can't hold."""
+        source = ParallelSegmentSource(self.video_path, self.total_frames, workers=2, segment_frames=8)
+        with mock.patch("components.streamer.segment_source.shm_free_bytes", return_value=64 * 1024):
+            with self.assertRaisesRegex(RuntimeError, "/dev/shm"):
+                source.start()
+        self.assertEqual(source.blocks, [])
+        self.assertIsNone(source.executor)
+
+    def test_seek_located_by_pts(self):
+        """An inexact seek is corrected from the PTS of the frame before the segment, within a GOP or two."""
+        for overshoot in (False, True):
+            cap = InexactSeekCapture(frames=1000, gop=10, overshoot=overshoot)
+            self.assertTrue(_seek(cap, 905, cap.fps, 0.0))
+            self.assertTrue(cap.grab())
+            self.assertEqual(cap.grabbed, 905)
+            self.assertLess(cap.grabs, 20)
+
+        cap = InexactSeekCapture(frames=50, gop=10, overshoot=False)
+        self.assertFalse(_seek(cap, 60, cap.fps, 0.0))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic video source.
+"""
+import unittest
+import sys
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from components.streamer.synthetic_source import SyntheticSpec, SyntheticVideoSource, open_capture
+from components.streamer.segment_source import _decode_segment
+from components.streamer.video_streamer import VideoStreamer
+from components.detector.motion_detector import MotionDetector
+from core.data_models import FrameData
+
+
+class TestSyntheticSpec(unittest.TestCase):
+    """Test spec parsing."""
+
+    def test_size_fps_and_options(self):
+        spec = SyntheticSpec.parse("synthetic:320x240@15,frames=40,objects=5,noise=6,lighting=0.25,seed=9")
+        self.assertEqual((spec.width, spec.height, spec.fps, spec.frames), (320, 240, 15.0, 40))
+        self.assertEqual((spec.objects, spec.noise, spec.lighting, spec.seed), (5, 6, 0.25, 9))
+
+    def test_presets_and_defaults(self):
+        spec = SyntheticSpec.parse("synthetic:4k")
+        self.assertEqual((spec.width, spec.height, spec.fps), (3840, 2160, 30.0))
+
+    def test_invalid_specs(self):
+        for bad in ("synthetic:320by240", "synthetic:320x240,speed=3", "synthetic:320x240,frames=0", "video.mp4"):
+            with self.assertRaises(ValueError):
+                SyntheticSpec.parse(bad)
+
+
+class TestSyntheticVideoSource(unittest.TestCase):
+    """Test the capture interface and determinism."""
+
+    SPEC = "synthetic:160x120@25,frames=30,objects=4,noise=5,lighting=0.3,seed=3"
+
+    def read_all(self, source):
+        frames = []
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                return frames
+            frames.append(frame)
+
+    def test_capture_properties(self):
+        cap = open_capture(self.SPEC)
+        self.assertTrue(cap.isOpened())
+        self.assertEqual(cap.get(cv2.CAP_PROP_FPS), 25.0)
+        self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 30)
+        self.assertEqual((cap.get(cv2.CAP_PROP_FRAME_WIDTH), cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), (160, 120))
+        self.assertEqual(len(self.read_all(cap)), 30)
+        cap.release()
+        self.assertFalse(cap.isOpened())
+
+    def test_deterministic_by_seed(self):
+        first = self.read_all(SyntheticVideoSource(self.SPEC))
+        second = self.read_all(SyntheticVideoSource(self.SPEC))
+        for a, b in zip(first, second):
+            np.testing.assert_array_equal(a, b)
+        other_seed = SyntheticVideoSource(self.SPEC.replace("seed=3", "seed=4")).read()[1]
+        self.assertFalse(np.array_equal(first[0], other_seed))
+
+    def test_seek_and_segments_match_sequential(self):
+        frames = self.read_all(SyntheticVideoSource(self.SPEC))
+        cap = SyntheticVideoSource(self.SPEC)
+        self.assertTrue(cap.set(cv2.CAP_PROP_POS_FRAMES, 17))
+        np.testing.assert_array_equal(cap.read()[1], frames[17])
+        block = shared_memory.SharedMemory(create=True, size=8 * frames[0].nbytes)
+        try:
+            pts, others = _decode_segment(self.SPEC, 10, 8, block.name, frames[0].shape, 0.0)
+            decoded = np.ndarray((8,) + frames[0].shape, dtype=np.uint8, buffer=block.buf).copy()
+        finally:
+            block.close()
+            block.unlink()
+        self.assertEqual(others, [])
+        for index, (a, pts_ms, b) in enumerate(zip(decoded, pts, frames[10:18]), 10):
+            np.testing.assert_array_equal(a, b)
+            self.assertEqual(pts_ms, index * 40.0)
+
+    def test_renders_into_given_buffer(self):
+        cap = SyntheticVideoSource(self.SPEC)
+        image = np.empty((120, 160, 3), dtype=np.uint8)
+        ret, frame = cap.read(image)
+        self.assertTrue(ret)
+        self.assertIs(frame, image)
+
+    def test_objects_move_on_static_background(self):
+        """Without noise and lighting, only the rectangles change - and the detector finds them."""
+        cap = SyntheticVideoSource("synthetic:320x240,objects=2,seed=1")
+        detector = MotionDetector(min_area=10)
+        for frame_id in range(5):
+            result = detector._process_frame(FrameData.create(frame_id, cap.read()[1]))
+        self.assertTrue(result.detections)
+
+        still = SyntheticVideoSource("synthetic:320x240,objects=0")
+        np.testing.assert_array_equal(still.read()[1], still.read()[1])
+
+    def test_object_boxes_are_ground_truth(self):
+        cap = SyntheticVideoSource("synthetic:320x240,objects=3,seed=2")
+        background = cap.background
+        for index in (0, 7, 50):
+            frame = cap.render(index)
+            boxes = cap.object_boxes(index)
+            self.assertEqual(len(boxes), 3)
+            changed = np.any(frame != background, axis=2)
+            covered = np.zeros_like(changed)
+            for x, y, w, h in boxes:
+                covered[y:y + h, x:x + w] = True
+            np.testing.assert_array_equal(changed, covered)
+
+    def test_streamer_opens_synthetic_source(self):
+        streamer = VideoStreamer("synthetic:320x180@12,frames=24")
+        self.assertTrue(streamer.open_video())
+        self.assertEqual((streamer.frame_width, streamer.frame_height), (320, 180))
+        self.assertEqual((streamer.original_fps, streamer.total_frames), (12.0, 24))
+        streamer.close_video()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)